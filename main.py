@@ -4,41 +4,63 @@ MVCアーキテクチャ版のメインエントリーポイント
 """
 
 import os
-import signal
 import sys
-import tkinter as tk
-from tkinter import messagebox
 
 # プロジェクトルートを追加
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.controllers import (
-    BoardController,
-    CoordinateController,
-    FileController,
-    MainController,
-)
-from src.models import (
-    AppSettingsModel,
-    BoardModel,
-    CoordinateModel,
-    ImageModel,
-    LotModel,
-    WorkerModel,
+from src.utils.startup_profiler import startup_profiler
+
+# --profile-startup 指定時は以降のインポート時間も記録するため最初に計測を開始
+if "--profile-startup" in sys.argv:
+    startup_profiler.enable()
+
+import importlib
+import multiprocessing
+import signal
+import threading
+import tkinter as tk
+from tkinter import messagebox
+
+# 作業者入力の表示中にバックグラウンドで読み込むモジュール
+# （SQLModel/SQLAlchemy/pydantic・PIL・numpyを含むため最初の画面表示の後に回す）
+PRELOAD_MODULES = (
+    "src.db.schema",
+    "src.models.coordinate_model",
+    "src.models.image_model",
+    "src.models.board_model",
+    "src.views.main_view",
+    "src.views.coordinate_canvas_view",
+    "src.views.sidebar_view",
+    "src.views.board_timeline_view",
+    "src.controllers.main_controller",
+    "src.controllers.coordinate_controller",
+    "src.controllers.file_controller",
+    "src.controllers.board_controller",
 )
-from src.views import CoordinateCanvasView, MainView, SidebarView
-from src.views.dialogs import DateSelectDialog, SettingsDialog, WorkerInputDialog
+
+
+def _preload_modules():
+    """重いモジュールを先読み（失敗した場合は通常のインポート時に改めてエラーにする）"""
+    with startup_profiler.step("モジュールの先読み（バックグラウンド）"):
+        for module_name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(module_name)
+            except Exception as e:
+                print(f"[起動] モジュールの先読みに失敗しました: {module_name} ({e})")
+                return
 
 
 class ImageCoordsApp:
     """MVCアーキテクチャによる画像座標アプリケーション"""
 
     def __init__(self):
-        self.root = tk.Tk()
-        self.root.title("画像座標アプリケーション (MVC)")
+        with startup_profiler.step("ウィンドウの作成"):
+            self.root = tk.Tk()
+            self.root.title("画像座標アプリケーション (MVC)")
 
-        # サブディスプレイにフルスクリーンで表示設定
-        self._setup_display()
+            # サブディスプレイにフルスクリーンで表示設定
+            self._setup_display()
 
         # アプリケーションのセットアップ
         self._setup_application()
@@ -65,19 +87,43 @@ class ImageCoordsApp:
             self.root.state("zoomed")
 
     def _setup_application(self):
-        """アプリケーションのセットアップ"""
+        """アプリケーションのセットアップ
+
+        ウィンドウと作業者入力を先に表示し、入力中に重いモジュールを読み込む
+        """
+        preload_thread = threading.Thread(target=_preload_modules, daemon=True)
+        preload_thread.start()
+
+        # 作業者モデル（作業者入力で使うため先に生成）
+        from src.models.worker_model import WorkerModel
+
+        self.worker_model = WorkerModel()
+
+        # 作業者入力（デバッグモード時はスキップ）
+        self.worker = self._input_worker()
+        if self.worker is None and not self._is_debug_mode():
+            # キャンセルされた場合はアプリを終了
+            self.root.destroy()
+            sys.exit(0)
+
+        with startup_profiler.step("先読みの完了待ち"):
+            preload_thread.join()
         try:
             # モデルの初期化
-            self._initialize_models()
+            with startup_profiler.step("モデルの初期化"):
+                self._initialize_models()
 
             # ビューの初期化
-            self._initialize_views()
+            with startup_profiler.step("ビューの初期化"):
+                self._initialize_views()
 
             # コントローラーの初期化
-            self._initialize_controllers()
+            with startup_profiler.step("コントローラーの初期化"):
+                self._initialize_controllers()
 
             # アプリケーションの初期化
-            self.main_controller.initialize_application()
+            with startup_profiler.step("アプリケーションの初期化"):
+                self.main_controller.initialize_application(self.worker)
 
         except Exception as e:
             messagebox.showerror(
@@ -85,14 +131,36 @@ class ImageCoordsApp:
             )
             sys.exit(1)
 
+    @staticmethod
+    def _is_debug_mode() -> bool:
+        """デバッグモードかどうか（環境変数 DEBUG=1 または --debug）"""
+        return os.getenv("DEBUG", "0") == "1" or "--debug" in sys.argv
+
+    def _input_worker(self):
+        """作業者入力ダイアログを表示（デバッグモード時は表示しない）"""
+        if self._is_debug_mode():
+            return None
+
+        from src.views.dialogs.worker_input_dialog import WorkerInputDialog
+
+        self.root.update_idletasks()
+        startup_profiler.mark("作業者入力の表示")
+        with startup_profiler.step("作業者入力（入力待ちを含む）"):
+            return WorkerInputDialog(self.root, self.worker_model).show()
+
     def _initialize_models(self):
         """モデルの初期化"""
+        from src.models import (
+            AppSettingsModel,
+            BoardModel,
+            CoordinateModel,
+            ImageModel,
+            LotModel,
+        )
+
         # アプリケーション設定モデル
         self.settings_model = AppSettingsModel()
 
-        # 作業者モデル
-        self.worker_model = WorkerModel()
-
         # 座標モデル
         self.coordinate_model = CoordinateModel()
 
@@ -107,6 +175,15 @@ class ImageCoordsApp:
 
     def _initialize_views(self):
         """ビューの初期化"""
+        from src.views import BoardTimelineView, CoordinateCanvasView, MainView, SidebarView
+        from src.views.dialogs import (
+            DateSelectDialog,
+            DefectSearchDialog,
+            ReportExportDialog,
+            SettingsDialog,
+            WorkerInputDialog,
+        )
+
         # メインビュー
         self.main_view = MainView(self.root)
 
@@ -116,15 +193,27 @@ class ImageCoordsApp:
         # サイドバービュー
         self.sidebar_view = SidebarView(self.main_view.sidebar_frame)
 
+        # 基板タイムラインビュー
+        self.timeline_view = BoardTimelineView(self.main_view.timeline_frame)
+
         # ダイアログクラス
         self.dialogs = {
             "WorkerInputDialog": WorkerInputDialog,
             "SettingsDialog": SettingsDialog,
             "DateSelectDialog": DateSelectDialog,
+            "DefectSearchDialog": DefectSearchDialog,
+            "ReportExportDialog": ReportExportDialog,
         }
 
     def _initialize_controllers(self):
         """コントローラーの初期化"""
+        from src.controllers import (
+            BoardController,
+            CoordinateController,
+            FileController,
+            MainController,
+        )
+
         # ファイルコントローラー
         self.file_controller = FileController(
             self.settings_model,
@@ -157,10 +246,11 @@ class ImageCoordsApp:
             coordinate_controller=self.coordinate_controller,
             file_controller=self.file_controller,
             board_controller=self.board_controller,
+            timeline_view=self.timeline_view,
         )
 
         # デバッグモードの設定（環境変数またはコマンドライン引数で制御）
-        if os.getenv("DEBUG", "0") == "1" or "--debug" in sys.argv:
+        if self._is_debug_mode():
             self.main_controller.set_debug_mode(True)
             print("[DEBUG] デバッグモードが有効になりました")
 
@@ -188,7 +278,7 @@ class ImageCoordsApp:
 
             # ロックファイルを削除
             if hasattr(self, "file_controller"):
-                self.file_controller.remove_lot_number_dir_lock_file()
+                self.file_controller.delete_lot_number_dir_lock_file()
                 print("[クリーンアップ] ロックファイルを削除しました")
 
         except Exception as e:
@@ -202,6 +292,12 @@ class ImageCoordsApp:
         try:
             print("[終了処理] ウィンドウ終了が要求されました")
 
+            # 未保存の変更がある場合は確認
+            if self.main_controller.has_unsaved_changes() and not messagebox.askokcancel(
+                "終了確認", "現在の基板に未保存の変更があります。\n保存せずに終了しますか？"
+            ):
+                return
+
             # ロックファイルを削除
             if hasattr(self, "file_controller"):
                 self.file_controller.delete_lot_number_dir_lock_file()
@@ -217,6 +313,7 @@ class ImageCoordsApp:
 
     def run(self):
         """アプリケーションを実行"""
+        self.root.after_idle(startup_profiler.mark, "メイン画面の表示")
         self.root.mainloop()
 
 
@@ -245,4 +342,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 実行ファイル化した場合に整合性チェックのワーカープロセスを起動できるようにする
+    multiprocessing.freeze_support()
     main()
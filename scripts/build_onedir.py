@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+onedir形式の実行ファイルをビルドするスクリプト
+
+onefile形式は起動のたびに一時ディレクトリへ展開するため起動が遅い。onedir形式で展開を省き、
+src以下はデータファイルではなくバイトコードとしてアーカイブに含め、起動時のコンパイルを省く。
+使わないライブラリは除外候補から起動プロファイル（python main.py --profile-startup で作成）に
+現れないものだけを除外する。
+
+使い方:
+    python scripts/build_onedir.py [--profile startup_profile.json] [--spec-only]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+APP_NAME = "image_coords_app"
+SPEC_FILE_NAME = f"{APP_NAME}_onedir.spec"
+
+# 除外候補（起動後の遅延インポートを含め、アプリから使っていないパッケージ・サブモジュール）: 理由
+EXCLUDE_CANDIDATES: Dict[str, str] = {
+    "sqlalchemy.dialects.mysql": "SQLiteのみ使用",
+    "sqlalchemy.dialects.postgresql": "SQLiteのみ使用",
+    "sqlalchemy.dialects.oracle": "SQLiteのみ使用",
+    "sqlalchemy.dialects.mssql": "SQLiteのみ使用",
+    "sqlalchemy.ext.asyncio": "非同期エンジン未使用",
+    "sqlalchemy.ext.mypy": "型チェック用プラグイン",
+    "sqlalchemy.testing": "SQLAlchemyのテスト用",
+    "pandas.tests": "pandasのテスト",
+    "pandas.plotting": "グラフ描画未使用",
+    "pandas.io.formats.style": "Styler未使用（jinja2が必要）",
+    "pandas.io.clipboard": "クリップボード未使用",
+    "numpy.f2py": "Fortran連携",
+    "numpy.distutils": "ビルド用",
+    "numpy.tests": "numpyのテスト",
+    "PIL.ImageQt": "Qt未使用",
+    "matplotlib": "グラフ描画未使用",
+    "scipy": "未使用",
+    "IPython": "未使用",
+    "jinja2": "未使用",
+    "tkinter.test": "tkinterのテスト",
+    "lib2to3": "未使用",
+    "pydoc_data": "ヘルプ用データ",
+}
+
+# 動的にインポートされるため明示するモジュール
+BASE_HIDDEN_IMPORTS = [
+    "PIL._tkinter_finder",
+    "PIL.ImageTk",
+    "tkinter",
+    "tkinter.ttk",
+    "tkinter.messagebox",
+    "tkinter.filedialog",
+    "tkinter.simpledialog",
+    # 不良集計レポートのXLSX書き出し（任意。インストールされている場合のみ同梱される）
+    "openpyxl",
+]
+
+
+def load_profiled_modules(profile_path: Path) -> Set[str]:
+    """起動プロファイルからインポートされたモジュール名を取得"""
+    with open(profile_path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    return {entry["module"] for entry in report.get("imports", [])}
+
+
+def derive_excludes(profiled_modules: Iterable[str]) -> List[str]:
+    """除外候補のうち起動プロファイルでインポートされていないものを取得"""
+    profiled_modules = set(profiled_modules)
+    excludes = []
+    for candidate in EXCLUDE_CANDIDATES:
+        used = any(name == candidate or name.startswith(candidate + ".") for name in profiled_modules)
+        if not used:
+            excludes.append(candidate)
+    return excludes
+
+
+def collect_source_modules(package_directory: Path = PROJECT_ROOT / "src") -> List[str]:
+    """src以下の全モジュール名を取得（遅延インポートされるため静的解析では見つからない）"""
+    modules = []
+    for path in sorted(package_directory.rglob("*.py")):
+        if "__pycache__" in path.parts:
+            continue
+        relative = path.relative_to(PROJECT_ROOT).with_suffix("")
+        parts = list(relative.parts)
+        if parts[-1] == "__init__":
+            parts.pop()
+        modules.append(".".join(parts))
+    return modules
+
+
+def render_spec(excludes: List[str], hidden_imports: List[str], console: bool = False) -> str:
+    """onedir形式のspecファイルの内容を作成"""
+    icon_path = PROJECT_ROOT / "assets" / "icons" / "app_icon.ico"
+    icon = repr(str(icon_path)) if icon_path.exists() else "None"
+    return f"""# -*- mode: python ; coding: utf-8 -*-
+# scripts/build_onedir.py で生成
+
+a = Analysis(
+    [{str(PROJECT_ROOT / "main.py")!r}],
+    pathex=[{str(PROJECT_ROOT)!r}],
+    binaries=[],
+    datas=[],
+    hiddenimports={hidden_imports!r},
+    hookspath=[],
+    hooksconfig={{}},
+    runtime_hooks=[],
+    excludes={excludes!r},
+    noarchive=False,
+)
+
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name={APP_NAME!r},
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console={console!r},
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    icon={icon},
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    name={APP_NAME!r},
+)
+"""
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="onedir形式の実行ファイルをビルドします")
+    parser.add_argument(
+        "--profile",
+        default=str(PROJECT_ROOT / "startup_profile.json"),
+        help="起動プロファイル（python main.py --profile-startup で作成）",
+    )
+    parser.add_argument("--spec-only", action="store_true", help="specファイルの作成のみ行う")
+    parser.add_argument("--console", action="store_true", help="コンソールを表示する（デバッグ用）")
+    args = parser.parse_args()
+
+    profile_path = Path(args.profile)
+    if profile_path.exists():
+        excludes = derive_excludes(load_profiled_modules(profile_path))
+        print(f"[ビルド] 起動プロファイルを使用します: {profile_path}")
+    else:
+        # プロファイルがない場合は除外候補をそのまま使う
+        excludes = derive_excludes([])
+        print(f"[ビルド] 起動プロファイルがないため除外候補をすべて除外します: {profile_path}")
+    for name in excludes:
+        print(f"  除外: {name} ({EXCLUDE_CANDIDATES[name]})")
+
+    hidden_imports = BASE_HIDDEN_IMPORTS + collect_source_modules()
+    spec_path = PROJECT_ROOT / SPEC_FILE_NAME
+    spec_path.write_text(render_spec(excludes, hidden_imports, args.console), encoding="utf-8")
+    print(f"[ビルド] specファイルを作成しました: {spec_path}")
+    if args.spec_only:
+        return
+
+    result = subprocess.run(
+        [sys.executable, "-m", "PyInstaller", str(spec_path), "--clean", "--noconfirm"],
+        cwd=PROJECT_ROOT,
+    )
+    if result.returncode != 0:
+        sys.exit(result.returncode)
+    print(f"[ビルド] 出力先: {PROJECT_ROOT / 'dist' / APP_NAME}")
+    print("[ビルド] 起動時間は dist 内の実行ファイルを --profile-startup 付きで起動して確認できます")
+
+
+if __name__ == "__main__":
+    os.chdir(PROJECT_ROOT)
+    main()
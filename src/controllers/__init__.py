@@ -1,12 +1,26 @@
 """
 Controller Layer
 ビジネスロジックとユーザーインタラクションを管理するコントローラー層
+
+各コントローラーは初回参照時にインポート
 """
 
-from .board_controller import BoardController
-from .coordinate_controller import CoordinateController
-from .file_controller import FileController
-from .main_controller import MainController
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .board_controller import BoardController
+    from .coordinate_controller import CoordinateController
+    from .file_controller import FileController
+    from .main_controller import MainController
+
+# 公開名: 定義元のモジュール
+_EXPORTS = {
+    "BoardController": ".board_controller",
+    "CoordinateController": ".coordinate_controller",
+    "FileController": ".file_controller",
+    "MainController": ".main_controller",
+}
 
 __all__ = [
     "MainController",
@@ -14,3 +28,13 @@ __all__ = [
     "FileController",
     "BoardController",
 ]
+
+
+def __getattr__(name: str):
+    """公開名を初めて参照した時に定義元のモジュールをインポート"""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -111,6 +111,7 @@ class BoardController:
 
             # 座標データをクリア
             self.coordinate_model.clear_coordinates()
+            self.coordinate_model.mark_saved()
 
             # サイドバーの表示を更新
             if self.sidebar_view:
@@ -208,6 +209,7 @@ class BoardController:
 
             # 座標データをクリア
             self.coordinate_model.clear_coordinates()
+            self.coordinate_model.mark_saved()
 
             # 新しい基盤番号を取得
             new_board_number = self.get_new_board_number()
@@ -363,12 +365,8 @@ class BoardController:
         )
 
     def has_unsaved_changes(self) -> bool:
-        """現在の基盤に未保存の変更があるかチェック"""
-        current_coordinates = self.coordinate_model.coordinates
-        current_details = self.coordinate_model.coordinate_details
-        return self.board_model.has_unsaved_changes(
-            current_coordinates, current_details
-        )
+        """現在の基盤に未保存の変更があるかチェック（リビジョンの比較のみ）"""
+        return self.coordinate_model.has_unsaved_changes()
 
     def _save_current_board_data(
         self, current_date: date, model_name: str, lot_number: str, worker_no: str
@@ -380,7 +378,7 @@ class BoardController:
             current_details = self.coordinate_model.coordinate_details
             image_path = self.image_model.current_image_path
 
-            return self.board_model.save_board_data(
+            success = self.board_model.save_board_data(
                 current_board_number,
                 current_coordinates,
                 current_details,
@@ -389,6 +387,9 @@ class BoardController:
                 image_path,
                 model_name,
             )
+            if success:
+                self.coordinate_model.mark_saved()
+            return success
 
         except Exception as e:
             print(f"現在の基盤データ保存エラー: {e}")
@@ -407,6 +408,7 @@ class BoardController:
                 self.coordinate_model.set_coordinates_with_details(
                     coordinates, coordinate_details
                 )
+                self.coordinate_model.mark_saved()
 
                 print(
                     f"基盤 {board_number} のデータを読み込みました（座標数: {len(coordinates)}）"
@@ -415,6 +417,7 @@ class BoardController:
             else:
                 # データがない場合は空の状態
                 self.coordinate_model.clear_coordinates()
+                self.coordinate_model.mark_saved()
                 print(f"基盤 {board_number} には保存されたデータがありません")
                 return True
 
@@ -461,6 +464,7 @@ class BoardController:
         try:
             self.board_model.reset()
             self.coordinate_model.clear_coordinates()
+            self.coordinate_model.mark_saved()
 
             if self.sidebar_view:
                 self.sidebar_view.clear_form()
@@ -47,6 +47,9 @@ class CoordinateController:
         # 現在の基盤番号（自動保存用）
         self.current_board_number = 1
 
+        # 前の基板から引き継いだ未確定の座標（ゴースト、元画像座標）
+        self.ghost_details: List[Detail] = []
+
     def set_canvas_view(self, canvas_view: "CoordinateCanvasView") -> None:
         """キャンバスビューを設定"""
         self.canvas_view = canvas_view
@@ -97,6 +100,29 @@ class CoordinateController:
 
         return index
 
+    def add_original_coordinate(self, orig_x: int, orig_y: int) -> int:
+        """元画像座標で座標を追加（部品の中心へのスナップ等、変換の丸めを挟まずに保存）"""
+        index = self.coordinate_model.add_coordinate(orig_x, orig_y)
+        if self.canvas_view:
+            display_x, display_y = self.image_model.convert_original_to_display_coords(orig_x, orig_y)
+            self.canvas_view.add_coordinate_marker(display_x, display_y, index + 1)
+        self._update_coordinate_display()
+        return index
+
+    def add_original_coordinates(
+        self, coordinates: List[Tuple[int, int]], details: Optional[List[Dict[str, Any]]] = None
+    ) -> List[int]:
+        """元画像座標で座標をまとめて追加（アンドゥ1回分、マーカーの再描画は1回）
+
+        Returns:
+            List[int]: 追加した座標のインデックス
+        """
+        indices = self.coordinate_model.add_coordinates(coordinates, details)
+        if indices:
+            self._redraw_all_markers()
+            self._update_coordinate_display()
+        return indices
+
     def remove_coordinate(self, index: int) -> bool:
         """座標を削除"""
         if self.coordinate_model.remove_coordinate(index):
@@ -201,6 +227,7 @@ class CoordinateController:
     def clear_coordinates(self) -> None:
         """全座標をクリア"""
         self.coordinate_model.clear_coordinates()
+        self.clear_ghosts()
         if self.canvas_view:
             self.canvas_view.clear_coordinate_markers()
             self.canvas_view.clear_highlight()
@@ -242,8 +269,10 @@ class CoordinateController:
         self, coordinates: List[Tuple[int, int]], details: List[Dict[str, Any]]
     ) -> None:
         """座標データを読み込み"""
-        # モデルに設定
+        # モデルに設定（ファイルから読み込んだ内容は保存済み）
         self.coordinate_model.set_coordinates_with_details(coordinates, details)
+        self.coordinate_model.mark_saved()
+        self.ghost_details = []
 
         # ビューのマーカーを再描画
         self._redraw_all_markers()
@@ -251,39 +280,115 @@ class CoordinateController:
         # メインビューの座標表示を更新
         self._update_coordinate_display()
 
+    def redraw_markers(self) -> None:
+        """全マーカーを現在の描画方式で再描画"""
+        self._redraw_all_markers()
+
     def _redraw_all_markers(self) -> None:
         """全マーカーを再描画"""
         if not self.canvas_view:
             return
 
-        # 元画像座標を表示座標に変換して描画
-        display_coordinates = []
-        for orig_x, orig_y in self.coordinate_model.coordinates:
-            display_x, display_y = self.image_model.convert_original_to_display_coords(
-                orig_x, orig_y
-            )
-            display_coordinates.append((display_x, display_y))
+        # 元画像座標を表示座標に一括変換して描画
+        display_coordinates = self.image_model.convert_original_to_display_array(
+            self.coordinate_model.coordinates_array
+        )
 
-        self.canvas_view.redraw_coordinate_markers(display_coordinates)
+        self.canvas_view.redraw_coordinate_markers(display_coordinates.tolist())
+        self.redraw_ghost_markers()
 
         # 現在選択中の座標をハイライト
         current_index = self.coordinate_model.current_index
         if current_index >= 0:
             self.canvas_view.highlight_coordinate(current_index)
 
+    # region 前の基板からの引き継ぎ（ゴースト）
+
+    # 引き継ぐ詳細情報（修理済み・コメントは基板ごとに異なるため引き継がない）
+    CARRY_FORWARD_FIELDS = ("reference", "defect")
+
+    def set_ghosts(self, details: List[Detail]) -> None:
+        """前の基板の座標を未確定の座標（ゴースト）として表示"""
+        self.ghost_details = [
+            Detail(x=detail.x, y=detail.y, **{field: getattr(detail, field) for field in self.CARRY_FORWARD_FIELDS})
+            for detail in details
+            if detail.x is not None and detail.y is not None
+        ]
+        self.redraw_ghost_markers()
+
+    def clear_ghosts(self) -> None:
+        """未確定の座標を破棄"""
+        self.ghost_details = []
+        if self.canvas_view:
+            self.canvas_view.clear_ghost_markers()
+
+    def has_ghosts(self) -> bool:
+        """未確定の座標があるかどうか"""
+        return bool(self.ghost_details)
+
+    def find_ghost(self, display_x: int, display_y: int) -> Optional[int]:
+        """クリック位置（表示座標）に最も近い未確定の座標のインデックスを取得"""
+        if not self.ghost_details or not self.canvas_view:
+            return None
+        return self.canvas_view.find_nearest_ghost(display_x, display_y)
+
+    def confirm_ghost(self, ghost_index: int) -> Optional[int]:
+        """未確定の座標を1つ確定して座標に追加
+
+        Returns:
+            Optional[int]: 追加した座標のインデックス
+        """
+        if not 0 <= ghost_index < len(self.ghost_details):
+            return None
+        ghost = self.ghost_details.pop(ghost_index)
+        index = self.coordinate_model.add_coordinate(
+            ghost.x, ghost.y, {field: getattr(ghost, field) for field in self.CARRY_FORWARD_FIELDS}
+        )
+        if self.canvas_view:
+            display_x, display_y = self.image_model.convert_original_to_display_coords(ghost.x, ghost.y)
+            self.canvas_view.add_coordinate_marker(display_x, display_y, index + 1)
+        self.redraw_ghost_markers()
+        self._update_coordinate_display()
+        return index
+
+    def confirm_all_ghosts(self) -> List[int]:
+        """未確定の座標を全て確定して座標に追加（アンドゥ1回分・再描画1回）
+
+        Returns:
+            List[int]: 追加した座標のインデックス
+        """
+        if not self.ghost_details:
+            return []
+        ghosts, self.ghost_details = self.ghost_details, []
+        return self.add_original_coordinates(
+            [(ghost.x, ghost.y) for ghost in ghosts],
+            [{field: getattr(ghost, field) for field in self.CARRY_FORWARD_FIELDS} for ghost in ghosts],
+        )
+
+    def redraw_ghost_markers(self) -> None:
+        """未確定の座標を現在の表示倍率・表示範囲で再描画（ズーム・パン・リサイズ後にも呼ぶ）"""
+        if not self.canvas_view:
+            return
+        if not self.ghost_details:
+            self.canvas_view.clear_ghost_markers()
+            return
+        display_coordinates = self.image_model.convert_original_to_display_array(
+            [(ghost.x, ghost.y) for ghost in self.ghost_details]
+        )
+        self.canvas_view.show_ghost_markers(display_coordinates.tolist())
+
+    # endregion
+
     def get_coordinate_summary(self) -> Dict[str, Any]:
         """座標概要を取得"""
         summary = self.coordinate_model.get_coordinate_summary()
 
-        # 表示用に元座標を変換
-        display_coordinates = []
-        for orig_x, orig_y in summary["coordinates"]:
-            display_x, display_y = self.image_model.convert_original_to_display_coords(
-                orig_x, orig_y
-            )
-            display_coordinates.append((display_x, display_y))
+        # 表示用に元座標を一括変換
+        display_coordinates = self.image_model.convert_original_to_display_array(
+            summary["coordinates"]
+        )
 
-        summary["display_coordinates"] = display_coordinates
+        summary["display_coordinates"] = [tuple(point) for point in display_coordinates.tolist()]
         return summary
 
     def get_all_coordinates(self) -> List[Tuple[int, int]]:
@@ -338,35 +443,17 @@ class CoordinateController:
     def _get_image_files_with_paths(self, directory: str) -> List[Dict[str, str]]:
         """指定されたディレクトリから画像ファイル名とフルパスの辞書リストを取得
 
+        走査結果はモデルカタログにキャッシュされ、ディレクトリが更新されていなければ再走査しない
+
         Args:
             directory: 検索対象のディレクトリパス
 
         Returns:
-            List[Dict[str, str]]: [{"filename": "フルパス"}, ...] 形式のリスト
+            List[Dict[str, str]]: [{"filename": "フルパス"}, ...] 形式のリスト（名前順）
         """
-        if not directory or not os.path.exists(directory):
-            return []
-
-        # サポートする画像拡張子
-        supported_extensions = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff"}
-
-        image_files = []
-        try:
-            for filename in os.listdir(directory):
-                if os.path.isfile(os.path.join(directory, filename)):
-                    # ファイルの拡張子をチェック
-                    name_without_ext, ext = os.path.splitext(filename)
-                    if ext.lower() in supported_extensions:
-                        # フルパスを作成
-                        full_path = os.path.join(directory, filename)
-                        # 拡張子なしのファイル名をキーとして使用
-                        image_files.append({name_without_ext: full_path})
-
-            return image_files
-
-        except Exception as e:
-            print(f"画像ファイル取得エラー: {e}")
+        if not directory:
             return []
+        return self.image_model.load_image_files_from_directory(directory)
 
     def delete_coordinate(self, index: int) -> bool:
         """指定されたインデックスの座標を削除
@@ -3,13 +3,27 @@
 ファイル操作とデータの保存・読み込みを制御
 """
 
+import hashlib
 import json
 import os
-from typing import TYPE_CHECKING, List, Optional
+import shutil
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
 from pydantic import ValidationError
 
 from src.db.schema import Detail, Lot, Worker
+from src.models.defect_dictionary_model import DefectDictionaryModel
+from src.models.lot_lock_model import LotLockModel
+from src.utils.json_stream import iter_detail_chunks
+from src.utils.lot_coordinates import (
+    COORDINATE_VERSION,
+    NO_OFFSET,
+    read_coordinate_offset,
+    to_image_coordinates,
+    to_stored_coordinate,
+)
 
 if TYPE_CHECKING:
     from ..models.app_settings_model import AppSettingsModel
@@ -20,22 +34,27 @@ from pathlib import Path
 class FileController:
     """ファイル操作を管理するコントローラー（FileManager統合版）"""
 
+    # 新しく作成するロットの座標形式のバージョン（lotInfo.txt の coordinate_version）
+    COORDINATE_VERSION = COORDINATE_VERSION
+
     def __init__(
         self,
         settings_model: "AppSettingsModel",
     ):
         self.settings_model = settings_model
+        # ロットディレクトリの排他ロック
+        self.lot_lock_model = LotLockModel()
+        # 不良項目辞書（defects.txt は更新時のみ読み直す）
+        self.defect_dictionary = DefectDictionaryModel()
+        # マニフェストの読み込み→更新→書き込みの排他（保存・ファイル監視・ヒートマップ集計スレッド）
+        self._manifest_lock = threading.RLock()
 
 
     def load_defects_from_file(self) -> List[str]:
-        """defects.txtから不良項目を読み込み"""
+        """defects.txtから不良項目を読み込み（前回から更新がなければ読み込み済みの一覧を返す）"""
         try:
-            if os.path.exists("defects.txt"):
-                with open("defects.txt", "r", encoding="utf-8") as f:
-                    defects = [line.strip() for line in f if line.strip()]
-                return defects 
-            else:
-                raise ValueError("不良項目が見つかりませんでした。")
+            self.defect_dictionary.load()
+            return self.defect_dictionary.get_names()
         except Exception as e:
             print(f"不良項目読み込みエラー: {e}")
             raise Exception("不良項目の読み込みに失敗しました。")
@@ -50,33 +69,37 @@ class FileController:
 
         return lot_directory
 
-    def create_lot_number_dir_lock_file(self, lot_number: str) -> Path | None:
-        """ロット番号ディレクトリのロックファイルを作成"""
+    def create_lot_number_dir_lock_file(self, lot_number: str, owner: str = "") -> Path | None:
+        """ロット番号ディレクトリのロックファイルを作成（他のプロセスが使用中の場合はNone）"""
         lot_directory = self.__create_lot_number_directory(lot_number)
-        if lot_directory:
-            lock_file_path = lot_directory / "lock"
-            lock_file_path.touch(exist_ok=True)
-            return lock_file_path
+        if lot_directory and self.lot_lock_model.acquire(lot_directory, owner):
+            return lot_directory / LotLockModel.LOCK_FILE_NAME
         return None
 
     def delete_lot_number_dir_lock_file(self, lot_number: Optional[str] = None):
-        """ロット番号ディレクトリのロックファイルを削除"""
+        """ロット番号ディレクトリのロックファイルを削除（省略時は保持中の全ロック）"""
         if not lot_number:
-            # lot_numberがNoneや空文字なら何もしない
+            self.lot_lock_model.release_all()
             return
         lot_directory = self.__create_lot_number_directory(lot_number)
-        lock_file = lot_directory / "lock"
-        if lock_file.exists():
-            lock_file.unlink()
+        self.lot_lock_model.release(lot_directory)
 
     def is_lock_file_exists(self, lot_number: str) -> bool:
-        """ロット番号ディレクトリにロックファイルが存在するかチェック"""
+        """他のプロセスが有効なロックを保持しているかチェック（残存ロックは無視）"""
         lot_directory = self.__create_lot_number_directory(lot_number)
         if lot_directory:
-            lock_file_path = lot_directory / "lock"
-            return lock_file_path.exists()
+            return self.lot_lock_model.is_locked_by_other(lot_directory)
         return False
 
+    def get_lock_owner_text(self, lot_number: str) -> str:
+        """ロックの所有者を表示用の文字列で取得"""
+        lot_directory = self.__create_lot_number_directory(lot_number)
+        info = self.lot_lock_model.get_lock_info(lot_directory)
+        if not info:
+            return ""
+        owner = info.get("owner") or info.get("user") or "不明"
+        return f"{owner}（{info.get('host') or '不明'}, {info.get('acquired_at', '')[:16]}）"
+
     def get_lot_dir_data_list(self, lot_number: str) -> List[Path]:
         """ロットディレクトリ内のdataファイル一覧を取得"""
         lot_directory = self.__create_lot_number_directory(lot_number)
@@ -135,8 +158,13 @@ class FileController:
         index_str = f"{index:04d}"
         json_path = lot_directory / f"{index_str}.data"
 
-        # list[Detail]をjsonに変換
-        detail_json_list = [d.model_dump() for d in detail] if detail else []
+        # list[Detail]をjsonに変換（旧形式のロットは記録済みの補正量を加えて同じ形式で保存）
+        offset = self.get_coordinate_offset(lot_number) or NO_OFFSET
+        detail_json_list = []
+        for d in detail or []:
+            data = d.model_dump()
+            data["x"], data["y"] = to_stored_coordinate(data["x"], data["y"], offset)
+            detail_json_list.append(data)
 
         if not lot_directory:
             raise ValueError("ロットディレクトリが設定されていません。")
@@ -151,6 +179,38 @@ class FileController:
         
         return json_path
 
+    def get_coordinate_offset(self, lot_number: str) -> Optional[Tuple[int, int]]:
+        """ロットのdataファイルの座標に含まれる画像の表示位置を取得
+
+        Returns:
+            Optional[Tuple[int, int]]: 補正量（元画像のピクセル単位）。旧形式で未記録の場合はNone
+        """
+        return read_coordinate_offset(Path(self.settings_model.data_directory) / lot_number)
+
+    def record_coordinate_offset(self, lot_number: str, offset: Tuple[int, int]) -> Path:
+        """旧形式のロットの座標の補正量を lotInfo.txt に記録（dataファイルは書き換えない）
+
+        記録前の lotInfo.txt を lotInfo.txt.bak に退避する（既にある場合は最初の内容を残す）。
+        補正量を削除すれば記録前の状態に戻せる。
+
+        Returns:
+            Path: バックアップのパス
+        """
+        lot_directory = self.__create_lot_number_directory(lot_number)
+        lot_info_path = lot_directory / "lotInfo.txt"
+        backup_path = lot_directory / "lotInfo.txt.bak"
+        if not backup_path.exists():
+            shutil.copy2(lot_info_path, backup_path)
+
+        with open(lot_info_path, "r", encoding="utf-8") as f:
+            lot = json.load(f)
+        lot["coordinate_offset"] = [int(offset[0]), int(offset[1])]
+        temp_path = lot_directory / "lotInfo.txt.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(lot, f, ensure_ascii=False, indent=4)
+        os.replace(temp_path, lot_info_path)
+        return backup_path
+
     def get_detail_text_count(self, lot_number: str) -> int:
         """ロット内のデータファイル数を取得"""
         data_files = self.get_lot_dir_data_list(lot_number)
@@ -172,26 +232,204 @@ class FileController:
         
     def read_detail_text(self, lot_number:str, index: int) -> List[Detail] | None:
         """インデックス用のdataファイルを読み込み"""
+        details = []
+        for chunk in self.iter_detail_chunks(lot_number, index):
+            details.extend(chunk)
+        return details
+
+    def iter_detail_chunks(
+        self, lot_number: str, index: int, chunk_size: int = 500
+    ) -> Iterator[List[Detail]]:
+        """dataファイルをチャンク単位で逐次読み込み（ファイル全体をメモリに展開しない）
+
+        座標は元画像のピクセル座標に変換する（旧形式で補正量が未記録のロットはそのまま）。
+        """
         lot_directory = self.__create_lot_number_directory(lot_number)
         if not lot_directory:
             raise ValueError("ロットディレクトリが設定されていません。")
 
-        index_str = f"{index:04d}"
-        json_path = lot_directory / f"{index_str}.data"
+        json_path = lot_directory / f"{index:04d}.data"
         if not json_path.exists():
             raise FileNotFoundError(f"{json_path} が見つかりません。")
 
+        offset = self.get_coordinate_offset(lot_number) or NO_OFFSET
         try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return [Detail(**item) for item in data]
-        except json.JSONDecodeError as e:
-            raise ValueError(f"無効なdataファイルです。")
+            for chunk in iter_detail_chunks(json_path, chunk_size):
+                yield to_image_coordinates(chunk, offset)
+        except ValueError as e:
+            raise ValueError(f"無効なdataファイルです。") from e
         
+    def iter_lot_detail_chunks(
+        self, lot_number: str, chunk_size: int = 500
+    ) -> Iterator[Tuple[int, List[Detail]]]:
+        """ロット内の全基板の座標を基板番号順にチャンク単位で逐次読み込み
+
+        座標未登録（空）や壊れたdataファイルは読み飛ばす。
+
+        Yields:
+            Tuple[int, List[Detail]]: (基板番号, 座標のチャンク)
+        """
+        board_numbers = sorted(
+            int(path.stem) for path in self.get_lot_dir_data_list(lot_number) if path.stem.isdigit()
+        )
+        for board_number in board_numbers:
+            try:
+                for chunk in self.iter_detail_chunks(lot_number, board_number, chunk_size):
+                    yield board_number, chunk
+            except (FileNotFoundError, ValueError) as e:
+                print(f"dataファイルを読み飛ばしました: {lot_number}/{board_number:04d}.data ({e})")
+
     def has_valid_detail_file(self, lot_number: str, index: int) -> bool:
         """有効なdataファイルが存在するか検証するメソッド"""
         try:
             details = self.read_detail_text(lot_number, index)
             return True
         except (FileNotFoundError, ValueError):
-            return False
\ No newline at end of file
+            return False
+
+    def read_lot_manifest(self, lot_number: str) -> Dict[str, Any]:
+        """ロットのマニフェスト（dataファイルのサイズ・更新時刻・チェックサム）を読み込み"""
+        lot_directory = self.__create_lot_number_directory(lot_number)
+        manifest_path = lot_directory / "manifest.json"
+        if not manifest_path.exists():
+            return {"files": {}, "updated_at": ""}
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {"files": {}, "updated_at": ""}
+
+    def _scan_lot_manifest_files(self, lot_number: str, previous_files: Dict[str, Any]) -> Dict[str, Any]:
+        """ロットのdataファイルを走査してマニフェストのファイル一覧を作成（変更されたファイルのみチェックサムを計算）"""
+        files = {}
+        for data_file in self.get_lot_dir_data_list(lot_number):
+            try:
+                stat = data_file.stat()
+                previous = previous_files.get(data_file.name)
+                if (
+                    previous
+                    and previous.get("size") == stat.st_size
+                    and previous.get("mtime_ns") == stat.st_mtime_ns
+                ):
+                    files[data_file.name] = previous
+                    continue
+                files[data_file.name] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha1": self._calculate_checksum(data_file),
+                }
+            except FileNotFoundError:
+                # 走査中に削除されたdataファイル
+                continue
+        return files
+
+    def _write_lot_manifest(self, lot_directory: Path, manifest: Dict[str, Any]):
+        """マニフェストを一時ファイル経由で置き換え（読み込み中のプロセスに書きかけを見せない）"""
+        manifest_path = lot_directory / "manifest.json"
+        temp_path = manifest_path.with_name("manifest.json.tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=4)
+            os.replace(temp_path, manifest_path)
+        except Exception as e:
+            print(f"マニフェスト保存エラー: {e}")
+            temp_path.unlink(missing_ok=True)
+
+    def update_lot_manifest(self, lot_number: str) -> Dict[str, Any]:
+        """ロットのマニフェストを更新（変更されたdataファイルのみチェックサムを再計算）"""
+        lot_directory = self.__create_lot_number_directory(lot_number)
+        with self._manifest_lock:
+            previous = self.read_lot_manifest(lot_number)
+            files = self._scan_lot_manifest_files(lot_number, previous.get("files", {}))
+            if files == previous.get("files", {}):
+                return {"files": files, "updated_at": previous.get("updated_at", "")}
+
+            manifest = {"files": files, "updated_at": datetime.now().isoformat()}
+            self._write_lot_manifest(lot_directory, manifest)
+            return manifest
+
+    def update_lot_manifest_entries(self, lot_number: str, file_names: List[str]) -> Optional[Dict[str, Any]]:
+        """ファイル監視で変更を検出したdataファイルのみマニフェストに反映（ロットは再走査しない）
+
+        Args:
+            lot_number: ロット番号
+            file_names: 追加・更新・削除されたdataファイル名
+
+        Returns:
+            Optional[Dict[str, Any]]: 更新後のマニフェスト（ロットディレクトリが存在しない場合はNone）
+        """
+        lot_directory = Path(self.settings_model.data_directory) / lot_number
+        if not lot_directory.is_dir():
+            return None
+        with self._manifest_lock:
+            return self._update_lot_manifest_entries(lot_number, lot_directory, file_names)
+
+    def _update_lot_manifest_entries(
+        self, lot_number: str, lot_directory: Path, file_names: List[str]
+    ) -> Dict[str, Any]:
+        """指定されたdataファイルのエントリを更新してマニフェストを保存（ロックを保持して呼ぶ）"""
+        manifest = self.read_lot_manifest(lot_number)
+        files = dict(manifest.get("files", {}))
+
+        for file_name in file_names:
+            data_file = lot_directory / file_name
+            try:
+                stat = data_file.stat()
+            except FileNotFoundError:
+                files.pop(file_name, None)
+                continue
+            previous = files.get(file_name)
+            if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+                continue
+            try:
+                checksum = self._calculate_checksum(data_file)
+            except OSError as e:
+                print(f"マニフェスト更新エラー: {e}")
+                continue
+            files[file_name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": checksum}
+
+        if files == manifest.get("files", {}):
+            return manifest
+
+        manifest = {"files": files, "updated_at": datetime.now().isoformat()}
+        self._write_lot_manifest(lot_directory, manifest)
+        return manifest
+
+    def get_lot_manifest_signature(self, lot_number: str, manifest: Optional[Dict[str, Any]] = None) -> str:
+        """ロットのマニフェストから座標を含むdataファイル構成の署名を算出
+
+        manifest.json は書き換えない（保存済みのチェックサムを再利用し、変更されたdataファイルのみ計算する）。
+
+        Args:
+            lot_number: ロット番号
+            manifest: 更新済みのマニフェスト（省略時はdataファイルを走査）
+
+        Returns:
+            str: 署名（座標を含むdataファイルが無い場合は空文字）
+        """
+        if manifest is not None:
+            files = manifest.get("files", {})
+        else:
+            with self._manifest_lock:
+                previous_files = self.read_lot_manifest(lot_number).get("files", {})
+            files = self._scan_lot_manifest_files(lot_number, previous_files)
+        # 作成直後の空のdataファイルは署名に含めない
+        names = sorted(name for name, entry in files.items() if entry.get("size", 0) > 0)
+        if not names:
+            return ""
+        digest = hashlib.sha1()
+        # 旧形式のロットの補正量が記録されたら座標が変わるため署名に含める
+        offset = self.get_coordinate_offset(lot_number)
+        if offset != NO_OFFSET:
+            digest.update(f"offset:{offset};".encode("utf-8"))
+        for name in names:
+            digest.update(f"{name}:{files[name].get('sha1', '')};".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _calculate_checksum(self, file_path: Path) -> str:
+        """ファイルのSHA-1チェックサムを計算"""
+        digest = hashlib.sha1()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(65536), b""):
+                digest.update(block)
+        return digest.hexdigest()
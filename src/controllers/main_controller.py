@@ -6,7 +6,9 @@
 import json
 import os
 import pathlib
+import queue
 import re
+import threading
 import tkinter as tk
 from datetime import date, datetime
 from pathlib import Path
@@ -17,6 +19,8 @@ import time
 import functools
 
 from src.db.schema import Detail, Lot, Worker
+from src.utils.lot_coordinates import to_image_coordinates
+from src.utils.startup_profiler import startup_profiler
 
 
 def timing_decorator(func):
@@ -55,11 +59,18 @@ if TYPE_CHECKING:
     from ..controllers.file_controller import FileController
     from ..models.app_settings_model import AppSettingsModel
     from ..models.board_model import BoardModel
+    from ..models.board_cache_model import BoardCacheModel
+    from ..models.board_thumbnail_model import BoardThumbnailModel
     from ..models.coordinate_model import CoordinateModel
+    from ..models.defect_heatmap_model import DefectHeatmapModel
+    from ..models.defect_index_model import DefectIndexModel
+    from ..models.component_index_model import ComponentIndexModel
     from ..models.image_model import ImageModel
     from ..models.lot_model import LotModel
     from ..models.worker_model import WorkerModel
+    from ..utils.file_watcher import FileWatcher, WatchEvent
     from ..views.coordinate_canvas_view import CoordinateCanvasView
+    from ..views.board_timeline_view import BoardTimelineView
     from ..views.main_view import MainView
     from ..views.sidebar_view import SidebarView
 
@@ -83,6 +94,7 @@ class MainController:
         coordinate_controller: "CoordinateController",
         file_controller: "FileController",
         board_controller: "BoardController",
+        timeline_view: Optional["BoardTimelineView"] = None,
     ):
 
         # モデル
@@ -97,6 +109,7 @@ class MainController:
         self.main_view = main_view
         self.canvas_view = canvas_view
         self.sidebar_view = sidebar_view
+        self.timeline_view = timeline_view
         self.dialogs = dialogs
 
         # 他のコントローラー
@@ -129,6 +142,53 @@ class MainController:
         # モデルデータ
         self.model_data: List[Any] = []
 
+        # 不良検索インデックス（初回検索時に生成）
+        self.defect_index_model: Optional["DefectIndexModel"] = None
+
+        # 現在のモデルの部品索引（モデル選択時にバックグラウンドで読み込み）
+        self.component_index: Optional["ComponentIndexModel"] = None
+        # キャリブレーション中の基準点の部品と、クリックした元画像座標
+        self._calibration_parts: Optional[List[Any]] = None
+        self._calibration_points: List[Tuple[str, int, int]] = []
+
+        # 不良ヒートマップ（表示時・基板保存時に生成）
+        self.defect_heatmap_model: Optional["DefectHeatmapModel"] = None
+        self._heatmap_histogram = None
+        self._heatmap_result = None
+        self._heatmap_thread: Optional[threading.Thread] = None
+
+        # ロット整合性チェック（バックグラウンドで実行）
+        self._lot_health_thread: Optional[threading.Thread] = None
+        self._lot_health_report: Optional[Dict[str, Any]] = None
+
+        # ロット全体の座標の書き出し（バックグラウンドで実行）
+        self._coordinate_export_thread: Optional[threading.Thread] = None
+        self._coordinate_export_result: Optional[Any] = None
+
+        # 不良集計レポートの書き出し（バックグラウンドで実行）
+        self._report_thread: Optional[threading.Thread] = None
+        self._report_result: Optional[Any] = None
+
+        # 閲覧モードの基板切り替え（読み込み済み基板のLRUと前後の先読み）
+        self.board_cache: Optional["BoardCacheModel"] = None
+        self._view_board_numbers: List[int] = []
+        # 閲覧中の補正量が未記録の旧形式のロットの仮の補正量（ロット番号 → 元画像のピクセル単位の画像の表示位置）
+        self._legacy_coordinate_shifts: Dict[str, Tuple[int, int]] = {}
+
+        # 基板タイムライン（閲覧中ロットのサムネイルをワーカープールで生成）
+        self.board_thumbnail_model: Optional["BoardThumbnailModel"] = None
+        self._thumbnail_polling = False
+
+        # ファイル監視（画像ディレクトリ・データディレクトリの変更を差分で反映）
+        self.file_watcher: Optional["FileWatcher"] = None
+        # 監視スレッドでマニフェストを更新した結果（変更イベント, {ロット番号: 変更されたdataファイル名}）
+        self._file_change_queue: "queue.Queue[Tuple[List[WatchEvent], Dict[str, set]]]" = queue.Queue()
+        self._file_watch_lock = threading.Lock()
+
+        # ズーム・パン表示（再描画は1フレームにまとめる）
+        self._viewport_layout: Optional[Dict[str, Any]] = None
+        self._viewport_redraw_pending = False
+
         # 初期化フラグ
         self.is_initialized: bool = False
 
@@ -145,7 +205,7 @@ class MainController:
 
     @current_lot_number.setter
     def current_lot_number(self, value: str):
-        if not self.current_lot_number:
+        if self.current_lot_number and self.current_lot_number != value:
             self.file_controller.delete_lot_number_dir_lock_file(self.current_lot_number)
         self.sidebar_view.set_lot_number(value)
         self._current_lot_number = value
@@ -175,7 +235,10 @@ class MainController:
     @current_model.setter
     def current_model(self, value: str):
         self.sidebar_view.set_product_number(value)
+        changed = value != getattr(self, "_current_model", None)
         self._current_model = value
+        if value and changed:
+            self._load_component_index(value)
 
     @property
     def current_index(self):
@@ -190,13 +253,19 @@ class MainController:
 
     # region アプリケーションの初期化
     # アプリケーションの初期化
-    def initialize_application(self):
-        """アプリケーションを初期化"""
+    def initialize_application(self, worker: Optional[Dict[str, str]] = None):
+        """アプリケーションを初期化
+
+        Args:
+            worker: 起動時に入力済みの作業者情報 {"worker_no", "worker_name"}（省略時はここで入力）
+        """
         if self.is_initialized:
             return
 
         # 作業者入力（デバッグモード時はスキップ）
-        if not self.debug_mode:
+        if worker is not None:
+            self._apply_worker_input(worker)
+        elif not self.debug_mode:
             self._setup_worker_input()
         else:
             # デバッグモード時はデフォルト作業者情報を設定
@@ -249,6 +318,10 @@ class MainController:
             self.main_view.root.quit()
             return
 
+        self._apply_worker_input(result)
+
+    def _apply_worker_input(self, result: Dict[str, str]):
+        """入力された作業者情報を反映"""
         # 作業者情報をサイドバーに設定（ラベル更新）
         worker_text = f"作業者: {result['worker_name']}"
         self.sidebar_view.update_worker_label(worker_text)
@@ -290,13 +363,30 @@ class MainController:
             "save_file": self.save_file,
             "exit_app": self.exit_app,
             "delete_file": self.delete_file,
+            "import_coordinates": self.import_coordinates,
+            "export_board_coordinates": self.export_board_coordinates,
+            "export_lot_coordinates": self.export_lot_coordinates,
             # ボタンコールバック
             "prev_board": self.prev_board,
             "next_board": self.next_board,
             "delete_board": self.delete_board,
+            "toggle_carry_forward": self.toggle_carry_forward,
+            "confirm_all_ghosts": self.confirm_all_ghosts,
+            "discard_ghosts": self.discard_ghosts,
             # 基盤管理コールバック
             "save_all_boards": self.save_all_boards,
             "load_board_session": self.load_board_session,
+            # 検索コールバック
+            "search_coordinates": self.search_coordinates,
+            # 表示コールバック
+            "toggle_heatmap": self.toggle_heatmap,
+            "reset_zoom": self.reset_zoom,
+            # ツールコールバック
+            "check_lot_health": self.check_lot_health,
+            "check_lot_health_quick": lambda: self.check_lot_health(quick=True),
+            "import_component_file": self.import_component_file,
+            "calibrate_components": self.start_component_calibration,
+            "export_defect_report": self.export_defect_report,
         }
 
         # コールバック設定のデバッグ情報
@@ -312,6 +402,8 @@ class MainController:
             "on_right_click": self.on_canvas_right_click,
             "on_view_click": self.on_canvas_view_click,
             "on_canvas_resize": self.on_canvas_resize,
+            "on_zoom": self.on_canvas_zoom,
+            "on_pan": self.on_canvas_pan,
         }
         self.canvas_view.set_callbacks(canvas_callbacks)
 
@@ -321,9 +413,20 @@ class MainController:
             "search_coordinates": self.search_coordinates,
             "on_entry_return": self.on_entry_return,
             "on_defect_selected": self.on_defect_selected,
+            "filter_defects": self.filter_defects,
+            "complete_reference": self.complete_reference,
         }
         self.sidebar_view.set_callbacks(sidebar_callbacks)
 
+        # 基板タイムラインのコールバック
+        if self.timeline_view is not None:
+            self.timeline_view.set_callbacks(
+                {
+                    "on_board_selected": self.on_timeline_board_selected,
+                    "on_visible_boards_changed": self.on_timeline_visible_boards_changed,
+                }
+            )
+
     def _setup_canvas_events(self):
         """キャンバスのイベントバインドを設定"""
         # 初期モードに基づいてイベントを設定
@@ -335,6 +438,13 @@ class MainController:
         self.main_view.root.bind("<Delete>", self.on_delete_key)
         self.main_view.root.bind("<BackSpace>", self.on_delete_key)
 
+        # キーイベントをバインド（閲覧モードの基板切り替え）
+        self.main_view.root.bind("<Prior>", lambda event: self._on_board_page_key(-1))
+        self.main_view.root.bind("<Next>", lambda event: self._on_board_page_key(1))
+
+        # キーイベントをバインド（引き継いだ座標の一括確定）
+        self.main_view.root.bind("<Control-Return>", lambda event: self.confirm_all_ghosts())
+
         # フォーカスを設定してキーイベントを受け取れるようにする
         self.main_view.root.focus_set()
 
@@ -353,12 +463,8 @@ class MainController:
         # 日付表示を更新
         self.main_view.update_date_label(self.current_date.strftime("%Y-%m-%d"))
 
-        # モデル選択肢を更新
-        self._update_model_options()
-
-        # 不良項目選択肢を更新
-        defects = self.file_controller.load_defects_from_file()
-        self.sidebar_view.update_defect_options(defects)
+        # モデル選択肢・不良項目選択肢はバックグラウンドで読み込んでから反映
+        self._start_startup_scans()
 
         # Undo/Redoボタンの状態を更新
         self._update_undo_redo_state()
@@ -367,6 +473,44 @@ class MainController:
         initial_board_number = self.board_controller.get_current_board_number()
         self.coordinate_controller.set_current_board_number(initial_board_number)
 
+    def _start_startup_scans(self):
+        """モデルカタログと不良項目をバックグラウンドで読み込み（最初の画面表示を待たせない）"""
+        result: Dict[str, Any] = {}
+
+        def scan():
+            image_directory = self.settings_model.image_directory
+            if image_directory and image_directory != "未選択":
+                self.image_model.load_image_files_from_directory(image_directory)
+            try:
+                result["defects"] = self.file_controller.load_defects_from_file()
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=scan, daemon=True)
+        thread.start()
+
+        def poll():
+            if thread.is_alive():
+                self.main_view.root.after(50, poll)
+                return
+            # カタログは読み込み済みのため再走査は行われない
+            self._update_model_options()
+            if "error" in result:
+                self.main_view.show_error(str(result["error"]))
+            else:
+                self.sidebar_view.update_defect_options(result["defects"])
+
+            # 画像ディレクトリ・データディレクトリの監視を開始
+            self._setup_file_watcher()
+
+            # 起動処理の最後のステップのため、起動プロファイルを出力
+            if startup_profiler.enabled:
+                startup_profiler.mark("モデル・不良項目の読み込み完了")
+                startup_profiler.write_report()
+                startup_profiler.disable()
+
+        self.main_view.root.after(50, poll)
+
     def _apply_settings(self):
         """設定を適用"""
         # デフォルトモードを設定
@@ -374,6 +518,9 @@ class MainController:
         self.main_view.set_mode(default_mode)
         self.on_mode_change()
 
+        # 前の基盤の座標の引き継ぎ
+        self.main_view.carry_forward_var.set(self.settings_model.carry_forward)
+
     def _update_model_options(self):
         """モデル選択肢を更新（旧コード互換機能）"""
         # CoordinateControllerのload_models_from_fileメソッドを使用
@@ -473,11 +620,17 @@ class MainController:
                     tk_image,
                     self.image_model.display_size[0],
                     self.image_model.display_size[1],
+                    pil_image=self.image_model.display_pil_image,
                 )
+                self._sync_display_offset()
 
                 # 座標をクリア
                 self.coordinate_controller.clear_coordinates()
 
+                # モデルが変わるためヒートマップを再集計
+                if self.main_view.is_heatmap_enabled():
+                    self._start_heatmap_update()
+
                 print(f"モデル画像を読み込みました: {model_name}")
             else:
                 print(f"画像の読み込みに失敗しました: {model_name}")
@@ -498,11 +651,29 @@ class MainController:
                 lot_number = self.current_lot_number
                 is_product_lot_set = bool(product_number and lot_number)
 
+            # キャリブレーション中は基準点として記録
+            if self._calibration_parts is not None:
+                self._add_calibration_point(x, y)
+                return
+
+            # 引き継いだ座標（ゴースト）のクリックはその座標の確定
+            if is_product_lot_set:
+                ghost_index = self.coordinate_controller.find_ghost(x, y)
+                if ghost_index is not None:
+                    self._confirm_ghost(ghost_index)
+                    return
+
             # 整番・ロットが設定されている場合
             if is_product_lot_set:
-                # 座標追加
+                # 座標追加（近くに部品があれば部品の中心に合わせる。Shiftを押しながらのクリックは合わせない）
                 with step_timer("座標追加（coordinate_controller.add_coordinate）"):
-                    index = self.coordinate_controller.add_coordinate(x, y)
+                    snapped = None if event.state & 0x0001 else self._snap_to_component(x, y)
+                    if snapped:
+                        suggested_reference, original_x, original_y = snapped
+                        index = self.coordinate_controller.add_original_coordinate(original_x, original_y)
+                    else:
+                        suggested_reference = None
+                        index = self.coordinate_controller.add_coordinate(x, y)
 
                 # 座標選択状態設定
                 with step_timer("座標選択状態設定"):
@@ -512,14 +683,16 @@ class MainController:
                 with step_timer("フォームクリア"):
                     self.sidebar_view.clear_form()
                 
-                # 詳細情報設定
+                # 詳細情報設定（部品に合わせた場合は部品番号を入力済みにする）
                 with step_timer("詳細情報設定"):
                     detail = {"item_number": str(index + 1)}
+                    if suggested_reference:
+                        detail["reference"] = suggested_reference
                     self.sidebar_view.set_coordinate_detail(detail)
 
-                # フォーカス設定
+                # フォーカス設定（候補は選択状態にして、入力で上書きできるようにする）
                 with step_timer("フォーカス設定"):
-                    self.sidebar_view.focus_reference_entry()
+                    self.sidebar_view.focus_reference_entry(select_all=bool(suggested_reference))
 
                 # Undo/Redo状態更新
                 with step_timer("Undo/Redo状態更新"):
@@ -627,9 +800,10 @@ class MainController:
             self.sidebar_view.set_readonly_mode(False)
             print("[モード変更] 編集モードに切り替えました")
         else:
-            # 閲覧モード
+            # 閲覧モード（引き継いだ未確定の座標は破棄）
             self.canvas_view.bind_events("view")
             self.sidebar_view.set_readonly_mode(True)
+            self.coordinate_controller.clear_ghosts()
             print("[モード変更] 閲覧モードに切り替えました")
 
             # 座標がある場合は概要情報を表示
@@ -643,6 +817,10 @@ class MainController:
                 if detail:
                     self.sidebar_view.display_coordinate_info(detail, 0)
 
+        # マーカーの描画方式（編集: ベクター / 閲覧: スプライト）を切り替えて再描画
+        self._render_heatmap_overlay()
+        self.coordinate_controller.redraw_markers()
+
         # ハイライトをクリア（モード変更時は一旦リセット）
         if current_mode == "編集":
             self.canvas_view.clear_highlight()
@@ -692,6 +870,9 @@ class MainController:
         # モデル選択リストを更新
         self._update_model_options()
 
+        # 監視するディレクトリを更新
+        self._setup_file_watcher()
+
     def on_lot_number_save(self):
         """ロット番号保存処理"""
         import re
@@ -755,6 +936,8 @@ class MainController:
             elif mode == "閲覧":
                 # 閲覧モード：指図入力のみのダイアログを表示
                 result = self._show_lot_number_input_dialog()
+                if result:
+                    self._open_view_lot(result)
             else:
                 result = None
 
@@ -827,8 +1010,248 @@ class MainController:
 
     def search_coordinates(self):
         """座標検索機能（閲覧モード用）"""
-        # TODO: 座標検索機能を実装
-        print("検索機能は今後実装予定です。")
+        if self.main_view.get_current_mode() != "閲覧":
+            self.main_view.show_warning("不良検索は閲覧モードで利用できます。")
+            return
+
+        index_model = self._get_defect_index_model()
+        if index_model is None:
+            self.main_view.show_error("データディレクトリが設定されていません。")
+            return
+
+        dialog = self.dialogs["DefectSearchDialog"](
+            self.main_view.root,
+            index_model,
+            self.sidebar_view.defect_items,
+        )
+        dialog.show()
+
+    def toggle_heatmap(self):
+        """不良ヒートマップの表示を切り替え"""
+        if self.main_view.is_heatmap_enabled():
+            self._start_heatmap_update()
+        else:
+            self._heatmap_histogram = None
+            self.canvas_view.clear_overlay_image()
+
+    def _get_heatmap_model_name(self) -> Optional[str]:
+        """ヒートマップの集計対象のモデル名（lotInfo.txtのモデル名と同じ規則）を取得"""
+        if self.current_model:
+            return self.current_model
+        selected_model = self.main_view.get_selected_model()
+        if selected_model and not selected_model.startswith("画像"):
+            return selected_model.split("_")[0]
+        return None
+
+    def _start_heatmap_update(self):
+        """ヒートマップの集計をバックグラウンドで開始"""
+        model_name = self._get_heatmap_model_name()
+        original_size = self.image_model.original_size
+        index_model = self._get_defect_index_model()
+        heatmap_model = self._get_defect_heatmap_model()
+
+        if not model_name or index_model is None or original_size == (0, 0):
+            self.main_view.show_warning(
+                "ヒートマップを表示するにはデータディレクトリとモデルを設定してください。"
+            )
+            self.main_view.set_heatmap_enabled(False)
+            return
+
+        if self._heatmap_thread and self._heatmap_thread.is_alive():
+            return
+
+        def build_histogram():
+            try:
+                index_model.refresh()
+                lot_signatures = {
+                    lot_number: self.file_controller.get_lot_manifest_signature(lot_number)
+                    for lot_number in index_model.get_lot_numbers(model_name)
+                }
+                self._heatmap_result = heatmap_model.get_histogram(
+                    model_name,
+                    original_size,
+                    lot_signatures,
+                    lambda: index_model.iter_points(model_name),
+                )
+            except Exception as e:
+                print(f"ヒートマップ集計エラー: {e}")
+                self._heatmap_result = None
+
+        self._heatmap_result = None
+        self._heatmap_thread = threading.Thread(target=build_histogram, daemon=True)
+        self._heatmap_thread.start()
+        self._poll_heatmap_update()
+
+    def _poll_heatmap_update(self):
+        """ヒートマップ集計の完了をUIスレッドで待機"""
+        if self._heatmap_thread and self._heatmap_thread.is_alive():
+            self.main_view.root.after(100, self._poll_heatmap_update)
+            return
+        self._heatmap_histogram = self._heatmap_result
+        self._render_heatmap_overlay()
+
+    def _render_heatmap_overlay(self):
+        """キャッシュ済みヒストグラムを現在の表示サイズでキャンバスに重ねる"""
+        if not self.main_view.is_heatmap_enabled() or self._heatmap_histogram is None:
+            return
+
+        layout = self._viewport_layout if self.image_model.is_zoomed() else None
+        if layout:
+            # ズーム中は見えている範囲だけを切り出す
+            width, height = self.image_model.original_size
+            left, top, right, bottom = layout["region"]
+            overlay = self.defect_heatmap_model.render_overlay(
+                self._heatmap_histogram,
+                layout["size"],
+                region=(left / width, top / height, right / width, bottom / height),
+            )
+        else:
+            overlay = self.defect_heatmap_model.render_overlay(
+                self._heatmap_histogram, self.image_model.display_size
+            )
+        if overlay is None:
+            self.canvas_view.clear_overlay_image()
+            return
+
+        if self.canvas_view.is_sprite_active():
+            # 閲覧モードでは画像とマーカーの間に合成する
+            self.canvas_view.set_sprite_overlay(overlay)
+            return
+
+        from PIL import ImageTk
+
+        self.canvas_view.show_overlay_image(
+            ImageTk.PhotoImage(overlay), layout["position"] if layout else None
+        )
+
+    def _update_heatmap_after_save(
+        self,
+        lot_number: str,
+        details: List[Detail],
+        previous_signature: str,
+        previous_entry: Optional[Dict[str, Any]],
+    ):
+        """基板保存後にマニフェストを更新し、ヒートマップへ差分を加算"""
+        try:
+            manifest = self.file_controller.update_lot_manifest(lot_number)
+            lot_signature = self.file_controller.get_lot_manifest_signature(lot_number, manifest)
+            model_name = self._get_heatmap_model_name()
+            heatmap_model = self._get_defect_heatmap_model()
+            if not model_name or heatmap_model is None:
+                return
+
+            if previous_entry and previous_entry.get("size", 0) > 0:
+                # 既存の基板を上書きした場合は差分が取れないため再集計させる
+                heatmap_model.invalidate(model_name)
+                return
+
+            points = [(d.x, d.y) for d in details if d.x is not None and d.y is not None]
+            if heatmap_model.add_points(
+                model_name, points, lot_number, previous_signature, lot_signature
+            ):
+                self._heatmap_histogram = heatmap_model.get_cached_histogram(model_name)
+                self._render_heatmap_overlay()
+
+        except Exception as e:
+            print(f"ヒートマップ更新エラー: {e}")
+
+    def _get_defect_heatmap_model(self) -> Optional["DefectHeatmapModel"]:
+        """データディレクトリに対応する不良ヒートマップモデルを取得"""
+        data_directory = self.settings_model.data_directory
+        if not data_directory or data_directory == "未選択" or not os.path.isdir(data_directory):
+            return None
+
+        cache_directory = os.path.join(data_directory, ".cache", "heatmap")
+        if (
+            self.defect_heatmap_model is None
+            or self.defect_heatmap_model.cache_directory != cache_directory
+        ):
+            from src.models.defect_heatmap_model import DefectHeatmapModel
+
+            self.defect_heatmap_model = DefectHeatmapModel(cache_directory)
+        return self.defect_heatmap_model
+
+    def _get_defect_index_model(self) -> Optional["DefectIndexModel"]:
+        """データディレクトリに対応する不良検索インデックスを取得"""
+        data_directory = self.settings_model.data_directory
+        if not data_directory or data_directory == "未選択" or not os.path.isdir(data_directory):
+            return None
+
+        # データディレクトリが変わった場合のみ作り直す
+        if (
+            self.defect_index_model is None
+            or str(self.defect_index_model.data_directory) != str(Path(data_directory))
+        ):
+            from src.models.defect_index_model import DefectIndexModel
+
+            self.defect_index_model = DefectIndexModel(data_directory)
+        return self.defect_index_model
+
+    # region ズーム・パン
+
+    # ズーム・パン時の再描画間隔（ミリ秒、約60fps）
+    VIEWPORT_FRAME_MS = 16
+    # マウスホイール1段あたりのズーム倍率
+    ZOOM_STEP = 1.25
+
+    def on_canvas_zoom(self, x: int, y: int, steps: int):
+        """マウスホイールでカーソル位置を中心にズーム"""
+        if not self.image_model.current_image_path:
+            return
+        zoom = self.image_model.zoom * (self.ZOOM_STEP ** steps)
+        if self.image_model.zoom_at(x, y, zoom):
+            self._schedule_viewport_redraw()
+
+    def on_canvas_pan(self, delta_x: int, delta_y: int):
+        """中ボタンドラッグで表示をパン"""
+        if self.image_model.pan_by(delta_x, delta_y):
+            self._schedule_viewport_redraw()
+
+    def reset_zoom(self):
+        """ズーム・パンを解除して画面に合わせた表示に戻す"""
+        if self.image_model.zoom_at(0, 0, 1.0):
+            self._schedule_viewport_redraw()
+
+    def _schedule_viewport_redraw(self):
+        """次のフレームで表示範囲を再描画（連続したホイール・ドラッグ操作はまとめる）"""
+        if self._viewport_redraw_pending:
+            return
+        self._viewport_redraw_pending = True
+        self.main_view.root.after(self.VIEWPORT_FRAME_MS, self._redraw_viewport)
+
+    def _redraw_viewport(self):
+        """ズーム・パン後の画像・ヒートマップ・マーカーを再描画"""
+        self._viewport_redraw_pending = False
+        try:
+            if self.image_model.is_zoomed():
+                result = self.image_model.render_viewport(
+                    self.canvas_view.canvas_width, self.canvas_view.canvas_height
+                )
+                if result is None:
+                    return
+                tk_image, self._viewport_layout = result
+                self.canvas_view.show_viewport_image(
+                    tk_image,
+                    *self._viewport_layout["position"],
+                    pil_image=self.image_model.display_pil_image,
+                )
+            else:
+                # 画面に合わせた表示に戻す
+                self._viewport_layout = None
+                if not self.image_model.tk_image:
+                    return
+                self.canvas_view.display_image(
+                    self.image_model.tk_image, pil_image=self.image_model.display_pil_image
+                )
+                self._sync_display_offset()
+
+            self._render_heatmap_overlay()
+            self._redraw_coordinates_for_new_scale()
+
+        except Exception as e:
+            print(f"ズーム表示エラー: {e}")
+
+    # endregion
 
     def on_canvas_resize(self, new_width: int, new_height: int):
         """キャンバスサイズ変更時の処理"""
@@ -848,7 +1271,13 @@ class MainController:
 
                 if tk_image:
                     # キャンバスに再表示
-                    self.canvas_view.display_image(tk_image)
+                    self.canvas_view.display_image(
+                        tk_image, pil_image=self.image_model.display_pil_image
+                    )
+                    self._sync_display_offset()
+
+                    # ヒートマップを新しい表示サイズで再描画
+                    self._render_heatmap_overlay()
 
                     # 座標マーカーを再描画（座標変換が必要な場合）
                     self._redraw_coordinates_for_new_scale()
@@ -861,25 +1290,30 @@ class MainController:
 
             traceback.print_exc()
 
+    def _sync_display_offset(self):
+        """キャンバス上の画像位置を座標変換に反映"""
+        offset_x, offset_y = self.canvas_view.get_image_offset()
+        self.image_model.set_display_offset(offset_x, offset_y)
+
     def _redraw_coordinates_for_new_scale(self):
         """新しいスケールに合わせて座標マーカーを再描画"""
         try:
-            # 元画像座標を表示座標に変換して再描画
-            display_coordinates = []
-            for orig_x, orig_y in self.coordinate_model.coordinates:
-                display_x, display_y = (
-                    self.image_model.convert_original_to_display_coords(orig_x, orig_y)
-                )
-                display_coordinates.append((display_x, display_y))
+            # 元画像座標を表示座標に一括変換して再描画
+            display_coordinates = self.image_model.convert_original_to_display_array(
+                self.coordinate_model.coordinates_array
+            )
 
-            if display_coordinates:
-                self.canvas_view.redraw_coordinate_markers(display_coordinates)
+            if len(display_coordinates):
+                self.canvas_view.redraw_coordinate_markers(display_coordinates.tolist())
 
                 # 現在選択中の座標をハイライト
                 current_index = self.coordinate_model.current_index
                 if current_index >= 0:
                     self.canvas_view.highlight_coordinate(current_index)
 
+            # 引き継いだ未確定の座標（確定済みの座標がなくても表示位置とクリック判定を更新）
+            self.coordinate_controller.redraw_ghost_markers()
+
         except Exception as e:
             print(f"座標再描画エラー: {e}")
 
@@ -1070,18 +1504,13 @@ class MainController:
         if not product_number or not self.model_list:
             return None
 
-        model_regex = rf"^{product_number}.*$"
-
-        # モデルリストから製番に一致するモデル名を検索
-        for item in self.model_list:
-            if not item:
-                continue
-            model_name = list(item.keys())[0]
-            if re.match(model_regex, model_name):
-                print(
-                    f"[製番検索] 製番 '{product_number}' → モデル '{model_name}' が見つかりました"
-                )
-                return model_name
+        # モデルカタログのソート済み索引から前方一致で検索
+        model_name = self.image_model.catalog.find_first_by_prefix(product_number)
+        if model_name:
+            print(
+                f"[製番検索] 製番 '{product_number}' → モデル '{model_name}' が見つかりました"
+            )
+            return model_name
 
         print(
             f"[製番検索] 製番 '{product_number}' に一致するモデルが見つかりませんでした"
@@ -1111,24 +1540,53 @@ class MainController:
         print("[メニュー] ファイルを保存が選択されました")
         self.save_coordinates()
 
+    def has_unsaved_changes(self) -> bool:
+        """編集中の基板に未保存の変更があるかどうか"""
+        return self.main_view.get_current_mode() != "閲覧" and self.board_controller.has_unsaved_changes()
+
     def exit_app(self):
         """アプリケーションを終了"""
         print("[メニュー] 終了が選択されました")
-        if messagebox.askokcancel("終了確認", "アプリケーションを終了しますか？"):
+        message = "アプリケーションを終了しますか？"
+        if self.has_unsaved_changes():
+            message = "現在の基板に未保存の変更があります。\n保存せずにアプリケーションを終了しますか？"
+        if messagebox.askokcancel("終了確認", message):
             self.main_view.root.quit()
 
     def prev_board(self):
         """前の基板を選択"""
-        pass
+        if self.main_view.get_current_mode() == "閲覧":
+            self._step_view_board(-1)
 
     def next_board(self):
         """次の基板を選択"""
+        if self.main_view.get_current_mode() == "閲覧":
+            self._step_view_board(1)
+            return
 
         # dataファイルを更新
         coord = self.coordinate_controller.get_all_coordinate_items()
         lot_number = self.current_lot_number
         index = self.current_index
+
+        # 保存前のロットの状態（ヒートマップの差分更新用）
+        previous_signature = self.file_controller.get_lot_manifest_signature(lot_number)
+        previous_entry = self.file_controller.read_lot_manifest(lot_number)["files"].get(
+            f"{index:04d}.data"
+        )
+
         self.file_controller.create_detail_text(lot_number, index, coord)
+        self.coordinate_model.mark_saved()
+
+        # 不良名の使用回数とリファレンスを入力候補に反映
+        self._record_defect_usage(lot_number, index, coord)
+        if self.component_index is not None:
+            self.component_index.add_references(
+                {detail.reference: 1 for detail in coord if detail.reference}
+            )
+
+        # ロットのマニフェストとヒートマップを更新
+        self._update_heatmap_after_save(lot_number, coord, previous_signature, previous_entry)
 
         # dataファイルの検証
         has_valid = self.file_controller.has_valid_detail_file(lot_number, index)
@@ -1138,13 +1596,770 @@ class MainController:
             # 新しいdataファイルを作成
             self.create_new_index_item()
         
-            # 座標をクリア
+            # 座標をクリア（新しい基板は空の状態で保存済み）
             self.clear_coordinates()
+            self.coordinate_model.mark_saved()
+
+            # 前の基板の座標を未確定の座標として表示（クリックまたはCtrl+Enterで確定）
+            if self.main_view.carry_forward_var.get():
+                self.coordinate_controller.set_ghosts(coord)
         
         else:
 
             self.main_view.show_message(title="無効な座標データ", message="現在の座標データが存在しないため、新しい基板に切替えできません。")
         
+    # region 前の基板の座標の引き継ぎ
+
+    def toggle_carry_forward(self):
+        """前の基盤の座標の引き継ぎを切り替え（設定に保存）"""
+        enabled = bool(self.main_view.carry_forward_var.get())
+        self.settings_model.carry_forward = enabled
+        self.settings_model.save_settings()
+        if not enabled:
+            self.coordinate_controller.clear_ghosts()
+
+    def _confirm_ghost(self, ghost_index: int):
+        """引き継いだ座標を1つ確定して選択"""
+        index = self.coordinate_controller.confirm_ghost(ghost_index)
+        if index is not None:
+            self._select_confirmed_coordinate(index)
+
+    def _select_confirmed_coordinate(self, index: int):
+        """確定した座標を選択して詳細をフォームに表示"""
+        self.coordinate_controller.set_current_coordinate(index)
+        detail = self.coordinate_controller.get_current_coordinate_detail() or {}
+        detail["item_number"] = str(index + 1)
+        self.sidebar_view.set_coordinate_detail(detail)
+        self.sidebar_view.focus_reference_entry(select_all=True)
+        self._update_undo_redo_state()
+
+    def confirm_all_ghosts(self):
+        """引き継いだ座標を全て確定（元に戻すは1回で全て取り消し）"""
+        if self.main_view.get_current_mode() != "編集" or not self.coordinate_controller.has_ghosts():
+            return
+        indices = self.coordinate_controller.confirm_all_ghosts()
+        self._select_confirmed_coordinate(indices[-1])
+        print(f"[引き継ぎ] {len(indices)}件の座標を確定しました")
+
+    def discard_ghosts(self):
+        """引き継いだ座標を破棄"""
+        self.coordinate_controller.clear_ghosts()
+
+    # endregion
+
+    # region 座標の取り込み・書き出し
+
+    # 取り込み確認で表示するエラーの最大件数
+    MAX_IMPORT_ERRORS_SHOWN = 10
+
+    def import_coordinates(self, file_path: Optional[str] = None):
+        """座標ファイル（CSV/TSV/JSON）を現在の基盤に取り込み（元に戻すは1回で全て取り消し）"""
+        if self.main_view.get_current_mode() != "編集":
+            self.main_view.show_error("座標の取り込みは編集モードで行ってください。")
+            return
+        if not (self._current_model and self.current_lot_number):
+            self.main_view.show_error("整番(モデル)と指図を設定してください。")
+            return
+
+        path = file_path or self.main_view.ask_open_filename(
+            "座標ファイルを選択",
+            [("座標ファイル", "*.csv *.tsv *.txt *.json *.data"), ("すべてのファイル", "*.*")],
+        )
+        if not path:
+            return
+
+        from src.utils.coordinate_file import read_coordinate_file
+
+        try:
+            result = read_coordinate_file(path, bounds=self.image_model.original_size)
+        except (OSError, ValueError) as e:
+            self.main_view.show_error(f"座標ファイルを読み込めませんでした。\n{e}")
+            return
+
+        if not result.coordinates:
+            message = "取り込める座標がありません。"
+            if result.errors:
+                message += "\n\n" + "\n".join(result.errors[: self.MAX_IMPORT_ERRORS_SHOWN])
+            self.main_view.show_error(message)
+            return
+
+        if result.errors:
+            shown = "\n".join(result.errors[: self.MAX_IMPORT_ERRORS_SHOWN])
+            if len(result.errors) > self.MAX_IMPORT_ERRORS_SHOWN:
+                shown += f"\n…ほか {len(result.errors) - self.MAX_IMPORT_ERRORS_SHOWN} 件"
+            message = (
+                f"{len(result.errors)} 件の座標に問題があります。\n{shown}\n\n"
+                f"問題のない {len(result.coordinates)} 件を取り込みますか？"
+            )
+            if not self.main_view.show_confirmation_dialog(message, "座標の取り込み"):
+                return
+
+        indices = self.coordinate_controller.add_original_coordinates(result.coordinates, result.details)
+        self.coordinate_controller.set_current_coordinate(indices[-1])
+        self._update_undo_redo_state()
+        print(f"[座標取り込み] {os.path.basename(path)} から {len(indices)} 件を取り込みました")
+
+    def export_board_coordinates(self):
+        """現在の基盤の座標をCSVに書き出し"""
+        details = self.coordinate_controller.get_all_coordinate_items()
+        if not details:
+            self.main_view.show_error("書き出す座標がありません。")
+            return
+        lot_number = self.current_lot_number or ""
+        path = self.main_view.ask_save_filename(
+            "座標の書き出し",
+            [("CSV", "*.csv")],
+            initialfile=f"{lot_number or 'board'}_{self.current_index:04d}.csv",
+            defaultextension=".csv",
+        )
+        if not path:
+            return
+
+        from src.utils.coordinate_file import write_coordinate_csv
+
+        rows = (
+            (lot_number, self.current_index, item_number, detail)
+            for item_number, detail in enumerate(details, start=1)
+        )
+        try:
+            count = write_coordinate_csv(path, rows)
+        except OSError as e:
+            self.main_view.show_error(f"座標を書き出せませんでした。\n{e}")
+            return
+        self.main_view.show_message(f"{count} 件の座標を書き出しました。\n{path}", "座標の書き出し")
+
+    def export_lot_coordinates(self):
+        """現在のロットの保存済みの全基盤の座標をCSVに逐次書き出し（バックグラウンドで実行）"""
+        if self._coordinate_export_thread and self._coordinate_export_thread.is_alive():
+            self.main_view.show_message("座標を書き出し中です。", "座標の書き出し")
+            return
+        lot_number = self.current_lot_number
+        if not lot_number:
+            self.main_view.show_error("指図を設定してください。")
+            return
+        if not self.file_controller.get_lot_dir_data_list(lot_number):
+            self.main_view.show_error(f"指図 {lot_number} に基板データがありません。")
+            return
+        path = self.main_view.ask_save_filename(
+            "座標の書き出し（ロット全体）",
+            [("CSV", "*.csv")],
+            initialfile=f"{lot_number}.csv",
+            defaultextension=".csv",
+        )
+        if not path:
+            return
+
+        from src.utils.coordinate_file import write_coordinate_csv
+
+        def iter_rows():
+            # 項目番号は基板ごとに1から（1基板が複数のチャンクに分かれても続きから数える）
+            current_board, item_number = None, 0
+            for board_number, chunk in self.file_controller.iter_lot_detail_chunks(lot_number):
+                if board_number != current_board:
+                    current_board, item_number = board_number, 0
+                for detail in chunk:
+                    item_number += 1
+                    yield lot_number, board_number, item_number, detail
+
+        def run_export():
+            try:
+                self._coordinate_export_result = (path, write_coordinate_csv(path, iter_rows()))
+            except Exception as e:
+                print(f"座標書き出しエラー: {e}")
+                self._coordinate_export_result = e
+
+        self._coordinate_export_result = None
+        self._coordinate_export_thread = threading.Thread(target=run_export, daemon=True)
+        self._coordinate_export_thread.start()
+        self._poll_coordinate_export()
+
+    def _poll_coordinate_export(self):
+        """ロット全体の座標の書き出しの完了をUIスレッドで待機して結果を表示"""
+        if self._coordinate_export_thread and self._coordinate_export_thread.is_alive():
+            self.main_view.root.after(100, self._poll_coordinate_export)
+            return
+
+        result = self._coordinate_export_result
+        if isinstance(result, tuple):
+            path, count = result
+            self.main_view.show_message(f"{count} 件の座標を書き出しました。\n{path}", "座標の書き出し")
+        else:
+            self.main_view.show_error(f"座標を書き出せませんでした。\n{result}")
+
+    # endregion
+
+    # region 部品索引
+
+    # クリック位置から部品の中心に合わせる距離（画面上のピクセル）
+    SNAP_DISPLAY_DISTANCE = 20
+
+    def _load_component_index(self, model: str):
+        """モデルの部品索引（取り込んだ部品表・部品座標と過去の記録）をバックグラウンドで読み込み"""
+        data_directory = self.settings_model.data_directory
+        if not data_directory or data_directory == "未選択" or not os.path.isdir(data_directory):
+            self.component_index = None
+            return
+
+        def load():
+            from src.models.component_index_model import ComponentIndexModel
+
+            component_index = ComponentIndexModel(data_directory, model)
+            history = None
+            index_model = self._get_defect_index_model()
+            if index_model is not None:
+                try:
+                    index_model.refresh()
+                    history = index_model.get_reference_counts(model)
+                except Exception as e:
+                    print(f"[部品索引] 過去の記録の読み込みエラー: {e}")
+            component_index.load(history)
+            # 読み込み中に別のモデルが選択された場合は破棄
+            if self.current_model == model:
+                self.component_index = component_index
+
+        threading.Thread(target=load, daemon=True).start()
+
+    def _snap_to_component(self, display_x: int, display_y: int) -> Optional[Tuple[str, int, int]]:
+        """クリック位置（表示座標）の近くにある部品の部品番号と中心の元画像座標を取得
+
+        キャリブレーション前の部品座標はCADの単位のままで画像上の位置と対応しないため合わせない。
+        """
+        if self.component_index is None or not self.component_index.is_calibrated:
+            return None
+        original_x, original_y = self.image_model.convert_display_to_original_coords(display_x, display_y)
+        # スナップ距離は画面上の見た目に合わせる（拡大表示中は元画像上で狭くなる）
+        display_scale = self.image_model.scale_factor * self.image_model.zoom
+        max_distance = self.SNAP_DISPLAY_DISTANCE / display_scale if display_scale > 0 else None
+        return self.component_index.snap(original_x, original_y, max_distance)
+
+    def start_component_calibration(self):
+        """部品座標を元画像に合わせるため、基準点の部品のクリックを開始"""
+        if self.main_view.get_current_mode() != "編集":
+            self.main_view.show_warning("キャリブレーションは編集モードで行ってください。")
+            return
+        if self.component_index is None or not self.component_index.has_positions:
+            self.main_view.show_error("部品座標ファイルを取り込んでください。")
+            return
+
+        parts = self.component_index.get_calibration_parts()
+        if len(parts) < 2:
+            self.main_view.show_error("キャリブレーションには座標のある部品が2つ以上必要です。")
+            return
+
+        self._calibration_parts = parts
+        self._calibration_points = []
+        references = " → ".join(part.reference for part in parts)
+        self.main_view.show_message(
+            f"画像上で次の部品の中心を順にクリックしてください。\n{references}",
+            "部品座標のキャリブレーション",
+        )
+
+    def _add_calibration_point(self, display_x: int, display_y: int):
+        """キャリブレーションの基準点を記録し、全て揃ったら変換を求める"""
+        part = self._calibration_parts[len(self._calibration_points)]
+        original_x, original_y = self.image_model.convert_display_to_original_coords(display_x, display_y)
+        self._calibration_points.append((part.reference, original_x, original_y))
+        print(f"[部品索引] 基準点 {part.reference}: ({original_x}, {original_y})")
+        if len(self._calibration_points) < len(self._calibration_parts):
+            return
+
+        points = self._calibration_points
+        self._calibration_parts = None
+        self._calibration_points = []
+        try:
+            error = self.component_index.calibrate(points)
+        except ValueError as e:
+            self.main_view.show_error(f"キャリブレーションに失敗しました。\n{e}")
+            return
+        if len(points) > 3:
+            accuracy = f"基準点のずれ: {error:.1f}px"
+        else:
+            # 3点以下では変換が基準点を必ず通るため、ずれから精度を判断できない
+            accuracy = "基準点以外の部品の位置で合っているか確認してください"
+        self.main_view.show_message(
+            f"キャリブレーションが完了しました（{accuracy}）。\n"
+            "クリックした位置の近くの部品に座標とリファレンスが合わせられます。",
+            "部品座標のキャリブレーション",
+        )
+
+    def import_component_file(self):
+        """現在のモデルの部品表・部品座標ファイルを取り込み"""
+        model = self.current_model
+        if not model:
+            self.main_view.show_error("整番(モデル)を設定してください。")
+            return
+        data_directory = self.settings_model.data_directory
+        if not data_directory or data_directory == "未選択" or not os.path.isdir(data_directory):
+            self.main_view.show_error("データディレクトリが設定されていません。")
+            return
+
+        path = self.main_view.ask_open_filename(
+            "部品表・部品座標ファイルを選択",
+            [("CSV/TSV", "*.csv *.tsv *.txt"), ("すべてのファイル", "*.*")],
+        )
+        if not path:
+            return
+
+        from src.models.component_index_model import ComponentIndexModel
+
+        component_index = self.component_index
+        if component_index is None or component_index.model != model:
+            component_index = ComponentIndexModel(data_directory, model)
+            component_index.load()
+        try:
+            result = component_index.import_file(path)
+        except (OSError, ValueError) as e:
+            self.main_view.show_error(f"部品表・部品座標ファイルを読み込めませんでした。\n{e}")
+            return
+        self.component_index = component_index
+        message = f"{model} の部品番号を {result['designators']} 件取り込みました。\n座標のある部品: {result['parts']} 件"
+        if result["parts"] and not component_index.is_calibrated:
+            message += "\n\n「部品座標のキャリブレーション」で部品座標を画像に合わせてください。"
+        self.main_view.show_message(message, "部品表・部品座標の取り込み")
+
+    # endregion
+
+    # region ロット整合性チェック
+
+    def check_lot_health(self, quick: bool = False):
+        """データディレクトリ内の全ロットの整合性をバックグラウンドで検査"""
+        if self._lot_health_thread and self._lot_health_thread.is_alive():
+            self.main_view.show_message("整合性チェックを実行中です。", "ロット整合性チェック")
+            return
+
+        from src.models.lot_health_model import LotHealthModel
+
+        health_model = LotHealthModel(self.settings_model.data_directory)
+
+        def run_scan():
+            try:
+                self._lot_health_report = health_model.scan(quick=quick)
+            except Exception as e:
+                print(f"整合性チェックエラー: {e}")
+                self._lot_health_report = None
+
+        self._lot_health_report = None
+        self._lot_health_thread = threading.Thread(target=run_scan, daemon=True)
+        self._lot_health_thread.start()
+        self._poll_lot_health()
+
+    def _poll_lot_health(self):
+        """整合性チェックの完了をUIスレッドで待機して結果を表示"""
+        if self._lot_health_thread and self._lot_health_thread.is_alive():
+            self.main_view.root.after(100, self._poll_lot_health)
+            return
+
+        from src.models.lot_health_model import LotHealthModel
+
+        report = self._lot_health_report
+        if report is None:
+            self.main_view.show_error("整合性チェックに失敗しました。")
+        elif report["issues"]:
+            self.main_view.show_warning(LotHealthModel.format_report(report), "ロット整合性チェック")
+        else:
+            self.main_view.show_message(LotHealthModel.format_report(report), "ロット整合性チェック")
+
+    # endregion
+
+    # region 不良集計レポート
+
+    def export_defect_report(self):
+        """期間の不良集計表（不良×リファレンス・モデル別・作業者別・日別）をバックグラウンドで書き出し"""
+        if self._report_thread and self._report_thread.is_alive():
+            self.main_view.show_message("不良集計レポートを書き出し中です。", "不良集計レポート")
+            return
+        data_directory = self.settings_model.data_directory
+        if not data_directory or data_directory == "未選択" or not os.path.isdir(data_directory):
+            self.main_view.show_error("データディレクトリが設定されていません。")
+            return
+
+        model_names = sorted(
+            {list(item.keys())[0].split("_")[0] for item in self.model_list or [] if item}
+        )
+        dialog = self.dialogs["ReportExportDialog"](
+            self.main_view.root, model_names, self._get_heatmap_model_name() or ""
+        )
+        conditions = dialog.show()
+        if not conditions:
+            return
+
+        suffix = conditions["suffix"]
+        period = "_".join(value.replace("-", "") for value in (conditions["date_from"], conditions["date_to"]) if value)
+        path = self.main_view.ask_save_filename(
+            "不良集計レポートの書き出し",
+            [(suffix.lstrip(".").upper(), f"*{suffix}")],
+            initialfile=f"defect_report{'_' + period if period else ''}{suffix}",
+            defaultextension=suffix,
+        )
+        if not path:
+            return
+
+        from src.models.defect_report_model import DefectReportModel
+
+        report_model = DefectReportModel(data_directory)
+
+        def run_report():
+            try:
+                report = report_model.build(
+                    date_from=conditions["date_from"] or None,
+                    date_to=conditions["date_to"] or None,
+                    model=conditions["model"] or None,
+                    use_index=conditions["use_index"],
+                )
+                self._report_result = (report, DefectReportModel.write(report, path))
+            except Exception as e:
+                print(f"不良集計レポートエラー: {e}")
+                self._report_result = e
+
+        self._report_result = None
+        self._report_thread = threading.Thread(target=run_report, daemon=True)
+        self._report_thread.start()
+        self._poll_defect_report()
+
+    def _poll_defect_report(self):
+        """不良集計レポートの完了をUIスレッドで待機して結果を表示"""
+        if self._report_thread and self._report_thread.is_alive():
+            self.main_view.root.after(100, self._poll_defect_report)
+            return
+
+        result = self._report_result
+        if isinstance(result, tuple):
+            report, paths = result
+            message = f"{report['lots']} ロット・{report['rows']} 件を集計しました（{report['elapsed']:.1f}秒）。\n" + "\n".join(paths)
+            self.main_view.show_message(message, "不良集計レポート")
+        else:
+            self.main_view.show_error(f"不良集計レポートを書き出せませんでした。\n{result}")
+
+    # endregion
+
+    # region 閲覧モードの基板切り替え
+
+    # 前後に先読みする基板数
+    BOARD_PREFETCH_RANGE = 2
+
+    def _get_board_cache(self) -> "BoardCacheModel":
+        """基板キャッシュを取得"""
+        if self.board_cache is None:
+            from src.models.board_cache_model import BoardCacheModel
+
+            self.board_cache = BoardCacheModel(self._read_board_details)
+        return self.board_cache
+
+    def _read_board_details(self, lot_number: str, board_number: int) -> List[Detail]:
+        """基板データを読み込み（座標未登録の空ファイルは空リスト、補正量が未記録の旧形式のロットは仮に補正）"""
+        try:
+            details = self.file_controller.read_detail_text(lot_number, board_number)
+        except ValueError:
+            return []
+        shift = self._legacy_coordinate_shifts.get(lot_number)
+        if shift:
+            to_image_coordinates(details, shift)
+        return details
+
+    def _get_legacy_coordinate_shift(self) -> Optional[Tuple[int, int]]:
+        """旧形式の座標から差し引く画像の表示位置（元画像のピクセル単位）を取得
+
+        旧形式の座標は「クリック位置 / 表示倍率」で保存されており、キャンバス上の画像の
+        表示位置を含む。現在の表示倍率・表示位置で差し引くと、旧バージョンで同じウィンドウ
+        サイズに表示したときのマーカー位置と一致する。
+
+        Returns:
+            Optional[Tuple[int, int]]: 補正量（モデル画像が未表示で算出できない場合はNone）
+        """
+        scale = self.image_model.scale_factor
+        if not self.image_model.current_image_path or scale <= 0:
+            return None
+        offset_x, offset_y = self.image_model.display_offset
+        return (int(round(offset_x / scale)), int(round(offset_y / scale)))
+
+    def _resolve_legacy_lot(self, lot_number: str) -> bool:
+        """補正量が未記録の旧形式のロットを、確認のうえ現在の表示位置の補正量で記録
+
+        dataファイルは書き換えず、lotInfo.txt に補正量を記録する（記録前の内容は lotInfo.txt.bak に退避）。
+        以降の読み込み・保存・検索インデックス・ヒートマップは記録した補正量で変換する。
+
+        Returns:
+            bool: 補正不要・記録済みならTrue（モデル画像が未表示・記録しなかった場合はFalse）
+        """
+        if self.file_controller.get_coordinate_offset(lot_number) is not None:
+            return True
+        shift = self._get_legacy_coordinate_shift()
+        if shift is None:
+            self.main_view.show_error(
+                "このロットは旧形式の座標で保存されています。\n"
+                "モデル画像を表示してからロットを開き直してください（座標の補正量を記録します）。"
+            )
+            return False
+        message = (
+            f"指図 {lot_number} は旧形式（画像の表示位置を含む座標）で保存されています。\n"
+            f"現在の表示位置から求めた補正量（X: {shift[0]}, Y: {shift[1]} ピクセル）をロット情報に記録して開きますか？\n\n"
+            "・dataファイルは書き換えません（lotInfo.txt は lotInfo.txt.bak に退避します）\n"
+            "・補正量は、旧バージョンで現在と同じウィンドウサイズで記録したロットの場合に正しくなります"
+        )
+        if not self.main_view.show_confirmation_dialog(message, "旧形式の座標"):
+            return False
+        backup_path = self.file_controller.record_coordinate_offset(lot_number, shift)
+        self._legacy_coordinate_shifts.pop(lot_number, None)
+        if self.board_cache is not None:
+            self.board_cache.invalidate(lot_number)
+        print(f"旧形式の座標の補正量を記録しました: {lot_number} ({shift[0]}, {shift[1]}), バックアップ: {backup_path}")
+        return True
+
+    def _open_view_lot(self, lot_number: str):
+        """閲覧モードでロットを開いて最初の基板を表示"""
+        data_directory = self.settings_model.data_directory
+        lot_directory = Path(data_directory) / lot_number
+        if not lot_directory.is_dir():
+            self.main_view.show_error(f"指図 {lot_number} のデータが見つかりません。")
+            return
+
+        board_numbers = sorted(
+            int(path.stem) for path in lot_directory.glob("*.data") if path.stem.isdigit()
+        )
+        if not board_numbers:
+            self.main_view.show_error(f"指図 {lot_number} に基板データがありません。")
+            return
+
+        # 補正量が未記録の旧形式のロットは現在の表示位置で仮に補正（閲覧モードでは記録しない）
+        self._legacy_coordinate_shifts.pop(lot_number, None)
+        if self.file_controller.get_coordinate_offset(lot_number) is None:
+            shift = self._get_legacy_coordinate_shift()
+            if shift is None:
+                print(f"旧形式の座標を補正できません（モデル画像が未表示）: {lot_number}")
+            else:
+                self._legacy_coordinate_shifts[lot_number] = shift
+
+        # ロットのデータが更新されている可能性があるため読み込み済みの基板を破棄
+        self._get_board_cache().invalidate(lot_number)
+        self.current_lot_number = lot_number
+        self._view_board_numbers = board_numbers
+        self._setup_timeline(lot_number, lot_directory, board_numbers)
+        self._show_view_board(board_numbers[0])
+
+    def _on_board_page_key(self, step: int):
+        """PageUp/PageDownキー（閲覧モードのみ基板を切り替え）"""
+        if self.main_view.get_current_mode() == "閲覧":
+            self._step_view_board(step)
+
+    def _step_view_board(self, step: int):
+        """閲覧中のロットで前後の基板に切り替え"""
+        if not self._view_board_numbers or self.current_index not in self._view_board_numbers:
+            return
+        position = self._view_board_numbers.index(self.current_index) + step
+        if 0 <= position < len(self._view_board_numbers):
+            self._show_view_board(self._view_board_numbers[position])
+
+    def _show_view_board(self, board_number: int):
+        """キャッシュ経由で基板データを読み込んで表示し、前後の基板を先読み"""
+        lot_number = self.current_lot_number
+        board_cache = self._get_board_cache()
+        try:
+            details = board_cache.get(lot_number, board_number)
+        except Exception as e:
+            self.main_view.show_error(f"基板データの読み込みに失敗しました:\n{e}")
+            return
+
+        self.current_index = board_number
+        coordinates = [(d.x, d.y) for d in details]
+        self.coordinate_controller.load_coordinates_from_data(
+            coordinates, [d.model_dump(exclude={"x", "y"}) for d in details]
+        )
+
+        position = self._view_board_numbers.index(board_number)
+        self.main_view.set_board_index_text(position + 1, len(self._view_board_numbers))
+        self.sidebar_view.set_board_label(board_number)
+        if coordinates:
+            self.coordinate_controller.set_current_coordinate(0)
+        else:
+            self.sidebar_view.clear_form()
+        if self.timeline_view is not None:
+            self.timeline_view.select_board(board_number)
+
+        # 前後の基板をバックグラウンドで先読み
+        prefetch_range = self.BOARD_PREFETCH_RANGE
+        neighbors = self._view_board_numbers[
+            max(0, position - prefetch_range) : position + prefetch_range + 1
+        ]
+        board_cache.prefetch(lot_number, [n for n in neighbors if n != board_number])
+
+    # endregion
+
+    # region 基板タイムライン
+
+    def _get_board_thumbnail_model(self) -> "BoardThumbnailModel":
+        """基板サムネイルモデルを取得（初回のみ生成）"""
+        if self.board_thumbnail_model is None:
+            from src.models.board_thumbnail_model import BoardThumbnailModel
+
+            cache_directory = os.path.join(self.settings_model.data_directory, ".cache", "thumbnails")
+            self.board_thumbnail_model = BoardThumbnailModel(cache_directory, self._read_board_details)
+        return self.board_thumbnail_model
+
+    def _setup_timeline(self, lot_number: str, lot_directory: Path, board_numbers: List[int]):
+        """閲覧するロットの基板をタイムラインに並べる（サムネイルは表示範囲から順に生成）"""
+        if self.timeline_view is None:
+            return
+
+        thumbnail_model = self._get_board_thumbnail_model()
+        try:
+            thumbnail_model.set_base_image(
+                self.image_model.current_image_path,
+                self.image_model.create_thumbnail(thumbnail_model.thumbnail_size),
+                self.image_model.original_size,
+            )
+        except OSError as e:
+            print(f"[タイムライン] モデル画像の取得エラー: {e}")
+            thumbnail_model.set_base_image("", None, self.image_model.original_size)
+
+        manifest = self.file_controller.read_lot_manifest(lot_number)
+        thumbnail_model.set_lot(lot_number, lot_directory, manifest.get("files", {}))
+        self.timeline_view.set_boards(board_numbers)
+
+    def on_timeline_board_selected(self, board_number: int):
+        """タイムラインの基板クリック時の処理"""
+        if self.main_view.get_current_mode() != "閲覧" or board_number == self.current_index:
+            return
+        self._show_view_board(board_number)
+
+    def on_timeline_visible_boards_changed(self, board_numbers: List[int]):
+        """タイムラインの表示範囲が変わった時にサムネイルの生成を要求"""
+        if self.board_thumbnail_model is None:
+            return
+        for board_number in board_numbers:
+            self.board_thumbnail_model.request(board_number)
+        if not self._thumbnail_polling:
+            self._thumbnail_polling = True
+            self.main_view.root.after(50, self._poll_thumbnails)
+
+    def _poll_thumbnails(self):
+        """生成済みのサムネイルをタイムラインに反映"""
+        from PIL import ImageTk
+
+        thumbnail_model = self.board_thumbnail_model
+        for board_number, thumbnail in thumbnail_model.poll_completed():
+            self.timeline_view.set_thumbnail(board_number, ImageTk.PhotoImage(thumbnail))
+
+        if thumbnail_model.has_pending():
+            self.main_view.root.after(50, self._poll_thumbnails)
+        else:
+            self._thumbnail_polling = False
+
+    # endregion
+
+    # region ファイル監視
+
+    FILE_CHANGE_POLL_MS = 250
+
+    def _setup_file_watcher(self):
+        """画像ディレクトリとデータディレクトリの監視を開始（設定変更時は監視先を切り替え）"""
+        from src.utils.file_watcher import FileWatcher
+
+        if self.file_watcher is None:
+            self.file_watcher = FileWatcher(self._on_file_changes)
+            self.main_view.root.after(self.FILE_CHANGE_POLL_MS, self._poll_file_changes)
+
+        directories = []
+        image_directory = self.settings_model.image_directory
+        if image_directory and image_directory != "未選択":
+            directories.append((image_directory, False))
+        data_directory = self.settings_model.data_directory
+        if data_directory and data_directory != "未選択":
+            directories.append((data_directory, True))
+
+        # ポーリング監視の初回走査に時間がかかるためバックグラウンドで開始
+        threading.Thread(target=self._watch_directories, args=(directories,), daemon=True).start()
+
+    def _watch_directories(self, directories: List[Tuple[str, bool]]):
+        """監視先を切り替え（バックグラウンドスレッドから呼び出し）"""
+        with self._file_watch_lock:
+            self.file_watcher.unwatch_all()
+            for directory, recursive in directories:
+                self.file_watcher.watch(directory, recursive=recursive)
+
+    def _on_file_changes(self, events: List["WatchEvent"]):
+        """監視スレッドで変更されたロットのマニフェストを更新し、結果をメインスレッドに渡す
+
+        dataファイルのチェックサムの計算（SMB共有では読み込みに時間がかかる）をGUIスレッドで行わない。
+        """
+        # <データディレクトリ>/<ロット番号>/<基板番号>.data の変更をロットごとにまとめる
+        data_directory = os.path.abspath(self.settings_model.data_directory or "")
+        changed_lots: Dict[str, set] = {}
+        for event in events:
+            path = Path(event.path)
+            if path.suffix != ".data" or os.path.abspath(path.parent.parent) != data_directory:
+                continue
+            if path.parent.name.startswith("."):
+                continue
+            changed_lots.setdefault(path.parent.name, set()).add(path.name)
+
+        for lot_number, file_names in changed_lots.items():
+            try:
+                self.file_controller.update_lot_manifest_entries(lot_number, sorted(file_names))
+            except Exception as e:
+                print(f"[ファイル監視] ロット {lot_number} のマニフェスト更新エラー: {e}")
+                continue
+            print(f"[ファイル監視] ロット {lot_number} の変更を反映しました: {len(file_names)}件")
+        self._file_change_queue.put((events, changed_lots))
+
+    def _poll_file_changes(self):
+        """監視スレッドから届いた変更をメインスレッドで反映"""
+        events = []
+        changed_lots: Dict[str, set] = {}
+        while True:
+            try:
+                queued_events, queued_lots = self._file_change_queue.get_nowait()
+            except queue.Empty:
+                break
+            events.extend(queued_events)
+            for lot_number, file_names in queued_lots.items():
+                changed_lots.setdefault(lot_number, set()).update(file_names)
+        if events:
+            try:
+                self._apply_file_changes(events, changed_lots)
+            except Exception as e:
+                print(f"[ファイル監視] 変更の反映エラー: {e}")
+        self.main_view.root.after(self.FILE_CHANGE_POLL_MS, self._poll_file_changes)
+
+    def _apply_file_changes(self, events: List["WatchEvent"], changed_lots: Dict[str, set]):
+        """変更イベントをモデルカタログと閲覧中のロットの表示に反映（マニフェストは監視スレッドで更新済み）"""
+        # モデル画像の追加・削除・更新（カタログ側で画像ディレクトリ外のパスは無視される）
+        if self.image_model.catalog.apply_changes(events):
+            self._update_model_options()
+
+        file_names = changed_lots.get(self.current_lot_number or "")
+        if file_names and self.main_view.get_current_mode() == "閲覧":
+            self._refresh_view_lot(self.current_lot_number, file_names)
+
+    def _refresh_view_lot(self, lot_number: str, file_names: set):
+        """閲覧中のロットが他の端末で更新された場合に基板一覧と表示を更新"""
+        lot_directory = Path(self.settings_model.data_directory) / lot_number
+        board_cache = self._get_board_cache()
+        for file_name in file_names:
+            stem = Path(file_name).stem
+            if stem.isdigit():
+                board_cache.invalidate(lot_number, int(stem))
+
+        board_numbers = sorted(
+            int(path.stem) for path in lot_directory.glob("*.data") if path.stem.isdigit()
+        )
+        if not board_numbers:
+            return
+        # 更新された基板のサムネイルも作り直すためタイムラインを再設定
+        self._view_board_numbers = board_numbers
+        self._setup_timeline(lot_number, lot_directory, board_numbers)
+
+        if self.current_index not in board_numbers:
+            self._show_view_board(board_numbers[0])
+        elif f"{self.current_index:04d}.data" in file_names:
+            self._show_view_board(self.current_index)
+        else:
+            position = board_numbers.index(self.current_index)
+            self.main_view.set_board_index_text(position + 1, len(board_numbers))
+            if self.timeline_view is not None:
+                self.timeline_view.select_board(self.current_index)
+
+    # endregion
+
     def delete_board(self):
         """現在の基板を削除"""
         print("[DEBUG] delete_board() called")
@@ -1376,6 +2591,7 @@ class MainController:
                     image_path,
                     selected_model,
                 )
+                self.coordinate_model.mark_saved()
 
                 # 基盤情報をファイルに保存
                 date_str = self.current_date.strftime("%Y-%m-%d")
@@ -1467,7 +2683,8 @@ class MainController:
             lot_number=lot_number,
             parent_lot_number=parent_lot_number,
             worker_number=worker_number,
-            detail_count=detail_count
+            detail_count=detail_count,
+            coordinate_version=self.file_controller.COORDINATE_VERSION,
         )
 
         print("[DEBUG] get_lot_item:", lot)
@@ -1496,16 +2713,20 @@ class MainController:
     def _change_lot_number(self):
         """ロット番号を変更する処理"""
 
-        # ロックファイルが存在するかチェック
-        if self.file_controller.is_lock_file_exists(self.current_lot_number):
-            # ロックファイルが存在する場合はエラーメッセージを表示
+        # ロックファイル作成（他のプロセスが使用中の場合はエラー、残存ロックは引き継ぐ）
+        if not self.file_controller.create_lot_number_dir_lock_file(
+            self.current_lot_number, self.current_worker_no or ""
+        ):
+            owner = self.file_controller.get_lock_owner_text(self.current_lot_number)
             self.main_view.show_error(
                 "ロット番号の変更中にエラーが発生しました。\n別のプロセスでロット番号が使用中です。"
+                + (f"\n使用中: {owner}" if owner else "")
             )
             return
-
-        # ロックファイル作成
-        self.file_controller.create_lot_number_dir_lock_file(self.current_lot_number)
+        # 旧形式の座標のロットは補正量を記録してから追記する（同じロットに形式を混在させない）
+        if not self._resolve_legacy_lot(self.current_lot_number):
+            self.file_controller.delete_lot_number_dir_lock_file(self.current_lot_number)
+            return
         # lot_item取得
         lot_item = self.get_lot_item()
         # lotInfo.jsonを生成
@@ -1540,6 +2761,23 @@ class MainController:
         """サイドバーの不良項目が選択された時の処理"""
         print("[DEBUG] Sidebar on_defect_selected")
 
+    def filter_defects(self, query: str) -> List[str]:
+        """サイドバーの不良名の入力に一致する候補を取得"""
+        return self.file_controller.defect_dictionary.filter(query)
+
+    def complete_reference(self, prefix: str) -> List[str]:
+        """サイドバーのリファレンスの入力に前方一致する部品番号を取得"""
+        if self.component_index is None or not prefix:
+            return []
+        return self.component_index.complete(prefix)
+
+    def _record_defect_usage(self, lot_number: str, index: int, coord: List[Detail]):
+        """保存した基板の不良名を不良項目辞書の使用回数に反映"""
+        board_key = f"{lot_number}/{index:04d}"
+        defects = [detail.defect for detail in coord if detail.defect]
+        if self.file_controller.defect_dictionary.record_board_usage(board_key, defects):
+            self.sidebar_view.update_defect_options(self.sidebar_view.defect_items)
+
     # endregion SidebarView Callbacks
 
     # endregion
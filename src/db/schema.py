@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from sqlmodel import Field, SQLModel
 from uuid import UUID, uuid5, NAMESPACE_OID
 from datetime import datetime
@@ -22,6 +22,12 @@ class Lot(BaseModel):
     lot_number: Optional[str] = Field(description="ロット番号")
     worker_number: Optional[str] = Field(description="作業者番号")
     detail_count: Optional[int] = Field(description="座標詳細数")
+    coordinate_version: Optional[int] = Field(
+        default=None, description="座標形式のバージョン（未設定は画像の表示位置を含む旧形式）"
+    )
+    coordinate_offset: Optional[List[int]] = Field(
+        default=None, description="旧形式のdataファイルの座標に含まれる画像の表示位置（元画像のピクセル単位の[x, y]）"
+    )
 
 
 class Worker(BaseModel):
@@ -42,6 +48,7 @@ class Detail(BaseModel):
     y: Optional[int] = Field(default=None, description="Y座標")
     reference: Optional[str] = Field(default="", description="リファレンス")
     defect: Optional[str] = Field(default="", description="不良名")
+    repaired: Optional[str] = Field(default="いいえ", description="修理済み")
     comment: Optional[str] = Field(default="", description="コメント")
 
     @field_validator('board_number', mode='before')
@@ -1,20 +1,82 @@
 """
 Model Layer
 データロジックを管理するモデル層
+
+各モデルは初めて参照された時にインポートする（起動時にSQLModel・PIL等を読み込まないため）
 """
 
-from .app_settings_model import AppSettingsModel
-from .board_model import BoardModel
-from .coordinate_model import CoordinateModel
-from .image_model import ImageModel
-from .worker_model import WorkerModel
-from .lot_model import LotModel
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .app_settings_model import AppSettingsModel
+    from .board_model import BoardModel
+    from .board_session_store import BoardSessionStore
+    from .board_cache_model import BoardCacheModel
+    from .board_thumbnail_model import BoardThumbnailModel
+    from .coordinate_model import CoordinateModel
+    from .image_model import ImageModel
+    from .model_catalog_model import ModelCatalogModel
+    from .viewport_transform import ViewportTransform
+    from .worker_model import WorkerModel
+    from .lot_model import LotModel
+    from .lot_lock_model import LotLockModel
+    from .lot_health_model import LotHealthModel
+    from .defect_index_model import DefectIndexModel
+    from .defect_heatmap_model import DefectHeatmapModel
+    from .defect_dictionary_model import DefectDictionaryModel
+    from .component_index_model import ComponentIndexModel
+    from .defect_report_model import DefectReportModel
+
+# 公開名: 定義元のモジュール
+_EXPORTS = {
+    "AppSettingsModel": ".app_settings_model",
+    "BoardModel": ".board_model",
+    "BoardSessionStore": ".board_session_store",
+    "BoardCacheModel": ".board_cache_model",
+    "BoardThumbnailModel": ".board_thumbnail_model",
+    "CoordinateModel": ".coordinate_model",
+    "ImageModel": ".image_model",
+    "ModelCatalogModel": ".model_catalog_model",
+    "ViewportTransform": ".viewport_transform",
+    "WorkerModel": ".worker_model",
+    "LotModel": ".lot_model",
+    "LotLockModel": ".lot_lock_model",
+    "LotHealthModel": ".lot_health_model",
+    "DefectIndexModel": ".defect_index_model",
+    "DefectHeatmapModel": ".defect_heatmap_model",
+    "DefectDictionaryModel": ".defect_dictionary_model",
+    "ComponentIndexModel": ".component_index_model",
+    "DefectReportModel": ".defect_report_model",
+}
 
 __all__ = [
     "CoordinateModel",
     "AppSettingsModel",
     "WorkerModel",
     "ImageModel",
+    "ModelCatalogModel",
+    "ViewportTransform",
     "BoardModel",
+    "BoardSessionStore",
+    "BoardCacheModel",
+    "BoardThumbnailModel",
     "LotModel",
+    "LotLockModel",
+    "LotHealthModel",
+    "DefectIndexModel",
+    "DefectHeatmapModel",
+    "DefectDictionaryModel",
+    "ComponentIndexModel",
+    "DefectReportModel",
 ]
+
+
+def __getattr__(name: str):
+    """公開名を初めて参照した時に定義元のモジュールをインポート"""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
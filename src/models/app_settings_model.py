@@ -123,6 +123,16 @@ class AppSettingsModel:
         """デフォルトモードを設定"""
         self.set_setting("default_mode", value)
 
+    @property
+    def carry_forward(self) -> bool:
+        """次の基板に前の基板の座標を引き継ぐかどうか"""
+        return self.get_setting("carry_forward", "False") == "True"
+
+    @carry_forward.setter
+    def carry_forward(self, value: bool):
+        """前の基板の座標の引き継ぎを設定"""
+        self.set_setting("carry_forward", str(bool(value)))
+
     @property
     def settings_file_path(self) -> str:
         """設定ファイルのパス"""
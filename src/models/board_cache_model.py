@@ -0,0 +1,131 @@
+"""
+基板キャッシュモデル
+閲覧モードの基板切り替え用に読み込み済みの基板データをLRUで保持し、前後の基板を先読み
+"""
+
+import queue
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.db.schema import Detail
+
+
+class BoardCacheModel:
+    """読み込み済み基板データのLRUキャッシュとバックグラウンド先読み"""
+
+    DEFAULT_CAPACITY = 32
+
+    def __init__(
+        self,
+        loader: Callable[[str, int], List[Detail]],
+        capacity: int = DEFAULT_CAPACITY,
+    ):
+        """
+        Args:
+            loader: (ロット番号, 基板番号) から基板データを読み込む関数
+            capacity: 保持する基板数の上限
+        """
+        self._loader = loader
+        self._capacity = capacity
+        # (ロット番号, 基板番号): 基板データ
+        self._boards: "OrderedDict[Tuple[str, int], List[Detail]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 破棄の世代（ロット番号: 世代、全破棄の世代）。読み込み中に破棄されたデータを格納しない
+        self._lot_generations: Dict[str, int] = {}
+        self._clear_generation = 0
+
+        # 先読み要求のキューとワーカー（初回の先読み要求時に起動、以降は常駐）
+        self._prefetch_queue: "queue.Queue[Tuple[str, int]]" = queue.Queue()
+        self._pending: set = set()
+        self._worker: Optional[threading.Thread] = None
+
+    # region 取得
+
+    def get(self, lot_number: str, board_number: int) -> List[Detail]:
+        """基板データを取得（キャッシュにない場合はその場で読み込み）"""
+        key = (lot_number, board_number)
+        with self._lock:
+            if key in self._boards:
+                self._boards.move_to_end(key)
+                return self._boards[key]
+            generation = self._generation(lot_number)
+
+        details = self._loader(lot_number, board_number)
+        self._store(key, details, generation)
+        return details
+
+    def contains(self, lot_number: str, board_number: int) -> bool:
+        """基板データがキャッシュ済みかどうか"""
+        with self._lock:
+            return (lot_number, board_number) in self._boards
+
+    def _generation(self, lot_number: str) -> Tuple[int, int]:
+        """ロットの破棄の世代を取得（ロックを保持して呼ぶ）"""
+        return self._clear_generation, self._lot_generations.get(lot_number, 0)
+
+    def _store(self, key: Tuple[str, int], details: List[Detail], generation: Tuple[int, int]):
+        """基板データをキャッシュに格納（上限を超えたら最も古いものを破棄）
+
+        読み込み開始後にロットが破棄された場合は古いデータのため格納しない。
+        """
+        with self._lock:
+            if self._generation(key[0]) != generation:
+                return
+            self._boards[key] = details
+            self._boards.move_to_end(key)
+            while len(self._boards) > self._capacity:
+                self._boards.popitem(last=False)
+
+    # endregion
+
+    # region 先読み
+
+    def prefetch(self, lot_number: str, board_numbers: Iterable[int]):
+        """基板データをバックグラウンドで先読み"""
+        for board_number in board_numbers:
+            key = (lot_number, board_number)
+            with self._lock:
+                if key in self._boards or key in self._pending:
+                    continue
+                self._pending.add(key)
+            self._prefetch_queue.put(key)
+
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._prefetch_worker, daemon=True)
+            self._worker.start()
+
+    def _prefetch_worker(self):
+        """先読みキューを順に処理"""
+        while True:
+            key = self._prefetch_queue.get()
+            try:
+                with self._lock:
+                    cached = key in self._boards
+                    generation = self._generation(key[0])
+                if not cached:
+                    self._store(key, self._loader(*key), generation)
+            except Exception as e:
+                print(f"[基板先読み] 読み込みエラー {key}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+    # endregion
+
+    def invalidate(self, lot_number: str, board_number: Optional[int] = None):
+        """キャッシュを破棄（基板番号省略時はロット全体）
+
+        読み込み中・先読み中の同じロットの基板データも格納されなくなる。
+        """
+        with self._lock:
+            self._lot_generations[lot_number] = self._lot_generations.get(lot_number, 0) + 1
+            for key in list(self._boards):
+                if key[0] == lot_number and board_number in (None, key[1]):
+                    del self._boards[key]
+
+    def clear(self):
+        """全キャッシュを破棄"""
+        with self._lock:
+            self._clear_generation += 1
+            self._boards.clear()
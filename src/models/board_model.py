@@ -3,32 +3,69 @@
 基盤の切り替えと管理を担当
 """
 
-import json
 import os
+from collections import OrderedDict
+from collections.abc import Mapping
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .board_session_store import BoardSessionStore
+
+
+class _LazyBoardsView(Mapping):
+    """基盤番号から基盤データを参照するビュー（参照時に必要な基盤のみ読み込み）"""
+
+    def __init__(self, board_model: "BoardModel"):
+        self._board_model = board_model
+
+    def __getitem__(self, board_number: int) -> Dict[str, Any]:
+        board_data = self._board_model.get_board_data(board_number)
+        if board_data is None:
+            raise KeyError(board_number)
+        return board_data
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._board_model.get_board_list())
+
+    def __len__(self) -> int:
+        return self._board_model.get_board_count()
 
 
 class BoardModel:
     """基盤データを管理するモデル"""
 
-    def __init__(self):
+    # メモリに保持する基盤データ数の上限（編集中・未保存の基盤は除く）
+    RESIDENT_BOARDS = 8
+
+    def __init__(self, session_directory: Optional[str] = None):
         self._current_board_number: int = 1
-        self._boards_data: Dict[int, Dict[str, Any]] = {}
+        # 全基盤番号と、メモリに読み込み済みの基盤データ（LRU）
+        self._board_numbers: set = set()
+        self._boards_data: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
         self._board_history: List[int] = []
         self._project_root = os.path.dirname(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         )
 
+        # セッションごとの保存先（旧形式の board_info.json は初回のみ取り込み）
+        self._session_store = BoardSessionStore(
+            session_directory or os.path.join(self._project_root, "settings/board_sessions"),
+            legacy_file=os.path.join(self._project_root, "settings/board_info.json"),
+        )
+        # 保存済みのセッションキーと、前回保存以降に変更・削除された基盤
+        self._session_key: Optional[str] = None
+        self._dirty_boards: set = set()
+        self._deleted_boards: set = set()
+
     @property
     def current_board_number(self) -> int:
         """現在の基盤番号"""
         return self._current_board_number
 
     @property
-    def boards_data(self) -> Dict[int, Dict[str, Any]]:
-        """全基盤データ"""
-        return self._boards_data.copy()
+    def boards_data(self) -> Mapping:
+        """全基盤データ（参照した基盤のみファイルから読み込む読み取り専用ビュー）"""
+        return _LazyBoardsView(self)
 
     @property
     def board_history(self) -> List[int]:
@@ -82,6 +119,11 @@ class BoardModel:
             }
 
             self._boards_data[board_number] = board_data
+            self._boards_data.move_to_end(board_number)
+            self._board_numbers.add(board_number)
+            self._dirty_boards.add(board_number)
+            self._deleted_boards.discard(board_number)
+            self._evict_boards()
             return True
 
         except Exception as e:
@@ -89,13 +131,43 @@ class BoardModel:
             return False
 
     def get_board_data(self, board_number: int) -> Optional[Dict[str, Any]]:
-        """基盤データを取得"""
-        return self._boards_data.get(board_number)
+        """基盤データを取得（未読み込みの場合はセッションファイルから読み込み）"""
+        if board_number not in self._board_numbers:
+            return None
+        if board_number in self._boards_data:
+            self._boards_data.move_to_end(board_number)
+            return self._boards_data[board_number]
+        if self._session_key is None:
+            return None
+
+        board_data = self._session_store.load_board(self._session_key, board_number)
+        if board_data is not None:
+            self._boards_data[board_number] = board_data
+            self._evict_boards()
+        return board_data
+
+    def _evict_boards(self):
+        """上限を超えた読み込み済みの基盤を古い順に破棄（現在の基盤と未保存の基盤は保持）"""
+        if len(self._boards_data) <= self.RESIDENT_BOARDS:
+            return
+        for board_number in list(self._boards_data):
+            if len(self._boards_data) <= self.RESIDENT_BOARDS:
+                break
+            if board_number == self._current_board_number or board_number in self._dirty_boards:
+                continue
+            del self._boards_data[board_number]
+
+    def get_resident_board_count(self) -> int:
+        """メモリに読み込み済みの基盤数を取得"""
+        return len(self._boards_data)
 
     def delete_board_data(self, board_number: int) -> bool:
         """基盤データを削除"""
-        if board_number in self._boards_data:
-            del self._boards_data[board_number]
+        if board_number in self._board_numbers:
+            self._board_numbers.discard(board_number)
+            self._boards_data.pop(board_number, None)
+            self._dirty_boards.discard(board_number)
+            self._deleted_boards.add(board_number)
 
             # 履歴からも削除
             if board_number in self._board_history:
@@ -106,81 +178,48 @@ class BoardModel:
 
     def get_board_count(self) -> int:
         """保存された基盤数を取得"""
-        return len(self._boards_data)
+        return len(self._board_numbers)
 
     def get_board_list(self) -> List[int]:
         """基盤番号リストを取得（ソート済み）"""
-        return sorted(self._boards_data.keys())
-
-    def has_unsaved_changes(
-        self,
-        current_coordinates: List[Tuple[int, int]],
-        current_details: List[Dict[str, Any]],
-    ) -> bool:
-        """現在の基盤に未保存の変更があるかチェック"""
-        current_board_data = self._boards_data.get(self._current_board_number)
-
-        if not current_board_data:
-            # 基盤データが存在しない場合、座標があれば未保存
-            return len(current_coordinates) > 0
-
-        # 座標数の比較
-        if len(current_coordinates) != len(current_board_data.get("coordinates", [])):
-            return True
-
-        # 座標内容の比較
-        for i, coord in enumerate(current_coordinates):
-            if (
-                i >= len(current_board_data["coordinates"])
-                or coord != current_board_data["coordinates"][i]
-            ):
-                return True
-
-        # 詳細情報の比較（簡略版）
-        if len(current_details) != len(
-            current_board_data.get("coordinate_details", [])
-        ):
-            return True
-
-        return False
+        return sorted(self._board_numbers)
 
     def save_board_info_to_file(
         self, date_str: str, model_name: str, lot_number: str
     ) -> bool:
-        """基盤情報をJSONファイルに保存"""
+        """基盤情報をセッションごとのファイルに保存（前回保存以降に変更された基盤のみ書き込み）"""
         try:
-            board_info_file = os.path.join(
-                self._project_root, "settings/board_info.json"
-            )
-
-            # 既存の基盤情報を読み込み
-            board_info = {}
-            if os.path.exists(board_info_file):
-                try:
-                    with open(board_info_file, "r", encoding="utf-8-sig") as f:
-                        board_info = json.load(f)
-                except (json.JSONDecodeError, Exception):
-                    board_info = {}
-
-            # キーを作成: "日付_モデル名_ロット番号"
-            key = f"{date_str}_{model_name}_{lot_number}"
-
-            # 基盤情報を更新
-            board_info[key] = {
+            key = BoardSessionStore.make_key(date_str, model_name, lot_number)
+
+            # 別のセッションとして保存する場合は全基盤を書き込み（未読み込みの基盤は1件ずつ読み込み）
+            if key != self._session_key:
+                self._dirty_boards = set(self._board_numbers)
+                self._deleted_boards = set()
+
+            header = {
                 "date": date_str,
                 "model_name": model_name,
                 "lot_number": lot_number,
                 "current_board": self._current_board_number,
-                "boards_data": self._boards_data,
+                "board_numbers": sorted(self._board_numbers),
                 "board_history": self._board_history,
                 "updated_at": datetime.now().isoformat(),
             }
-
-            # ファイルに保存
-            with open(board_info_file, "w", encoding="utf-8") as f:
-                json.dump(board_info, f, ensure_ascii=False, indent=2)
-
-            print(f"基盤情報をファイルに保存しました: {key}")
+            boards = {}
+            for board_number in self._dirty_boards:
+                board_data = self._boards_data.get(board_number) or self._session_store.load_board(
+                    self._session_key, board_number
+                )
+                if board_data is not None:
+                    boards[board_number] = board_data
+            self._session_store.save_session(key, header, boards, self._deleted_boards)
+
+            self._session_key = key
+            self._dirty_boards = set()
+            self._deleted_boards = set()
+            self._evict_boards()
+
+            print(f"基盤情報をファイルに保存しました: {key}（書き込み基盤数: {len(boards)}）")
             return True
 
         except Exception as e:
@@ -190,39 +229,28 @@ class BoardModel:
     def load_board_info_from_file(
         self, date_str: str, model_name: str, lot_number: str
     ) -> bool:
-        """基盤情報をJSONファイルから読み込み"""
+        """基盤情報をセッションごとのファイルから読み込み（ヘッダーと現在の基盤のみ読み込み）"""
         try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(os.path.dirname(current_dir))
-            board_info_file = os.path.join(project_root, "settings/board_info.json")
-
-            if not os.path.exists(board_info_file):
+            key = BoardSessionStore.make_key(date_str, model_name, lot_number)
+            header = self._session_store.load_header(key)
+            if header is None:
                 return False
 
-            with open(board_info_file, "r", encoding="utf-8-sig") as f:
-                board_info = json.load(f)
-
-            # キーを作成: "日付_モデル名_ロット番号"
-            key = f"{date_str}_{model_name}_{lot_number}"
+            self._current_board_number = header.get("current_board", 1)
 
-            if key in board_info:
-                data = board_info[key]
-                self._current_board_number = data.get("current_board", 1)
+            # 基盤データは参照時に読み込む
+            self._board_numbers = {int(board_number) for board_number in header.get("board_numbers", [])}
+            self._boards_data = OrderedDict()
+            self._board_history = header.get("board_history", [])
+            self._session_key = key
+            self._dirty_boards = set()
+            self._deleted_boards = set()
+            self.get_board_data(self._current_board_number)
 
-                # 基盤データを復元
-                boards_data_raw = data.get("boards_data", {})
-                self._boards_data = {}
-                for board_num_str, board_data in boards_data_raw.items():
-                    self._boards_data[int(board_num_str)] = board_data
-
-                self._board_history = data.get("board_history", [])
-
-                print(f"基盤情報をファイルから読み込みました: {key}")
-                print(f"現在の基盤番号: {self._current_board_number}")
-                print(f"保存された基盤数: {len(self._boards_data)}")
-                return True
-
-            return False
+            print(f"基盤情報をファイルから読み込みました: {key}")
+            print(f"現在の基盤番号: {self._current_board_number}")
+            print(f"保存された基盤数: {len(self._board_numbers)}")
+            return True
 
         except Exception as e:
             print(f"基盤情報ファイル読み込みエラー: {e}")
@@ -232,7 +260,7 @@ class BoardModel:
         """基盤管理の概要情報を取得"""
         return {
             "current_board": self._current_board_number,
-            "total_boards": len(self._boards_data),
+            "total_boards": len(self._board_numbers),
             "board_list": self.get_board_list(),
             "has_previous": self._current_board_number > 1,
             "board_history": self._board_history,
@@ -242,4 +270,8 @@ class BoardModel:
         """基盤管理をリセット"""
         self._current_board_number = 1
         self._boards_data.clear()
+        self._board_numbers.clear()
         self._board_history.clear()
+        self._session_key = None
+        self._dirty_boards = set()
+        self._deleted_boards = set()
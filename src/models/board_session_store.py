@@ -0,0 +1,275 @@
+"""
+基盤セッションストア
+基盤セッション（日付_モデル名_ロット番号）ごとにヘッダーと基盤データを個別ファイルで保存し、
+変更された基盤のみを書き込む
+"""
+
+import json
+import os
+import re
+import shutil
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+class BoardSessionStore:
+    """基盤セッションのファイル保存を管理するストア
+
+    ディレクトリ構成:
+        <root>/index.json                   セッション一覧（セッション作成・整理時のみ更新）
+        <root>/<セッション>/session.json     現在の基盤番号・履歴・基盤番号一覧
+        <root>/<セッション>/boards/NNNN.json 基盤ごとの座標データ
+    """
+
+    INDEX_FILE = "index.json"
+    SESSION_FILE = "session.json"
+    BOARDS_DIRECTORY = "boards"
+
+    # 保持期間（日）と保持するセッション数の上限
+    RETENTION_DAYS = 90
+    MAX_SESSIONS = 500
+
+    def __init__(
+        self,
+        root_directory: str,
+        legacy_file: Optional[str] = None,
+        retention_days: int = RETENTION_DAYS,
+        max_sessions: int = MAX_SESSIONS,
+    ):
+        """
+        Args:
+            root_directory: セッションを保存するディレクトリ
+            legacy_file: 旧形式の board_info.json（初回のみ取り込み）
+            retention_days: セッションの保持期間（日）
+            max_sessions: 保持するセッション数の上限
+        """
+        self._root = Path(root_directory)
+        self._legacy_file = legacy_file
+        self._retention_days = retention_days
+        self._max_sessions = max_sessions
+        self._index: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def make_key(date_str: str, model_name: str, lot_number: str) -> str:
+        """セッションキーを作成: "日付_モデル名_ロット番号" """
+        return f"{date_str}_{model_name}_{lot_number}"
+
+    # region インデックス
+
+    def _load_index(self) -> Dict[str, Any]:
+        """インデックスを読み込み（初回は旧形式ファイルを取り込み）"""
+        if self._index is not None:
+            return self._index
+
+        index_path = self._root / self.INDEX_FILE
+        self._index = {"sessions": {}}
+        if index_path.exists():
+            try:
+                with open(index_path, "r", encoding="utf-8-sig") as f:
+                    self._index = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"基盤セッションインデックス読み込みエラー: {e}")
+                self._index = {"sessions": self._rebuild_sessions()}
+        elif self._legacy_file and os.path.exists(self._legacy_file):
+            self._migrate_legacy()
+        return self._index
+
+    def _save_index(self):
+        """インデックスを保存"""
+        self._write_json(self._root / self.INDEX_FILE, self._index, indent=2)
+
+    def _rebuild_sessions(self) -> Dict[str, Dict[str, Any]]:
+        """インデックスが壊れている場合にセッションファイルから一覧を再構築"""
+        sessions = {}
+        if not self._root.exists():
+            return sessions
+        for session_path in self._root.glob(f"*/{self.SESSION_FILE}"):
+            header = self._read_json(session_path)
+            if not header:
+                continue
+            key = self.make_key(header.get("date", ""), header.get("model_name", ""), header.get("lot_number", ""))
+            sessions[key] = self._make_index_entry(header, session_path.parent.name)
+        return sessions
+
+    def _migrate_legacy(self):
+        """旧形式の board_info.json を1セッションずつ取り込み"""
+        try:
+            with open(self._legacy_file, "r", encoding="utf-8-sig") as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"旧形式の基盤情報読み込みエラー: {e}")
+            legacy = {}
+
+        for key, data in legacy.items():
+            boards = {int(number): board for number, board in data.get("boards_data", {}).items()}
+            header = {key_: value for key_, value in data.items() if key_ != "boards_data"}
+            header["board_numbers"] = sorted(boards)
+            self._write_session(key, header, boards, ())
+
+        self._save_index()
+        print(f"旧形式の基盤情報を取り込みました: {len(legacy)}セッション")
+
+    def _make_index_entry(self, header: Dict[str, Any], directory: str) -> Dict[str, Any]:
+        """インデックスに登録する情報を作成"""
+        return {
+            "date": header.get("date", ""),
+            "model_name": header.get("model_name", ""),
+            "lot_number": header.get("lot_number", ""),
+            "directory": directory,
+        }
+
+    def list_sessions(self) -> Dict[str, Dict[str, Any]]:
+        """保存されているセッションの一覧を取得"""
+        return dict(self._load_index()["sessions"])
+
+    def has_session(self, key: str) -> bool:
+        """セッションが保存されているかどうか"""
+        return key in self._load_index()["sessions"]
+
+    # endregion
+
+    # region 保存
+
+    def save_session(
+        self,
+        key: str,
+        header: Dict[str, Any],
+        boards: Dict[int, Dict[str, Any]],
+        deleted_boards: Iterable[int] = (),
+    ) -> bool:
+        """セッションを保存（渡された基盤のみ書き込み）
+
+        Args:
+            key: セッションキー
+            header: 現在の基盤番号・履歴・基盤番号一覧などのヘッダー
+            boards: 書き込む基盤データ（変更された基盤のみ）
+            deleted_boards: 削除された基盤番号
+        """
+        self._load_index()
+        is_new = key not in self._index["sessions"]
+        self._write_session(key, header, boards, deleted_boards)
+
+        if is_new:
+            # セッション作成時のみインデックスを更新し、古いセッションを整理（作成したセッションは残す）
+            self.compact(keep=(key,))
+            self._save_index()
+        return True
+
+    def _write_session(
+        self,
+        key: str,
+        header: Dict[str, Any],
+        boards: Dict[int, Dict[str, Any]],
+        deleted_boards: Iterable[int],
+    ):
+        """セッションのファイルを書き込み"""
+        sessions = self._index["sessions"]
+        if key not in sessions:
+            sessions[key] = self._make_index_entry(header, self._make_directory_name(key))
+        session_directory = self._root / sessions[key]["directory"]
+        boards_directory = session_directory / self.BOARDS_DIRECTORY
+        boards_directory.mkdir(parents=True, exist_ok=True)
+
+        for board_number, board_data in boards.items():
+            self._write_json(boards_directory / f"{int(board_number):04d}.json", board_data)
+        for board_number in deleted_boards:
+            board_path = boards_directory / f"{int(board_number):04d}.json"
+            if board_path.exists():
+                board_path.unlink()
+
+        self._write_json(session_directory / self.SESSION_FILE, header, indent=2)
+
+    def _make_directory_name(self, key: str) -> str:
+        """セッションキーからディレクトリ名を作成（重複時は連番を付与）"""
+        base_name = re.sub(r"[^\w\-]", "_", key)
+        used = {entry["directory"] for entry in self._index["sessions"].values()}
+        name, suffix = base_name, 1
+        while name in used:
+            suffix += 1
+            name = f"{base_name}_{suffix}"
+        return name
+
+    # endregion
+
+    # region 読み込み
+
+    def load_header(self, key: str) -> Optional[Dict[str, Any]]:
+        """セッションのヘッダーを読み込み"""
+        entry = self._load_index()["sessions"].get(key)
+        if entry is None:
+            return None
+        return self._read_json(self._root / entry["directory"] / self.SESSION_FILE)
+
+    def load_board(self, key: str, board_number: int) -> Optional[Dict[str, Any]]:
+        """基盤データを1件読み込み"""
+        entry = self._load_index()["sessions"].get(key)
+        if entry is None:
+            return None
+        return self._read_json(
+            self._root / entry["directory"] / self.BOARDS_DIRECTORY / f"{int(board_number):04d}.json"
+        )
+
+    # endregion
+
+    # region 整理
+
+    def compact(self, today: Optional[date] = None, keep: Iterable[str] = ()) -> int:
+        """保持期間を過ぎたセッションと上限を超えた古いセッションを削除
+
+        Args:
+            today: 保持期間の基準日（省略時は今日）
+            keep: 削除しないセッションキー（保存中のセッション。上限数には含める）
+
+        Returns:
+            int: 削除したセッション数
+        """
+        sessions = self._load_index()["sessions"]
+        cutoff = ((today or date.today()) - timedelta(days=self._retention_days)).isoformat()
+        kept = {key for key in keep if key in sessions}
+
+        # 日付の新しい順に上限数まで保持
+        ordered = sorted(
+            (key for key in sessions if key not in kept),
+            key=lambda k: sessions[k].get("date", ""),
+            reverse=True,
+        )
+        limit = self._max_sessions - len(kept)
+        expired = [
+            key
+            for position, key in enumerate(ordered)
+            if position >= limit or sessions[key].get("date", "") < cutoff
+        ]
+
+        for key in expired:
+            entry = sessions.pop(key)
+            shutil.rmtree(self._root / entry["directory"], ignore_errors=True)
+
+        if expired:
+            print(f"古い基盤セッションを削除しました: {len(expired)}件")
+        return len(expired)
+
+    # endregion
+
+    # region ファイル入出力
+
+    def _read_json(self, path: Path) -> Optional[Any]:
+        """JSONファイルを読み込み（存在しない・壊れている場合はNone）"""
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8-sig") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"基盤セッション読み込みエラー {path.name}: {e}")
+            return None
+
+    def _write_json(self, path: Path, data: Any, indent: Optional[int] = None):
+        """JSONファイルを一時ファイル経由で置き換え（書き込み途中で壊れないように）"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(temp_path, path)
+
+    # endregion
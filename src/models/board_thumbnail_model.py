@@ -0,0 +1,202 @@
+"""
+基板サムネイルモデル
+ロット内の各基板のサムネイル（モデル画像＋マーカー）をワーカープールで生成し、
+dataファイルのチェックサムをキーにディスクへキャッシュ
+"""
+
+import hashlib
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from src.db.schema import Detail
+
+
+class BoardThumbnailModel:
+    """基板サムネイルの生成とキャッシュを管理するモデル"""
+
+    THUMBNAIL_SIZE = (96, 72)
+    MAX_WORKERS = 4
+
+    def __init__(
+        self,
+        cache_directory: str,
+        loader: Callable[[str, int], List[Detail]],
+        thumbnail_size: Tuple[int, int] = THUMBNAIL_SIZE,
+        max_workers: int = MAX_WORKERS,
+    ):
+        """
+        Args:
+            cache_directory: サムネイルのキャッシュディレクトリ
+            loader: (ロット番号, 基板番号) から基板データを読み込む関数
+            thumbnail_size: サムネイルの最大サイズ (幅, 高さ)
+            max_workers: 生成に使うワーカー数
+        """
+        self._cache_directory = cache_directory
+        self._loader = loader
+        self._thumbnail_size = thumbnail_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        # 背景のモデル画像（サムネイルサイズに縮小済み）
+        self._base_image: Optional[Image.Image] = None
+        self._base_key = "noimage"
+        self._original_size: Tuple[int, int] = thumbnail_size
+
+        # 対象ロット（切り替えるたびに世代を進め、古い生成結果は捨てる）
+        self._generation = 0
+        self._lot_number = ""
+        self._lot_directory: Optional[Path] = None
+        self._manifest_files: Dict[str, Dict[str, Any]] = {}
+        self._requested: set = set()
+        self._completed: "queue.Queue[Tuple[int, int, Image.Image]]" = queue.Queue()
+        self._pending_count = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def cache_directory(self) -> str:
+        """キャッシュディレクトリ"""
+        return self._cache_directory
+
+    @property
+    def thumbnail_size(self) -> Tuple[int, int]:
+        """サムネイルの最大サイズ (幅, 高さ)"""
+        return self._thumbnail_size
+
+    # region 設定
+
+    def set_base_image(self, image_path: str, base_image: Optional[Image.Image], original_size: Tuple[int, int]):
+        """背景に使うモデル画像を設定
+
+        Args:
+            image_path: モデル画像のパス（キャッシュキーに使用）
+            base_image: サムネイルサイズに縮小したモデル画像
+            original_size: 元画像のサイズ（座標の縮尺計算用）
+        """
+        self._base_image = base_image
+        self._original_size = original_size if base_image is not None else self._thumbnail_size
+        if base_image is None or not image_path:
+            self._base_key = "noimage"
+            return
+        stat = os.stat(image_path)
+        key_source = f"{os.path.abspath(image_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        name = re.sub(r"[^\w\-]", "_", Path(image_path).stem)
+        self._base_key = f"{name}_{hashlib.sha1(key_source.encode('utf-8')).hexdigest()[:12]}"
+
+    def set_lot(self, lot_number: str, lot_directory: Path, manifest_files: Dict[str, Dict[str, Any]]):
+        """対象ロットを設定（未処理の生成要求は破棄）
+
+        Args:
+            lot_number: ロット番号
+            lot_directory: ロットディレクトリ
+            manifest_files: ロットのマニフェストのファイル情報（チェックサムの再利用に使用）
+        """
+        self._generation += 1
+        self._lot_number = lot_number
+        self._lot_directory = lot_directory
+        self._manifest_files = dict(manifest_files)
+        self._requested = set()
+
+    # endregion
+
+    # region 生成
+
+    def request(self, board_number: int):
+        """サムネイルの生成を要求（生成済み・要求済みの基板は無視）"""
+        if self._lot_directory is None or board_number in self._requested:
+            return
+        self._requested.add(board_number)
+        with self._pending_lock:
+            self._pending_count += 1
+        self._executor.submit(self._generate, self._generation, board_number)
+
+    def poll_completed(self) -> List[Tuple[int, Image.Image]]:
+        """生成が完了したサムネイルを取得
+
+        Returns:
+            List[Tuple[int, Image.Image]]: (基板番号, サムネイル) のリスト
+        """
+        completed = []
+        while True:
+            try:
+                generation, board_number, thumbnail = self._completed.get_nowait()
+            except queue.Empty:
+                return completed
+            if generation == self._generation:
+                completed.append((board_number, thumbnail))
+
+    def has_pending(self) -> bool:
+        """生成待ちの要求があるかどうか"""
+        with self._pending_lock:
+            return self._pending_count > 0 or not self._completed.empty()
+
+    def _generate(self, generation: int, board_number: int):
+        """サムネイルをキャッシュから読み込み、なければ生成して保存（ワーカースレッド）"""
+        try:
+            if generation != self._generation:
+                return
+            data_path = self._lot_directory / f"{board_number:04d}.data"
+            cache_path = self._get_cache_path(self._get_checksum(data_path))
+
+            if cache_path.exists():
+                with Image.open(cache_path) as cached:
+                    thumbnail = cached.convert("RGB")
+            else:
+                details = self._loader(self._lot_number, board_number)
+                thumbnail = self.render_thumbnail([(d.x, d.y) for d in details])
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                thumbnail.save(cache_path, format="PNG")
+
+            self._completed.put((generation, board_number, thumbnail))
+        except Exception as e:
+            print(f"[サムネイル] 基板 {board_number} の生成エラー: {e}")
+        finally:
+            with self._pending_lock:
+                self._pending_count -= 1
+
+    def _get_checksum(self, data_path: Path) -> str:
+        """dataファイルのチェックサムを取得（マニフェストと一致する場合は再計算しない）"""
+        stat = data_path.stat()
+        entry = self._manifest_files.get(data_path.name)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["sha1"]
+
+        digest = hashlib.sha1()
+        with open(data_path, "rb") as f:
+            for block in iter(lambda: f.read(65536), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _get_cache_path(self, checksum: str) -> Path:
+        """サムネイルのキャッシュファイルのパスを取得"""
+        width, height = self._thumbnail_size
+        return Path(self._cache_directory) / f"{self._base_key}_{width}x{height}" / f"{checksum}.png"
+
+    def render_thumbnail(self, points: List[Tuple[int, int]]) -> Image.Image:
+        """モデル画像にマーカーを描画したサムネイルを生成"""
+        if self._base_image is not None:
+            thumbnail = self._base_image.convert("RGB")
+        else:
+            thumbnail = Image.new("RGB", self._thumbnail_size, (224, 224, 224))
+
+        scale_x = thumbnail.width / self._original_size[0]
+        scale_y = thumbnail.height / self._original_size[1]
+        draw = ImageDraw.Draw(thumbnail)
+        for x, y in points:
+            if x is None or y is None:
+                continue
+            cx, cy = x * scale_x, y * scale_y
+            draw.ellipse((cx - 2, cy - 2, cx + 2, cy + 2), fill=(255, 0, 0), outline=(0, 0, 0))
+        return thumbnail
+
+    # endregion
+
+    def shutdown(self):
+        """ワーカープールを停止"""
+        self._generation += 1
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,353 @@
+"""
+部品索引モデル
+モデルごとの部品番号（リファレンス）を前方一致のトライ木で、部品の中心座標を格子で索引する。
+部品番号は過去の記録と取り込んだ部品表・部品座標ファイルから集め、部品座標は基準点から求めた
+アフィン変換で元画像のピクセル座標に合わせる
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.affine_transform import apply_affine, fit_affine, residual_error
+from src.utils.component_file import ComponentPart, normalize_designator, read_component_file
+from src.utils.spatial_index import GridSpatialIndex
+
+_NATURAL_SPLIT = re.compile(r"(\d+)")
+
+# 基準マーク（フィデューシャル）の部品番号
+_FIDUCIAL_PATTERN = re.compile(r"^(FID|FIDUCIAL|FM|FD|MARK)\d*$")
+
+_IDENTITY = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+
+# 裏面の部品を表す実装面の値（正規化後）
+_BOTTOM_SIDES = {"bottom", "bot", "b", "back", "裏", "裏面"}
+
+
+def _natural_key(designator: str) -> tuple:
+    """R2 が R10 より先に並ぶ比較キー"""
+    return tuple(int(part) if part.isdigit() else part for part in _NATURAL_SPLIT.split(designator))
+
+
+class _TrieNode:
+    """トライ木のノード"""
+
+    __slots__ = ("children", "designator")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # このノードで終わる部品番号
+        self.designator: Optional[str] = None
+
+
+class ReferenceTrie:
+    """部品番号の前方一致検索用トライ木"""
+
+    def __init__(self):
+        self._root = _TrieNode()
+        # 部品番号: 重み（記録された回数）
+        self._weights: Dict[str, int] = {}
+
+    def add(self, designator: str, weight: int = 0):
+        """部品番号を追加（追加済みの場合は重みを加算）"""
+        if designator in self._weights:
+            self._weights[designator] += weight
+            return
+        node = self._root
+        for char in designator:
+            node = node.children.setdefault(char, _TrieNode())
+        node.designator = designator
+        self._weights[designator] = weight
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """前方一致する部品番号を重みの大きい順（同じ重みは番号順）に取得"""
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        designators = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.designator is not None:
+                designators.append(current.designator)
+            stack.extend(current.children.values())
+        designators.sort(key=lambda designator: (-self._weights[designator], _natural_key(designator)))
+        return designators[:limit]
+
+    def __contains__(self, designator: object) -> bool:
+        return designator in self._weights
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+
+class ComponentIndexModel:
+    """モデルごとの部品番号と部品の中心座標を管理するモデル
+
+    取り込んだ部品表・部品座標とキャリブレーション結果は <データディレクトリ>/.components/<モデル名>.json に
+    保存し、同じデータディレクトリを使う他のPCと共有する。キャリブレーション前の部品座標は元画像の
+    ピクセル座標として扱う。
+    """
+
+    STORE_DIRECTORY_NAME = ".components"
+    STORE_VERSION = 1
+
+    # クリック位置から部品を探す既定の距離（元画像のピクセル）
+    DEFAULT_SNAP_DISTANCE = 30.0
+
+    def __init__(self, data_directory: str, model: str):
+        self._model = model
+        self._store_file = Path(data_directory) / self.STORE_DIRECTORY_NAME / f"{model}.json"
+        self._lock = threading.RLock()
+        self._trie = ReferenceTrie()
+        self._designators: List[str] = []
+        self._parts: List[ComponentPart] = []
+        # 部品の中心の元画像座標（_parts と同じ順）
+        self._image_points = np.empty((0, 2), dtype=np.float64)
+        self._spatial_index = GridSpatialIndex(cell_size=self.DEFAULT_SNAP_DISTANCE)
+        self._source = ""
+        # {"matrix": 2x3の変換行列, "fiducials": [[部品番号, 元画像x, 元画像y], ...]}
+        self._calibration: Optional[Dict[str, Any]] = None
+
+    @property
+    def model(self) -> str:
+        """対象のモデル名"""
+        return self._model
+
+    @property
+    def source(self) -> str:
+        """取り込んだファイル名（未取り込みの場合は空）"""
+        return self._source
+
+    @property
+    def has_positions(self) -> bool:
+        """部品の中心座標があるかどうか"""
+        return bool(self._parts)
+
+    @property
+    def is_calibrated(self) -> bool:
+        """部品座標を元画像に合わせ済みかどうか"""
+        return self._calibration is not None
+
+    # region 読み込み
+
+    def load(self, history: Optional[Dict[str, int]] = None):
+        """保存済みの部品表・部品座標と過去の記録を読み込み
+
+        Args:
+            history: 過去に記録されたリファレンスごとの件数（DefectIndexModel.get_reference_counts）
+        """
+        with self._lock:
+            stored = self._read_store()
+            self._trie = ReferenceTrie()
+            self._source = stored.get("source", "")
+            self._designators = list(stored.get("designators", []))
+            for designator in self._designators:
+                self._trie.add(designator)
+            self._calibration = stored.get("calibration")
+            self._set_parts([ComponentPart(*part) for part in stored.get("parts", [])])
+            if history:
+                self.add_references(history)
+
+    def import_file(self, path: str) -> Dict[str, int]:
+        """部品表・部品座標ファイルを取り込んで保存（前回の取り込み内容は置き換える）
+
+        キャリブレーションは、基準点に使った部品の座標が変わっていない場合のみ引き継ぐ。
+
+        Returns:
+            Dict[str, int]: 部品番号数と座標のある部品数
+
+        Raises:
+            ValueError: ファイルを解釈できない場合
+        """
+        component_file = read_component_file(path)
+        if not component_file.designators:
+            raise ValueError("部品番号が見つかりません。")
+
+        with self._lock:
+            for designator in component_file.designators:
+                self._trie.add(designator)
+            self._designators = component_file.designators
+            self._source = os.path.basename(path)
+            if self._calibration is not None:
+                previous = {part.reference: (part.x, part.y) for part in self._parts}
+                current = {part.reference: (part.x, part.y) for part in component_file.parts}
+                fiducials = [reference for reference, _x, _y in self._calibration["fiducials"]]
+                if any(previous.get(reference) != current.get(reference) for reference in fiducials):
+                    self._calibration = None
+            self._set_parts(component_file.parts)
+            self._write_store()
+        print(
+            f"[部品索引] {self._model}: {self._source} を取り込みました "
+            f"(部品番号: {len(component_file.designators)}件, 座標: {len(component_file.parts)}件)"
+        )
+        return {"designators": len(component_file.designators), "parts": len(component_file.parts)}
+
+    def add_references(self, references: Dict[str, int]):
+        """記録されたリファレンスを候補に追加（件数を並び順の重みにする）"""
+        with self._lock:
+            for reference, count in references.items():
+                designator = normalize_designator(reference)
+                if designator:
+                    self._trie.add(designator, count)
+
+    def _set_parts(self, parts: Iterable[ComponentPart]):
+        """部品の中心座標を元画像座標に変換して格子に索引"""
+        self._parts = list(parts)
+        matrix = np.asarray(self._calibration["matrix"]) if self._calibration else _IDENTITY
+        self._image_points = apply_affine(matrix, [(part.x, part.y) for part in self._parts])
+        self._spatial_index.build(self._image_points)
+
+    def _read_store(self) -> Dict[str, Any]:
+        """保存済みの取り込み内容を読み込み（存在しない・破損している場合は空）"""
+        try:
+            with open(self._store_file, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(stored, dict) or stored.get("version") != self.STORE_VERSION:
+            return {}
+        return stored
+
+    def _write_store(self):
+        """取り込み内容を保存（一時ファイルを経由して置き換え）"""
+        stored = {
+            "version": self.STORE_VERSION,
+            "model": self._model,
+            "source": self._source,
+            "designators": self._designators,
+            "parts": [list(part) for part in self._parts],
+            "calibration": self._calibration,
+        }
+        try:
+            self._store_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self._store_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(stored, f, ensure_ascii=False)
+            os.replace(temp_path, self._store_file)
+        except OSError as e:
+            print(f"[部品索引] 保存エラー: {e}")
+
+    # endregion
+
+    # region キャリブレーション
+
+    def get_calibration_parts(self, count: int = 3) -> List[ComponentPart]:
+        """キャリブレーションでクリックしてもらう基準点の部品を取得
+
+        基準マーク（FID1 等）があればそれを、なければ互いに離れた部品を選ぶ（離れているほど誤差が小さい）。
+        """
+        with self._lock:
+            fiducials = [part for part in self._parts if _FIDUCIAL_PATTERN.match(part.reference)]
+            candidates = fiducials if len(fiducials) >= 2 else self._parts
+            if len(candidates) <= 2:
+                return list(candidates)
+
+            points = np.array([(part.x, part.y) for part in candidates])
+            # 重心から最も遠い点、その点から最も遠い点、2点を結ぶ直線から最も遠い点
+            first = int(np.argmax(np.hypot(*(points - points.mean(axis=0)).T)))
+            second = int(np.argmax(np.hypot(*(points - points[first]).T)))
+            chosen = [first, second]
+            if count >= 3:
+                edge = points[second] - points[first]
+                relative = points - points[first]
+                areas = np.abs(edge[0] * relative[:, 1] - edge[1] * relative[:, 0])
+                if areas.max() > 0:
+                    chosen.append(int(np.argmax(areas)))
+            return [candidates[index] for index in chosen[:count]]
+
+    def calibrate(self, fiducials: Sequence[Tuple[str, float, float]]) -> float:
+        """基準点の部品と、その部品をクリックした元画像座標から部品座標の変換を求めて保存
+
+        Args:
+            fiducials: (部品番号, 元画像x, 元画像y) のリスト（2点以上）
+
+        Returns:
+            float: 基準点の最大のずれ（元画像のピクセル。3点以下では変換が基準点を必ず通るため0）
+
+        Raises:
+            ValueError: 部品が見つからない、または基準点の配置から変換が決まらない場合
+        """
+        with self._lock:
+            positions = {part.reference: (part.x, part.y) for part in self._parts}
+            missing = [reference for reference, _x, _y in fiducials if reference not in positions]
+            if missing:
+                raise ValueError(f"部品座標に見つかりません: {', '.join(missing)}")
+
+            source = [positions[reference] for reference, _x, _y in fiducials]
+            target = [(x, y) for _reference, x, y in fiducials]
+            # 2点では反転が決まらないため実装面から判断する。表面はCADのY軸上向きを画像のY軸下向きに
+            # 反転し、裏面は左右反転も加わって打ち消し合うため反転なし
+            sides = {part.reference: part.side for part in self._parts}
+            bottom = all(
+                sides[reference].strip().lower() in _BOTTOM_SIDES for reference, _x, _y in fiducials
+            )
+            matrix = fit_affine(source, target, mirror=not bottom)
+            self._calibration = {
+                "matrix": matrix.tolist(),
+                "fiducials": [[reference, float(x), float(y)] for reference, x, y in fiducials],
+            }
+            self._set_parts(self._parts)
+            self._write_store()
+            error = residual_error(matrix, source, target)
+        print(f"[部品索引] {self._model}: キャリブレーションしました (基準点: {len(fiducials)}点, 誤差: {error:.1f}px)")
+        return error
+
+    # endregion
+
+    # region 検索
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """入力途中の部品番号の候補を取得"""
+        with self._lock:
+            return self._trie.complete(normalize_designator(prefix), limit)
+
+    def _nearest_index(self, x: float, y: float, max_distance: Optional[float]) -> Optional[int]:
+        """指定位置（元画像座標）に最も近い部品の番号を取得"""
+        if not self._parts:
+            return None
+        distance = self.DEFAULT_SNAP_DISTANCE if max_distance is None else max_distance
+        return self._spatial_index.nearest(x, y, distance)
+
+    def snap(
+        self, x: float, y: float, max_distance: Optional[float] = None
+    ) -> Optional[Tuple[str, int, int]]:
+        """指定位置（元画像座標）に最も近い部品の部品番号と中心の元画像座標を取得
+
+        Returns:
+            Optional[Tuple[str, int, int]]: (部品番号, x, y)。範囲内に部品がない場合はNone
+        """
+        with self._lock:
+            index = self._nearest_index(x, y, max_distance)
+            if index is None:
+                return None
+            center_x, center_y = self._image_points[index]
+            return self._parts[index].reference, int(round(center_x)), int(round(center_y))
+
+    def find_part_at(self, x: float, y: float, max_distance: Optional[float] = None) -> Optional[ComponentPart]:
+        """指定位置（元画像座標）に最も近い部品を取得"""
+        with self._lock:
+            index = self._nearest_index(x, y, max_distance)
+            return self._parts[index] if index is not None else None
+
+    def suggest_at(self, x: float, y: float, max_distance: Optional[float] = None) -> Optional[str]:
+        """指定位置（元画像座標）の近くにある部品の部品番号を取得"""
+        snapped = self.snap(x, y, max_distance)
+        return snapped[0] if snapped else None
+
+    def __len__(self) -> int:
+        return len(self._trie)
+
+    def __contains__(self, designator: object) -> bool:
+        return designator in self._trie
+
+    # endregion
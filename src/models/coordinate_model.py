@@ -4,6 +4,8 @@
 """
 from typing import List, Dict, Any, Optional, Tuple
 
+import numpy as np
+
 from src.db.schema import Detail
 
 
@@ -17,14 +19,27 @@ class CoordinateModel:
         self._details: List[Detail] = []
         self._current_index: int = -1
         self._image_path: str = ""
-        self._undo_stack: List[List[Detail]] = []
-        self._redo_stack: List[List[Detail]] = []
+        self._undo_stack: List[Tuple[List[Detail], int]] = []
+        self._redo_stack: List[Tuple[List[Detail], int]] = []
+
+        # 変更検出用のリビジョン（変更のたびに新しい番号を採番し、アンドゥ・リドゥでは状態と一緒に戻す）
+        self._revision: int = 0
+        self._next_revision: int = 1
+        # 最後に保存（または読み込み）した時点のリビジョン
+        self._saved_revision: int = 0
         
     @property
     def coordinates(self) -> List[Tuple[int, int]]:
         """座標リストを取得（互換性のため）"""
         return [(d.x, d.y) for d in self._details]
 
+    @property
+    def coordinates_array(self) -> np.ndarray:
+        """座標を (N, 2) の配列で取得（一括座標変換用）"""
+        if not self._details:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.array([(d.x, d.y) for d in self._details], dtype=np.int64)
+
     @property
     def coordinate_details(self) -> List[Dict[str, Any]]:
         """座標詳細リストを取得（互換性のため）"""
@@ -44,6 +59,29 @@ class CoordinateModel:
     def image_path(self) -> str:
         """画像パス"""
         return self._image_path
+
+    @property
+    def revision(self) -> int:
+        """現在の内容のリビジョン"""
+        return self._revision
+
+    @property
+    def saved_revision(self) -> int:
+        """最後に保存した時点のリビジョン"""
+        return self._saved_revision
+
+    def mark_saved(self):
+        """現在の内容を保存済みとして記録（保存・読み込みの直後に呼び出す）"""
+        self._saved_revision = self._revision
+
+    def has_unsaved_changes(self) -> bool:
+        """最後の保存以降に変更があるかどうか"""
+        return self._revision != self._saved_revision
+
+    def _touch(self):
+        """内容の変更を記録"""
+        self._revision = self._next_revision
+        self._next_revision += 1
         
     def add_coordinate(self, x: int, y: int, detail: Optional[Dict[str, Any]] = None) -> int:
         """座標を追加"""
@@ -55,13 +93,40 @@ class CoordinateModel:
         else:
             d = Detail(x=x, y=y, **detail)
         self._details.append(d)
+        self._touch()
         return len(self._details) - 1
     
+    def add_coordinates(
+        self, coordinates: List[Tuple[int, int]], details: Optional[List[Dict[str, Any]]] = None
+    ) -> List[int]:
+        """座標をまとめて追加（アンドゥ1回分・リビジョン1回分の変更として扱う）
+
+        Args:
+            coordinates: 追加する座標のリスト
+            details: 座標ごとの詳細情報（省略時・不足分は座標のみ）
+
+        Returns:
+            List[int]: 追加した座標のインデックス
+        """
+        if not coordinates:
+            return []
+        details = details or []
+        new_details = [
+            Detail(x=x, y=y, **(details[i] if i < len(details) else {}))
+            for i, (x, y) in enumerate(coordinates)
+        ]
+        self._save_state_to_undo()
+        start = len(self._details)
+        self._details.extend(new_details)
+        self._touch()
+        return list(range(start, len(self._details)))
+
     def remove_coordinate(self, index: int) -> bool:
         """座標を削除"""
         if 0 <= index < len(self._details):
             self._save_state_to_undo()
             self._details.pop(index)
+            self._touch()
             if self._current_index >= index:
                 self._current_index = max(-1, self._current_index - 1)
             return True
@@ -73,6 +138,7 @@ class CoordinateModel:
             self._save_state_to_undo()
             self._details[index].x = x
             self._details[index].y = y
+            self._touch()
             return True
         return False
     
@@ -81,6 +147,7 @@ class CoordinateModel:
         if 0 <= index < len(self._details):
             for k, v in detail.items():
                 setattr(self._details[index], k, v)
+            self._touch()
             return True
         return False
     
@@ -112,7 +179,9 @@ class CoordinateModel:
     def clear_coordinates(self):
         """全座標をクリア"""
         self._save_state_to_undo()
-        self._details.clear()
+        if self._details:
+            self._details.clear()
+            self._touch()
         self._current_index = -1
 
     def set_coordinates_with_details(self, coordinates: List[Tuple[int, int]], details: List[Dict[str, Any]]):
@@ -123,6 +192,7 @@ class CoordinateModel:
             detail = details[i] if i < len(details) else {}
             d = Detail(x=x, y=y, **detail)
             self._details.append(d)
+        self._touch()
     
     def set_image_path(self, path: str):
         """画像パスを設定"""
@@ -132,7 +202,7 @@ class CoordinateModel:
         """現在の状態をアンドゥスタックに保存"""
         import copy
         current_state = [copy.deepcopy(d) for d in self._details]
-        self._undo_stack.append(current_state)
+        self._undo_stack.append((current_state, self._revision))
         self._redo_stack.clear()
         if len(self._undo_stack) > 50:
             self._undo_stack.pop(0)
@@ -142,8 +212,8 @@ class CoordinateModel:
         import copy
         if self._undo_stack:
             current_state = [copy.deepcopy(d) for d in self._details]
-            self._redo_stack.append(current_state)
-            previous_state = self._undo_stack.pop()
+            self._redo_stack.append((current_state, self._revision))
+            previous_state, self._revision = self._undo_stack.pop()
             self._details = [copy.deepcopy(d) for d in previous_state]
             if self._current_index >= len(self._details):
                 self._current_index = -1
@@ -154,8 +224,8 @@ class CoordinateModel:
         import copy
         if self._redo_stack:
             current_state = [copy.deepcopy(d) for d in self._details]
-            self._undo_stack.append(current_state)
-            next_state = self._redo_stack.pop()
+            self._undo_stack.append((current_state, self._revision))
+            next_state, self._revision = self._redo_stack.pop()
             self._details = [copy.deepcopy(d) for d in next_state]
             if self._current_index >= len(self._details):
                 self._current_index = -1
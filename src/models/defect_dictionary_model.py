@@ -0,0 +1,387 @@
+"""
+不良項目辞書モデル
+defects.txt を更新時刻をキーに1度だけ読み込み、前方一致・部分一致・かな/ローマ字の検索索引を保持する。
+保存した基板の不良名から使用回数を学習し、候補の並び順に反映する
+"""
+
+import heapq
+import json
+import os
+import tempfile
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# ひらがな→ローマ字（訓令式。ヘボン式の入力は _canonicalize_romaji で訓令式に揃える）
+_KANA_ROMAJI = {
+    "あ": "a", "い": "i", "う": "u", "え": "e", "お": "o",
+    "か": "ka", "き": "ki", "く": "ku", "け": "ke", "こ": "ko",
+    "さ": "sa", "し": "si", "す": "su", "せ": "se", "そ": "so",
+    "た": "ta", "ち": "ti", "つ": "tu", "て": "te", "と": "to",
+    "な": "na", "に": "ni", "ぬ": "nu", "ね": "ne", "の": "no",
+    "は": "ha", "ひ": "hi", "ふ": "hu", "へ": "he", "ほ": "ho",
+    "ま": "ma", "み": "mi", "む": "mu", "め": "me", "も": "mo",
+    "や": "ya", "ゆ": "yu", "よ": "yo",
+    "ら": "ra", "り": "ri", "る": "ru", "れ": "re", "ろ": "ro",
+    "わ": "wa", "を": "o", "ん": "n",
+    "が": "ga", "ぎ": "gi", "ぐ": "gu", "げ": "ge", "ご": "go",
+    "ざ": "za", "じ": "zi", "ず": "zu", "ぜ": "ze", "ぞ": "zo",
+    "だ": "da", "ぢ": "zi", "づ": "zu", "で": "de", "ど": "do",
+    "ば": "ba", "び": "bi", "ぶ": "bu", "べ": "be", "ぼ": "bo",
+    "ぱ": "pa", "ぴ": "pi", "ぷ": "pu", "ぺ": "pe", "ぽ": "po",
+    "ぁ": "a", "ぃ": "i", "ぅ": "u", "ぇ": "e", "ぉ": "o",
+    "ゔ": "vu", "ー": "",
+}
+
+# 拗音（きゃ→kya 等）
+_SMALL_Y = {"ゃ": "a", "ゅ": "u", "ょ": "o"}
+
+# ヘボン式→訓令式（長いものから置き換える）
+_HEPBURN_TO_KUNREI = (
+    ("shi", "si"),
+    ("chi", "ti"),
+    ("tsu", "tu"),
+    ("fu", "hu"),
+    ("ji", "zi"),
+    ("sh", "sy"),
+    ("ch", "ty"),
+    ("j", "zy"),
+    # 長音（ショート→syoto）
+    ("-", ""),
+)
+
+
+def _to_hiragana(text: str) -> str:
+    """カタカナをひらがなに変換"""
+    return "".join(chr(ord(char) - 0x60) if "ァ" <= char <= "ヶ" else char for char in text)
+
+
+def _kana_to_romaji(kana: str) -> str:
+    """ひらがなを訓令式のローマ字に変換（かな以外の文字はそのまま）"""
+    result = []
+    double_next = False
+    index = 0
+    while index < len(kana):
+        char = kana[index]
+        if char == "っ":
+            double_next = True
+            index += 1
+            continue
+
+        romaji = _KANA_ROMAJI.get(char, char)
+        following = kana[index + 1] if index + 1 < len(kana) else ""
+        if following in _SMALL_Y and len(romaji) >= 2:
+            # き+ゃ→kya、し+ゃ→sya
+            romaji = romaji[:-1] + "y" + _SMALL_Y[following]
+            index += 1
+        if double_next and romaji[:1].isalpha() and romaji[:1] not in "aiueon":
+            romaji = romaji[0] + romaji
+        double_next = False
+        result.append(romaji)
+        index += 1
+    return "".join(result)
+
+
+def _canonicalize_romaji(text: str) -> str:
+    """ローマ字入力を訓令式に揃える（shi→si, tsu→tu, ja→zya 等。長音の「-」は除く）"""
+    for hepburn, kunrei in _HEPBURN_TO_KUNREI:
+        text = text.replace(hepburn, kunrei)
+    return text
+
+
+def normalize_query(text: str) -> str:
+    """検索語を正規化（全角/半角・大文字/小文字・カタカナ/ひらがなの違いをなくす）"""
+    return _to_hiragana(unicodedata.normalize("NFKC", text).strip().lower())
+
+
+class DefectDictionaryModel:
+    """不良項目の一覧と検索索引・使用回数を管理するモデル
+
+    defects.txt は1行1項目で、タブ区切りで読み（ひらがな/カタカナ）を付けられる（例: 傷<TAB>きず）。
+    読みはかな・ローマ字での検索に使う。
+    """
+
+    FILE_NAME = "defects.txt"
+    USAGE_VERSION = 1
+
+    # 前方一致の索引に登録する先頭文字数（これより長い検索語は索引の候補を絞り込む）
+    PREFIX_INDEX_LENGTH = 3
+
+    # 使用回数の重複計上を防ぐために記録しておく基板の数
+    MAX_TRACKED_BOARDS = 2000
+
+    def __init__(self, file_path: Optional[str] = None, usage_file: Optional[str] = None):
+        """
+        Args:
+            file_path: 不良項目ファイル（省略時はカレントディレクトリ、なければ settings の defects.txt）
+            usage_file: 使用回数の保存先（省略時は settings/defect_usage.json）
+        """
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self._file_path = file_path
+        self._fallback_path = os.path.join(project_root, "settings", self.FILE_NAME)
+        self._usage_file = Path(usage_file or os.path.join(project_root, "settings/defect_usage.json"))
+        self._lock = threading.RLock()
+
+        self._loaded_path: Optional[str] = None
+        self._loaded_mtime_ns: Optional[int] = None
+        self._names: List[str] = []
+        # 項目ごとの検索キー（正規化した名前・読み・ローマ字）
+        self._keys: List[Tuple[str, ...]] = []
+        # 部分一致の判定用に検索キーを改行でつないだ文字列
+        self._search_texts: List[str] = []
+        # 検索キーの先頭 PREFIX_INDEX_LENGTH 文字までの各長さ: 項目番号
+        self._prefix_index: Dict[str, Set[int]] = {}
+
+        # 直前の検索語（正規化したもの）と一致した項目（検索語を伸ばした場合は前回の候補だけを絞り込む）
+        self._last_variants: Set[str] = set()
+        self._last_matches: List[int] = []
+
+        self._usage: Counter = Counter()
+        # 項目番号: 使用回数順（同数は記載順）の順位
+        self._usage_rank: List[int] = []
+        # 基板キー: {不良名: 件数}（再保存時に前回分を差し引く）
+        self._board_usage: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._usage_loaded = False
+
+    # region 読み込み
+
+    def resolve_path(self) -> Optional[str]:
+        """読み込む不良項目ファイルのパスを取得（見つからない場合はNone）"""
+        if self._file_path:
+            return self._file_path if os.path.exists(self._file_path) else None
+        for path in (self.FILE_NAME, self._fallback_path):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def load(self) -> bool:
+        """不良項目ファイルを読み込み（前回から更新がなければ何もしない）
+
+        Returns:
+            bool: ファイルを読み込み直したかどうか
+
+        Raises:
+            FileNotFoundError: 不良項目ファイルが見つからない場合
+        """
+        with self._lock:
+            path = self.resolve_path()
+            if path is None:
+                raise FileNotFoundError("不良項目が見つかりませんでした。")
+            mtime_ns = os.stat(path).st_mtime_ns
+            if path == self._loaded_path and mtime_ns == self._loaded_mtime_ns:
+                return False
+
+            entries = []
+            with open(path, "r", encoding="utf-8-sig") as f:
+                for line in f:
+                    name, _, reading = line.strip().partition("\t")
+                    name = name.strip()
+                    if name:
+                        entries.append((name, reading.strip()))
+            self._build_index(entries)
+            self._loaded_path = path
+            self._loaded_mtime_ns = mtime_ns
+            self._load_usage()
+            self._update_usage_rank()
+            print(f"[不良項目辞書] 読み込みました: {path} ({len(self._names)}件)")
+            return True
+
+    def _build_index(self, entries: List[Tuple[str, str]]):
+        """検索キーと前方一致の索引を作成"""
+        names = []
+        keys = []
+        prefix_index: Dict[str, Set[int]] = {}
+        seen = set()
+        for name, reading in entries:
+            if name in seen:
+                continue
+            seen.add(name)
+            item_keys = [normalize_query(name)]
+            kana = normalize_query(reading) if reading else ""
+            if kana:
+                item_keys.append(kana)
+            romaji = _kana_to_romaji(kana or item_keys[0])
+            if romaji not in item_keys and romaji.isascii():
+                item_keys.append(romaji)
+
+            item_id = len(names)
+            names.append(name)
+            keys.append(tuple(item_keys))
+            for key in item_keys:
+                for length in range(1, min(len(key), self.PREFIX_INDEX_LENGTH) + 1):
+                    prefix_index.setdefault(key[:length], set()).add(item_id)
+
+        self._names = names
+        self._keys = keys
+        self._search_texts = ["\n".join(item_keys) for item_keys in keys]
+        self._prefix_index = prefix_index
+        self._last_variants = set()
+        self._last_matches = []
+
+    # endregion
+
+    # region 検索
+
+    def get_names(self) -> List[str]:
+        """不良項目の一覧を取得（ファイルの記載順）"""
+        return list(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+    def filter(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """検索語に一致する不良項目を取得
+
+        前方一致を部分一致より先に、同じ一致種別の中では使用回数の多い順（同数はファイルの記載順）に並べる。
+        空の検索語では全項目を使用回数順に返す。
+
+        Args:
+            query: 検索語（名前・読み・ローマ字のいずれか）
+            limit: 最大件数（省略時は全件）
+        """
+        with self._lock:
+            normalized = normalize_query(query)
+            variants = {normalized}
+            if normalized.isascii():
+                variants.add(_canonicalize_romaji(normalized))
+
+            if not normalized:
+                matches: List[int] = list(range(len(self._names)))
+                prefix_matches: Set[int] = set()
+            else:
+                matches, prefix_matches = self._match(variants)
+
+            usage_rank = self._usage_rank
+
+            def sort_key(item_id: int) -> Tuple[bool, int]:
+                return (bool(prefix_matches) and item_id not in prefix_matches, usage_rank[item_id])
+
+            if limit is not None and limit < len(matches):
+                ordered = heapq.nsmallest(limit, matches, key=sort_key)
+            else:
+                ordered = sorted(matches, key=sort_key)
+            return [self._names[item_id] for item_id in ordered]
+
+    def _match(self, variants: Set[str]) -> Tuple[List[int], Set[int]]:
+        """部分一致する項目と、そのうち前方一致する項目を取得"""
+        # 検索語を伸ばした場合、一致する項目は前回の候補に含まれる
+        # （"j"→"ji" のようにローマ字の正規化結果が前回の続きにならない場合は全件から探す）
+        if self._last_variants and all(
+            any(variant.startswith(previous) for previous in self._last_variants) for variant in variants
+        ):
+            candidates: Iterable[int] = self._last_matches
+        else:
+            candidates = range(len(self._names))
+
+        prefix_matches: Set[int] = set()
+        for variant in variants:
+            indexed = self._prefix_index.get(variant[: self.PREFIX_INDEX_LENGTH], ())
+            if len(variant) <= self.PREFIX_INDEX_LENGTH:
+                prefix_matches.update(indexed)
+            else:
+                prefix_matches.update(
+                    item_id for item_id in indexed if any(key.startswith(variant) for key in self._keys[item_id])
+                )
+
+        search_texts = self._search_texts
+        matches = [
+            item_id
+            for item_id in candidates
+            if item_id in prefix_matches or any(variant in search_texts[item_id] for variant in variants)
+        ]
+        self._last_variants = variants
+        self._last_matches = matches
+        return matches, prefix_matches
+
+    def best_match(self, query: str) -> Optional[str]:
+        """検索語に最もよく一致する不良項目を取得（完全一致を優先、なければ先頭の候補）"""
+        if query in self._names:
+            return query
+        matches = self.filter(query, limit=1)
+        return matches[0] if matches else None
+
+    # endregion
+
+    # region 使用回数
+
+    def get_usage_count(self, name: str) -> int:
+        """不良項目の使用回数を取得"""
+        with self._lock:
+            self._load_usage()
+            return self._usage[name]
+
+    def record_board_usage(self, board_key: str, defects: Iterable[str]) -> bool:
+        """保存した基板の不良名を使用回数に反映（同じ基板の再保存では前回分を置き換える）
+
+        Args:
+            board_key: 基板を識別するキー（ロット番号と基板番号など）
+            defects: 基板の座標ごとの不良名
+
+        Returns:
+            bool: 使用回数が変わったかどうか
+        """
+        counts = dict(Counter(defect for defect in defects if defect))
+        with self._lock:
+            self._load_usage()
+            previous = self._board_usage.pop(board_key, {})
+            self._board_usage[board_key] = counts
+            while len(self._board_usage) > self.MAX_TRACKED_BOARDS:
+                self._board_usage.popitem(last=False)
+            if previous == counts:
+                return False
+
+            self._usage.subtract(previous)
+            self._usage.update(counts)
+            # 0以下になった項目は削除
+            self._usage = +self._usage
+            self._update_usage_rank()
+            self._write_usage()
+            return True
+
+    def _update_usage_rank(self):
+        """使用回数順の順位を更新（絞り込みのたびに使用回数を参照しないため）"""
+        usage = self._usage
+        names = self._names
+        order = sorted(range(len(names)), key=lambda item_id: (-usage[names[item_id]], item_id))
+        rank = [0] * len(names)
+        for position, item_id in enumerate(order):
+            rank[item_id] = position
+        self._usage_rank = rank
+
+    def _load_usage(self):
+        """使用回数を読み込み（初回のみ）"""
+        if self._usage_loaded:
+            return
+        self._usage_loaded = True
+        try:
+            with open(self._usage_file, "r", encoding="utf-8") as f:
+                data: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != self.USAGE_VERSION:
+            return
+        self._usage = Counter({name: int(count) for name, count in data.get("counts", {}).items()})
+        self._board_usage = OrderedDict(data.get("boards", {}))
+
+    def _write_usage(self):
+        """使用回数を保存（一時ファイルを経由して置き換え）"""
+        data = {
+            "version": self.USAGE_VERSION,
+            "counts": dict(self._usage),
+            "boards": self._board_usage,
+        }
+        try:
+            self._usage_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self._usage_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self._usage_file)
+        except OSError as e:
+            print(f"[不良項目辞書] 使用回数の保存エラー: {e}")
+
+    # endregion
@@ -0,0 +1,228 @@
+"""
+不良ヒートマップモデル
+モデル（品目）ごとの不良座標の2次元ヒストグラムを集計・キャッシュ
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+class DefectHeatmapModel:
+    """モデルごとの不良座標ヒストグラムを管理するモデル"""
+
+    # 長辺方向のビン数
+    DEFAULT_BINS = 96
+
+    def __init__(self, cache_directory: str, bins: int = DEFAULT_BINS):
+        self._cache_directory = cache_directory
+        self._bins = bins
+        # モデル名: {"histogram", "original_size", "lot_signatures"}
+        self._cache: Dict[str, Dict] = {}
+        # 集計スレッドと保存後の差分加算（UIスレッド）の排他
+        self._lock = threading.RLock()
+
+    @property
+    def cache_directory(self) -> str:
+        """キャッシュディレクトリ"""
+        return self._cache_directory
+
+    def _calculate_bin_shape(self, original_size: Tuple[int, int]) -> Tuple[int, int]:
+        """画像のアスペクト比に合わせたビン数 (x方向, y方向) を計算"""
+        width, height = original_size
+        if width >= height:
+            return self._bins, max(1, round(self._bins * height / width))
+        return max(1, round(self._bins * width / height)), self._bins
+
+    def _accumulate(
+        self, histogram: np.ndarray, original_size: Tuple[int, int], points: List[Tuple[int, int]]
+    ):
+        """座標をヒストグラムに加算"""
+        if not points:
+            return
+        coords = np.asarray(points, dtype=np.float64)
+        bins_x, bins_y = histogram.shape[1], histogram.shape[0]
+        width, height = original_size
+        counts, _, _ = np.histogram2d(
+            coords[:, 1],
+            coords[:, 0],
+            bins=(bins_y, bins_x),
+            range=((0, height), (0, width)),
+        )
+        histogram += counts
+
+    # region ヒストグラム取得・更新
+
+    def get_histogram(
+        self,
+        model_name: str,
+        original_size: Tuple[int, int],
+        lot_signatures: Dict[str, str],
+        point_loader: Callable[[], Iterable[List[Tuple[int, int]]]],
+    ) -> np.ndarray:
+        """モデルのヒストグラムを取得（ロットのマニフェストが変わった場合のみ再集計）
+
+        Args:
+            model_name: モデル名
+            original_size: 元画像サイズ (幅, 高さ)
+            lot_signatures: 対象ロットごとのマニフェスト署名 {ロット番号: 署名}
+            point_loader: 座標をチャンク単位で返すイテラブルを生成する関数
+
+        Returns:
+            np.ndarray: (y方向ビン数, x方向ビン数) のヒストグラム
+        """
+        with self._lock:
+            entry = self._cache.get(model_name) or self._load_cache(model_name)
+            if (
+                entry
+                and entry["lot_signatures"] == lot_signatures
+                and tuple(entry["original_size"]) == tuple(original_size)
+            ):
+                self._cache[model_name] = entry
+                return entry["histogram"]
+
+        # 再集計はロックの外で行う（集計中に加算された基板は署名の不一致で次回再集計される）
+        bins_x, bins_y = self._calculate_bin_shape(original_size)
+        histogram = np.zeros((bins_y, bins_x), dtype=np.float64)
+        for chunk in point_loader():
+            self._accumulate(histogram, original_size, chunk)
+
+        entry = {
+            "histogram": histogram,
+            "original_size": tuple(original_size),
+            "lot_signatures": dict(lot_signatures),
+        }
+        with self._lock:
+            self._cache[model_name] = entry
+            self._save_cache(model_name, entry)
+        print(f"[ヒートマップ] {model_name} を再集計しました（{int(histogram.sum())}点）")
+        return histogram
+
+    def add_points(
+        self,
+        model_name: str,
+        points: List[Tuple[int, int]],
+        lot_number: str,
+        previous_signature: str,
+        lot_signature: str,
+    ) -> bool:
+        """保存された基板の座標をキャッシュ済みヒストグラムに加算（全ロットの再集計は行わない）
+
+        Args:
+            model_name: モデル名
+            points: 追加された座標（元画像座標）
+            lot_number: ロット番号
+            previous_signature: 保存前のロットの署名（座標なしのロットは空文字）
+            lot_signature: 保存後のロットの署名
+
+        Returns:
+            bool: キャッシュに加算できた場合True（キャッシュが古い場合は破棄してFalse）
+        """
+        with self._lock:
+            entry = self._cache.get(model_name) or self._load_cache(model_name)
+            if not entry:
+                return False
+            if entry["lot_signatures"].get(lot_number, "") != previous_signature:
+                # キャッシュが保存前のロットの状態と一致しないため次回再集計する
+                self.invalidate(model_name)
+                return False
+            self._accumulate(entry["histogram"], entry["original_size"], points)
+            entry["lot_signatures"][lot_number] = lot_signature
+            self._cache[model_name] = entry
+            self._save_cache(model_name, entry)
+            return True
+
+    def get_cached_histogram(self, model_name: str) -> Optional[np.ndarray]:
+        """メモリ上のキャッシュ済みヒストグラムを取得"""
+        with self._lock:
+            entry = self._cache.get(model_name)
+            return entry["histogram"] if entry else None
+
+    def invalidate(self, model_name: str):
+        """モデルのキャッシュを破棄"""
+        with self._lock:
+            self._cache.pop(model_name, None)
+            cache_path = self._get_cache_path(model_name)
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+
+    # endregion
+
+    # region キャッシュファイル
+
+    def _get_cache_path(self, model_name: str) -> str:
+        """キャッシュファイルのパスを取得"""
+        safe_name = re.sub(r"[^\w\-]", "_", model_name)
+        return os.path.join(self._cache_directory, f"{safe_name}.npz")
+
+    def _load_cache(self, model_name: str) -> Optional[Dict]:
+        """キャッシュファイルを読み込み"""
+        cache_path = self._get_cache_path(model_name)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with np.load(cache_path) as data:
+                return {
+                    "histogram": data["histogram"].astype(np.float64),
+                    "original_size": tuple(int(v) for v in data["original_size"]),
+                    "lot_signatures": json.loads(str(data["lot_signatures"])),
+                }
+        except Exception as e:
+            print(f"[ヒートマップ] キャッシュ読み込みエラー: {e}")
+            return None
+
+    def _save_cache(self, model_name: str, entry: Dict):
+        """キャッシュファイルを保存"""
+        try:
+            os.makedirs(self._cache_directory, exist_ok=True)
+            np.savez_compressed(
+                self._get_cache_path(model_name),
+                histogram=entry["histogram"],
+                original_size=np.asarray(entry["original_size"]),
+                lot_signatures=np.asarray(json.dumps(entry["lot_signatures"], sort_keys=True)),
+            )
+        except Exception as e:
+            print(f"[ヒートマップ] キャッシュ保存エラー: {e}")
+
+    # endregion
+
+    def render_overlay(
+        self,
+        histogram: np.ndarray,
+        display_size: Tuple[int, int],
+        max_alpha: int = 160,
+        region: Optional[Tuple[float, float, float, float]] = None,
+    ) -> Optional[Image.Image]:
+        """ヒストグラムを半透明のRGBAオーバーレイ画像に変換
+
+        Args:
+            histogram: get_histogramで取得したヒストグラム
+            display_size: 表示サイズ (幅, 高さ)
+            max_alpha: 最大不透明度 (0-255)
+            region: 切り出す範囲（画像全体に対する割合 (左, 上, 右, 下)、ズーム表示用）
+        """
+        peak = histogram.max() if histogram.size else 0
+        if peak <= 0 or display_size[0] <= 0 or display_size[1] <= 0:
+            return None
+
+        # 件数の偏りが大きいため平方根で正規化
+        intensity = np.sqrt(histogram / peak)
+
+        # 青→黄→赤 のカラーマップ
+        rgba = np.zeros(histogram.shape + (4,), dtype=np.uint8)
+        rgba[..., 0] = np.clip(intensity * 2.0, 0, 1) * 255
+        rgba[..., 1] = np.clip(1.0 - np.abs(intensity * 2.0 - 1.0), 0, 1) * 255
+        rgba[..., 2] = np.clip(1.0 - intensity * 2.0, 0, 1) * 255
+        rgba[..., 3] = np.where(histogram > 0, 40 + intensity * (max_alpha - 40), 0)
+
+        overlay = Image.fromarray(rgba)
+        box = None
+        if region:
+            bins_y, bins_x = histogram.shape
+            box = (region[0] * bins_x, region[1] * bins_y, region[2] * bins_x, region[3] * bins_y)
+        return overlay.resize(display_size, Image.Resampling.BILINEAR, box=box)
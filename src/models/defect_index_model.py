@@ -0,0 +1,477 @@
+"""
+不良検索インデックスモデル
+ロット横断の不良検索用SQLiteインデックスを管理
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.db.schema import Detail
+from src.utils.json_stream import iter_detail_chunks
+from src.utils.lot_coordinates import NO_OFFSET, get_coordinate_offset, to_image_coordinates
+
+
+def read_lot_info(lot_directory: Path) -> Dict[str, Any]:
+    """lotInfo.txt / workerInfo.txt からロット共通の情報を取得
+
+    Returns:
+        Dict[str, Any]: モデル・作業者番号・ロットの日付・座標の補正量
+        （coordinate_offset は補正量が未記録の旧形式のロットではNone）
+    """
+    info: Dict[str, Any] = {
+        "model": "",
+        "worker_number": "",
+        "lot_date": "",
+        "coordinate_offset": NO_OFFSET,
+    }
+    try:
+        with open(lot_directory / "lotInfo.txt", "r", encoding="utf-8") as f:
+            lot = json.load(f)
+        info["model"] = lot.get("model") or ""
+        info["worker_number"] = lot.get("worker_number") or ""
+        info["lot_date"] = (lot.get("insert_timestamp") or "")[:10]
+        info["coordinate_offset"] = get_coordinate_offset(lot)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, AttributeError):
+        info["coordinate_offset"] = None
+
+    if not info["worker_number"]:
+        try:
+            with open(lot_directory / "workerInfo.txt", "r", encoding="utf-8") as f:
+                info["worker_number"] = json.load(f).get("number") or ""
+        except (OSError, ValueError):
+            pass
+    return info
+
+
+class DefectIndexModel:
+    """データディレクトリ内の全ロットの不良情報をSQLiteで索引化するモデル
+
+    SQLiteはネットワークドライブ（SMB共有）上ではロックが機能しないため、インデックスは
+    共有のデータディレクトリではなく端末ごとの settings/defect_index/ にデータディレクトリ単位で作成する
+    """
+
+    # LIKE 検索のエスケープ文字
+    LIKE_ESCAPE = "\\"
+
+    # 検索条件として指定可能な項目（検索キー: detailsテーブルの列名）
+    FILTER_COLUMNS = {
+        "lot_number": "lot_number",
+        "model": "model",
+        "reference": "reference",
+        "defect": "defect",
+        "worker_number": "worker_number",
+        "repaired": "repaired",
+    }
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            lot_number TEXT NOT NULL,
+            board_number INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS lots (
+            lot_number TEXT PRIMARY KEY,
+            info_mtime_ns INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS details (
+            file_path TEXT NOT NULL,
+            lot_number TEXT NOT NULL,
+            board_number INTEGER NOT NULL,
+            count_number INTEGER,
+            x INTEGER,
+            y INTEGER,
+            reference TEXT,
+            defect TEXT,
+            repaired TEXT,
+            comment TEXT,
+            model TEXT,
+            worker_number TEXT,
+            detail_date TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_details_file ON details(file_path);
+        CREATE INDEX IF NOT EXISTS idx_details_lot ON details(lot_number, board_number);
+        CREATE INDEX IF NOT EXISTS idx_details_model ON details(model);
+        CREATE INDEX IF NOT EXISTS idx_details_reference ON details(reference, defect);
+        CREATE INDEX IF NOT EXISTS idx_details_defect ON details(defect);
+        CREATE INDEX IF NOT EXISTS idx_details_worker ON details(worker_number);
+        CREATE INDEX IF NOT EXISTS idx_details_repaired ON details(repaired);
+        CREATE INDEX IF NOT EXISTS idx_details_date ON details(detail_date);
+    """
+
+    def __init__(self, data_directory: str, index_directory: Optional[str] = None):
+        """
+        Args:
+            data_directory: インデックス対象のデータディレクトリ
+            index_directory: インデックスの保存先（省略時は settings/defect_index）
+        """
+        self._data_directory = Path(data_directory)
+        if index_directory is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            index_directory = os.path.join(project_root, "settings/defect_index")
+        self._index_path = Path(index_directory) / self.get_index_file_name(data_directory)
+        self._index_path.parent.mkdir(parents=True, exist_ok=True)
+        # 更新処理はバックグラウンドスレッドから呼ばれるため排他制御する
+        self._refresh_lock = threading.Lock()
+        self._initialize_schema()
+
+    @property
+    def data_directory(self) -> Path:
+        """インデックス対象のデータディレクトリ"""
+        return self._data_directory
+
+    @staticmethod
+    def get_index_file_name(data_directory: str) -> str:
+        """データディレクトリに対応するインデックスのファイル名（ディレクトリ名と絶対パスのハッシュ）"""
+        absolute = os.path.normcase(os.path.abspath(data_directory))
+        digest = hashlib.sha1(absolute.encode("utf-8")).hexdigest()[:16]
+        name = "".join(c if c.isalnum() or c in "-_" else "_" for c in Path(absolute).name)
+        return f"{name}_{digest}.sqlite3"
+
+    @property
+    def index_path(self) -> Path:
+        """インデックスファイルのパス"""
+        return self._index_path
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """SQLite接続を作成（スレッドごとに接続を分け、終了時にコミットして閉じる）"""
+        connection = sqlite3.connect(self._index_path)
+        connection.row_factory = sqlite3.Row
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _initialize_schema(self):
+        """テーブルとインデックスを作成"""
+        with self._connect() as connection:
+            connection.executescript(self._SCHEMA)
+
+    # region インデックス更新
+
+    def refresh(
+        self, progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, int]:
+        """データディレクトリを走査し、変更されたdataファイルのみ再索引化
+
+        lotInfo.txt が変更されたロット（モデル・座標の補正量の変更）は全基板を再索引化する。
+
+        Args:
+            progress_callback: (処理済みファイル数, 総ファイル数) を受け取るコールバック
+
+        Returns:
+            Dict[str, int]: 更新・削除・未変更ファイル数
+        """
+        result = {"updated": 0, "removed": 0, "unchanged": 0}
+        if not self._data_directory.is_dir():
+            return result
+
+        with self._refresh_lock, self._connect() as connection:
+            indexed = {
+                row["path"]: (row["size"], row["mtime_ns"])
+                for row in connection.execute("SELECT path, size, mtime_ns FROM files")
+            }
+
+            indexed_lots = {
+                row["lot_number"]: row["info_mtime_ns"]
+                for row in connection.execute("SELECT lot_number, info_mtime_ns FROM lots")
+            }
+
+            data_files, lot_info_mtimes = self._collect_data_files()
+            changed_lots = {
+                lot_number
+                for lot_number, info_mtime_ns in lot_info_mtimes.items()
+                if indexed_lots.pop(lot_number, None) != info_mtime_ns
+            }
+            total = len(data_files)
+            lot_info_cache: Dict[str, Dict[str, Any]] = {}
+
+            for processed, (lot_directory, data_file, stat) in enumerate(data_files, 1):
+                path_key = str(data_file)
+                lot_number = lot_directory.name
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if indexed.pop(path_key, None) == signature and lot_number not in changed_lots:
+                    result["unchanged"] += 1
+                else:
+                    if lot_number not in lot_info_cache:
+                        lot_info_cache[lot_number] = self._read_lot_info(lot_directory)
+                    self._index_data_file(
+                        connection,
+                        data_file,
+                        lot_number,
+                        lot_info_cache[lot_number],
+                        signature,
+                    )
+                    result["updated"] += 1
+
+                if progress_callback:
+                    progress_callback(processed, total)
+
+            # 削除されたファイルをインデックスから除外
+            for removed_path in indexed:
+                connection.execute("DELETE FROM details WHERE file_path = ?", (removed_path,))
+                connection.execute("DELETE FROM files WHERE path = ?", (removed_path,))
+                result["removed"] += 1
+
+            # lotInfo.txt の更新日時を記録（削除されたロットは除外）
+            connection.executemany(
+                "INSERT OR REPLACE INTO lots (lot_number, info_mtime_ns) VALUES (?, ?)",
+                [(lot_number, lot_info_mtimes[lot_number]) for lot_number in changed_lots],
+            )
+            connection.executemany(
+                "DELETE FROM lots WHERE lot_number = ?",
+                [(lot_number,) for lot_number in indexed_lots],
+            )
+
+        print(
+            f"[検索インデックス] 更新: {result['updated']}件, "
+            f"削除: {result['removed']}件, 未変更: {result['unchanged']}件"
+        )
+        return result
+
+    def _collect_data_files(
+        self,
+    ) -> Tuple[List[Tuple[Path, Path, os.stat_result]], Dict[str, int]]:
+        """全ロットディレクトリのdataファイルを列挙
+
+        Returns:
+            Tuple: (ロットディレクトリ, dataファイル, stat) の一覧と、
+            ロット番号 → lotInfo.txt の更新日時（ナノ秒、ファイルがなければ0）
+        """
+        data_files = []
+        lot_info_mtimes: Dict[str, int] = {}
+        with os.scandir(self._data_directory) as lot_entries:
+            for lot_entry in lot_entries:
+                if not lot_entry.is_dir() or lot_entry.name.startswith("."):
+                    continue
+                lot_directory = Path(lot_entry.path)
+                lot_info_mtimes[lot_entry.name] = 0
+                with os.scandir(lot_directory) as file_entries:
+                    for file_entry in file_entries:
+                        if not file_entry.is_file():
+                            continue
+                        if file_entry.name.endswith(".data"):
+                            data_files.append(
+                                (lot_directory, Path(file_entry.path), file_entry.stat())
+                            )
+                        elif file_entry.name == "lotInfo.txt":
+                            lot_info_mtimes[lot_entry.name] = file_entry.stat().st_mtime_ns
+        return data_files, lot_info_mtimes
+
+    def _read_lot_info(self, lot_directory: Path) -> Dict[str, Any]:
+        """lotInfo.txt / workerInfo.txt からロット共通の情報を取得"""
+        return read_lot_info(lot_directory)
+
+    def _index_data_file(
+        self,
+        connection: sqlite3.Connection,
+        data_file: Path,
+        lot_number: str,
+        lot_info: Dict[str, Any],
+        signature: Tuple[int, int],
+    ):
+        """dataファイル1件分の不良情報をインデックスに登録
+
+        座標は元画像のピクセル座標に変換して登録する。補正量が未記録の旧形式のロットは
+        座標を登録しない（ヒートマップの集計から除外し、検索結果には含める）。
+        """
+        path_key = str(data_file)
+        board_number = int(data_file.stem) if data_file.stem.isdigit() else 0
+
+        connection.execute("DELETE FROM details WHERE file_path = ?", (path_key,))
+        connection.execute(
+            "INSERT OR REPLACE INTO files (path, lot_number, board_number, size, mtime_ns) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (path_key, lot_number, board_number, signature[0], signature[1]),
+        )
+
+        insert = (
+            "INSERT INTO details (file_path, lot_number, board_number, count_number, x, y, "
+            "reference, defect, repaired, comment, model, worker_number, detail_date) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        offset = lot_info["coordinate_offset"]
+        # チャンク単位で登録し、巨大なdataファイルでもメモリ使用量を一定に保つ
+        for chunk in self._iter_detail_chunks(data_file):
+            if offset is not None:
+                to_image_coordinates(chunk, offset)
+            connection.executemany(
+                insert,
+                [
+                    (
+                        path_key,
+                        lot_number,
+                        board_number,
+                        detail.count_number,
+                        detail.x if offset is not None else None,
+                        detail.y if offset is not None else None,
+                        detail.reference or "",
+                        detail.defect or "",
+                        detail.repaired or "",
+                        detail.comment or "",
+                        lot_info["model"],
+                        lot_info["worker_number"],
+                        (detail.insert_timestamp or "")[:10] or lot_info["lot_date"],
+                    )
+                    for detail in chunk
+                ],
+            )
+
+    def _iter_detail_chunks(self, data_file: Path) -> Iterator[List[Detail]]:
+        """dataファイルをチャンク単位で逐次読み込み（空・破損ファイルは空扱い）"""
+        if data_file.stat().st_size == 0:
+            # 作成直後の基板（座標未登録）
+            return
+        try:
+            yield from iter_detail_chunks(data_file)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[検索インデックス] 読み込みスキップ: {data_file.name} ({e})")
+
+    # endregion
+
+    # region 検索
+
+    def _build_where_clause(
+        self,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        **filters: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        """検索条件からWHERE句を生成（"*" はワイルドカードとして扱い、"%" "_" は文字として検索する）"""
+        clauses = []
+        params: List[Any] = []
+        for key, value in filters.items():
+            if key not in self.FILTER_COLUMNS:
+                raise ValueError(f"不明な検索条件です: {key}")
+            if value is None or value == "":
+                continue
+            column = self.FILTER_COLUMNS[key]
+            if "*" in value:
+                clauses.append(f"{column} LIKE ? ESCAPE '{self.LIKE_ESCAPE}'")
+                params.append(self._to_like_pattern(value))
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        if date_from:
+            clauses.append("detail_date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("detail_date <= ?")
+            params.append(date_to)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _to_like_pattern(self, value: str) -> str:
+        """"*" を含む検索値をLIKEのパターンに変換（"%" "_" とエスケープ文字はエスケープ）"""
+        escape = self.LIKE_ESCAPE
+        for special in (escape, "%", "_"):
+            value = value.replace(special, escape + special)
+        return value.replace("*", "%")
+
+    def count(self, **filters: Optional[str]) -> int:
+        """検索条件に一致する件数を取得"""
+        where, params = self._build_where_clause(**filters)
+        with self._connect() as connection:
+            row = connection.execute(f"SELECT COUNT(*) FROM details {where}", params).fetchone()
+        return row[0]
+
+    def search(
+        self, offset: int = 0, limit: int = 100, **filters: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """検索条件に一致する不良を1ページ分取得
+
+        Args:
+            offset: 取得開始位置
+            limit: 1ページの件数
+            **filters: lot_number, model, reference, defect, worker_number,
+                repaired, date_from, date_to
+
+        Returns:
+            List[Dict[str, Any]]: 検索結果
+        """
+        where, params = self._build_where_clause(**filters)
+        query = (
+            f"SELECT * FROM details {where} "
+            "ORDER BY detail_date DESC, lot_number, board_number, count_number "
+            "LIMIT ? OFFSET ?"
+        )
+        with self._connect() as connection:
+            rows = connection.execute(query, [*params, limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_search(
+        self, chunk_size: int = 500, **filters: Optional[str]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """検索結果をチャンク単位で逐次取得（全件をメモリに展開しない）"""
+        where, params = self._build_where_clause(**filters)
+        query = (
+            f"SELECT * FROM details {where} "
+            "ORDER BY detail_date DESC, lot_number, board_number, count_number"
+        )
+        with self._connect() as connection:
+            cursor = connection.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+
+    def iter_points(
+        self, model: str, chunk_size: int = 5000
+    ) -> Iterator[List[Tuple[int, int]]]:
+        """指定モデルの全ロットの座標（元画像座標）をチャンク単位で取得"""
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "SELECT x, y FROM details WHERE model = ? AND x IS NOT NULL AND y IS NOT NULL",
+                (model,),
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [(row[0], row[1]) for row in rows]
+
+    def get_lot_numbers(self, model: str) -> List[str]:
+        """指定モデルのロット番号一覧を取得"""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT DISTINCT lot_number FROM details WHERE model = ? ORDER BY lot_number",
+                (model,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_reference_counts(self, model: str) -> Dict[str, int]:
+        """指定モデルで記録されたリファレンスごとの件数を取得"""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT reference, COUNT(*) FROM details "
+                "WHERE model = ? AND reference IS NOT NULL AND reference != '' GROUP BY reference",
+                (model,),
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def get_distinct_values(self, key: str) -> List[str]:
+        """検索条件の候補値（重複なし）を取得"""
+        if key not in self.FILTER_COLUMNS:
+            raise ValueError(f"不明な検索条件です: {key}")
+        column = self.FILTER_COLUMNS[key]
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT DISTINCT {column} FROM details WHERE {column} != '' ORDER BY {column}"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # endregion
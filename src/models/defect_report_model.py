@@ -0,0 +1,334 @@
+"""
+不良集計レポートモデル
+ロットディレクトリまたは検索インデックスから不良をチャンク単位でDataFrameに読み込み、
+期間の集計表（不良×リファレンス・モデル別・作業者別・日別）を作成して書き出す
+"""
+
+import fnmatch
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.models.defect_index_model import DefectIndexModel, read_lot_info
+from src.utils.json_stream import iter_detail_chunks
+
+# 集計に使う列
+REPORT_COLUMNS = ["lot_number", "model", "worker_number", "detail_date", "reference", "defect"]
+
+# 集計表: 名前 -> (行の列, シート名)。列はいずれも不良名
+PIVOTS: Dict[str, Tuple[str, str]] = {
+    "defect_reference": ("reference", "不良×リファレンス"),
+    "model": ("model", "モデル別"),
+    "worker": ("worker_number", "作業者別"),
+    "daily": ("detail_date", "日別"),
+}
+
+# 行の見出し
+COLUMN_LABELS = {
+    "reference": "リファレンス",
+    "model": "モデル",
+    "worker_number": "作業者",
+    "detail_date": "日付",
+}
+
+# 値が空の項目の表示名
+EMPTY_LABEL = "（未入力）"
+TOTAL_LABEL = "合計"
+
+# 1回に集計する座標数（この件数ごとにDataFrameを作って件数だけを残す）
+DEFAULT_CHUNK_SIZE = 20000
+
+
+def _count_chunk(rows: List[Tuple[str, ...]]) -> Dict[str, pd.Series]:
+    """1チャンク分の座標を集計表ごとの (行, 不良名) の件数にする"""
+    frame = pd.DataFrame.from_records(rows, columns=REPORT_COLUMNS)
+    frame = frame.replace("", EMPTY_LABEL).fillna(EMPTY_LABEL)
+    return {
+        name: frame.groupby([row_column, "defect"], sort=False).size()
+        for name, (row_column, _) in PIVOTS.items()
+    }
+
+
+def _merge_counts(totals: Dict[str, pd.Series], counts: Dict[str, pd.Series]):
+    """件数を合算（件数は加算できるためチャンク・ロットごとの集計を足し合わせる）"""
+    for name, series in counts.items():
+        totals[name] = series if name not in totals else totals[name].add(series, fill_value=0)
+
+
+def _in_period(date: str, date_from: Optional[str], date_to: Optional[str]) -> bool:
+    """日付（YYYY-MM-DD）が期間内かどうか"""
+    return (not date_from or date >= date_from) and (not date_to or date <= date_to)
+
+
+def aggregate_lot_directory(
+    lot_directory: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    model: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """1ロット分のdataファイルを読み込んで集計（プロセスプールのワーカーから呼ばれる）
+
+    Returns:
+        Dict[str, Any]: {"lot_number", "rows", "counts": {集計表名: 件数}}
+    """
+    lot_path = Path(lot_directory)
+    result: Dict[str, Any] = {"lot_number": lot_path.name, "rows": 0, "counts": {}}
+    info = read_lot_info(lot_path)
+    if model and not fnmatch.fnmatchcase(info["model"], model):
+        return result
+
+    rows: List[Tuple[str, ...]] = []
+    for data_file in sorted(lot_path.glob("*.data")):
+        try:
+            stat = data_file.stat()
+            # 最終更新日より後に登録された座標はないため、開始日より前に更新されたファイルは読まない
+            if stat.st_size == 0 or (
+                date_from and datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d") < date_from
+            ):
+                continue
+            for chunk in iter_detail_chunks(data_file):
+                for detail in chunk:
+                    detail_date = (detail.insert_timestamp or "")[:10] or info["lot_date"]
+                    if not _in_period(detail_date, date_from, date_to):
+                        continue
+                    rows.append(
+                        (
+                            lot_path.name,
+                            info["model"],
+                            info["worker_number"],
+                            detail_date,
+                            detail.reference or "",
+                            detail.defect or "",
+                        )
+                    )
+                if len(rows) >= chunk_size:
+                    _merge_counts(result["counts"], _count_chunk(rows))
+                    result["rows"] += len(rows)
+                    rows = []
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[不良集計] 読み込みスキップ: {lot_path.name}/{data_file.name} ({e})")
+
+    if rows:
+        _merge_counts(result["counts"], _count_chunk(rows))
+        result["rows"] += len(rows)
+    return result
+
+
+class DefectReportModel:
+    """期間内の不良を集計して集計表を書き出すモデル"""
+
+    def __init__(
+        self,
+        data_directory: str,
+        max_workers: Optional[int] = None,
+        index_directory: Optional[str] = None,
+    ):
+        """
+        Args:
+            data_directory: データディレクトリ
+            max_workers: ロットを並列に集計するプロセス数（省略時はCPU数）
+            index_directory: 検索インデックスの保存先（省略時は settings/defect_index）
+        """
+        self._data_directory = Path(data_directory)
+        self._max_workers = max_workers
+        self._index_directory = index_directory
+
+    def _collect_lot_directories(self) -> List[str]:
+        """ロットディレクトリを列挙（キャッシュ・索引等の隠しディレクトリは除外）"""
+        if not self._data_directory.is_dir():
+            return []
+        with os.scandir(self._data_directory) as entries:
+            return sorted(
+                entry.path for entry in entries if entry.is_dir() and not entry.name.startswith(".")
+            )
+
+    # region 集計
+
+    def build(
+        self,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        model: Optional[str] = None,
+        use_index: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """期間内の不良を集計
+
+        メモリに残すのは (行, 不良名) ごとの件数だけで、座標はチャンク単位で読み捨てるため、
+        長い期間でも使用量は座標数ではなく項目の種類数で決まる。
+
+        Args:
+            date_from: 開始日（YYYY-MM-DD、省略時は制限なし）
+            date_to: 終了日（YYYY-MM-DD、省略時は制限なし）
+            model: モデル名（* でワイルドカード、省略時は全モデル）
+            use_index: ロットディレクトリの代わりに検索インデックス（差分更新してから）を使う
+            chunk_size: 1回に集計する座標数
+            progress_callback: (処理済み数, 総数) を受け取るコールバック
+
+        Returns:
+            Dict[str, Any]: {"tables": {集計表名: DataFrame}, "rows", "lots", "elapsed"}
+        """
+        start = time.perf_counter()
+        if use_index:
+            counts, rows, lots = self._aggregate_index(date_from, date_to, model, chunk_size, progress_callback)
+        else:
+            counts, rows, lots = self._aggregate_lot_directories(
+                date_from, date_to, model, chunk_size, progress_callback
+            )
+
+        report = {
+            "tables": {name: self._to_table(name, counts.get(name)) for name in PIVOTS},
+            "rows": rows,
+            "lots": lots,
+            "elapsed": time.perf_counter() - start,
+        }
+        print(f"[不良集計] {lots}ロット / {rows}件 / {report['elapsed']:.2f}秒")
+        return report
+
+    def _aggregate_lot_directories(
+        self,
+        date_from: Optional[str],
+        date_to: Optional[str],
+        model: Optional[str],
+        chunk_size: int,
+        progress_callback: Optional[Callable[[int, int], None]],
+    ) -> Tuple[Dict[str, pd.Series], int, int]:
+        """ロットディレクトリをプロセスプールで並列に集計"""
+        lot_directories = self._collect_lot_directories()
+        total = len(lot_directories)
+        arguments = (date_from, date_to, model, chunk_size)
+        totals: Dict[str, pd.Series] = {}
+        rows = lots = 0
+
+        def collect(processed: int, result: Dict[str, Any]):
+            nonlocal rows, lots
+            if result["rows"]:
+                _merge_counts(totals, result["counts"])
+                rows += result["rows"]
+                lots += 1
+            if progress_callback:
+                progress_callback(processed, total)
+
+        if total > 1 and self._max_workers != 1:
+            try:
+                # GUIのスレッドから呼ばれるためforkではなくspawnでワーカーを起動
+                with ProcessPoolExecutor(
+                    max_workers=self._max_workers, mp_context=multiprocessing.get_context("spawn")
+                ) as executor:
+                    futures = [
+                        executor.submit(aggregate_lot_directory, directory, *arguments)
+                        for directory in lot_directories
+                    ]
+                    for processed, future in enumerate(as_completed(futures), 1):
+                        collect(processed, future.result())
+                return totals, rows, lots
+            except (OSError, NotImplementedError) as e:
+                print(f"[不良集計] 並列実行できないため逐次集計します: {e}")
+                totals, rows, lots = {}, 0, 0
+
+        for processed, directory in enumerate(lot_directories, 1):
+            collect(processed, aggregate_lot_directory(directory, *arguments))
+        return totals, rows, lots
+
+    def _aggregate_index(
+        self,
+        date_from: Optional[str],
+        date_to: Optional[str],
+        model: Optional[str],
+        chunk_size: int,
+        progress_callback: Optional[Callable[[int, int], None]],
+    ) -> Tuple[Dict[str, pd.Series], int, int]:
+        """検索インデックスをチャンク単位で読み込んで集計"""
+        index_model = DefectIndexModel(str(self._data_directory), self._index_directory)
+        index_model.refresh()
+        filters = {"model": model, "date_from": date_from, "date_to": date_to}
+        total = index_model.count(**filters)
+
+        totals: Dict[str, pd.Series] = {}
+        rows = 0
+        lot_numbers = set()
+        for chunk in index_model.iter_search(chunk_size=chunk_size, **filters):
+            records = [tuple(row[column] or "" for column in REPORT_COLUMNS) for row in chunk]
+            _merge_counts(totals, _count_chunk(records))
+            lot_numbers.update(row["lot_number"] for row in chunk)
+            rows += len(records)
+            if progress_callback:
+                progress_callback(rows, total)
+        return totals, rows, len(lot_numbers)
+
+    @staticmethod
+    def _to_table(name: str, counts: Optional[pd.Series]) -> pd.DataFrame:
+        """(行, 不良名) の件数を 行×不良名 の集計表にする（合計列付き、多い順）"""
+        row_column = PIVOTS[name][0]
+        if counts is None or counts.empty:
+            table = pd.DataFrame(columns=[TOTAL_LABEL], dtype="int64")
+        else:
+            table = counts.astype("int64").unstack(fill_value=0)
+            # 不良名の列は件数の多い順
+            table = table[table.sum().sort_values(ascending=False, kind="stable").index]
+            table[TOTAL_LABEL] = table.sum(axis=1)
+            if row_column == "detail_date":
+                table = table.sort_index()
+            else:
+                table = table.sort_values(TOTAL_LABEL, ascending=False, kind="stable")
+        table.index.name = COLUMN_LABELS[row_column]
+        table.columns.name = None
+        return table
+
+    # endregion
+
+    # region 書き出し
+
+    @staticmethod
+    def write(report: Dict[str, Any], path: str) -> List[str]:
+        """集計表を書き出し（拡張子で形式を判定）
+
+        - .xlsx: 集計表ごとのシート（openpyxl が必要）
+        - .csv: 集計表ごとに `<ファイル名>_<集計表名>.csv`（BOM付きUTF-8）
+        - .parquet: 集計表ごとに `<ファイル名>_<集計表名>.parquet`（pyarrow 等が必要）
+
+        Returns:
+            List[str]: 書き出したファイルのパス
+
+        Raises:
+            ValueError: 対応していない形式、または形式に必要なライブラリがない場合
+        """
+        output = Path(path)
+        suffix = output.suffix.lower()
+        tables: Dict[str, pd.DataFrame] = report["tables"]
+
+        if suffix == ".xlsx":
+            try:
+                with pd.ExcelWriter(output, engine="openpyxl") as writer:
+                    for name, table in tables.items():
+                        table.to_excel(writer, sheet_name=PIVOTS[name][1])
+            except ImportError as e:
+                raise ValueError("XLSXの書き出しには openpyxl が必要です。") from e
+            return [str(output)]
+
+        if suffix not in (".csv", ".parquet"):
+            raise ValueError(f"対応していない形式です: {suffix or '拡張子なし'}")
+
+        paths = []
+        for name, table in tables.items():
+            table_path = output.with_name(f"{output.stem}_{name}{suffix}")
+            if suffix == ".csv":
+                table.to_csv(table_path, encoding="utf-8-sig")
+            else:
+                try:
+                    # Parquetの列名は文字列のみ
+                    table.rename(columns=str).to_parquet(table_path)
+                except ImportError as e:
+                    raise ValueError("Parquetの書き出しには pyarrow が必要です。") from e
+            paths.append(str(table_path))
+        return paths
+
+    # endregion
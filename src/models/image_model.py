@@ -2,13 +2,21 @@
 画像データモデル
 画像情報とリサイズロジックを管理
 """
+import math
 import os
+import numpy as np
 from PIL import Image, ImageTk
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Sequence, Tuple, Any, Union
+
+from .model_catalog_model import ModelCatalogModel
+from .viewport_transform import ViewportTransform
 
 
 class ImageModel:
     """画像データを管理するモデル"""
+
+    # ズーム倍率の上限
+    MAX_ZOOM = 32.0
     
     def __init__(self):
         self._current_image_path: str = ""
@@ -16,10 +24,17 @@ class ImageModel:
         self._display_size: Tuple[int, int] = (0, 0)
         self._scale_factor: float = 1.0
         self._tk_image: Optional[ImageTk.PhotoImage] = None
-        self._image_files: List[Dict[str, str]] = []
-        
-        # サポートする画像形式
-        self._supported_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff'}
+        # 元画像座標⇔表示座標の変換（オフセット・ズーム・パンを含む）
+        self._transform = ViewportTransform()
+        # 元画像と縮小ピラミッド（[0]が元画像、以降1/2ずつ縮小）
+        self._source_image: Optional[Image.Image] = None
+        self._pyramid: List[Image.Image] = []
+        self._viewport_tk_image: Optional[ImageTk.PhotoImage] = None
+        # 表示用画像（PIL、マーカーのスプライト合成用）
+        self._fit_pil_image: Optional[Image.Image] = None
+        self._viewport_pil_image: Optional[Image.Image] = None
+        # 画像ディレクトリのモデル画像索引（ディレクトリ更新時刻をキーにキャッシュ）
+        self._catalog = ModelCatalogModel()
     
     def load_image(self, image_path: str, canvas_width: int = 800, canvas_height: int = 600) -> Optional[ImageTk.PhotoImage]:
         """画像を読み込み、指定サイズにリサイズ"""
@@ -27,27 +42,36 @@ class ImageModel:
             if not os.path.exists(image_path):
                 raise FileNotFoundError(f"画像ファイルが見つかりません: {image_path}")
             
-            # PIL画像として読み込み
-            with Image.open(image_path) as pil_image:
-                self._original_size = pil_image.size
-                
-                # リサイズ計算（キャンバスサイズに合わせる）
-                new_size, scale_factor = self._calculate_display_size(
-                    self._original_size, (canvas_width, canvas_height)
-                )
-                
-                print(f"[DEBUG] 画像リサイズ: 元サイズ{self._original_size} → 表示サイズ{new_size} (倍率: {scale_factor:.3f})")
-                
-                # リサイズ実行
-                resized_image = pil_image.resize(new_size, Image.Resampling.LANCZOS)
-                
-                # Tkinter用に変換
-                self._tk_image = ImageTk.PhotoImage(resized_image)
-                self._current_image_path = image_path
-                self._display_size = new_size
-                self._scale_factor = scale_factor
-                
-                return self._tk_image
+            # PIL画像として読み込み（同じ画像の再読み込み時はキャッシュ済みの元画像を使う）
+            if image_path != self._current_image_path or self._source_image is None:
+                with Image.open(image_path) as pil_image:
+                    pil_image.load()
+                    self._source_image = pil_image.copy()
+                self._pyramid = [self._source_image]
+
+            self._original_size = self._source_image.size
+            
+            # リサイズ計算（キャンバスサイズに合わせる）
+            new_size, scale_factor = self._calculate_display_size(
+                self._original_size, (canvas_width, canvas_height)
+            )
+            
+            print(f"[DEBUG] 画像リサイズ: 元サイズ{self._original_size} → 表示サイズ{new_size} (倍率: {scale_factor:.3f})")
+            
+            # リサイズ実行（縮小ピラミッドから近い解像度の画像を使う）
+            source_image, _ = self._get_pyramid_level(scale_factor)
+            resized_image = source_image.resize(new_size, Image.Resampling.LANCZOS)
+            
+            # Tkinter用に変換
+            self._fit_pil_image = resized_image
+            self._tk_image = ImageTk.PhotoImage(resized_image)
+            self._current_image_path = image_path
+            self._display_size = new_size
+            self._scale_factor = scale_factor
+            # ズーム・パンは画面に合わせた表示に戻す
+            self._transform.update(base_scale=scale_factor, zoom=1.0, pan=(0.0, 0.0))
+            
+            return self._tk_image
                 
         except Exception as e:
             print(f"画像読み込みエラー: {e}")
@@ -74,60 +98,195 @@ class ImageModel:
         
         return (new_width, new_height), scale_factor
     
-    def convert_display_to_original_coords(self, display_x: int, display_y: int) -> Tuple[int, int]:
-        """表示座標を元画像の座標に変換"""
-        if self._scale_factor > 0:
-            orig_x = int(display_x / self._scale_factor)
-            orig_y = int(display_y / self._scale_factor)
-            return orig_x, orig_y
-        return display_x, display_y
+    def set_display_offset(self, offset_x: float, offset_y: float):
+        """キャンバス上の画像左上位置を設定"""
+        self._transform.update(offset=(offset_x, offset_y))
+
+    def set_zoom_pan(self, zoom: float, pan_x: float = 0.0, pan_y: float = 0.0):
+        """ズーム倍率とパン量を設定"""
+        self._transform.update(zoom=zoom, pan=(pan_x, pan_y))
+
+    def convert_display_to_original_coords(self, display_x: float, display_y: float) -> Tuple[int, int]:
+        """表示座標を元画像の座標（最も近いピクセル）に変換"""
+        return self._transform.to_original(display_x, display_y)
     
-    def convert_original_to_display_coords(self, orig_x: int, orig_y: int) -> Tuple[int, int]:
-        """元画像の座標を表示座標に変換"""
-        display_x = int(orig_x * self._scale_factor)
-        display_y = int(orig_y * self._scale_factor)
-        return display_x, display_y
+    def convert_original_to_display_coords(self, orig_x: int, orig_y: int) -> Tuple[float, float]:
+        """元画像の座標を表示座標に変換（サブピクセル精度）"""
+        return self._transform.to_display(orig_x, orig_y)
+
+    def convert_original_to_display_array(
+        self, points: Union[np.ndarray, Sequence[Tuple[int, int]]]
+    ) -> np.ndarray:
+        """元画像の座標をまとめて表示座標に変換
+
+        Args:
+            points: (N, 2) の元画像座標
+
+        Returns:
+            np.ndarray: (N, 2) の表示座標（float64）
+        """
+        return self._transform.to_display_array(points)
+
+    def convert_display_to_original_array(
+        self, points: Union[np.ndarray, Sequence[Tuple[int, int]]]
+    ) -> np.ndarray:
+        """表示座標をまとめて元画像の座標に変換
+
+        Args:
+            points: (N, 2) の表示座標
+
+        Returns:
+            np.ndarray: (N, 2) の元画像座標（int64）
+        """
+        return self._transform.to_original_array(points)
     
+    # region ズーム・パン
+
+    def is_zoomed(self) -> bool:
+        """画面に合わせた表示からズーム・パンしているかどうか"""
+        return self._transform.zoom != 1.0 or self._transform.pan != (0.0, 0.0)
+
+    def zoom_at(self, display_x: float, display_y: float, zoom: float) -> bool:
+        """指定した表示座標を中心にズーム（カーソル下の画素を固定）
+
+        Returns:
+            bool: 変換が変わった場合True
+        """
+        zoom = min(max(zoom, 1.0), self.MAX_ZOOM)
+        if zoom == 1.0:
+            return self._transform.update(zoom=1.0, pan=(0.0, 0.0))
+
+        orig_x, orig_y = self._transform.to_original_exact(display_x, display_y)
+        offset_x, offset_y = self._transform.offset
+        scale = self._transform.base_scale * zoom
+        pan_x = display_x - offset_x - orig_x * scale
+        pan_y = display_y - offset_y - orig_y * scale
+        return self._transform.update(zoom=zoom, pan=self._clamp_pan(zoom, pan_x, pan_y))
+
+    def pan_by(self, delta_x: float, delta_y: float) -> bool:
+        """表示をパン（ズーム中のみ）
+
+        Returns:
+            bool: 変換が変わった場合True
+        """
+        zoom = self._transform.zoom
+        if zoom <= 1.0:
+            return False
+        pan_x, pan_y = self._transform.pan
+        return self._transform.update(pan=self._clamp_pan(zoom, pan_x + delta_x, pan_y + delta_y))
+
+    def _clamp_pan(self, zoom: float, pan_x: float, pan_y: float) -> Tuple[float, float]:
+        """ズームした画像が画面に合わせた表示範囲の外に出ないようにパン量を制限"""
+        display_width, display_height = self._display_size
+        min_pan_x = display_width - display_width * zoom
+        min_pan_y = display_height - display_height * zoom
+        return min(max(pan_x, min_pan_x), 0.0), min(max(pan_y, min_pan_y), 0.0)
+
+    def _get_pyramid_level(self, scale: float) -> Tuple[Image.Image, float]:
+        """指定倍率の表示に十分な解像度を持つ最小の縮小画像を取得
+
+        Returns:
+            Tuple[Image.Image, float]: (縮小画像, 元画像に対する縮小率)
+        """
+        if not self._pyramid:
+            return self._source_image, 1.0
+
+        level = 0
+        if 0 < scale < 1:
+            level = int(math.floor(math.log2(1.0 / scale)))
+
+        # 必要な段まで1/2ずつ縮小してキャッシュ
+        while len(self._pyramid) <= level:
+            previous = self._pyramid[-1]
+            if min(previous.size) < 2:
+                break
+            self._pyramid.append(previous.reduce(2))
+
+        level = min(level, len(self._pyramid) - 1)
+        pyramid_image = self._pyramid[level]
+        return pyramid_image, pyramid_image.width / self._original_size[0]
+
+    def create_thumbnail(self, max_size: Tuple[int, int]) -> Optional[Image.Image]:
+        """現在の画像をアスペクト比を保って指定サイズ以内に縮小した画像を生成"""
+        if self._source_image is None:
+            return None
+        width, height = self._original_size
+        scale = min(max_size[0] / width, max_size[1] / height)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        source_image, _ = self._get_pyramid_level(scale)
+        return source_image.resize(size, Image.Resampling.LANCZOS).convert("RGB")
+
+    def get_viewport_layout(self, canvas_width: int, canvas_height: int) -> Optional[Dict[str, Any]]:
+        """キャンバス内に見えている元画像の範囲と表示位置を計算
+
+        Returns:
+            Optional[Dict[str, Any]]: {"region": 元画像上の範囲 (左, 上, 右, 下),
+            "position": 表示位置 (x, y), "size": 表示サイズ (幅, 高さ)}
+        """
+        if self._source_image is None:
+            return None
+
+        width, height = self._original_size
+        left, top = self._transform.to_original_exact(0, 0)
+        right, bottom = self._transform.to_original_exact(canvas_width, canvas_height)
+        left, top = max(0.0, left), max(0.0, top)
+        right, bottom = min(float(width), right), min(float(height), bottom)
+        if right <= left or bottom <= top:
+            return None
+
+        display_left, display_top = self._transform.to_display(left, top)
+        display_right, display_bottom = self._transform.to_display(right, bottom)
+        position = (round(display_left), round(display_top))
+        size = (
+            max(1, round(display_right) - position[0]),
+            max(1, round(display_bottom) - position[1]),
+        )
+        return {"region": (left, top, right, bottom), "position": position, "size": size}
+
+    def render_viewport(
+        self, canvas_width: int, canvas_height: int
+    ) -> Optional[Tuple[ImageTk.PhotoImage, Dict[str, Any]]]:
+        """見えている範囲だけを縮小ピラミッドから切り出して表示用画像を生成
+
+        Returns:
+            Optional[Tuple[ImageTk.PhotoImage, Dict[str, Any]]]: (表示用画像, get_viewport_layoutの結果)
+        """
+        layout = self.get_viewport_layout(canvas_width, canvas_height)
+        if layout is None:
+            return None
+
+        pyramid_image, level_scale = self._get_pyramid_level(self._transform.scale)
+        left, top, right, bottom = layout["region"]
+        box = (left * level_scale, top * level_scale, right * level_scale, bottom * level_scale)
+        viewport_image = pyramid_image.resize(layout["size"], Image.Resampling.BILINEAR, box=box)
+
+        # 画像参照を保持（ガベージコレクション防止）
+        self._viewport_pil_image = viewport_image
+        self._viewport_tk_image = ImageTk.PhotoImage(viewport_image)
+        return self._viewport_tk_image, layout
+
+    # endregion
+
+    @property
+    def catalog(self) -> ModelCatalogModel:
+        """画像ディレクトリのモデル画像索引"""
+        return self._catalog
+
     def load_image_files_from_directory(self, directory: str) -> List[Dict[str, str]]:
-        """ディレクトリから画像ファイル一覧を読み込み"""
-        self._image_files = []
-        
+        """ディレクトリから画像ファイル一覧を読み込み（名前順）"""
         try:
-            if not os.path.exists(directory):
-                return self._image_files
-            
-            for filename in os.listdir(directory):
-                if self._is_image_file(filename):
-                    full_path = os.path.join(directory, filename)
-                    name_without_ext = os.path.splitext(filename)[0]
-                    self._image_files.append({name_without_ext: full_path})
-            
-            # ファイル名でソート
-            self._image_files.sort(key=lambda x: list(x.keys())[0])
-            
+            self._catalog.load(directory)
         except Exception as e:
             print(f"画像ファイル読み込みエラー: {e}")
-        
-        return self._image_files
-    
-    def _is_image_file(self, filename: str) -> bool:
-        """ファイルが画像ファイルかどうかを判定"""
-        _, ext = os.path.splitext(filename.lower())
-        return ext in self._supported_extensions
+        return self._catalog.to_model_list()
     
     def get_image_path_by_name(self, name: str) -> Optional[str]:
         """画像名からフルパスを取得"""
-        for image_dict in self._image_files:
-            if name in image_dict:
-                return image_dict[name]
-        return None
+        return self._catalog.get_path(name)
     
     def get_image_names(self) -> List[str]:
         """画像名一覧を取得"""
-        names = []
-        for image_dict in self._image_files:
-            names.extend(image_dict.keys())
-        return names
+        return self._catalog.get_names()
     
     @property
     def current_image_path(self) -> str:
@@ -149,6 +308,33 @@ class ImageModel:
         """スケールファクター"""
         return self._scale_factor
     
+    @property
+    def display_pil_image(self) -> Optional[Image.Image]:
+        """表示中の画像（画面に合わせた画像、またはズーム中の表示範囲）"""
+        if self.is_zoomed():
+            return self._viewport_pil_image
+        return self._fit_pil_image
+
+    @property
+    def transform(self) -> ViewportTransform:
+        """元画像座標⇔表示座標の変換"""
+        return self._transform
+
+    @property
+    def display_offset(self) -> Tuple[float, float]:
+        """キャンバス上の画像左上位置"""
+        return self._transform.offset
+
+    @property
+    def zoom(self) -> float:
+        """ズーム倍率"""
+        return self._transform.zoom
+
+    @property
+    def pan(self) -> Tuple[float, float]:
+        """パン量"""
+        return self._transform.pan
+
     @property
     def tk_image(self) -> Optional[ImageTk.PhotoImage]:
         """Tkinter画像オブジェクト"""
@@ -161,6 +347,9 @@ class ImageModel:
             'original_size': self._original_size,
             'display_size': self._display_size,
             'scale_factor': self._scale_factor,
+            'display_offset': self._transform.offset,
+            'zoom': self._transform.zoom,
+            'pan': self._transform.pan,
             'tk_image': self._tk_image
         }
     
@@ -170,4 +359,10 @@ class ImageModel:
         self._original_size = (0, 0)
         self._display_size = (0, 0)
         self._scale_factor = 1.0
+        self._transform.reset()
+        self._source_image = None
+        self._pyramid = []
+        self._viewport_tk_image = None
+        self._fit_pil_image = None
+        self._viewport_pil_image = None
         self._tk_image = None
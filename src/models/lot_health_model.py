@@ -0,0 +1,300 @@
+"""
+ロット整合性チェックモデル
+データディレクトリ内の全ロットのdata・lotInfo.txt・workerInfo.txt・ロックファイルを
+プロセスプールで並列に検査
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from src.db.schema import Detail, Lot, Worker
+from src.models.lot_lock_model import LotLockModel
+from src.utils.json_stream import iter_json_array
+
+# 検出する問題の種類
+ISSUE_MISSING = "missing"
+ISSUE_EMPTY = "empty"
+ISSUE_TRUNCATED = "truncated"
+ISSUE_SCHEMA = "schema"
+ISSUE_DUPLICATE_COUNT = "duplicate_count_number"
+ISSUE_ORPHANED_LOCK = "orphaned_lock"
+ISSUE_MANIFEST_MISMATCH = "manifest_mismatch"
+ISSUE_NOT_IN_MANIFEST = "not_in_manifest"
+
+ISSUE_LABELS = {
+    ISSUE_MISSING: "ファイルなし",
+    ISSUE_EMPTY: "空ファイル",
+    ISSUE_TRUNCATED: "途中で切れている・破損",
+    ISSUE_SCHEMA: "項目の形式が不正",
+    ISSUE_DUPLICATE_COUNT: "アイテム番号の重複",
+    ISSUE_ORPHANED_LOCK: "残ったロックファイル",
+    ISSUE_MANIFEST_MISMATCH: "マニフェストと不一致",
+    ISSUE_NOT_IN_MANIFEST: "マニフェスト未登録",
+}
+
+
+def _issue(lot_number: str, file_name: str, kind: str, message: str = "") -> Dict[str, str]:
+    """検出した問題を作成"""
+    return {"lot_number": lot_number, "file": file_name, "kind": kind, "message": message}
+
+
+def _check_info_file(lot_number: str, path: Path, model_class) -> List[Dict[str, str]]:
+    """lotInfo.txt / workerInfo.txt を検査"""
+    if not path.exists():
+        return [_issue(lot_number, path.name, ISSUE_MISSING)]
+    if path.stat().st_size == 0:
+        return [_issue(lot_number, path.name, ISSUE_EMPTY)]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (ValueError, OSError) as e:
+        return [_issue(lot_number, path.name, ISSUE_TRUNCATED, str(e))]
+    try:
+        if not isinstance(data, dict):
+            raise TypeError("オブジェクトではありません")
+        model_class(**data)
+    except (ValidationError, TypeError) as e:
+        return [_issue(lot_number, path.name, ISSUE_SCHEMA, str(e).splitlines()[0])]
+    return []
+
+
+def _check_data_file(lot_number: str, path: Path) -> List[Dict[str, str]]:
+    """dataファイルを逐次デコードして検査（形式・項目・アイテム番号の重複）"""
+    issues = []
+    count_numbers = set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for position, item in enumerate(iter_json_array(f)):
+                try:
+                    if not isinstance(item, dict):
+                        raise TypeError("オブジェクトではありません")
+                    detail = Detail(**item)
+                    # 不正な座標はスキーマ側でNoneに変換されるため座標の有無で判定
+                    if detail.x is None or detail.y is None:
+                        raise TypeError("座標が不正です")
+                except (ValidationError, TypeError) as e:
+                    issues.append(
+                        _issue(lot_number, path.name, ISSUE_SCHEMA, f"{position + 1}件目: {str(e).splitlines()[0]}")
+                    )
+                    continue
+                if detail.count_number is None:
+                    continue
+                if detail.count_number in count_numbers:
+                    issues.append(
+                        _issue(lot_number, path.name, ISSUE_DUPLICATE_COUNT, f"アイテム番号 {detail.count_number}")
+                    )
+                count_numbers.add(detail.count_number)
+    except (ValueError, OSError) as e:
+        issues.append(_issue(lot_number, path.name, ISSUE_TRUNCATED, str(e)))
+    return issues
+
+
+def _check_against_manifest(
+    lot_number: str, path: Path, stat: os.stat_result, entry: Optional[Dict[str, Any]]
+) -> List[Dict[str, str]]:
+    """マニフェストのサイズ・チェックサムと照合（簡易モード、内容は解析しない）"""
+    if entry is None:
+        return [_issue(lot_number, path.name, ISSUE_NOT_IN_MANIFEST)]
+    if entry.get("size") != stat.st_size:
+        return [
+            _issue(
+                lot_number,
+                path.name,
+                ISSUE_MANIFEST_MISMATCH,
+                f"サイズ {stat.st_size} (マニフェスト: {entry.get('size')})",
+            )
+        ]
+    if entry.get("mtime_ns") == stat.st_mtime_ns:
+        return []
+
+    # 更新時刻のみ異なる場合はチェックサムで判定
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    if digest.hexdigest() != entry.get("sha1"):
+        return [_issue(lot_number, path.name, ISSUE_MANIFEST_MISMATCH, "チェックサム不一致")]
+    return []
+
+
+def scan_lot_directory(lot_directory: str, quick: bool = False, lock_stale_seconds: float = 0) -> Dict[str, Any]:
+    """ロットディレクトリ1件を検査（プロセスプールのワーカーから呼び出し）
+
+    Args:
+        lot_directory: ロットディレクトリのパス
+        quick: マニフェストとの照合のみで内容を解析しない
+        lock_stale_seconds: この秒数以上更新されていないロックファイルを残存とみなす
+
+    Returns:
+        Dict[str, Any]: {"lot_number", "files", "bytes", "issues"}
+    """
+    directory = Path(lot_directory)
+    lot_number = directory.name
+    result = {"lot_number": lot_number, "files": 0, "bytes": 0, "issues": []}
+    issues = result["issues"]
+
+    for file_name, model_class in (("lotInfo.txt", Lot), ("workerInfo.txt", Worker)):
+        issues.extend(_check_info_file(lot_number, directory / file_name, model_class))
+        result["files"] += 1
+
+    manifest_files = {}
+    if quick:
+        try:
+            with open(directory / "manifest.json", "r", encoding="utf-8") as f:
+                manifest_files = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            manifest_files = {}
+
+    data_names = set()
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if not entry.is_file() or not entry.name.endswith(".data"):
+                continue
+            data_names.add(entry.name)
+            path = Path(entry.path)
+            stat = entry.stat()
+            result["files"] += 1
+            result["bytes"] += stat.st_size
+
+            if quick:
+                issues.extend(_check_against_manifest(lot_number, path, stat, manifest_files.get(entry.name)))
+            elif stat.st_size == 0:
+                # 作成直後の基板・不良なしで保存した基板は空ファイル（座標未登録）のため問題としない
+                continue
+            else:
+                issues.extend(_check_data_file(lot_number, path))
+
+    for missing_name in sorted(set(manifest_files) - data_names):
+        issues.append(_issue(lot_number, missing_name, ISSUE_MISSING, "マニフェストに登録済み"))
+
+    lock_path = directory / "lock"
+    if lock_path.exists():
+        age = time.time() - lock_path.stat().st_mtime
+        if age >= lock_stale_seconds:
+            issues.append(_issue(lot_number, "lock", ISSUE_ORPHANED_LOCK, f"{int(age // 60)}分間更新なし"))
+
+    return result
+
+
+class LotHealthModel:
+    """データディレクトリ内の全ロットの整合性を並列に検査するモデル"""
+
+    # この時間以上ハートビートが途絶えたロックファイルを残存とみなす（秒）
+    LOCK_STALE_SECONDS = LotLockModel.STALE_SECONDS
+
+    def __init__(self, data_directory: str, max_workers: Optional[int] = None):
+        """
+        Args:
+            data_directory: データディレクトリ
+            max_workers: プロセス数（省略時はCPU数）
+        """
+        self._data_directory = Path(data_directory)
+        self._max_workers = max_workers
+
+    def _collect_lot_directories(self) -> List[str]:
+        """ロットディレクトリを列挙（キャッシュ等の隠しディレクトリは除外）"""
+        if not self._data_directory.is_dir():
+            return []
+        with os.scandir(self._data_directory) as entries:
+            return sorted(
+                entry.path for entry in entries if entry.is_dir() and not entry.name.startswith(".")
+            )
+
+    def scan(
+        self,
+        quick: bool = False,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """全ロットを検査
+
+        Args:
+            quick: マニフェストとの照合のみで内容を解析しない
+            progress_callback: (検査済みロット数, 総ロット数) を受け取るコールバック
+
+        Returns:
+            Dict[str, Any]: {"lots", "files", "bytes", "elapsed", "files_per_second",
+            "megabytes_per_second", "issues"}
+        """
+        start = time.perf_counter()
+        lot_directories = self._collect_lot_directories()
+        total = len(lot_directories)
+        results = []
+
+        try:
+            # GUIのスレッドから呼ばれるためforkではなくspawnでワーカーを起動
+            with ProcessPoolExecutor(
+                max_workers=self._max_workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                futures = [
+                    executor.submit(scan_lot_directory, directory, quick, self.LOCK_STALE_SECONDS)
+                    for directory in lot_directories
+                ]
+                for processed, future in enumerate(as_completed(futures), 1):
+                    results.append(future.result())
+                    if progress_callback:
+                        progress_callback(processed, total)
+        except (OSError, NotImplementedError) as e:
+            # プロセスを起動できない環境では逐次検査
+            print(f"[整合性チェック] 並列実行できないため逐次検査します: {e}")
+            results = []
+            for processed, directory in enumerate(lot_directories, 1):
+                results.append(scan_lot_directory(directory, quick, self.LOCK_STALE_SECONDS))
+                if progress_callback:
+                    progress_callback(processed, total)
+
+        elapsed = time.perf_counter() - start
+        files = sum(result["files"] for result in results)
+        total_bytes = sum(result["bytes"] for result in results)
+        issues = [issue for result in sorted(results, key=lambda r: r["lot_number"]) for issue in result["issues"]]
+
+        report = {
+            "lots": total,
+            "files": files,
+            "bytes": total_bytes,
+            "elapsed": elapsed,
+            "files_per_second": files / elapsed if elapsed > 0 else 0.0,
+            "megabytes_per_second": total_bytes / 1024 / 1024 / elapsed if elapsed > 0 else 0.0,
+            "issues": issues,
+        }
+        print(
+            f"[整合性チェック] {total}ロット / {files}ファイル / {elapsed:.2f}秒 "
+            f"({report['files_per_second']:.0f}ファイル/秒), 問題: {len(issues)}件"
+        )
+        return report
+
+    @staticmethod
+    def format_report(report: Dict[str, Any], max_issues: int = 20) -> str:
+        """検査結果を表示用の文字列に整形"""
+        lines = [
+            f"ロット数: {report['lots']}  ファイル数: {report['files']}",
+            f"処理時間: {report['elapsed']:.2f}秒 "
+            f"({report['files_per_second']:.0f}ファイル/秒, {report['megabytes_per_second']:.1f}MB/秒)",
+        ]
+        issues = report["issues"]
+        if not issues:
+            lines.append("問題は見つかりませんでした。")
+            return "\n".join(lines)
+
+        counts: Dict[str, int] = {}
+        for issue in issues:
+            counts[issue["kind"]] = counts.get(issue["kind"], 0) + 1
+        lines.append(f"問題: {len(issues)}件")
+        for kind, count in counts.items():
+            lines.append(f"  {ISSUE_LABELS.get(kind, kind)}: {count}件")
+        lines.append("")
+        for issue in issues[:max_issues]:
+            message = f" {issue['message']}" if issue["message"] else ""
+            lines.append(
+                f"{issue['lot_number']}/{issue['file']}: {ISSUE_LABELS.get(issue['kind'], issue['kind'])}{message}"
+            )
+        if len(issues) > max_issues:
+            lines.append(f"... 他 {len(issues) - max_issues}件")
+        return "\n".join(lines)
@@ -0,0 +1,303 @@
+"""
+ロットロックモデル
+ロットディレクトリの排他ロックを所有者情報付きで作成し、ハートビートで更新
+異常終了で残ったロックは一定時間で自動的に引き継ぐ
+"""
+
+import getpass
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class LotLockModel:
+    """ロットディレクトリのロックファイルを管理するモデル"""
+
+    LOCK_FILE_NAME = "lock"
+
+    # ハートビートの間隔と、更新が途絶えたロックを残存とみなすまでの時間（秒）
+    HEARTBEAT_SECONDS = 30
+    STALE_SECONDS = 120
+
+    def __init__(self, heartbeat_seconds: float = HEARTBEAT_SECONDS, stale_seconds: float = STALE_SECONDS):
+        self._heartbeat_seconds = heartbeat_seconds
+        self._stale_seconds = stale_seconds
+        self._token = uuid.uuid4().hex
+        # 保持中のロック（ロックファイルのパス: ファイル記述子）
+        self._held: Dict[Path, int] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    # region 取得・解放
+
+    def acquire(self, lot_directory: Path, owner: str = "") -> bool:
+        """ロックを取得（残存ロックは引き継ぐ）
+
+        Args:
+            lot_directory: ロットディレクトリ
+            owner: 所有者名（作業者番号など）
+
+        Returns:
+            bool: 取得できたかどうか（他のプロセスが使用中の場合はFalse）
+        """
+        lock_path = Path(lot_directory) / self.LOCK_FILE_NAME
+        with self._lock:
+            if lock_path in self._held:
+                return True
+
+            # 残存ロックの引き継ぎで競合した場合に備えて1回だけ再試行
+            for _ in range(2):
+                try:
+                    fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_RDWR, 0o644)
+                except FileExistsError:
+                    if not self._take_over_stale_lock(lock_path):
+                        return False
+                    continue
+
+                self._write_metadata(fd, owner)
+                self._try_advisory_lock(fd)
+                self._held[lock_path] = fd
+                self._start_heartbeat()
+                print(f"[ロック] 取得しました: {lock_path}")
+                return True
+            return False
+
+    def release(self, lot_directory: Path):
+        """ロックを解放（自分が保持しているロックのみ削除）
+
+        Windowsでは開いているファイルを削除できないため、ファイル記述子を閉じてから削除する。
+        削除に失敗してもロックの保持は必ず解除する（残ったロックファイルは残存ロックとして引き継がれる）。
+        """
+        lock_path = Path(lot_directory) / self.LOCK_FILE_NAME
+        with self._lock:
+            fd = self._held.pop(lock_path, None)
+            if fd is None:
+                return
+            try:
+                is_own = self._is_own_lock(lock_path)
+            finally:
+                self._close_lock_fd(fd)
+            if is_own:
+                try:
+                    lock_path.unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"[ロック] ロックファイル削除エラー: {lock_path} ({e})")
+            print(f"[ロック] 解放しました: {lock_path}")
+
+    def release_all(self):
+        """保持中の全ロックを解放してハートビートを停止"""
+        for lock_path in list(self._held):
+            self.release(lock_path.parent)
+        self._stop_event.set()
+
+    def is_held(self, lot_directory: Path) -> bool:
+        """このプロセスがロックを保持しているかどうか"""
+        return Path(lot_directory) / self.LOCK_FILE_NAME in self._held
+
+    def is_locked_by_other(self, lot_directory: Path) -> bool:
+        """他のプロセスが有効なロックを保持しているかどうか"""
+        info = self.get_lock_info(lot_directory)
+        return info is not None and not info["stale"] and info.get("token") != self._token
+
+    # endregion
+
+    # region ロック情報
+
+    def get_lock_info(self, lot_directory: Path) -> Optional[Dict[str, Any]]:
+        """ロックファイルの所有者情報を取得（ロックがない場合はNone）
+
+        Returns:
+            Optional[Dict[str, Any]]: 所有者情報（owner, pid, host, user, acquired_at, token）に
+            最終更新からの経過秒数 "age" と残存判定 "stale" を加えたもの
+        """
+        lock_path = Path(lot_directory) / self.LOCK_FILE_NAME
+        try:
+            stat = lock_path.stat()
+        except FileNotFoundError:
+            return None
+
+        info = self._read_metadata(lock_path)
+        # ハートビートはロックファイルの更新時刻で表す
+        info["age"] = max(0.0, time.time() - stat.st_mtime)
+        info["stale"] = self._is_stale(lock_path, info)
+        return info
+
+    def _is_stale(self, lock_path: Path, info: Dict[str, Any]) -> bool:
+        """残存ロックかどうかを判定"""
+        if info.get("token") == self._token:
+            # 解放時に削除できずに残った自分のロックファイル
+            return lock_path not in self._held
+        if info["age"] > self._stale_seconds:
+            return True
+        # 同じホストで所有プロセスが存在しない場合は即座に残存とみなす
+        if info.get("host") == socket.gethostname() and info.get("pid") and not self._is_process_alive(info["pid"]):
+            return True
+        # アドバイザリロックが取れる場合は所有プロセスが終了している
+        return self._is_advisory_lock_free(lock_path)
+
+    def _take_over_stale_lock(self, lock_path: Path) -> bool:
+        """残存ロックを退避して引き継げる状態にする
+
+        Returns:
+            bool: 引き継げる場合はTrue
+        """
+        info = self.get_lock_info(lock_path.parent)
+        if info is None:
+            # 確認中に削除された
+            return True
+        if not info["stale"]:
+            return False
+
+        # リネームは1プロセスだけが成功するため、引き継ぎの競合を防げる
+        stale_path = lock_path.with_name(f"{self.LOCK_FILE_NAME}.stale-{self._token}")
+        try:
+            os.replace(lock_path, stale_path)
+        except FileNotFoundError:
+            return True
+        stale_path.unlink(missing_ok=True)
+        print(
+            f"[ロック] 残存ロックを引き継ぎます: {lock_path} "
+            f"(所有者: {info.get('owner') or '不明'}@{info.get('host') or '不明'}, {int(info['age'])}秒間更新なし)"
+        )
+        return True
+
+    def _write_metadata(self, fd: int, owner: str):
+        """ロックファイルに所有者情報を書き込み"""
+        metadata = {
+            "owner": owner,
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "user": getpass.getuser(),
+            "acquired_at": datetime.now().isoformat(),
+            "token": self._token,
+        }
+        os.write(fd, json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+        os.fsync(fd)
+
+    def _read_metadata(self, lock_path: Path) -> Dict[str, Any]:
+        """ロックファイルの所有者情報を読み込み（旧形式の空ファイルは空の情報）"""
+        try:
+            with open(lock_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _is_own_lock(self, lock_path: Path) -> bool:
+        """ロックファイルが自分のものかどうか（引き継がれていないか）"""
+        return self._read_metadata(lock_path).get("token") == self._token
+
+    @staticmethod
+    def _is_process_alive(pid: int) -> bool:
+        """プロセスが存在するかどうか"""
+        if os.name == "nt":
+            # Windowsの os.kill はシグナル0でもプロセスに割り込むため判定しない
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except (PermissionError, OSError):
+            # 権限がない・判定できない場合は存在するとみなす
+            return True
+        return True
+
+    # endregion
+
+    # region アドバイザリロック
+
+    @staticmethod
+    def _try_advisory_lock(fd: int) -> bool:
+        """fcntlのアドバイザリロックを取得（非対応のファイルシステムでは何もしない）"""
+        if fcntl is None:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _close_lock_fd(fd: int):
+        """アドバイザリロックを解除してファイル記述子を閉じる"""
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            except OSError:
+                pass
+        try:
+            os.close(fd)
+        except OSError as e:
+            print(f"[ロック] ファイル記述子のクローズエラー: {e}")
+
+    @staticmethod
+    def _is_advisory_lock_free(lock_path: Path) -> bool:
+        """ロックファイルのアドバイザリロックが誰にも保持されていないかどうか
+
+        所有者がアドバイザリロックを取得できなかった環境（ネットワークドライブ等）でも
+        誤判定しないよう、所有者情報にpidがあり同じホストの場合のみ判定に使う
+        """
+        if fcntl is None:
+            return False
+        try:
+            fd = os.open(lock_path, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            info = json.loads(os.read(fd, 65536).decode("utf-8") or "{}")
+            if not isinstance(info, dict) or info.get("host") != socket.gethostname() or not info.get("pid"):
+                return False
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return True
+        except (OSError, ValueError):
+            return False
+        finally:
+            os.close(fd)
+
+    # endregion
+
+    # region ハートビート
+
+    def _start_heartbeat(self):
+        """ハートビートのスレッドを起動（起動済みの場合は何もしない）"""
+        if self._heartbeat_thread and self._heartbeat_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self):
+        """一定間隔で保持中のロックファイルの更新時刻を更新"""
+        while not self._stop_event.wait(self._heartbeat_seconds):
+            self.heartbeat()
+
+    def heartbeat(self):
+        """保持中のロックファイルの更新時刻を更新（引き継がれたロックは手放す）"""
+        with self._lock:
+            for lock_path, fd in list(self._held.items()):
+                if not self._is_own_lock(lock_path):
+                    print(f"[ロック] ロックが他のプロセスに引き継がれました: {lock_path}")
+                    del self._held[lock_path]
+                    self._close_lock_fd(fd)
+                    continue
+                try:
+                    os.utime(lock_path)
+                except OSError as e:
+                    print(f"[ロック] ハートビート更新エラー: {e}")
+
+    # endregion
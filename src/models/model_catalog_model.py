@@ -0,0 +1,261 @@
+"""
+モデルカタログモデル
+画像ディレクトリ内のモデル画像を名前で索引し、ディレクトリの更新時刻をキーにキャッシュ
+"""
+
+import bisect
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+
+class ModelCatalogModel:
+    """モデル名（拡張子なしのファイル名）→画像情報の索引を管理するモデル"""
+
+    # サポートする画像拡張子
+    SUPPORTED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff"}
+
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_file: Optional[str] = None):
+        """
+        Args:
+            cache_file: キャッシュファイルのパス（省略時は settings/model_catalog.json）
+        """
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self._cache_file = Path(cache_file or os.path.join(project_root, "settings/model_catalog.json"))
+        self._directory: str = ""
+        self._directory_mtime_ns: Optional[int] = None
+        # モデル名: {"path", "size", "mtime_ns", "width", "height"}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # 製番の前方一致検索用のソート済みモデル名
+        self._sorted_names: List[str] = []
+        self._lock = threading.RLock()
+
+    # region 読み込み
+
+    def load(self, directory: str) -> bool:
+        """画像ディレクトリを読み込み（更新がなければキャッシュを使用）
+
+        Args:
+            directory: 画像ディレクトリ
+
+        Returns:
+            bool: ディレクトリを走査したかどうか（キャッシュを使用した場合はFalse）
+        """
+        with self._lock:
+            try:
+                directory_mtime_ns = os.stat(directory).st_mtime_ns
+            except (OSError, TypeError, ValueError):
+                self._set_entries("", None, {})
+                return False
+
+            # 同じディレクトリを読み込み済みで更新がない場合は何もしない
+            if directory == self._directory and directory_mtime_ns == self._directory_mtime_ns:
+                return False
+
+            cache = self._read_cache()
+            if cache.get("directory") == directory and cache.get("mtime_ns") == directory_mtime_ns:
+                self._set_entries(directory, directory_mtime_ns, cache.get("entries", {}))
+                print(f"[モデルカタログ] キャッシュを使用しました: {len(self._entries)}件")
+                return False
+
+            previous = cache.get("entries", {}) if cache.get("directory") == directory else {}
+            entries = self._scan(directory, previous)
+            self._set_entries(directory, directory_mtime_ns, entries)
+            self._write_cache()
+            print(f"[モデルカタログ] 画像ディレクトリを走査しました: {len(entries)}件")
+            return True
+
+    def _scan(self, directory: str, previous: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """ディレクトリを走査（サイズ・更新時刻が変わっていない画像は前回の情報を再利用）"""
+        entries = {}
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    name, ext = os.path.splitext(entry.name)
+                    if ext.lower() not in self.SUPPORTED_EXTENSIONS:
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+
+                    cached = previous.get(name)
+                    if (
+                        cached
+                        and cached.get("path") == entry.path
+                        and cached.get("size") == stat.st_size
+                        and cached.get("mtime_ns") == stat.st_mtime_ns
+                    ):
+                        entries[name] = cached
+                    else:
+                        entries[name] = self._make_entry(entry.path, stat)
+        except OSError as e:
+            print(f"画像ファイル取得エラー: {e}")
+        return entries
+
+    def _make_entry(self, path: str, stat: os.stat_result) -> Dict[str, Any]:
+        """画像1件の情報を作成（画像サイズはヘッダーのみ読み込み）"""
+        width, height = self.read_image_size(path)
+        return {
+            "path": path,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "width": width,
+            "height": height,
+        }
+
+    @staticmethod
+    def read_image_size(path: str) -> Tuple[Optional[int], Optional[int]]:
+        """画像のサイズをヘッダーから取得（画素データは読み込まない）"""
+        try:
+            with Image.open(path) as image:
+                return image.size
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return None, None
+
+    def apply_changes(self, changes: Iterable[Tuple[str, str]]) -> bool:
+        """ファイル監視で検出した変更を索引に反映（ディレクトリは再走査しない）
+
+        Args:
+            changes: (イベントの種類 "created"/"modified"/"deleted", ファイルパス) のリスト
+
+        Returns:
+            bool: 索引が変更されたかどうか
+        """
+        with self._lock:
+            if not self._directory:
+                return False
+            changed = False
+            for kind, path in changes:
+                if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self._directory):
+                    continue
+                name, ext = os.path.splitext(os.path.basename(path))
+                if ext.lower() not in self.SUPPORTED_EXTENSIONS:
+                    continue
+
+                if kind == "deleted":
+                    # 同名で拡張子の異なる画像が残っている場合は削除しない
+                    entry = self._entries.get(name)
+                    if entry and os.path.normcase(entry["path"]) == os.path.normcase(path):
+                        del self._entries[name]
+                        changed = True
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                self._entries[name] = self._make_entry(path, stat)
+                changed = True
+
+            if not changed:
+                return False
+            self._sorted_names = sorted(self._entries)
+            # 反映後のディレクトリ更新時刻を記録し、次回起動時もキャッシュを使えるようにする
+            try:
+                self._directory_mtime_ns = os.stat(self._directory).st_mtime_ns
+            except OSError:
+                self._directory_mtime_ns = None
+            self._write_cache()
+            print(f"[モデルカタログ] 変更を反映しました: {len(self._entries)}件")
+            return True
+
+    def _set_entries(self, directory: str, mtime_ns: Optional[int], entries: Dict[str, Dict[str, Any]]):
+        """索引を置き換え"""
+        self._directory = directory
+        self._directory_mtime_ns = mtime_ns
+        self._entries = dict(entries)
+        self._sorted_names = sorted(self._entries)
+
+    # endregion
+
+    # region キャッシュ
+
+    def _read_cache(self) -> Dict[str, Any]:
+        """キャッシュファイルを読み込み（存在しない・破損している場合は空）"""
+        try:
+            with open(self._cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or cache.get("version") != self.CACHE_VERSION:
+            return {}
+        return cache
+
+    def _write_cache(self):
+        """キャッシュファイルを書き込み（一時ファイルを経由して置き換え）"""
+        cache = {
+            "version": self.CACHE_VERSION,
+            "directory": self._directory,
+            "mtime_ns": self._directory_mtime_ns,
+            "entries": self._entries,
+        }
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self._cache_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(temp_path, self._cache_file)
+        except OSError as e:
+            print(f"[モデルカタログ] キャッシュ保存エラー: {e}")
+
+    # endregion
+
+    # region 検索
+
+    @property
+    def directory(self) -> str:
+        """読み込み済みの画像ディレクトリ"""
+        return self._directory
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def get_names(self) -> List[str]:
+        """モデル名一覧（名前順）"""
+        return list(self._sorted_names)
+
+    def get_path(self, name: str) -> Optional[str]:
+        """モデル名から画像のフルパスを取得"""
+        entry = self._entries.get(name)
+        return entry["path"] if entry else None
+
+    def get_image_size(self, name: str) -> Optional[Tuple[int, int]]:
+        """モデル名から画像サイズ（幅, 高さ）を取得"""
+        entry = self._entries.get(name)
+        if not entry or entry.get("width") is None:
+            return None
+        return entry["width"], entry["height"]
+
+    def find_by_prefix(self, prefix: str) -> List[str]:
+        """指定した文字列で始まるモデル名を名前順で取得"""
+        names = self._sorted_names
+        start = bisect.bisect_left(names, prefix)
+        # 前方一致する名前はソート済みリスト上で連続する
+        end = bisect.bisect_left(names, prefix + "\U0010ffff", lo=start)
+        return names[start:end]
+
+    def find_first_by_prefix(self, prefix: str) -> Optional[str]:
+        """指定した文字列で始まる最初のモデル名を取得"""
+        names = self._sorted_names
+        index = bisect.bisect_left(names, prefix)
+        if index < len(names) and names[index].startswith(prefix):
+            return names[index]
+        return None
+
+    def to_model_list(self) -> List[Dict[str, str]]:
+        """[{"モデル名": "フルパス"}, ...] 形式のリストに変換（名前順）"""
+        return [{name: self._entries[name]["path"]} for name in self._sorted_names]
+
+    # endregion
@@ -0,0 +1,153 @@
+"""
+ビューポート変換
+元画像座標とキャンバス上の表示座標を相互変換するアフィン変換を管理
+"""
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+
+class ViewportTransform:
+    """元画像座標⇔表示座標のアフィン変換（倍率・オフセット・ズーム・パン）
+
+    display = original * (base_scale * zoom) + (offset + pan)
+
+    変換パラメータはキャッシュし、リサイズ・ズーム・パンで値が変わった時だけ再計算する。
+    """
+
+    def __init__(self):
+        # 画像をキャンバスに収めるための倍率
+        self._base_scale: float = 1.0
+        # キャンバス上の画像左上位置
+        self._offset: Tuple[float, float] = (0.0, 0.0)
+        # ズーム倍率とパン量（表示座標）
+        self._zoom: float = 1.0
+        self._pan: Tuple[float, float] = (0.0, 0.0)
+
+        # キャッシュ済み変換パラメータ (倍率, x方向移動量, y方向移動量)
+        self._cached: Tuple[float, float, float] = (1.0, 0.0, 0.0)
+        self._dirty = True
+        # 変換が変わるたびに加算される番号
+        self._revision = 0
+
+    # region パラメータ設定
+
+    def update(
+        self,
+        base_scale: float = None,
+        offset: Tuple[float, float] = None,
+        zoom: float = None,
+        pan: Tuple[float, float] = None,
+    ) -> bool:
+        """変換パラメータを更新（値が変わった場合のみキャッシュを無効化）
+
+        Returns:
+            bool: 変換が変わった場合True
+        """
+        new_base_scale = self._base_scale if base_scale is None else float(base_scale)
+        new_offset = self._offset if offset is None else (float(offset[0]), float(offset[1]))
+        new_zoom = self._zoom if zoom is None or zoom <= 0 else float(zoom)
+        new_pan = self._pan if pan is None else (float(pan[0]), float(pan[1]))
+
+        if (new_base_scale, new_offset, new_zoom, new_pan) == (
+            self._base_scale,
+            self._offset,
+            self._zoom,
+            self._pan,
+        ):
+            return False
+
+        self._base_scale = new_base_scale
+        self._offset = new_offset
+        self._zoom = new_zoom
+        self._pan = new_pan
+        self._dirty = True
+        self._revision += 1
+        return True
+
+    def reset(self):
+        """初期状態に戻す"""
+        self.update(base_scale=1.0, offset=(0.0, 0.0), zoom=1.0, pan=(0.0, 0.0))
+
+    def _get_parameters(self) -> Tuple[float, float, float]:
+        """キャッシュ済みの変換パラメータを取得"""
+        if self._dirty:
+            self._cached = (
+                self._base_scale * self._zoom,
+                self._offset[0] + self._pan[0],
+                self._offset[1] + self._pan[1],
+            )
+            self._dirty = False
+        return self._cached
+
+    # endregion
+
+    # region 座標変換
+
+    def to_display(self, orig_x: float, orig_y: float) -> Tuple[float, float]:
+        """元画像座標を表示座標に変換（サブピクセル精度）"""
+        scale, translate_x, translate_y = self._get_parameters()
+        return orig_x * scale + translate_x, orig_y * scale + translate_y
+
+    def to_original(self, display_x: float, display_y: float) -> Tuple[int, int]:
+        """表示座標を元画像座標（最も近いピクセル）に変換"""
+        scale, translate_x, translate_y = self._get_parameters()
+        if scale <= 0:
+            return round(display_x), round(display_y)
+        return (
+            round((display_x - translate_x) / scale),
+            round((display_y - translate_y) / scale),
+        )
+
+    def to_original_exact(self, display_x: float, display_y: float) -> Tuple[float, float]:
+        """表示座標を元画像座標に変換（丸めなし）"""
+        scale, translate_x, translate_y = self._get_parameters()
+        if scale <= 0:
+            return display_x, display_y
+        return (display_x - translate_x) / scale, (display_y - translate_y) / scale
+
+    def to_display_array(self, points: Union[np.ndarray, Sequence[Tuple[float, float]]]) -> np.ndarray:
+        """元画像座標 (N, 2) を表示座標 (N, 2, float64) に一括変換"""
+        coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        scale, translate_x, translate_y = self._get_parameters()
+        return coords * scale + (translate_x, translate_y)
+
+    def to_original_array(self, points: Union[np.ndarray, Sequence[Tuple[float, float]]]) -> np.ndarray:
+        """表示座標 (N, 2) を元画像座標 (N, 2, int64) に一括変換"""
+        coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        scale, translate_x, translate_y = self._get_parameters()
+        if scale <= 0:
+            return np.rint(coords).astype(np.int64)
+        return np.rint((coords - (translate_x, translate_y)) / scale).astype(np.int64)
+
+    # endregion
+
+    @property
+    def scale(self) -> float:
+        """元画像→表示の実効倍率"""
+        return self._get_parameters()[0]
+
+    @property
+    def base_scale(self) -> float:
+        """キャンバスに収めるための倍率"""
+        return self._base_scale
+
+    @property
+    def offset(self) -> Tuple[float, float]:
+        """キャンバス上の画像左上位置"""
+        return self._offset
+
+    @property
+    def zoom(self) -> float:
+        """ズーム倍率"""
+        return self._zoom
+
+    @property
+    def pan(self) -> Tuple[float, float]:
+        """パン量"""
+        return self._pan
+
+    @property
+    def revision(self) -> int:
+        """変換の更新番号"""
+        return self._revision
@@ -0,0 +1,78 @@
+"""
+アフィン変換
+基準点の対応（部品座標ファイルの座標→元画像のピクセル座標）から変換行列を求める
+"""
+
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+PointArray = Union[np.ndarray, Sequence[Tuple[float, float]]]
+
+
+def fit_affine(source: PointArray, target: PointArray, mirror: bool = False) -> np.ndarray:
+    """対応点から 2x3 の変換行列を求める
+
+    2点の場合は回転・拡大縮小・平行移動（相似変換）、3点以上の場合は最小二乗法で一般のアフィン変換
+    （裏面の部品座標のような左右反転や、X・Yで異なる縮尺を含む）を求める。
+    2点では反転の有無が決まらないため、反転を含めるかどうかを mirror で指定する
+    （CADのY軸上向きの座標を画像のY軸下向きの座標に合わせる場合は True）。
+
+    Args:
+        source: (N, 2) の変換元の点
+        target: (N, 2) の変換先の点
+        mirror: 2点の場合に反転を含む相似変換を求める（3点以上では無視）
+
+    Returns:
+        np.ndarray: target ≈ matrix[:, :2] @ source + matrix[:, 2] となる 2x3 の行列
+
+    Raises:
+        ValueError: 点が2点未満、または同じ位置・一直線上にあり変換が決まらない場合
+    """
+    source = np.asarray(source, dtype=np.float64).reshape(-1, 2)
+    target = np.asarray(target, dtype=np.float64).reshape(-1, 2)
+    if len(source) != len(target) or len(source) < 2:
+        raise ValueError("基準点は2点以上必要です。")
+
+    if len(source) == 2:
+        # 複素数で z' = a * z + b（反転時は z の共役）を解く
+        source_complex = source[:, 0] + 1j * source[:, 1]
+        if mirror:
+            source_complex = source_complex.conj()
+        target_complex = target[:, 0] + 1j * target[:, 1]
+        delta = source_complex[1] - source_complex[0]
+        if abs(delta) < 1e-12:
+            raise ValueError("基準点が同じ位置にあります。")
+        a = (target_complex[1] - target_complex[0]) / delta
+        b = target_complex[0] - a * source_complex[0]
+        if mirror:
+            return np.array([[a.real, a.imag, b.real], [a.imag, -a.real, b.imag]])
+        return np.array([[a.real, -a.imag, b.real], [a.imag, a.real, b.imag]])
+
+    design = np.hstack([source, np.ones((len(source), 1))])
+    if np.linalg.matrix_rank(design) < 3:
+        raise ValueError("基準点が一直線上にあります。")
+    solution, *_ = np.linalg.lstsq(design, target, rcond=None)
+    return solution.T
+
+
+def apply_affine(matrix: np.ndarray, points: PointArray) -> np.ndarray:
+    """点の配列に変換行列を適用
+
+    Args:
+        matrix: 2x3 の変換行列
+        points: (N, 2) の点
+
+    Returns:
+        np.ndarray: (N, 2) の変換後の点
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return points @ matrix[:, :2].T + matrix[:, 2]
+
+
+def residual_error(matrix: np.ndarray, source: PointArray, target: PointArray) -> float:
+    """変換後の点と変換先の点の最大のずれ（基準点の誤差の確認用）"""
+    target = np.asarray(target, dtype=np.float64).reshape(-1, 2)
+    if not len(target):
+        return 0.0
+    return float(np.hypot(*(apply_affine(matrix, source) - target).T).max())
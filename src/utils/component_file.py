@@ -0,0 +1,165 @@
+"""
+部品表（BOM）・部品座標（centroid / XY）ファイルの読み込み
+CADやマウンターが出力するCSV/TSVから部品番号と部品の中心座標を取り出す
+"""
+
+import csv
+import re
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+# 列名の候補（正規化後の列名）
+DESIGNATOR_COLUMNS = (
+    "designator",
+    "refdes",
+    "reference",
+    "ref",
+    "partreference",
+    "designators",
+    "references",
+    "location",
+    "部品番号",
+    "リファレンス",
+    "回路記号",
+)
+X_COLUMNS = ("midx", "centerx", "centrex", "posx", "refx", "locationx", "x", "x座標")
+Y_COLUMNS = ("midy", "centery", "centrey", "posy", "refy", "locationy", "y", "y座標")
+ROTATION_COLUMNS = ("rotation", "rot", "angle", "回転", "角度")
+SIDE_COLUMNS = ("layer", "side", "tb", "面", "実装面")
+
+# 範囲指定（R5-R7）で展開する最大数
+MAX_RANGE_SIZE = 1000
+
+_NUMBER_PATTERN = re.compile(r"[-+]?\d+(?:\.\d+)?")
+_RANGE_PATTERN = re.compile(r"^([A-Z]+)(\d+)-(?:([A-Z]+))?(\d+)$")
+_DESIGNATOR_SEPARATOR = re.compile(r"[,;\s]+")
+
+
+class ComponentPart(NamedTuple):
+    """部品座標ファイルの1部品"""
+
+    reference: str
+    x: float
+    y: float
+    rotation: float = 0.0
+    side: str = ""
+
+
+class ComponentFile(NamedTuple):
+    """読み込んだ部品表・部品座標ファイル"""
+
+    # 部品番号（記載順、重複なし）
+    designators: List[str]
+    # 部品の中心座標（座標列がない部品表では空）
+    parts: List[ComponentPart]
+
+
+def normalize_designator(text: str) -> str:
+    """部品番号を正規化（全角→半角、大文字）"""
+    return unicodedata.normalize("NFKC", text).strip().upper()
+
+
+def normalize_header(text: str) -> str:
+    """列名を比較用に正規化（単位の括弧書き・空白・記号を除く）"""
+    text = unicodedata.normalize("NFKC", text).strip().lower()
+    text = re.sub(r"[(\[].*?[)\]]", "", text)
+    return re.sub(r"[\s\-_.]", "", text)
+
+
+def find_column(headers: Sequence[str], candidates: Iterable[str]) -> Optional[int]:
+    """候補の優先順に列番号を探す"""
+    for candidate in candidates:
+        if candidate in headers:
+            return headers.index(candidate)
+    return None
+
+
+def _parse_number(text: str) -> Optional[float]:
+    """単位付きの数値（12.5mm 等）を読み取る"""
+    match = _NUMBER_PATTERN.search(unicodedata.normalize("NFKC", text))
+    return float(match.group()) if match else None
+
+
+def expand_designators(text: str) -> List[str]:
+    """部品表のセルを部品番号に分解（"R1, R2 R5-R7" → R1, R2, R5, R6, R7）"""
+    designators = []
+    for token in _DESIGNATOR_SEPARATOR.split(normalize_designator(text)):
+        if not token:
+            continue
+        match = _RANGE_PATTERN.match(token)
+        if match:
+            prefix, start, end_prefix, end = match.groups()
+            start_number, end_number = int(start), int(end)
+            if (end_prefix in (None, prefix)) and 0 <= end_number - start_number < MAX_RANGE_SIZE:
+                designators.extend(f"{prefix}{number}" for number in range(start_number, end_number + 1))
+                continue
+        designators.append(token)
+    return designators
+
+
+def read_rows(path: str) -> List[List[str]]:
+    """CSV/TSVを読み込み（UTF-8で読めない場合はCP932）"""
+    for encoding in ("utf-8-sig", "cp932"):
+        try:
+            with open(path, "r", encoding=encoding, newline="") as f:
+                content = f.read()
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        raise ValueError("ファイルの文字コードを判別できません。")
+
+    sample = content[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",\t;")
+    except csv.Error:
+        dialect = csv.excel_tab if "\t" in sample else csv.excel
+    return [row for row in csv.reader(content.splitlines(), dialect) if any(cell.strip() for cell in row)]
+
+
+def read_component_file(path: str) -> ComponentFile:
+    """部品表・部品座標ファイルを読み込み
+
+    先頭付近の行から部品番号の列を含む見出し行を探す（見出しの前のコメント行は読み飛ばす）。
+    X・Y列があれば部品座標ファイル、なければ部品表として扱う。
+
+    Raises:
+        ValueError: 部品番号の列が見つからない場合
+    """
+    rows = read_rows(path)
+    for header_row, row in enumerate(rows[:50]):
+        headers = [normalize_header(cell) for cell in row]
+        designator_column = find_column(headers, DESIGNATOR_COLUMNS)
+        if designator_column is not None:
+            break
+    else:
+        raise ValueError("部品番号の列が見つかりません。")
+
+    x_column = find_column(headers, X_COLUMNS)
+    y_column = find_column(headers, Y_COLUMNS)
+    rotation_column = find_column(headers, ROTATION_COLUMNS)
+    side_column = find_column(headers, SIDE_COLUMNS)
+    has_positions = x_column is not None and y_column is not None
+
+    designators: Dict[str, None] = {}
+    parts = []
+    for row in rows[header_row + 1 :]:
+        if designator_column >= len(row):
+            continue
+        references = expand_designators(row[designator_column])
+        for reference in references:
+            designators.setdefault(reference, None)
+        if not has_positions or len(references) != 1:
+            continue
+
+        x = _parse_number(row[x_column]) if x_column < len(row) else None
+        y = _parse_number(row[y_column]) if y_column < len(row) else None
+        if x is None or y is None:
+            continue
+        rotation = None
+        if rotation_column is not None and rotation_column < len(row):
+            rotation = _parse_number(row[rotation_column])
+        side = row[side_column].strip() if side_column is not None and side_column < len(row) else ""
+        parts.append(ComponentPart(references[0], x, y, rotation or 0.0, side))
+
+    return ComponentFile(list(designators), parts)
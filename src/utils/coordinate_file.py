@@ -0,0 +1,218 @@
+"""
+座標ファイルの取り込み・書き出し
+CSV/TSV/JSONの座標リストを検証して読み込み、基板・ロットの座標をCSVに逐次書き出す
+"""
+
+import csv
+import os
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.utils.component_file import DESIGNATOR_COLUMNS, find_column, normalize_header, read_rows
+from src.utils.json_stream import iter_json_array
+
+# 取り込む詳細情報の項目
+DETAIL_FIELDS = ("reference", "defect", "repaired", "comment")
+
+# 列名の候補（正規化後の列名）
+COLUMN_CANDIDATES: Dict[str, Tuple[str, ...]] = {
+    "x": ("x", "x座標", "posx", "centerx"),
+    "y": ("y", "y座標", "posy", "centery"),
+    "reference": DESIGNATOR_COLUMNS,
+    "defect": ("defect", "不良名", "不良", "不良項目"),
+    "repaired": ("repaired", "修理済み", "修理"),
+    "comment": ("comment", "コメント", "備考"),
+}
+
+# 見出し行がないファイル（coords.txt 等）の列の並び
+HEADERLESS_FIELDS = ("x", "y") + DETAIL_FIELDS
+
+# 修理済みとして受け付ける値
+REPAIRED_VALUES = {
+    "はい": "はい",
+    "済": "はい",
+    "yes": "はい",
+    "true": "はい",
+    "1": "はい",
+    "いいえ": "いいえ",
+    "未": "いいえ",
+    "no": "いいえ",
+    "false": "いいえ",
+    "0": "いいえ",
+}
+
+# 書き出す列（取り込み時の列名の候補にも一致する）
+EXPORT_COLUMNS = ("lot_number", "board_number", "item_number", "x", "y") + DETAIL_FIELDS
+
+JSON_SUFFIXES = (".json", ".data")
+
+
+class CoordinateImport(NamedTuple):
+    """読み込んだ座標リスト"""
+
+    # 元画像の座標
+    coordinates: List[Tuple[int, int]]
+    # 座標ごとの詳細情報（値のある項目のみ）
+    details: List[Dict[str, str]]
+    # 取り込めなかった行のエラー（"3行目: ..." の形式）
+    errors: List[str]
+
+
+def _parse_coordinate(value: Any) -> Optional[int]:
+    """座標値を整数に変換（小数は四捨五入、数値でなければ None）"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        try:
+            number = float(unicodedata.normalize("NFKC", str(value)).strip())
+        except ValueError:
+            return None
+    if number != number or number in (float("inf"), float("-inf")):
+        return None
+    return int(round(number))
+
+
+def _validate_record(
+    record: Dict[str, Any], bounds: Optional[Tuple[int, int]]
+) -> Tuple[Optional[Tuple[int, int]], Dict[str, str], Optional[str]]:
+    """1行分を検証して座標・詳細情報・エラーを返す"""
+    x = _parse_coordinate(record.get("x"))
+    y = _parse_coordinate(record.get("y"))
+    if x is None or y is None:
+        return None, {}, f"座標が数値ではありません（x={record.get('x')!r}, y={record.get('y')!r}）"
+    if x < 0 or y < 0:
+        return None, {}, f"座標が負の値です（{x}, {y}）"
+    if bounds and bounds[0] > 0 and bounds[1] > 0 and (x >= bounds[0] or y >= bounds[1]):
+        return None, {}, f"座標が画像の範囲外です（{x}, {y}、画像 {bounds[0]}x{bounds[1]}）"
+
+    detail = {}
+    for field in DETAIL_FIELDS:
+        value = record.get(field)
+        if value is None or str(value).strip() == "":
+            continue
+        value = str(value).strip()
+        if field == "repaired":
+            repaired = REPAIRED_VALUES.get(value.lower())
+            if repaired is None:
+                return None, {}, f"修理済みの値が不正です（{value!r}）"
+            value = repaired
+        detail[field] = value
+    return (x, y), detail, None
+
+
+def _iter_json_records(
+    path: str, column_map: Optional[Dict[str, str]]
+) -> Iterable[Tuple[int, Dict[str, Any]]]:
+    """JSON配列（座標のオブジェクトまたは [x, y]）を要素ごとに読み込み"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for number, item in enumerate(iter_json_array(f), start=1):
+            if isinstance(item, dict):
+                keys = [normalize_header(str(key)) for key in item]
+                values = list(item.values())
+                yield number, {field: values[index] for field, index in _resolve_columns(keys, column_map).items()}
+            elif isinstance(item, (list, tuple)):
+                yield number, dict(zip(HEADERLESS_FIELDS, item))
+            else:
+                yield number, {"x": item}
+
+
+def _resolve_columns(headers: List[str], column_map: Optional[Dict[str, str]]) -> Dict[str, int]:
+    """項目ごとの列番号を決定（指定された列名を優先し、なければ候補から探す）"""
+    columns = {}
+    for field, candidates in COLUMN_CANDIDATES.items():
+        if column_map and column_map.get(field):
+            candidates = (normalize_header(column_map[field]),)
+        column = find_column(headers, candidates)
+        if column is not None:
+            columns[field] = column
+    return columns
+
+
+def _iter_table_records(
+    path: str, column_map: Optional[Dict[str, str]]
+) -> Iterable[Tuple[int, Dict[str, Any]]]:
+    """CSV/TSVを1行ずつ読み込み（見出し行がなければ x, y, リファレンス, 不良名... の順）"""
+    rows = read_rows(path)
+    if not rows:
+        return
+    columns = _resolve_columns([normalize_header(cell) for cell in rows[0]], column_map)
+    if "x" in columns and "y" in columns:
+        start = 1
+    elif column_map:
+        raise ValueError("指定された座標の列が見つかりません。")
+    else:
+        columns = {field: index for index, field in enumerate(HEADERLESS_FIELDS)}
+        start = 0
+
+    for number, row in enumerate(rows[start:], start=start + 1):
+        yield number, {field: row[column] for field, column in columns.items() if column < len(row)}
+
+
+def read_coordinate_file(
+    path: str,
+    column_map: Optional[Dict[str, str]] = None,
+    bounds: Optional[Tuple[int, int]] = None,
+) -> CoordinateImport:
+    """座標ファイル（CSV/TSV/JSON）を読み込んで全行を検証
+
+    不正な行があっても読み込みは中断せず、正しい行の座標とエラーの一覧を返す
+    （取り込むかどうかは呼び出し側で判断する）。
+
+    Args:
+        path: 座標ファイルのパス（.json/.data はJSON、それ以外はCSV/TSV）
+        column_map: 項目（x, y, reference, defect, repaired, comment）と列名の対応（省略時は列名から推定）
+        bounds: 元画像のサイズ（指定時は範囲外の座標をエラーにする）
+
+    Raises:
+        ValueError: ファイルの形式が不正な場合、または指定された座標の列がない場合
+    """
+    if Path(path).suffix.lower() in JSON_SUFFIXES:
+        records = _iter_json_records(path, column_map)
+        label = "件目"
+    else:
+        records = _iter_table_records(path, column_map)
+        label = "行目"
+
+    coordinates, details, errors = [], [], []
+    for number, record in records:
+        coordinate, detail, error = _validate_record(record, bounds)
+        if error:
+            errors.append(f"{number}{label}: {error}")
+            continue
+        coordinates.append(coordinate)
+        details.append(detail)
+    return CoordinateImport(coordinates, details, errors)
+
+
+def write_coordinate_csv(path: str, rows: Iterable[Tuple[str, int, int, Any]]) -> int:
+    """座標をCSVに1行ずつ書き出し（一時ファイルに書いてから置き換え）
+
+    Args:
+        path: 書き出すCSVのパス
+        rows: (ロット番号, 基板番号, 項目番号, Detail) の反復子
+
+    Returns:
+        int: 書き出した座標数
+    """
+    temp_path = f"{path}.tmp"
+    count = 0
+    try:
+        # Excelで文字化けしないようにBOM付きUTF-8
+        with open(temp_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for lot_number, board_number, item_number, detail in rows:
+                writer.writerow(
+                    [lot_number, board_number, item_number, detail.x, detail.y]
+                    + [getattr(detail, field) or "" for field in DETAIL_FIELDS]
+                )
+                count += 1
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return count
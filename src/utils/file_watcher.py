@@ -0,0 +1,372 @@
+"""
+ファイル監視
+ディレクトリの追加・削除・更新イベントをまとめて通知する
+watchdog（依存パッケージ）で OS の通知（inotify 等）を使い、
+ネットワークドライブ（SMB共有）や watchdog を読み込めない環境ではポーリングで差分を検出
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog を読み込めない環境ではポーリングのみ
+    FileSystemEventHandler = object
+    Observer = None
+
+# イベントの種類
+EVENT_CREATED = "created"
+EVENT_DELETED = "deleted"
+EVENT_MODIFIED = "modified"
+
+
+class WatchEvent(NamedTuple):
+    """ファイルの変更イベント"""
+
+    kind: str
+    path: str
+
+
+def _merge_event(previous: Optional[str], kind: str) -> Optional[str]:
+    """同じパスに続けて発生したイベントを1つにまとめる（Noneは変更なし）"""
+    if previous is None:
+        return kind
+    if previous == EVENT_CREATED:
+        # 作成後に削除されたファイルは通知しない
+        return None if kind == EVENT_DELETED else EVENT_CREATED
+    if previous == EVENT_DELETED and kind == EVENT_CREATED:
+        # 置き換え（一時ファイルからのリネーム等）は更新として扱う
+        return EVENT_MODIFIED
+    return kind
+
+
+def is_network_path(path: str) -> bool:
+    """ネットワークドライブ上のパスかどうか（OSの変更通知が届かないためポーリングで監視）"""
+    return path.startswith("\\\\") or path.startswith("//")
+
+
+class _WatchdogHandler(FileSystemEventHandler):
+    """watchdog のイベントを FileWatcher に転送"""
+
+    def __init__(self, emit: Callable[[str, str], None]):
+        super().__init__()
+        self._emit = emit
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._emit(EVENT_CREATED, event.src_path)
+
+    def on_deleted(self, event):
+        self._emit(EVENT_DELETED, event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._emit(EVENT_MODIFIED, event.src_path)
+
+    def on_moved(self, event):
+        self._emit(EVENT_DELETED, event.src_path)
+        if not event.is_directory:
+            self._emit(EVENT_CREATED, event.dest_path)
+
+
+class _PollingWatch:
+    """ポーリングによる1ディレクトリの監視
+
+    サブディレクトリは更新時刻が変わったもの（ファイルの追加・削除）と、
+    直近に変更があったものだけを走査し、全体の再走査は行わない
+    """
+
+    # 変更があったサブディレクトリをファイル単位で監視し続ける時間（秒）
+    ACTIVE_SECONDS = 300
+
+    def __init__(self, path: str, recursive: bool):
+        self.path = path
+        self.recursive = recursive
+        # ディレクトリ: (更新時刻, {ファイルパス: (サイズ, 更新時刻)})
+        self._snapshots: Dict[str, Tuple[int, Dict[str, Tuple[int, int]]]] = {}
+        # ディレクトリ: 最後に変更を検出した時刻
+        self._active: Dict[str, float] = {}
+        self._initialized = False
+
+    def poll(self, emit: Callable[[str, str], None]):
+        """前回からの差分をイベントとして通知"""
+        now = time.monotonic()
+        directories = [self.path]
+        if self.recursive:
+            directories.extend(self._list_subdirectories(emit))
+
+        for directory in directories:
+            previous = self._snapshots.get(directory)
+            try:
+                directory_mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            if (
+                previous is not None
+                and previous[0] == directory_mtime_ns
+                and now - self._active.get(directory, 0) > self.ACTIVE_SECONDS
+                and directory != self.path
+            ):
+                continue
+
+            files = self._snapshot_files(directory)
+            self._snapshots[directory] = (directory_mtime_ns, files)
+            if previous is None:
+                if self._initialized:
+                    # 監視開始後に作成されたディレクトリ内のファイル
+                    for file_path in files:
+                        emit(EVENT_CREATED, file_path)
+                    self._active[directory] = now
+                continue
+            if self._diff(previous[1], files, emit):
+                self._active[directory] = now
+        self._initialized = True
+
+    def _list_subdirectories(self, emit: Callable[[str, str], None]) -> List[str]:
+        """直下のサブディレクトリを列挙（削除されたディレクトリのファイルは削除として通知）"""
+        try:
+            with os.scandir(self.path) as entries:
+                subdirectories = [
+                    entry.path for entry in entries if entry.is_dir() and not entry.name.startswith(".")
+                ]
+        except OSError:
+            return []
+        for removed in set(self._snapshots) - set(subdirectories) - {self.path}:
+            for file_path in self._snapshots.pop(removed)[1]:
+                emit(EVENT_DELETED, file_path)
+            self._active.pop(removed, None)
+        return subdirectories
+
+    @staticmethod
+    def _snapshot_files(directory: str) -> Dict[str, Tuple[int, int]]:
+        """ディレクトリ直下のファイルのサイズ・更新時刻を取得"""
+        files = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return files
+
+    @staticmethod
+    def _diff(
+        previous: Dict[str, Tuple[int, int]],
+        current: Dict[str, Tuple[int, int]],
+        emit: Callable[[str, str], None],
+    ) -> bool:
+        """スナップショットの差分を通知（変更があればTrue）"""
+        changed = False
+        for file_path, signature in current.items():
+            before = previous.get(file_path)
+            if before is None:
+                emit(EVENT_CREATED, file_path)
+                changed = True
+            elif before != signature:
+                emit(EVENT_MODIFIED, file_path)
+                changed = True
+        for file_path in previous.keys() - current.keys():
+            emit(EVENT_DELETED, file_path)
+            changed = True
+        return changed
+
+
+class FileWatcher:
+    """ディレクトリを監視し、変更イベントを間引いてまとめて通知するクラス
+
+    コールバックは監視スレッドから呼ばれるため、GUIへの反映は呼び出し側でメインスレッドに渡すこと
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[List[WatchEvent]], None],
+        debounce_seconds: float = 0.5,
+        max_delay_seconds: float = 5.0,
+        poll_interval: float = 2.0,
+    ):
+        """
+        Args:
+            callback: まとめたイベントのリストを受け取るコールバック
+            debounce_seconds: 最後のイベントからこの秒数変更がなければ通知
+            max_delay_seconds: 変更が続いてもこの秒数経過したら通知
+            poll_interval: ポーリング監視の間隔（秒）
+        """
+        self._callback = callback
+        self._debounce_seconds = debounce_seconds
+        self._max_delay_seconds = max_delay_seconds
+        self._poll_interval = poll_interval
+
+        self._condition = threading.Condition()
+        # パス: イベントの種類（まとめた結果）
+        self._pending: Dict[str, str] = {}
+        self._first_event_time: Optional[float] = None
+        self._last_event_time: Optional[float] = None
+
+        self._observer = None
+        # 監視中のディレクトリ: watchdog の監視ハンドル（ポーリングの場合は _PollingWatch）
+        self._watches: Dict[str, object] = {}
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @staticmethod
+    def is_native_available() -> bool:
+        """OSの変更通知（watchdog）を使用できるかどうか"""
+        return Observer is not None
+
+    # region 監視の開始・停止
+
+    def watch(self, path: str, recursive: bool = False, polling: Optional[bool] = None) -> bool:
+        """ディレクトリの監視を開始
+
+        Args:
+            path: 監視するディレクトリ
+            recursive: 直下のサブディレクトリも監視するかどうか
+            polling: ポーリングで監視するかどうか（省略時はwatchdogがない場合・ネットワークパスの場合のみ）
+
+        Returns:
+            bool: 監視を開始できたかどうか
+        """
+        path = os.path.abspath(path)
+        if path in self._watches:
+            return True
+        if not os.path.isdir(path):
+            print(f"[ファイル監視] ディレクトリが存在しません: {path}")
+            return False
+
+        if polling is None:
+            polling = not self.is_native_available() or is_network_path(path)
+        self._start_threads()
+
+        if not polling:
+            try:
+                if self._observer is None:
+                    self._observer = Observer()
+                    self._observer.daemon = True
+                    self._observer.start()
+                self._watches[path] = self._observer.schedule(
+                    _WatchdogHandler(self._emit), path, recursive=recursive
+                )
+                print(f"[ファイル監視] 監視を開始しました: {path}")
+                return True
+            except OSError as e:
+                # inotifyの上限等で監視できない場合はポーリングに切り替え
+                print(f"[ファイル監視] OSの変更通知を使用できないためポーリングします: {e}")
+
+        polling_watch = _PollingWatch(path, recursive)
+        polling_watch.poll(self._emit)
+        with self._condition:
+            self._watches[path] = polling_watch
+        print(f"[ファイル監視] ポーリングで監視を開始しました: {path}")
+        return True
+
+    def unwatch(self, path: str):
+        """ディレクトリの監視を停止"""
+        with self._condition:
+            watch = self._watches.pop(os.path.abspath(path), None)
+        if watch is not None and not isinstance(watch, _PollingWatch) and self._observer is not None:
+            self._observer.unschedule(watch)
+
+    def unwatch_all(self):
+        """全ディレクトリの監視を停止"""
+        for path in list(self._watches):
+            self.unwatch(path)
+
+    def get_watched_paths(self) -> List[str]:
+        """監視中のディレクトリ一覧"""
+        return list(self._watches)
+
+    def stop(self):
+        """監視を停止してスレッドを終了"""
+        self.unwatch_all()
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        self._threads = []
+
+    def _start_threads(self):
+        """通知スレッドとポーリングスレッドを起動（起動済みの場合は何もしない）"""
+        if self._threads:
+            return
+        self._stop_event.clear()
+        for target in (self._dispatch_loop, self._polling_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    # endregion
+
+    # region イベントの集約・通知
+
+    def _emit(self, kind: str, path: str):
+        """イベントを登録（同じパスのイベントはまとめる）"""
+        with self._condition:
+            merged = _merge_event(self._pending.get(path), kind)
+            if merged is None:
+                self._pending.pop(path, None)
+            else:
+                self._pending[path] = merged
+            now = time.monotonic()
+            if self._first_event_time is None:
+                self._first_event_time = now
+            self._last_event_time = now
+            self._condition.notify_all()
+
+    def _take_ready_events(self) -> Optional[List[WatchEvent]]:
+        """通知できる状態のイベントを取り出す（まだ変更が続いている場合はNone）"""
+        if not self._pending:
+            self._first_event_time = None
+            return None
+        now = time.monotonic()
+        quiet = now - self._last_event_time >= self._debounce_seconds
+        overdue = now - self._first_event_time >= self._max_delay_seconds
+        if not (quiet or overdue):
+            return None
+        events = [WatchEvent(kind, path) for path, kind in sorted(self._pending.items())]
+        self._pending = {}
+        self._first_event_time = None
+        self._last_event_time = None
+        return events
+
+    def flush(self) -> List[WatchEvent]:
+        """待機中のイベントを間引き時間を待たずに取り出す"""
+        with self._condition:
+            events = [WatchEvent(kind, path) for path, kind in sorted(self._pending.items())]
+            self._pending = {}
+            self._first_event_time = None
+            self._last_event_time = None
+        return events
+
+    def _dispatch_loop(self):
+        """間引き時間が経過したイベントをまとめてコールバックに渡す"""
+        while not self._stop_event.is_set():
+            with self._condition:
+                events = self._take_ready_events()
+                if events is None:
+                    timeout = self._debounce_seconds if self._pending else None
+                    self._condition.wait(timeout)
+                    continue
+            try:
+                self._callback(events)
+            except Exception as e:
+                print(f"[ファイル監視] イベント処理エラー: {e}")
+
+    def _polling_loop(self):
+        """ポーリング監視のディレクトリの差分を一定間隔で検出"""
+        while not self._stop_event.wait(self._poll_interval):
+            with self._condition:
+                polling_watches = [w for w in self._watches.values() if isinstance(w, _PollingWatch)]
+            for polling_watch in polling_watches:
+                polling_watch.poll(self._emit)
+
+    # endregion
@@ -0,0 +1,129 @@
+"""
+JSONストリーム読み込み
+巨大なdataファイル（JSON配列）をファイル全体を読み込まずに要素単位で逐次デコード
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Iterator, List, TextIO, Union
+
+from src.db.schema import Detail
+
+# 1回に読み込む文字数
+READ_SIZE = 65536
+
+_WHITESPACE = " \t\r\n"
+
+
+class _ArrayReader:
+    """JSON配列を先頭から読み進めるバッファ付きリーダー"""
+
+    def __init__(self, file: TextIO, read_size: int):
+        self._file = file
+        self._read_size = read_size
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """バッファに続きを読み込む（読み込み済みの部分は破棄）
+
+        Returns:
+            bool: 読み込めたかどうか
+        """
+        if self._eof:
+            return False
+        chunk = self._file.read(self._read_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
+
+    def _next_char(self) -> str:
+        """空白を読み飛ばして次の文字を取得（位置は進めない、終端では空文字）"""
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ""
+
+    def _expect(self, expected: str):
+        """次の文字が指定の文字であることを確認して読み進める"""
+        char = self._next_char()
+        if char != expected:
+            raise ValueError(f"JSON配列の形式が不正です（'{expected}' が必要な位置に '{char or '終端'}'）")
+        self._position += 1
+
+    def _decode_value(self) -> Any:
+        """次の値をデコード（途中で切れている場合は続きを読み込んで再試行）"""
+        self._next_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise ValueError(f"JSONのデコードに失敗しました: {e}") from e
+            # 数値などはバッファ終端で途切れている可能性があるため続きを読んでから確定
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def __iter__(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._next_char() == "]":
+            self._position += 1
+            return
+
+        while True:
+            yield self._decode_value()
+            char = self._next_char()
+            if char == "]":
+                self._position += 1
+                return
+            self._expect(",")
+
+
+def iter_json_array(file: TextIO, read_size: int = READ_SIZE) -> Iterator[Any]:
+    """ファイルのJSON配列を要素ごとに逐次デコード
+
+    Args:
+        file: テキストモードで開いたファイル
+        read_size: 1回に読み込む文字数
+
+    Raises:
+        ValueError: JSON配列として不正な場合（空ファイルを含む）
+    """
+    return iter(_ArrayReader(file, read_size))
+
+
+def iter_detail_chunks(
+    path: Union[str, Path], chunk_size: int = 500, read_size: int = READ_SIZE
+) -> Iterator[List[Detail]]:
+    """dataファイルを検証済みのDetailのリストとしてチャンク単位で逐次読み込み
+
+    Args:
+        path: dataファイルのパス
+        chunk_size: 1チャンクの件数
+        read_size: 1回に読み込む文字数
+
+    Raises:
+        ValueError: JSON配列として不正な場合、または要素が不正な場合
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        chunk: List[Detail] = []
+        for item in iter_json_array(f, read_size):
+            if not isinstance(item, dict):
+                raise ValueError(f"dataファイルの要素が不正です: {item!r}")
+            chunk.append(Detail(**item))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
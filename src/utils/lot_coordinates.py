@@ -0,0 +1,72 @@
+"""
+ロットの座標形式
+lotInfo.txt の座標形式（coordinate_version / coordinate_offset）から、dataファイルの座標と
+元画像のピクセル座標の対応を求め、読み込み・書き込み時に変換する
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.db.schema import Detail
+
+# dataファイルの座標形式のバージョン（lotInfo.txt の coordinate_version）
+# 未設定: クリック位置を表示倍率で割った座標（キャンバス上の画像の表示位置を含む）
+# 2: 元画像のピクセル座標
+COORDINATE_VERSION = 2
+
+# 補正不要（元画像のピクセル座標）
+NO_OFFSET: Tuple[int, int] = (0, 0)
+
+
+def get_coordinate_offset(lot: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """ロット情報からdataファイルの座標に含まれる画像の表示位置（元画像のピクセル単位）を取得
+
+    Returns:
+        Optional[Tuple[int, int]]: dataファイルの座標 = 元画像の座標 + 戻り値（整数のため読み書きで座標が変わらない）。
+        旧形式で補正量が記録されていない場合はNone
+    """
+    if (lot.get("coordinate_version") or 0) >= COORDINATE_VERSION:
+        return NO_OFFSET
+    offset = lot.get("coordinate_offset")
+    if isinstance(offset, (list, tuple)) and len(offset) == 2:
+        try:
+            return int(round(float(offset[0]))), int(round(float(offset[1])))
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def read_coordinate_offset(lot_directory: Path) -> Optional[Tuple[int, int]]:
+    """ロットディレクトリの lotInfo.txt から座標の補正量を取得（lotInfo.txt がなければ補正不要）"""
+    try:
+        with open(Path(lot_directory) / "lotInfo.txt", "r", encoding="utf-8") as f:
+            lot = json.load(f)
+    except FileNotFoundError:
+        return NO_OFFSET
+    except (OSError, ValueError):
+        return None
+    return get_coordinate_offset(lot if isinstance(lot, dict) else {})
+
+
+def to_image_coordinates(details: Iterable[Detail], offset: Tuple[int, int]) -> List[Detail]:
+    """dataファイルの座標を元画像のピクセル座標に変換（その場で書き換え）"""
+    details = list(details)
+    if offset == NO_OFFSET:
+        return details
+    for detail in details:
+        if detail.x is not None:
+            detail.x = max(0, detail.x - offset[0])
+        if detail.y is not None:
+            detail.y = max(0, detail.y - offset[1])
+    return details
+
+
+def to_stored_coordinate(
+    x: Optional[int], y: Optional[int], offset: Tuple[int, int]
+) -> Tuple[Optional[int], Optional[int]]:
+    """元画像のピクセル座標をdataファイルの座標に変換（to_image_coordinates の逆変換）"""
+    return (
+        None if x is None else x + offset[0],
+        None if y is None else y + offset[1],
+    )
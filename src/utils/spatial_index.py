@@ -0,0 +1,150 @@
+"""
+空間インデックス
+表示座標の近傍検索・範囲検索・クラスタリングを格子分割で高速化
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+class GridSpatialIndex:
+    """一定サイズの格子で点を分類する空間インデックス"""
+
+    # 点の追加で確保するバッファの最小サイズ
+    MIN_CAPACITY = 64
+
+    def __init__(self, cell_size: float = 32.0):
+        self._cell_size = cell_size
+        # 点の座標のバッファ（先頭 _count 件が有効、追加時は容量を倍にして確保し直す）
+        self._buffer = np.empty((0, 2), dtype=np.float64)
+        self._count = 0
+        # 格子セル (列, 行): 点インデックスのリスト
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+
+    @property
+    def _points(self) -> np.ndarray:
+        """有効な点の座標（バッファのビュー、コピーしない）"""
+        return self._buffer[: self._count]
+
+    def _cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        """座標が属する格子セルを取得"""
+        return int(math.floor(x / self._cell_size)), int(math.floor(y / self._cell_size))
+
+    # region 構築
+
+    def build(self, points: Union[np.ndarray, Sequence[Tuple[float, float]]]):
+        """点の集合からインデックスを再構築"""
+        self._buffer = np.array(points, dtype=np.float64).reshape(-1, 2)
+        self._count = len(self._buffer)
+        self._cells = {}
+        if not self._count:
+            return
+
+        cells = np.floor(self._points / self._cell_size).astype(np.int64)
+        for index, (column, row) in enumerate(cells.tolist()):
+            self._cells.setdefault((column, row), []).append(index)
+
+    def add(self, x: float, y: float) -> int:
+        """点を1つ追加（バッファの容量を倍ずつ確保するため、連続した追加も償却O(1)）
+
+        Returns:
+            int: 追加した点のインデックス
+        """
+        index = self._count
+        if index == len(self._buffer):
+            buffer = np.empty((max(self.MIN_CAPACITY, index * 2), 2), dtype=np.float64)
+            buffer[:index] = self._buffer[:index]
+            self._buffer = buffer
+        self._buffer[index] = (x, y)
+        self._count += 1
+        self._cells.setdefault(self._cell_of(x, y), []).append(index)
+        return index
+
+    def clear(self):
+        """全ての点を削除"""
+        self._buffer = np.empty((0, 2), dtype=np.float64)
+        self._count = 0
+        self._cells = {}
+
+    # endregion
+
+    # region 検索
+
+    def _candidates(self, left: float, top: float, right: float, bottom: float) -> List[int]:
+        """矩形と重なる格子セルに含まれる点インデックスを取得"""
+        first_column, first_row = self._cell_of(left, top)
+        last_column, last_row = self._cell_of(right, bottom)
+
+        # 矩形が格子セル数より広い場合は全セルを走査した方が速い
+        if (last_column - first_column + 1) * (last_row - first_row + 1) > len(self._cells):
+            return [
+                index
+                for (column, row), indices in self._cells.items()
+                if first_column <= column <= last_column and first_row <= row <= last_row
+                for index in indices
+            ]
+
+        candidates = []
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                candidates.extend(self._cells.get((column, row), ()))
+        return candidates
+
+    def query_rect(self, left: float, top: float, right: float, bottom: float) -> np.ndarray:
+        """矩形内の点インデックスを昇順で取得"""
+        candidates = np.asarray(self._candidates(left, top, right, bottom), dtype=np.int64)
+        if not len(candidates):
+            return candidates
+
+        points = self._points[candidates]
+        inside = (
+            (points[:, 0] >= left)
+            & (points[:, 0] <= right)
+            & (points[:, 1] >= top)
+            & (points[:, 1] <= bottom)
+        )
+        return np.sort(candidates[inside])
+
+    def nearest(self, x: float, y: float, max_distance: float) -> Optional[int]:
+        """指定距離内で最も近い点のインデックスを取得（同距離なら小さいインデックス）"""
+        candidates = np.asarray(
+            self._candidates(x - max_distance, y - max_distance, x + max_distance, y + max_distance),
+            dtype=np.int64,
+        )
+        if not len(candidates):
+            return None
+
+        candidates = np.sort(candidates)
+        distances = np.hypot(self._points[candidates, 0] - x, self._points[candidates, 1] - y)
+        best = int(np.argmin(distances))
+        if distances[best] > max_distance:
+            return None
+        return int(candidates[best])
+
+    def cluster(self, indices: np.ndarray, cluster_size: float) -> List[Tuple[float, float, List[int]]]:
+        """点を cluster_size 四方の格子ごとにまとめる
+
+        Returns:
+            List[Tuple[float, float, List[int]]]: (重心x, 重心y, 点インデックス) のリスト
+        """
+        if not len(indices):
+            return []
+
+        points = self._points[indices]
+        cells = np.floor(points / cluster_size).astype(np.int64)
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for position, (column, row) in enumerate(cells.tolist()):
+            groups.setdefault((column, row), []).append(position)
+
+        clusters = []
+        for positions in groups.values():
+            center_x, center_y = points[positions].mean(axis=0)
+            clusters.append((float(center_x), float(center_y), [int(indices[p]) for p in positions]))
+        return clusters
+
+    # endregion
+
+    def __len__(self) -> int:
+        return self._count
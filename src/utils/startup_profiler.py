@@ -0,0 +1,213 @@
+"""
+起動プロファイラー
+--profile-startup 指定時に、モジュールごとのインポート時間と初期化ステップごとの経過時間を記録して
+レポートに出力する（実行ファイル化した環境でも -X importtime なしで計測できる）
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from importlib.abc import MetaPathFinder
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class _TimingLoader:
+    """ローダーをラップしてモジュールの実行時間を計測"""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._profiler._time_import(module.__name__):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name: str):
+        # get_code・get_resource_reader 等は元のローダーに委譲
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(MetaPathFinder):
+    """sys.meta_path の先頭に置き、他のファインダーが見つけたモジュールのローダーをラップ"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+        self._searching = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._searching, "active", False):
+            return None
+        self._searching.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimingLoader(spec.loader, self._profiler)
+                    return spec
+            return None
+        finally:
+            self._searching.active = False
+
+
+class StartupProfiler:
+    """起動時のインポート時間と初期化ステップの経過時間を記録するクラス"""
+
+    REPORT_FILE_NAME = "startup_profile.json"
+
+    def __init__(self):
+        self._enabled = False
+        self._origin = time.perf_counter()
+        self._finder: Optional[_TimingFinder] = None
+        self._lock = threading.Lock()
+        # モジュール名: {"self_us", "cumulative_us", "thread"}
+        self._imports: Dict[str, Dict[str, Any]] = {}
+        self._stack = threading.local()
+        # [{"name", "start", "elapsed"}]（秒、計測開始からの時刻）
+        self._steps: List[Dict[str, Any]] = []
+
+    @property
+    def enabled(self) -> bool:
+        """計測中かどうか"""
+        return self._enabled
+
+    def enable(self):
+        """計測を開始（以降のインポートを記録）"""
+        if self._enabled:
+            return
+        self._enabled = True
+        self._origin = time.perf_counter()
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def disable(self):
+        """インポートの記録を停止"""
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+        self._enabled = False
+
+    # region 計測
+
+    @contextmanager
+    def _time_import(self, name: str) -> Iterator[None]:
+        """モジュール1件の実行時間を計測（入れ子のインポート時間は自身の時間から除く）"""
+        stack = getattr(self._stack, "frames", None)
+        if stack is None:
+            stack = self._stack.frames = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                self._imports[name] = {
+                    "self_us": int((elapsed - children) * 1_000_000),
+                    "cumulative_us": int(elapsed * 1_000_000),
+                    "thread": threading.current_thread().name,
+                }
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """初期化ステップの経過時間を計測（計測していない場合は何もしない）"""
+        if not self._enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_step(name, start, time.perf_counter() - start)
+
+    def mark(self, name: str):
+        """起動開始からの時刻を記録（最初の画面表示など）"""
+        if self._enabled:
+            self._add_step(name, time.perf_counter(), 0.0)
+
+    def _add_step(self, name: str, start: float, elapsed: float):
+        with self._lock:
+            self._steps.append({"name": name, "start": start - self._origin, "elapsed": elapsed})
+
+    # endregion
+
+    # region レポート
+
+    def get_report(self) -> Dict[str, Any]:
+        """計測結果を取得"""
+        with self._lock:
+            imports = [{"module": name, **values} for name, values in self._imports.items()]
+            steps = list(self._steps)
+
+        # トップレベルのパッケージごとの合計（自身の時間の合計）
+        packages: Dict[str, int] = {}
+        for entry in imports:
+            package = entry["module"].split(".")[0]
+            packages[package] = packages.get(package, 0) + entry["self_us"]
+
+        return {
+            "created_at": datetime.now().isoformat(),
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "python": sys.version.split()[0],
+            "elapsed": time.perf_counter() - self._origin,
+            "import_total_us": sum(entry["self_us"] for entry in imports),
+            "steps": steps,
+            "packages": dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)),
+            "imports": sorted(imports, key=lambda entry: entry["cumulative_us"], reverse=True),
+        }
+
+    @staticmethod
+    def format_report(report: Dict[str, Any], max_items: int = 15) -> str:
+        """計測結果を表示用の文字列に整形"""
+        lines = [
+            f"起動時間: {report['elapsed']:.2f}秒 (インポート合計: {report['import_total_us'] / 1000:.0f}ms)",
+            "",
+            "[初期化ステップ]",
+        ]
+        for step in report["steps"]:
+            lines.append(f"  {step['start']:7.3f}秒  {step['elapsed'] * 1000:8.1f}ms  {step['name']}")
+        lines += ["", "[パッケージ別インポート時間]"]
+        for package, self_us in list(report["packages"].items())[:max_items]:
+            lines.append(f"  {self_us / 1000:8.1f}ms  {package}")
+        return "\n".join(lines)
+
+    def write_report(self, path: Optional[str] = None) -> str:
+        """計測結果をJSONで保存して要約を表示
+
+        Args:
+            path: 保存先（省略時は実行ファイル、またはプロジェクトのディレクトリの startup_profile.json）
+
+        Returns:
+            str: 保存先のパス
+        """
+        if path is None:
+            if getattr(sys, "frozen", False):
+                base_directory = os.path.dirname(sys.executable)
+            else:
+                base_directory = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            path = os.path.join(base_directory, self.REPORT_FILE_NAME)
+
+        report = self.get_report()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(self.format_report(report))
+        print(f"[起動プロファイル] レポートを保存しました: {path}")
+        return path
+
+    # endregion
+
+
+# アプリケーション全体で共有するインスタンス
+startup_profiler = StartupProfiler()
@@ -1,14 +1,40 @@
 """
 View Layer
 ユーザーインターフェースを管理するビュー層
+
+各ビューは初回参照時にインポート
 """
 
-from .main_view import MainView
-from .coordinate_canvas_view import CoordinateCanvasView
-from .sidebar_view import SidebarView
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .main_view import MainView
+    from .coordinate_canvas_view import CoordinateCanvasView
+    from .sidebar_view import SidebarView
+    from .board_timeline_view import BoardTimelineView
+
+# 公開名: 定義元のモジュール
+_EXPORTS = {
+    "MainView": ".main_view",
+    "CoordinateCanvasView": ".coordinate_canvas_view",
+    "SidebarView": ".sidebar_view",
+    "BoardTimelineView": ".board_timeline_view",
+}
 
 __all__ = [
-    'MainView',
-    'CoordinateCanvasView',
-    'SidebarView'
+    "MainView",
+    "CoordinateCanvasView",
+    "SidebarView",
+    "BoardTimelineView",
 ]
+
+
+def __getattr__(name: str):
+    """公開名を初めて参照した時に定義元のモジュールをインポート"""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,183 @@
+"""
+基板タイムラインビュー
+キャンバス下部にロット内の全基板のサムネイルを横一列に表示
+"""
+
+import tkinter as tk
+from typing import Callable, Dict, List, Optional
+
+from PIL import ImageTk
+
+
+class BoardTimelineView:
+    """ロット内の基板サムネイルを横スクロールで表示するビュー"""
+
+    THUMBNAIL_WIDTH = 96
+    THUMBNAIL_HEIGHT = 72
+    ITEM_GAP = 8
+    LABEL_HEIGHT = 16
+
+    def __init__(self, parent_frame: tk.Frame):
+        self.parent_frame = parent_frame
+        item_height = self.THUMBNAIL_HEIGHT + self.LABEL_HEIGHT + self.ITEM_GAP
+
+        self.canvas = tk.Canvas(parent_frame, height=item_height, bg="#e8e8e8", highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(parent_frame, orient=tk.HORIZONTAL, command=self._on_scroll)
+        self.canvas.configure(xscrollcommand=self._on_xscroll)
+        self.scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(side=tk.TOP, fill=tk.X)
+
+        # イベントコールバック
+        self.callbacks: Dict[str, Callable] = {}
+
+        # 表示中の基板番号と、基板番号ごとのサムネイル画像（ガベージコレクション防止）
+        self.board_numbers: List[int] = []
+        self.thumbnail_images: Dict[int, ImageTk.PhotoImage] = {}
+        self.selected_board: Optional[int] = None
+
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self._scroll_units(-3))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll_units(3))
+        self.canvas.bind("<Configure>", lambda e: self._notify_visible_boards())
+
+    def set_callbacks(self, callbacks: Dict[str, Callable]):
+        """コールバック関数を設定"""
+        self.callbacks.update(callbacks)
+
+    # region 表示
+
+    def set_boards(self, board_numbers: List[int]):
+        """ロットの基板一覧を設定（サムネイルは未生成の枠を表示）"""
+        self.canvas.delete("all")
+        self.board_numbers = list(board_numbers)
+        self.thumbnail_images.clear()
+        self.selected_board = None
+
+        step = self.THUMBNAIL_WIDTH + self.ITEM_GAP
+        for position, board_number in enumerate(self.board_numbers):
+            x = self.ITEM_GAP // 2 + position * step
+            tag = f"board_{board_number}"
+            self.canvas.create_rectangle(
+                x,
+                2,
+                x + self.THUMBNAIL_WIDTH,
+                2 + self.THUMBNAIL_HEIGHT,
+                fill="#d0d0d0",
+                outline="#a0a0a0",
+                tags=(tag, f"frame_{board_number}"),
+            )
+            self.canvas.create_text(
+                x + self.THUMBNAIL_WIDTH // 2,
+                4 + self.THUMBNAIL_HEIGHT + self.LABEL_HEIGHT // 2,
+                text=f"No.{board_number}",
+                font=("Arial", 9),
+                tags=(tag,),
+            )
+
+        total_width = len(self.board_numbers) * step + self.ITEM_GAP
+        self.canvas.configure(scrollregion=(0, 0, total_width, self.canvas.winfo_reqheight()))
+        self.canvas.xview_moveto(0)
+        self._notify_visible_boards()
+
+    def set_thumbnail(self, board_number: int, tk_image: ImageTk.PhotoImage):
+        """基板のサムネイルを表示"""
+        if board_number not in self.board_numbers:
+            return
+        self.thumbnail_images[board_number] = tk_image
+
+        position = self.board_numbers.index(board_number)
+        x = self.ITEM_GAP // 2 + position * (self.THUMBNAIL_WIDTH + self.ITEM_GAP)
+        self.canvas.delete(f"thumbnail_{board_number}")
+        self.canvas.create_image(
+            x + self.THUMBNAIL_WIDTH // 2,
+            2 + self.THUMBNAIL_HEIGHT // 2,
+            image=tk_image,
+            anchor="center",
+            tags=(f"board_{board_number}", f"thumbnail_{board_number}"),
+        )
+        # 選択枠は常に最前面
+        self.canvas.tag_raise("selection")
+
+    def select_board(self, board_number: int):
+        """選択中の基板を枠で強調し、見える位置までスクロール"""
+        self.canvas.delete("selection")
+        self.selected_board = board_number
+        if board_number not in self.board_numbers:
+            return
+
+        position = self.board_numbers.index(board_number)
+        step = self.THUMBNAIL_WIDTH + self.ITEM_GAP
+        x = self.ITEM_GAP // 2 + position * step
+        self.canvas.create_rectangle(
+            x - 2,
+            0,
+            x + self.THUMBNAIL_WIDTH + 2,
+            4 + self.THUMBNAIL_HEIGHT,
+            outline="#0078d7",
+            width=3,
+            tags=("selection",),
+        )
+
+        # 選択した基板が表示範囲外ならスクロール
+        first, last = self._get_visible_positions()
+        if not first <= position <= last and self.board_numbers:
+            visible = max(1, last - first)
+            start = max(0, position - visible // 2)
+            self.canvas.xview_moveto(start / len(self.board_numbers))
+            self._notify_visible_boards()
+
+    def clear(self):
+        """タイムラインをクリア"""
+        self.set_boards([])
+
+    # endregion
+
+    # region スクロール
+
+    def _get_visible_positions(self):
+        """表示範囲内の基板位置（先頭, 末尾）を取得"""
+        if not self.board_numbers:
+            return 0, -1
+        first_fraction, last_fraction = self.canvas.xview()
+        count = len(self.board_numbers)
+        first = int(first_fraction * count)
+        last = min(count - 1, int(last_fraction * count))
+        return first, last
+
+    def get_visible_boards(self, margin: int = 0) -> List[int]:
+        """表示範囲内（前後margin件を含む）の基板番号を取得"""
+        first, last = self._get_visible_positions()
+        return self.board_numbers[max(0, first - margin) : last + margin + 1]
+
+    def _on_scroll(self, *args):
+        """スクロールバー操作"""
+        self.canvas.xview(*args)
+        self._notify_visible_boards()
+
+    def _on_xscroll(self, first, last):
+        """キャンバスのスクロール位置変更"""
+        self.scrollbar.set(first, last)
+
+    def _on_mouse_wheel(self, event):
+        """マウスホイールで横スクロール"""
+        self._scroll_units(-3 if event.delta > 0 else 3)
+
+    def _scroll_units(self, units: int):
+        """指定単位だけ横スクロール"""
+        self.canvas.xview_scroll(units, "units")
+        self._notify_visible_boards()
+
+    def _notify_visible_boards(self):
+        """表示範囲の基板が変わったことを通知（サムネイルの遅延生成用）"""
+        if "on_visible_boards_changed" in self.callbacks and self.board_numbers:
+            self.callbacks["on_visible_boards_changed"](self.get_visible_boards(margin=5))
+
+    # endregion
+
+    def _on_click(self, event):
+        """クリックした基板を選択"""
+        x = self.canvas.canvasx(event.x)
+        position = int(x // (self.THUMBNAIL_WIDTH + self.ITEM_GAP))
+        if 0 <= position < len(self.board_numbers) and "on_board_selected" in self.callbacks:
+            self.callbacks["on_board_selected"](self.board_numbers[position])
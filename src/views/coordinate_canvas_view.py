@@ -6,12 +6,26 @@
 import tkinter as tk
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from PIL import ImageTk
+import numpy as np
+from PIL import Image, ImageTk
+
+from src.utils.spatial_index import GridSpatialIndex
+
+from .marker_sprite_layer import MarkerSpriteLayer
 
 
 class CoordinateCanvasView:
     """座標キャンバスを管理するビュー"""
 
+    # 表示範囲外のマーカーを省略する際の余白（ピクセル）
+    CULLING_MARGIN = 20
+    # 番号ラベルを表示する表示範囲内の最大点数
+    LABEL_MAX_MARKERS = 150
+    # これを超える点数が表示範囲内にある場合は密集部分をバッジに集約
+    CLUSTER_MIN_MARKERS = 600
+    # クラスタ集約の格子サイズ（ピクセル）
+    CLUSTER_CELL_SIZE = 24
+
     def __init__(self, parent_frame: tk.Frame):
         self.parent_frame = parent_frame
         self.canvas_width = 800
@@ -31,8 +45,39 @@ class CoordinateCanvasView:
         self.coordinate_markers = []
         self.highlight_marker = None
 
+        # マーカーの表示座標の空間インデックス（当たり判定・LOD描画で共通）
+        self.spatial_index = GridSpatialIndex()
+
+        # 前の基板から引き継いだ未確定のマーカー（ゴースト）の表示座標
+        self.ghost_index = GridSpatialIndex()
+
+        # 閲覧モードのスプライト描画（マーカーを画像に合成して1アイテムで表示）
+        self.sprite_mode = False
+        self.sprite_layer: Optional[MarkerSpriteLayer] = None
+        self._base_tk_image: Optional[ImageTk.PhotoImage] = None
+        self._sprite_base_image: Optional[Image.Image] = None
+        self._sprite_overlay: Optional[Image.Image] = None
+        self._sprite_tk_image: Optional[ImageTk.PhotoImage] = None
+        self._sprite_highlight_index = -1
+        self._sprite_applied = False
+
+        # オーバーレイ画像（ヒートマップ）
+        self.overlay_image = None
+        self.overlay_tk_image = None
+
+        # ドラッグ中のパン開始位置
+        self._pan_last_position: Optional[Tuple[int, int]] = None
+
         # ウィンドウサイズ変更のイベントをバインド
         self.canvas.bind("<Configure>", self._on_canvas_configure)
+
+        # ズーム（マウスホイール）・パン（中ボタンドラッグ）のイベントをバインド
+        self.canvas.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.canvas.bind("<Button-4>", self._on_mouse_wheel)
+        self.canvas.bind("<Button-5>", self._on_mouse_wheel)
+        self.canvas.bind("<ButtonPress-2>", self._on_pan_start)
+        self.canvas.bind("<B2-Motion>", self._on_pan_motion)
+        self.canvas.bind("<ButtonRelease-2>", self._on_pan_end)
         self.current_image = None
         self.coordinate_markers = []
         self.highlight_marker = None
@@ -56,6 +101,9 @@ class CoordinateCanvasView:
             # 閲覧モード: 左クリックで座標選択のみ
             self.canvas.bind("<Button-1>", self._on_view_click)
 
+        # 閲覧モードではマーカーが変わらないためスプライト描画を使う
+        self.sprite_mode = mode == "view"
+
     def _on_left_click(self, event):
         """左クリックイベント（編集モード）"""
         if "on_left_click" in self.callbacks:
@@ -71,6 +119,34 @@ class CoordinateCanvasView:
         if "on_view_click" in self.callbacks:
             self.callbacks["on_view_click"](event)
 
+    def _on_mouse_wheel(self, event):
+        """マウスホイールイベント（ズーム）"""
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            steps = 1
+        elif event.num == 5 or getattr(event, "delta", 0) < 0:
+            steps = -1
+        else:
+            return
+        if "on_zoom" in self.callbacks:
+            self.callbacks["on_zoom"](event.x, event.y, steps)
+
+    def _on_pan_start(self, event):
+        """中ボタン押下イベント（パン開始）"""
+        self._pan_last_position = (event.x, event.y)
+
+    def _on_pan_motion(self, event):
+        """中ボタンドラッグイベント（パン）"""
+        if self._pan_last_position is None:
+            return
+        last_x, last_y = self._pan_last_position
+        self._pan_last_position = (event.x, event.y)
+        if "on_pan" in self.callbacks:
+            self.callbacks["on_pan"](event.x - last_x, event.y - last_y)
+
+    def _on_pan_end(self, event):
+        """中ボタン解放イベント（パン終了）"""
+        self._pan_last_position = None
+
     def _on_canvas_configure(self, event):
         """キャンバスサイズ変更時の処理"""
         # キャンバス自体のサイズ変更イベントのみ処理
@@ -99,10 +175,20 @@ class CoordinateCanvasView:
         self.callbacks.update(callbacks)
 
     def display_image(
-        self, tk_image: ImageTk.PhotoImage, width: int = None, height: int = None
+        self,
+        tk_image: ImageTk.PhotoImage,
+        width: int = None,
+        height: int = None,
+        pil_image: Optional[Image.Image] = None,
     ):
-        """画像を表示"""
+        """画像を表示
+
+        Args:
+            pil_image: tk_imageと同じ内容のPIL画像（閲覧モードのスプライト合成に使用）
+        """
         self.clear_canvas()
+        self._base_tk_image = tk_image
+        self._sprite_base_image = pil_image
 
         # キャンバスサイズを取得
         canvas_width = self.canvas.winfo_width() or self.canvas_width
@@ -124,21 +210,151 @@ class CoordinateCanvasView:
             f"[DEBUG] 画像を表示: キャンバスサイズ {canvas_width}x{canvas_height}, 画像を中央({center_x}, {center_y})に配置"
         )
 
+    def show_viewport_image(
+        self, tk_image: ImageTk.PhotoImage, x: int, y: int, pil_image: Optional[Image.Image] = None
+    ):
+        """ズーム・パン中の表示範囲の画像を左上位置 (x, y) に表示（マーカーは残す）"""
+        self._base_tk_image = tk_image
+        self._sprite_base_image = pil_image
+        self._sprite_applied = False
+        if self.current_image:
+            self.canvas.itemconfig(self.current_image, image=tk_image, anchor="nw")
+            self.canvas.coords(self.current_image, x, y)
+        else:
+            self.current_image = self.canvas.create_image(x, y, anchor="nw", image=tk_image)
+            self.canvas.tag_lower(self.current_image)
+
+        # 画像参照を保持（ガベージコレクション防止）
+        self.canvas.image = tk_image
+
+    def show_overlay_image(self, tk_image: ImageTk.PhotoImage, position: Tuple[int, int] = None):
+        """画像の上（マーカーの下）に半透明のオーバーレイ画像を表示
+
+        Args:
+            tk_image: オーバーレイ画像
+            position: 左上位置（省略時は表示中の画像と同じ中央位置）
+        """
+        self.clear_overlay_image()
+        if not self.current_image:
+            return
+
+        if position:
+            self.overlay_image = self.canvas.create_image(
+                position[0], position[1], anchor="nw", image=tk_image, tags=("overlay",)
+            )
+        else:
+            center_x, center_y = self.canvas.coords(self.current_image)
+            self.overlay_image = self.canvas.create_image(
+                center_x, center_y, anchor="center", image=tk_image, tags=("overlay",)
+            )
+        # 画像の直上に配置してマーカーを隠さない
+        self.canvas.tag_raise(self.overlay_image, self.current_image)
+
+        # 画像参照を保持（ガベージコレクション防止）
+        self.overlay_tk_image = tk_image
+
+    def clear_overlay_image(self):
+        """オーバーレイ画像をクリア"""
+        if self.overlay_image:
+            self.canvas.delete(self.overlay_image)
+        self.overlay_image = None
+        self.overlay_tk_image = None
+        if self._sprite_overlay is not None:
+            self._sprite_overlay = None
+            if self._sprite_applied:
+                self._render_sprites()
+
+    # region スプライト描画
+
+    def is_sprite_active(self) -> bool:
+        """マーカーをスプライトとして画像に合成して描画するかどうか"""
+        return self.sprite_mode and self._sprite_base_image is not None and bool(self.current_image)
+
+    def set_sprite_overlay(self, overlay: Image.Image):
+        """スプライト描画時に画像とマーカーの間へ合成する半透明画像を設定"""
+        self.clear_overlay_image()
+        self._sprite_overlay = overlay
+        self._render_sprites()
+
+    def _get_image_origin(self) -> Tuple[float, float]:
+        """表示中の画像の左上位置を取得"""
+        if self.canvas.itemcget(self.current_image, "anchor") == "nw":
+            x, y = self.canvas.coords(self.current_image)
+            return x, y
+        return self.get_image_offset()
+
+    def _render_sprites(self):
+        """画像・オーバーレイ・全マーカー・ハイライトを1枚に合成して表示"""
+        if self.sprite_layer is None:
+            self.sprite_layer = MarkerSpriteLayer()
+
+        origin_x, origin_y = self._get_image_origin()
+        points = np.array(
+            [(marker["x"] - origin_x, marker["y"] - origin_y) for marker in self.coordinate_markers],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        visible_count = len(self.spatial_index.query_rect(*self._get_viewport_rect()))
+
+        composite = self.sprite_layer.render(
+            self._sprite_base_image,
+            points,
+            [marker["number"] for marker in self.coordinate_markers],
+            highlight_index=self._sprite_highlight_index,
+            show_labels=visible_count <= self.LABEL_MAX_MARKERS,
+            overlay=self._sprite_overlay,
+        )
+        self._sprite_tk_image = ImageTk.PhotoImage(composite)
+        self.canvas.itemconfig(self.current_image, image=self._sprite_tk_image)
+        self.canvas.image = self._sprite_tk_image
+        self._sprite_applied = True
+
+    def _restore_base_image(self):
+        """スプライト合成前の画像に戻す（編集モードへの切り替え時）"""
+        if self._sprite_applied and self.current_image and self._base_tk_image:
+            self.canvas.itemconfig(self.current_image, image=self._base_tk_image)
+            self.canvas.image = self._base_tk_image
+        self._sprite_applied = False
+
+    # endregion
+
+    def _get_viewport_rect(self) -> Tuple[float, float, float, float]:
+        """キャンバスの表示範囲（余白込み）を取得"""
+        canvas_width = self.canvas.winfo_width() or self.canvas_width
+        canvas_height = self.canvas.winfo_height() or self.canvas_height
+        margin = self.CULLING_MARGIN
+        return -margin, -margin, canvas_width + margin, canvas_height + margin
+
+    def _is_in_viewport(self, x: float, y: float) -> bool:
+        """座標がキャンバスの表示範囲（余白込み）にあるかどうか"""
+        left, top, right, bottom = self._get_viewport_rect()
+        return left <= x <= right and top <= y <= bottom
+
     def add_coordinate_marker(
-        self, x: int, y: int, number: int, color: str = "red"
+        self, x: int, y: int, number: int, color: str = "red", show_label: bool = True
     ) -> int:
         """座標マーカーを追加"""
+        marker_id = len(self.coordinate_markers)
+        self.spatial_index.add(x, y)
+
+        # 表示範囲外は描画せず位置だけ保持（当たり判定・ハイライト用）
+        if not self._is_in_viewport(x, y):
+            self.coordinate_markers.append(
+                {"id": marker_id, "circle": None, "text": None, "x": x, "y": y, "number": number}
+            )
+            return marker_id
+
         # 円マーカー
         circle = self.canvas.create_oval(
             x - 5, y - 5, x + 5, y + 5, fill=color, outline="black", width=2
         )
 
-        # 番号テキスト
-        text = self.canvas.create_text(
-            x, y - 15, text=str(number), fill="black", font=("Arial", 12, "bold")
-        )
+        # 番号テキスト（密集時は省略）
+        text = None
+        if show_label:
+            text = self.canvas.create_text(
+                x, y - 15, text=str(number), fill="black", font=("Arial", 12, "bold")
+            )
 
-        marker_id = len(self.coordinate_markers)
         self.coordinate_markers.append(
             {
                 "id": marker_id,
@@ -152,31 +368,140 @@ class CoordinateCanvasView:
 
         return marker_id
 
+    def _delete_marker_items(self, marker: Dict[str, Any]):
+        """マーカーのキャンバスアイテムを削除"""
+        if marker["circle"]:
+            self.canvas.delete(marker["circle"])
+        if marker["text"]:
+            self.canvas.delete(marker["text"])
+
     def remove_coordinate_marker(self, marker_id: int) -> bool:
         """座標マーカーを削除"""
         if 0 <= marker_id < len(self.coordinate_markers):
-            marker = self.coordinate_markers[marker_id]
-            self.canvas.delete(marker["circle"])
-            self.canvas.delete(marker["text"])
+            self._delete_marker_items(self.coordinate_markers[marker_id])
             return True
         return False
 
-    def clear_coordinate_markers(self):
-        """全座標マーカーをクリア"""
+    def _clear_marker_items(self):
+        """全座標マーカーのキャンバスアイテムと位置情報をクリア"""
         for marker in self.coordinate_markers:
-            self.canvas.delete(marker["circle"])
-            self.canvas.delete(marker["text"])
+            self._delete_marker_items(marker)
         self.coordinate_markers.clear()
+        self.canvas.delete("cluster")
+        self.spatial_index.clear()
+
+    def clear_coordinate_markers(self):
+        """全座標マーカーをクリア"""
+        self._clear_marker_items()
+        if self._sprite_applied:
+            # 合成済みのマーカーを消す
+            self._sprite_highlight_index = -1
+            self._render_sprites()
 
     def redraw_coordinate_markers(self, coordinates: List[Tuple[int, int]]):
-        """座標マーカーを再描画"""
-        self.clear_coordinate_markers()
+        """座標マーカーを詳細度（LOD）に応じて再描画
+
+        表示範囲内の点数に応じて、番号ラベル付き → ラベルなし → 密集部分を件数バッジに集約、
+        の順に描画を簡略化する。表示範囲外の点は描画しない。
+        """
+        self._clear_marker_items()
+
+        # 全点を空間インデックスに登録（当たり判定と共通）
+        self.spatial_index.build(coordinates)
+        self.coordinate_markers = [
+            {"id": i, "circle": None, "text": None, "x": x, "y": y, "number": i + 1}
+            for i, (x, y) in enumerate(coordinates)
+        ]
+
+        if self.is_sprite_active():
+            self._sprite_highlight_index = -1
+            self._render_sprites()
+            return
+        self._restore_base_image()
+
+        visible_indices = self.spatial_index.query_rect(*self._get_viewport_rect())
+        show_labels = len(visible_indices) <= self.LABEL_MAX_MARKERS
+
+        if len(visible_indices) <= self.CLUSTER_MIN_MARKERS:
+            for index in visible_indices.tolist():
+                self._draw_marker_items(index, show_labels)
+            return
+
+        # 密集部分はクラスタの件数バッジで表示
+        for center_x, center_y, indices in self.spatial_index.cluster(
+            visible_indices, self.CLUSTER_CELL_SIZE
+        ):
+            if len(indices) == 1:
+                self._draw_marker_items(indices[0], False)
+            else:
+                self._draw_cluster_badge(center_x, center_y, len(indices))
+
+    def _draw_marker_items(self, index: int, show_label: bool, color: str = "red"):
+        """登録済みのマーカーを描画"""
+        marker = self.coordinate_markers[index]
+        x, y = marker["x"], marker["y"]
+        marker["circle"] = self.canvas.create_oval(
+            x - 5, y - 5, x + 5, y + 5, fill=color, outline="black", width=2
+        )
+        if show_label:
+            marker["text"] = self.canvas.create_text(
+                x, y - 15, text=str(marker["number"]), fill="black", font=("Arial", 12, "bold")
+            )
+
+    def _draw_cluster_badge(self, x: float, y: float, count: int):
+        """密集した座標の件数バッジを描画"""
+        radius = 9 + min(len(str(count)), 4) * 3
+        self.canvas.create_oval(
+            x - radius,
+            y - radius,
+            x + radius,
+            y + radius,
+            fill="orange",
+            outline="black",
+            width=2,
+            tags=("cluster",),
+        )
+        self.canvas.create_text(
+            x, y, text=str(count), fill="black", font=("Arial", 10, "bold"), tags=("cluster",)
+        )
 
-        for i, (x, y) in enumerate(coordinates):
-            self.add_coordinate_marker(x, y, i + 1)
+    # region ゴーストマーカー
+
+    def show_ghost_markers(self, coordinates: List[Tuple[float, float]]):
+        """未確定のマーカーを破線の円で表示（表示範囲外は描画しない）"""
+        self.canvas.delete("ghost")
+        self.ghost_index.build(coordinates)
+        if not coordinates:
+            return
+        for index in self.ghost_index.query_rect(*self._get_viewport_rect()).tolist():
+            x, y = coordinates[index]
+            self.canvas.create_oval(
+                x - 7, y - 7, x + 7, y + 7, outline="gray40", width=2, dash=(3, 2), tags=("ghost",)
+            )
+        # 画像の上、確定済みのマーカーの下に表示
+        if self.current_image:
+            self.canvas.tag_raise("ghost", self.current_image)
+
+    def clear_ghost_markers(self):
+        """未確定のマーカーを消去"""
+        self.canvas.delete("ghost")
+        self.ghost_index.clear()
+
+    def find_nearest_ghost(self, x: int, y: int, max_distance: int = 12) -> Optional[int]:
+        """最寄りの未確定のマーカーのインデックスを検索"""
+        return self.ghost_index.nearest(x, y, max_distance)
+
+    # endregion
 
     def highlight_coordinate(self, index: int):
         """指定した座標をハイライト"""
+        if self._sprite_applied:
+            # スプライト描画時はハイライトも合成し直す
+            if index != self._sprite_highlight_index:
+                self._sprite_highlight_index = index
+                self._render_sprites()
+            return
+
         self.clear_highlight()
 
         if 0 <= index < len(self.coordinate_markers):
@@ -190,6 +515,9 @@ class CoordinateCanvasView:
 
     def clear_highlight(self):
         """ハイライトをクリア"""
+        if self._sprite_applied and self._sprite_highlight_index != -1:
+            self._sprite_highlight_index = -1
+            self._render_sprites()
         if self.highlight_marker:
             self.canvas.delete(self.highlight_marker)
             self.highlight_marker = None
@@ -198,8 +526,15 @@ class CoordinateCanvasView:
         """キャンバスをクリア"""
         self.canvas.delete("all")
         self.coordinate_markers.clear()
+        self.spatial_index.clear()
+        self.ghost_index.clear()
         self.highlight_marker = None
         self.current_image = None
+        self.overlay_image = None
+        self.overlay_tk_image = None
+        self._sprite_overlay = None
+        self._sprite_applied = False
+        self._sprite_highlight_index = -1
 
     def get_canvas_coordinates(self, event) -> Tuple[int, int]:
         """イベントからキャンバス座標を取得"""
@@ -209,18 +544,7 @@ class CoordinateCanvasView:
         self, x: int, y: int, max_distance: int = 20
     ) -> Optional[int]:
         """最寄りの座標インデックスを検索"""
-        min_distance = float("inf")
-        nearest_index = None
-
-        for i, marker in enumerate(self.coordinate_markers):
-            marker_x, marker_y = marker["x"], marker["y"]
-            distance = ((x - marker_x) ** 2 + (y - marker_y) ** 2) ** 0.5
-
-            if distance <= max_distance and distance < min_distance:
-                min_distance = distance
-                nearest_index = i
-
-        return nearest_index
+        return self.spatial_index.nearest(x, y, max_distance)
 
     def update_canvas_size(self, width: int, height: int):
         """キャンバスサイズを更新"""
@@ -245,6 +569,8 @@ class CoordinateCanvasView:
 
             # 画像を新しい位置に移動
             self.canvas.coords(self.current_image, center_x, center_y)
+            if self.overlay_image:
+                self.canvas.coords(self.overlay_image, center_x, center_y)
             print(f"[DEBUG] 画像を再配置: 新しい中央位置({center_x}, {center_y})")
 
     def get_image_offset(self) -> Tuple[int, int]:
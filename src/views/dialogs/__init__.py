@@ -1,17 +1,49 @@
 """
 Dialog Views
 ダイアログウィンドウを管理するビュー層
+
+ダイアログは表示する時にインポート
 """
 
-from .worker_input_dialog import WorkerInputDialog
-from .settings_dialog import SettingsDialog
-from .date_select_dialog import DateSelectDialog
-from .item_tag_switch_dialog import ItemTagSwitchDialog, show_item_tag_switch_dialog
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .worker_input_dialog import WorkerInputDialog
+    from .settings_dialog import SettingsDialog
+    from .date_select_dialog import DateSelectDialog
+    from .item_tag_switch_dialog import ItemTagSwitchDialog
+    from .item_tag_switch_dialog import show_item_tag_switch_dialog
+    from .defect_search_dialog import DefectSearchDialog
+    from .report_export_dialog import ReportExportDialog
+
+# 公開名: 定義元のモジュール
+_EXPORTS = {
+    "WorkerInputDialog": ".worker_input_dialog",
+    "SettingsDialog": ".settings_dialog",
+    "DateSelectDialog": ".date_select_dialog",
+    "ItemTagSwitchDialog": ".item_tag_switch_dialog",
+    "show_item_tag_switch_dialog": ".item_tag_switch_dialog",
+    "DefectSearchDialog": ".defect_search_dialog",
+    "ReportExportDialog": ".report_export_dialog",
+}
 
 __all__ = [
-    'WorkerInputDialog',
-    'SettingsDialog',
-    'DateSelectDialog',
-    'ItemTagSwitchDialog',
-    'show_item_tag_switch_dialog'
+    "WorkerInputDialog",
+    "SettingsDialog",
+    "DateSelectDialog",
+    "ItemTagSwitchDialog",
+    "show_item_tag_switch_dialog",
+    "DefectSearchDialog",
+    "ReportExportDialog",
 ]
+
+
+def __getattr__(name: str):
+    """公開名を初めて参照した時に定義元のモジュールをインポート"""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,275 @@
+"""
+不良検索ダイアログ
+ロット横断の不良検索（閲覧モード用）を管理
+"""
+import threading
+import tkinter as tk
+from tkinter import messagebox, ttk
+from typing import Any, Dict, List, Optional
+
+
+class DefectSearchDialog:
+    """不良検索ダイアログ"""
+
+    PAGE_SIZE = 100
+
+    # 検索結果の表示列（列キー, 見出し, 幅）
+    RESULT_COLUMNS = [
+        ("detail_date", "日付", 90),
+        ("model", "モデル", 180),
+        ("lot_number", "指図", 100),
+        ("board_number", "基板No", 60),
+        ("count_number", "座標No", 60),
+        ("reference", "リファレンス", 100),
+        ("defect", "不良名", 100),
+        ("repaired", "修理済み", 70),
+        ("worker_number", "作業者", 80),
+    ]
+
+    def __init__(self, parent: tk.Tk, index_model=None, defect_items: Optional[List[str]] = None):
+        self.parent = parent
+        self.index_model = index_model
+        self.defect_items = defect_items or []
+        self.dialog = None
+
+        # 検索条件変数
+        self.lot_number_var = tk.StringVar()
+        self.model_var = tk.StringVar()
+        self.date_from_var = tk.StringVar()
+        self.date_to_var = tk.StringVar()
+        self.reference_var = tk.StringVar()
+        self.defect_var = tk.StringVar()
+        self.worker_var = tk.StringVar()
+        self.repaired_var = tk.StringVar()
+        self.status_var = tk.StringVar(value="")
+
+        # ページング状態
+        self.current_page = 0
+        self.total_count = 0
+        self.current_filters: Dict[str, str] = {}
+
+        # インデックス更新の進捗（バックグラウンドスレッドから書き込み）
+        self._refresh_progress = (0, 0)
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def show(self):
+        """ダイアログを表示"""
+        self.dialog = tk.Toplevel(self.parent)
+        self.dialog.title("不良検索")
+        self.dialog.geometry("1000x600")
+
+        # モーダルダイアログに設定
+        self.dialog.transient(self.parent)
+        self.dialog.grab_set()
+
+        # センタリング
+        self.dialog.update_idletasks()
+        x = (self.dialog.winfo_screenwidth() // 2) - (1000 // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (600 // 2)
+        self.dialog.geometry(f"1000x600+{x}+{y}")
+
+        self._setup_ui()
+
+        # 開いた時点でインデックスを差分更新
+        self._start_index_refresh()
+
+        # ダイアログが閉じられるまで待機
+        self.dialog.wait_window()
+
+    def _setup_ui(self):
+        """UIを設定"""
+        # 検索条件フレーム
+        filter_frame = tk.LabelFrame(self.dialog, text="検索条件", font=("Arial", 10))
+        filter_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        fields = [
+            ("指図", self.lot_number_var, 0, 0),
+            ("モデル", self.model_var, 0, 2),
+            ("開始日", self.date_from_var, 0, 4),
+            ("終了日", self.date_to_var, 0, 6),
+            ("リファレンス", self.reference_var, 1, 0),
+            ("作業者", self.worker_var, 1, 4),
+        ]
+        for label_text, variable, row, column in fields:
+            tk.Label(filter_frame, text=label_text, font=("Arial", 10)).grid(
+                row=row, column=column, padx=5, pady=5, sticky="e"
+            )
+            entry = tk.Entry(filter_frame, textvariable=variable, width=18)
+            entry.grid(row=row, column=column + 1, padx=5, pady=5, sticky="w")
+            entry.bind("<Return>", lambda e: self._on_search())
+
+        # 不良名
+        tk.Label(filter_frame, text="不良名", font=("Arial", 10)).grid(
+            row=1, column=2, padx=5, pady=5, sticky="e"
+        )
+        ttk.Combobox(
+            filter_frame,
+            textvariable=self.defect_var,
+            values=[""] + self.defect_items,
+            width=16,
+        ).grid(row=1, column=3, padx=5, pady=5, sticky="w")
+
+        # 修理済み
+        tk.Label(filter_frame, text="修理済み", font=("Arial", 10)).grid(
+            row=1, column=6, padx=5, pady=5, sticky="e"
+        )
+        ttk.Combobox(
+            filter_frame,
+            textvariable=self.repaired_var,
+            values=["", "はい", "いいえ"],
+            state="readonly",
+            width=8,
+        ).grid(row=1, column=7, padx=5, pady=5, sticky="w")
+
+        tk.Label(
+            filter_frame,
+            text="※ 日付は YYYY-MM-DD、* でワイルドカード検索",
+            font=("Arial", 9),
+            fg="gray",
+        ).grid(row=2, column=0, columnspan=6, padx=5, sticky="w")
+
+        tk.Button(
+            filter_frame, text="検索", command=self._on_search, font=("Arial", 10), width=10
+        ).grid(row=2, column=7, padx=5, pady=5, sticky="e")
+
+        # 検索結果フレーム
+        result_frame = tk.Frame(self.dialog)
+        result_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        self.result_tree = ttk.Treeview(
+            result_frame,
+            columns=[column for column, _, _ in self.RESULT_COLUMNS],
+            show="headings",
+        )
+        for column, heading, width in self.RESULT_COLUMNS:
+            self.result_tree.heading(column, text=heading)
+            self.result_tree.column(column, width=width, anchor="center")
+
+        scrollbar = ttk.Scrollbar(result_frame, orient=tk.VERTICAL, command=self.result_tree.yview)
+        self.result_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.result_tree.pack(fill=tk.BOTH, expand=True)
+
+        # ページング・ステータスフレーム
+        footer_frame = tk.Frame(self.dialog)
+        footer_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        tk.Label(footer_frame, textvariable=self.status_var, font=("Arial", 10)).pack(side=tk.LEFT)
+
+        tk.Button(
+            footer_frame, text="閉じる", command=self.dialog.destroy, font=("Arial", 10), width=8
+        ).pack(side=tk.RIGHT, padx=5)
+        self.next_button = tk.Button(
+            footer_frame, text="次へ", command=self._on_next_page, font=("Arial", 10), width=8
+        )
+        self.next_button.pack(side=tk.RIGHT, padx=5)
+        self.prev_button = tk.Button(
+            footer_frame, text="前へ", command=self._on_prev_page, font=("Arial", 10), width=8
+        )
+        self.prev_button.pack(side=tk.RIGHT, padx=5)
+        self._update_paging_buttons()
+
+    # region インデックス更新
+
+    def _start_index_refresh(self):
+        """インデックスの差分更新をバックグラウンドで開始"""
+        if not self.index_model:
+            self.status_var.set("データディレクトリが設定されていません。")
+            return
+
+        def progress(processed: int, total: int):
+            self._refresh_progress = (processed, total)
+
+        self._refresh_thread = threading.Thread(
+            target=self.index_model.refresh, kwargs={"progress_callback": progress}, daemon=True
+        )
+        self._refresh_thread.start()
+        self._poll_index_refresh()
+
+    def _poll_index_refresh(self):
+        """インデックス更新の進捗をUIスレッドで反映"""
+        if not self.dialog or not self.dialog.winfo_exists():
+            return
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            processed, total = self._refresh_progress
+            self.status_var.set(f"インデックス更新中... {processed} / {total} ファイル")
+            self.dialog.after(100, self._poll_index_refresh)
+        else:
+            self.status_var.set("インデックス更新完了")
+            self._on_search()
+
+    # endregion
+
+    # region 検索
+
+    def _collect_filters(self) -> Dict[str, str]:
+        """入力された検索条件を取得"""
+        return {
+            "lot_number": self.lot_number_var.get().strip(),
+            "model": self.model_var.get().strip(),
+            "date_from": self.date_from_var.get().strip(),
+            "date_to": self.date_to_var.get().strip(),
+            "reference": self.reference_var.get().strip().upper(),
+            "defect": self.defect_var.get().strip(),
+            "worker_number": self.worker_var.get().strip(),
+            "repaired": self.repaired_var.get().strip(),
+        }
+
+    def _on_search(self):
+        """検索ボタン押下時の処理"""
+        if not self.index_model:
+            return
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            # 更新完了後に自動で検索される
+            return
+
+        self.current_filters = self._collect_filters()
+        self.current_page = 0
+        try:
+            self.total_count = self.index_model.count(**self.current_filters)
+        except Exception as e:
+            messagebox.showerror("検索エラー", f"検索に失敗しました: {e}", parent=self.dialog)
+            return
+        self._load_page()
+
+    def _load_page(self):
+        """現在のページの検索結果を表示"""
+        rows = self.index_model.search(
+            offset=self.current_page * self.PAGE_SIZE,
+            limit=self.PAGE_SIZE,
+            **self.current_filters,
+        )
+        self._populate_results(rows)
+
+        first = self.current_page * self.PAGE_SIZE + 1 if rows else 0
+        last = self.current_page * self.PAGE_SIZE + len(rows)
+        self.status_var.set(f"{self.total_count}件中 {first}-{last}件を表示")
+        self._update_paging_buttons()
+
+    def _populate_results(self, rows: List[Dict[str, Any]]):
+        """検索結果をツリービューに表示"""
+        self.result_tree.delete(*self.result_tree.get_children())
+        for row in rows:
+            values = [row.get(column, "") for column, _, _ in self.RESULT_COLUMNS]
+            self.result_tree.insert("", tk.END, values=values)
+
+    def _on_prev_page(self):
+        """前のページを表示"""
+        if self.current_page > 0:
+            self.current_page -= 1
+            self._load_page()
+
+    def _on_next_page(self):
+        """次のページを表示"""
+        if (self.current_page + 1) * self.PAGE_SIZE < self.total_count:
+            self.current_page += 1
+            self._load_page()
+
+    def _update_paging_buttons(self):
+        """ページングボタンの有効/無効を更新"""
+        has_prev = self.current_page > 0
+        has_next = (self.current_page + 1) * self.PAGE_SIZE < self.total_count
+        self.prev_button.config(state=tk.NORMAL if has_prev else tk.DISABLED)
+        self.next_button.config(state=tk.NORMAL if has_next else tk.DISABLED)
+
+    # endregion
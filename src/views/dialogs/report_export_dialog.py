@@ -0,0 +1,140 @@
+"""
+不良集計レポートダイアログ
+集計期間・モデル・集計元・書き出し形式の入力を管理
+"""
+import importlib.util
+import tkinter as tk
+from datetime import date, datetime
+from tkinter import messagebox, ttk
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ReportExportDialog:
+    """不良集計レポートの条件を入力するダイアログ"""
+
+    # 書き出し形式（表示名, 拡張子）。先頭が既定
+    FORMATS = [
+        ("CSV（集計表ごと）", ".csv"),
+        ("Parquet（集計表ごと）", ".parquet"),
+        ("Excel（.xlsx）", ".xlsx"),
+    ]
+    # 任意の依存ライブラリが必要な形式（拡張子 → モジュール名）
+    OPTIONAL_FORMATS = {".xlsx": "openpyxl"}
+
+    @classmethod
+    def available_formats(cls) -> List[Tuple[str, str]]:
+        """選択できる書き出し形式（必要なライブラリがない形式は除く）"""
+        return [
+            (label, suffix)
+            for label, suffix in cls.FORMATS
+            if suffix not in cls.OPTIONAL_FORMATS
+            or importlib.util.find_spec(cls.OPTIONAL_FORMATS[suffix]) is not None
+        ]
+
+    def __init__(self, parent: tk.Tk, model_names: Optional[List[str]] = None, model: str = ""):
+        self.parent = parent
+        self.model_names = model_names or []
+        self.result: Optional[Dict[str, Any]] = None
+        self.dialog = None
+
+        # 既定の期間は今月
+        today = date.today()
+        self.date_from_var = tk.StringVar(value=today.replace(day=1).strftime("%Y-%m-%d"))
+        self.date_to_var = tk.StringVar(value=today.strftime("%Y-%m-%d"))
+        self.model_var = tk.StringVar(value=model)
+        self.use_index_var = tk.BooleanVar(value=False)
+        self.formats = self.available_formats()
+        self.format_var = tk.StringVar(value=self.formats[0][0])
+
+    def show(self) -> Optional[Dict[str, Any]]:
+        """ダイアログを表示
+
+        Returns:
+            Optional[Dict[str, Any]]: {"date_from", "date_to", "model", "use_index", "suffix"}
+            （キャンセル時は None）
+        """
+        self.dialog = tk.Toplevel(self.parent)
+        self.dialog.title("不良集計レポート")
+        self.dialog.resizable(False, False)
+
+        # モーダルダイアログに設定
+        self.dialog.transient(self.parent)
+        self.dialog.grab_set()
+
+        self._setup_ui()
+
+        # センタリング
+        self.dialog.update_idletasks()
+        width, height = self.dialog.winfo_width(), self.dialog.winfo_height()
+        x = (self.dialog.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (height // 2)
+        self.dialog.geometry(f"+{x}+{y}")
+
+        # ダイアログが閉じられるまで待機
+        self.dialog.wait_window()
+
+        return self.result
+
+    def _setup_ui(self):
+        """UIを設定"""
+        main_frame = tk.Frame(self.dialog)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=15)
+
+        for row, (label_text, variable) in enumerate((("開始日", self.date_from_var), ("終了日", self.date_to_var))):
+            tk.Label(main_frame, text=label_text, font=("Arial", 10)).grid(row=row, column=0, padx=5, pady=5, sticky="e")
+            tk.Entry(main_frame, textvariable=variable, width=14).grid(row=row, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(main_frame, text="モデル", font=("Arial", 10)).grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        ttk.Combobox(
+            main_frame, textvariable=self.model_var, values=[""] + self.model_names, width=24
+        ).grid(row=2, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(main_frame, text="形式", font=("Arial", 10)).grid(row=3, column=0, padx=5, pady=5, sticky="e")
+        ttk.Combobox(
+            main_frame,
+            textvariable=self.format_var,
+            values=[label for label, _ in self.formats],
+            state="readonly",
+            width=24,
+        ).grid(row=3, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Checkbutton(
+            main_frame, text="検索インデックスから集計する", variable=self.use_index_var, font=("Arial", 10)
+        ).grid(row=4, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+
+        tk.Label(
+            main_frame,
+            text="※ 日付は YYYY-MM-DD（空欄は制限なし）、モデルは空欄で全モデル・* でワイルドカード",
+            font=("Arial", 9),
+            fg="gray",
+        ).grid(row=5, column=0, columnspan=2, padx=5, sticky="w")
+
+        button_frame = tk.Frame(main_frame)
+        button_frame.grid(row=6, column=0, columnspan=2, pady=(15, 0))
+        tk.Button(button_frame, text="書き出し", command=self._on_ok, width=10).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="キャンセル", command=self.dialog.destroy, width=10).pack(side=tk.LEFT, padx=5)
+
+    def _on_ok(self):
+        """入力を検証して閉じる"""
+        dates = {}
+        for key, variable in (("date_from", self.date_from_var), ("date_to", self.date_to_var)):
+            value = variable.get().strip()
+            if value:
+                try:
+                    value = datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+                except ValueError:
+                    messagebox.showerror("入力エラー", f"日付の形式が正しくありません: {value}", parent=self.dialog)
+                    return
+            dates[key] = value
+        if dates["date_from"] and dates["date_to"] and dates["date_from"] > dates["date_to"]:
+            messagebox.showerror("入力エラー", "開始日が終了日より後になっています。", parent=self.dialog)
+            return
+
+        suffix = dict(self.formats)[self.format_var.get()]
+        self.result = {
+            **dates,
+            "model": self.model_var.get().strip(),
+            "use_index": bool(self.use_index_var.get()),
+            "suffix": suffix,
+        }
+        self.dialog.destroy()
@@ -14,6 +14,7 @@ from typing import (
     List,
     Optional,
     Protocol,
+    Tuple,
     TypedDict,
     Union,
     overload,
@@ -42,6 +43,9 @@ class CallbackTypes(TypedDict, total=False):
     save_file: CallbackProtocol
     exit_app: CallbackProtocol
     delete_file: CallbackProtocol
+    import_coordinates: CallbackProtocol
+    export_board_coordinates: CallbackProtocol
+    export_lot_coordinates: CallbackProtocol
 
     # 編集操作
     undo_action: CallbackProtocol
@@ -74,6 +78,23 @@ class CallbackTypes(TypedDict, total=False):
     prev_board: CallbackProtocol
     next_board: CallbackProtocol
     delete_board: CallbackProtocol
+    toggle_carry_forward: CallbackProtocol
+    confirm_all_ghosts: CallbackProtocol
+    discard_ghosts: CallbackProtocol
+
+    # 検索操作
+    search_coordinates: CallbackProtocol
+
+    # 表示操作
+    toggle_heatmap: CallbackProtocol
+    reset_zoom: CallbackProtocol
+
+    # ツール操作
+    check_lot_health: CallbackProtocol
+    check_lot_health_quick: CallbackProtocol
+    import_component_file: CallbackProtocol
+    calibrate_components: CallbackProtocol
+    export_defect_report: CallbackProtocol
 
 
 class MainView:
@@ -111,10 +132,15 @@ class MainView:
         self.content_header_frame = None
         self.canvas_top_frame = None
         self.canvas_frame = None
+        self.timeline_frame = None
 
         # 生産情報用変数
         self.save_name_var = tk.StringVar(value="")
 
+        # 表示設定用変数
+        self.heatmap_var = tk.BooleanVar(value=False)
+        self.carry_forward_var = tk.BooleanVar(value=False)
+
         # UI設定の初期化
         self._setup_layout()
 
@@ -174,6 +200,10 @@ class MainView:
         self.menu_frame = tk.Frame(self.content_frame)
         self.menu_frame.pack(fill=tk.X, padx=5, pady=5)
 
+        # 基板タイムラインフレーム（キャンバス下部）
+        self.timeline_frame = tk.Frame(self.content_frame)
+        self.timeline_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=30, pady=(0, 5))
+
         # キャンバスフレーム
         self.canvas_frame = tk.Frame(
             self.content_frame, relief=tk.SUNKEN, borderwidth=3, bg="#f0f0f0"
@@ -195,6 +225,19 @@ class MainView:
         file_menu.add_command(label="開く", command=self.get_callback("open_file"))
         file_menu.add_command(label="保存", command=self.get_callback("save_file"))
         file_menu.add_separator()
+        file_menu.add_command(
+            label="座標の取り込み（CSV/TSV/JSON）",
+            command=self.get_callback("import_coordinates"),
+        )
+        file_menu.add_command(
+            label="座標の書き出し（現在の基盤）",
+            command=self.get_callback("export_board_coordinates"),
+        )
+        file_menu.add_command(
+            label="座標の書き出し（ロット全体）",
+            command=self.get_callback("export_lot_coordinates"),
+        )
+        file_menu.add_separator()
         file_menu.add_command(label="終了", command=self.get_callback("exit_app"))
 
         # 編集メニュー
@@ -231,6 +274,66 @@ class MainView:
         board_menu.add_command(
             label="基盤削除", command=self.get_callback("delete_board")
         )
+        board_menu.add_separator()
+        board_menu.add_checkbutton(
+            label="前の基盤の座標を引き継ぐ",
+            variable=self.carry_forward_var,
+            command=self.get_callback("toggle_carry_forward"),
+        )
+        board_menu.add_command(
+            label="引き継いだ座標を全て確定",
+            accelerator="Ctrl+Enter",
+            command=self.get_callback("confirm_all_ghosts"),
+        )
+        board_menu.add_command(
+            label="引き継いだ座標を破棄",
+            command=self.get_callback("discard_ghosts"),
+        )
+
+        # 表示メニュー
+        display_menu = tk.Menu(menu_bar, tearoff=False)
+        menu_bar.add_cascade(label="表示", menu=display_menu)
+        display_menu.add_checkbutton(
+            label="不良ヒートマップ",
+            variable=self.heatmap_var,
+            command=self.get_callback("toggle_heatmap"),
+        )
+        display_menu.add_separator()
+        display_menu.add_command(
+            label="ズームをリセット", command=self.get_callback("reset_zoom")
+        )
+
+        # 検索メニュー
+        search_menu = tk.Menu(menu_bar, tearoff=False)
+        menu_bar.add_cascade(label="検索", menu=search_menu)
+        search_menu.add_command(
+            label="不良検索", command=self.get_callback("search_coordinates")
+        )
+
+        # ツールメニュー
+        tool_menu = tk.Menu(menu_bar, tearoff=False)
+        menu_bar.add_cascade(label="ツール", menu=tool_menu)
+        tool_menu.add_command(
+            label="ロット整合性チェック", command=self.get_callback("check_lot_health")
+        )
+        tool_menu.add_command(
+            label="ロット整合性チェック（簡易）",
+            command=self.get_callback("check_lot_health_quick"),
+        )
+        tool_menu.add_separator()
+        tool_menu.add_command(
+            label="部品表・部品座標の取り込み",
+            command=self.get_callback("import_component_file"),
+        )
+        tool_menu.add_command(
+            label="部品座標のキャリブレーション",
+            command=self.get_callback("calibrate_components"),
+        )
+        tool_menu.add_separator()
+        tool_menu.add_command(
+            label="不良集計レポートの書き出し",
+            command=self.get_callback("export_defect_report"),
+        )
 
     def setup_top_controls(self):
         """トップコントロールを設定 - 既存UIと同じスタイル"""
@@ -549,6 +652,14 @@ class MainView:
         if self.redo_button:
             self.redo_button.config(state=tk.NORMAL if can_redo else tk.DISABLED)
 
+    def is_heatmap_enabled(self) -> bool:
+        """ヒートマップ表示が有効かどうか"""
+        return self.heatmap_var.get()
+
+    def set_heatmap_enabled(self, enabled: bool):
+        """ヒートマップ表示の有効/無効を設定"""
+        self.heatmap_var.set(enabled)
+
     def get_current_mode(self) -> str:
         """現在のモードを取得"""
         return self.mode_var.get()
@@ -864,6 +975,29 @@ class MainView:
 
         messagebox.showwarning(title, message)
 
+    def ask_open_filename(self, title: str, filetypes: List[Tuple[str, str]]) -> str:
+        """開くファイルを選択（キャンセル時は空文字）"""
+        from tkinter import filedialog
+
+        return filedialog.askopenfilename(parent=self.root, title=title, filetypes=filetypes) or ""
+
+    def ask_save_filename(
+        self, title: str, filetypes: List[Tuple[str, str]], initialfile: str = "", defaultextension: str = ""
+    ) -> str:
+        """保存先のファイルを選択（キャンセル時は空文字）"""
+        from tkinter import filedialog
+
+        return (
+            filedialog.asksaveasfilename(
+                parent=self.root,
+                title=title,
+                filetypes=filetypes,
+                initialfile=initialfile,
+                defaultextension=defaultextension,
+            )
+            or ""
+        )
+
     def show_confirmation_dialog(self, message: str, title: str = "確認") -> bool:
         """確認ダイアログを表示"""
         from tkinter import messagebox
@@ -945,6 +1079,7 @@ class MainView:
 
         # 辞書データを保持（画像パス取得で使用）
         self.model_data = model_data
+        self._model_paths = {name: path for item in model_data if item for name, path in item.items()}
 
         # コンボボックスの値を更新
         self.model_combobox["values"] = model_values
@@ -961,14 +1096,7 @@ class MainView:
 
     def get_model_image_path(self, model_name: str) -> str:
         """選択されたモデルの画像パスを取得"""
-        if not hasattr(self, "model_data") or not self.model_data:
-            return ""
-
-        for model_dict in self.model_data:
-            if model_name in model_dict:
-                return model_dict[model_name]
-
-        return ""
+        return getattr(self, "_model_paths", {}).get(model_name, "")
 
     def clear_lot_number_entry(self):
         self.lot_number_entry.delete(0, tk.END)
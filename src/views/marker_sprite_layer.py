@@ -0,0 +1,115 @@
+"""
+マーカースプライトレイヤー
+閲覧モード用に全マーカー・番号・ハイライトを1枚のRGBA画像へラスタライズ
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+class MarkerSpriteLayer:
+    """マーカーをスプライトとして画像に合成するレンダラー"""
+
+    # アンチエイリアス用の拡大率
+    SUPERSAMPLE = 4
+
+    def __init__(self):
+        # キャンバスのベクターマーカーと同じ見た目のスプライト
+        self._marker_sprite = self._create_circle_sprite(5, (255, 0, 0, 255), (0, 0, 0, 255), 2)
+        self._highlight_sprite = self._create_circle_sprite(10, None, (255, 255, 0, 255), 3)
+        self._font = self._load_font()
+
+    def _create_circle_sprite(
+        self,
+        radius: int,
+        fill: Optional[Tuple[int, int, int, int]],
+        outline: Tuple[int, int, int, int],
+        width: int,
+    ) -> Image.Image:
+        """円のスプライトを生成（拡大して描画後に縮小）"""
+        size = (radius + width) * 2 + 1
+        scale = self.SUPERSAMPLE
+        sprite = Image.new("RGBA", (size * scale, size * scale), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(sprite)
+        margin = width * scale // 2
+        draw.ellipse(
+            (margin, margin, size * scale - margin - 1, size * scale - margin - 1),
+            fill=fill,
+            outline=outline,
+            width=width * scale,
+        )
+        return sprite.resize((size, size), Image.Resampling.LANCZOS)
+
+    def _load_font(self) -> ImageFont.ImageFont:
+        """番号表示用のフォントを読み込み（見つからない場合は既定フォント）"""
+        for font_name in ("arialbd.ttf", "Arial Bold.ttf", "arial.ttf", "DejaVuSans-Bold.ttf"):
+            try:
+                return ImageFont.truetype(font_name, 16)
+            except OSError:
+                continue
+        return ImageFont.load_default()
+
+    def render(
+        self,
+        base_image: Image.Image,
+        points: np.ndarray,
+        numbers: List[int],
+        highlight_index: int = -1,
+        show_labels: bool = True,
+        overlay: Optional[Image.Image] = None,
+    ) -> Image.Image:
+        """画像にオーバーレイとマーカーを合成
+
+        Args:
+            base_image: 表示中の画像
+            points: (N, 2) のマーカー位置（base_imageの左上を原点とする座標）
+            numbers: マーカーの番号
+            highlight_index: ハイライトするマーカーのインデックス（-1でなし）
+            show_labels: 番号を描画するかどうか
+            overlay: 画像とマーカーの間に重ねる半透明画像（ヒートマップ）
+        """
+        composite = base_image.convert("RGBA")
+        if overlay is not None:
+            if overlay.size != composite.size:
+                overlay = overlay.resize(composite.size, Image.Resampling.BILINEAR)
+            composite = Image.alpha_composite(composite, overlay)
+
+        width, height = composite.size
+        layer = Image.new("RGBA", composite.size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        half = self._marker_sprite.width // 2
+        inside = np.flatnonzero(
+            (points[:, 0] >= -half)
+            & (points[:, 0] <= width + half)
+            & (points[:, 1] >= -half)
+            & (points[:, 1] <= height + half)
+        )
+        positions = np.rint(points[inside]).astype(np.int64).tolist()
+
+        for x, y in positions:
+            layer.paste(self._marker_sprite, (x - half, y - half), self._marker_sprite)
+
+        if show_labels:
+            for index, (x, y) in zip(inside.tolist(), positions):
+                draw.text(
+                    (x, y - 15),
+                    str(numbers[index]),
+                    fill=(0, 0, 0, 255),
+                    font=self._font,
+                    anchor="mm",
+                )
+
+        if 0 <= highlight_index < len(points):
+            x, y = np.rint(points[highlight_index]).astype(np.int64).tolist()
+            highlight_half = self._highlight_sprite.width // 2
+            layer.paste(
+                self._highlight_sprite,
+                (x - highlight_half, y - highlight_half),
+                self._highlight_sprite,
+            )
+
+        return Image.alpha_composite(composite, layer)
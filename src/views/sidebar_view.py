@@ -14,6 +14,9 @@ import unicodedata
 class SidebarView:
     """サイドバーを管理するビュー"""
 
+    # 不良名の候補を絞り込まないキー（候補の選択・確定に使う）
+    DEFECT_NAVIGATION_KEYS = {"Return", "KP_Enter", "Tab", "Up", "Down", "Escape"}
+
     def __init__(self, parent_frame: tk.Frame):
         self.parent_frame = parent_frame
 
@@ -21,6 +24,8 @@ class SidebarView:
         self.item_number_var = tk.StringVar()
         self.reference_var = tk.StringVar()
         self.defect_var = tk.StringVar()
+        # 不良名の入力中の文字列（確定するまで defect_var には反映しない）
+        self.defect_query_var = tk.StringVar()
         self.serial_var = tk.StringVar()
 
         # ロット番号（表示用）
@@ -183,13 +188,17 @@ class SidebarView:
         # リファレンス入力フィールドにEnterキーのバインド
         self.reference_entry.bind("<Return>", self._on_entry_return)
         # リファレンス入力フィールドに入力があるたびに呼ばれる
-        self.reference_entry.bind("<KeyRelease>", self.to_ref_halfwidth)
+        self.reference_entry.bind("<KeyRelease>", self._on_reference_key_release)
 
         # 不良名
         self.defect_combobox = self._create_defect_selection()
 
         # 不良名入力フィールドの値が変更されたら
         self.defect_combobox.bind("<<ComboboxSelected>>", self._on_defect_selected)
+        # 入力に合わせて候補を絞り込み、Enter・フォーカス移動で確定
+        self.defect_combobox.bind("<KeyRelease>", self._on_defect_query_changed)
+        self.defect_combobox.bind("<Return>", self._commit_defect_query)
+        self.defect_combobox.bind("<FocusOut>", self._commit_defect_query)
 
         # 区切り線
         separator3 = tk.Frame(self.parent_frame, height=1, bg="#cccccc")
@@ -232,14 +241,72 @@ class SidebarView:
             self.reference_entry.delete(0, tk.END)
             self.reference_entry.insert(0, half)
 
+    def _on_reference_key_release(self, event: tk.Event):
+        """リファレンスを半角に揃え、部品番号の候補で入力の続きを補完"""
+        self.to_ref_halfwidth(event)
+        # 文字の入力時のみ補完（削除・カーソル移動では補完しない）
+        if not event.char or not event.char.isprintable():
+            return
+        self._complete_reference()
+
+    def _complete_reference(self):
+        """最上位の候補の残りをカーソルの後ろに選択状態で挿入（続けて入力すると置き換わる）"""
+        entry = self.reference_entry
+        if "complete_reference" not in self.callbacks or entry.index(tk.INSERT) != entry.index(tk.END):
+            return
+        text = entry.get()
+        if not text:
+            return
+        candidates = self.callbacks["complete_reference"](text)
+        if not candidates or candidates[0] == text or not candidates[0].startswith(text):
+            return
+        entry.insert(tk.END, candidates[0][len(text) :])
+        entry.icursor(len(text))
+        entry.selection_range(len(text), tk.END)
+
     def _on_entry_return(self, event: tk.Event):
         """エンターキーが押されたときの処理"""
         # コントローラーのコールバックを呼び出し
         if "on_entry_return" in self.callbacks:
             self.callbacks["on_entry_return"](event)
 
+    def _on_defect_query_changed(self, event: tk.Event):
+        """不良名の入力に合わせて候補を絞り込む"""
+        if event.keysym in self.DEFECT_NAVIGATION_KEYS:
+            return
+        self.defect_combobox["values"] = self._filter_defects(self.defect_query_var.get())
+
+    def _filter_defects(self, query: str) -> List[str]:
+        """検索語に一致する不良項目を候補の順に取得"""
+        if "filter_defects" in self.callbacks:
+            return self.callbacks["filter_defects"](query)
+        return [item for item in self.defect_items if query in item]
+
+    def _commit_defect_query(self, event: Optional[tk.Event] = None):
+        """入力中の文字列を不良名として確定（完全一致がなければ最上位の候補）"""
+        query = self.defect_query_var.get().strip()
+        if not query:
+            defect = ""
+        elif query in self.defect_items:
+            defect = query
+        else:
+            candidates = self._filter_defects(query)
+            defect = candidates[0] if candidates else self.defect_var.get()
+
+        if defect != self.defect_var.get():
+            self.defect_var.set(defect)
+        else:
+            self.defect_query_var.set(defect)
+        # 候補を全件（使用回数順）に戻す
+        self.defect_combobox["values"] = self._filter_defects("")
+
+    def _sync_defect_query(self, *args):
+        """defect_var の変更を入力欄に反映"""
+        self.defect_query_var.set(self.defect_var.get())
+
     def _on_defect_selected(self, event: tk.Event):
         """不良名が選択されたときの処理"""
+        self._commit_defect_query()
         # コントローラーのコールバックを呼び出し
         if "on_defect_selected" in self.callbacks:
             self.callbacks["on_defect_selected"](event)
@@ -426,14 +493,17 @@ class SidebarView:
 
         defect_combobox = ttk.Combobox(
             defect_frame,
-            textvariable=self.defect_var,
+            textvariable=self.defect_query_var,
             values=self.defect_items,
-            state="readonly",
+            state="normal",
             font=("Arial", 14),
             justify="center",
         )
         defect_combobox.pack(side=tk.LEFT, fill=tk.X)
 
+        # 入力欄は defect_var の値を表示する
+        self.defect_var.trace_add("write", self._sync_defect_query)
+
         # 初期値は空に設定 
         self.defect_var.set("")
 
@@ -674,7 +744,7 @@ class SidebarView:
             self.reference_entry.config(state=state)
 
         # コンボボックス
-        combo_state = "disabled" if readonly else "readonly"
+        combo_state = "disabled" if readonly else "normal"
         if hasattr(self, "defect_combobox") and self.defect_combobox:
             self.defect_combobox.config(state=combo_state)
 
@@ -696,7 +766,7 @@ class SidebarView:
         """不良項目選択肢を更新"""
         self.defect_items = defects
         if hasattr(self, "defect_combobox") and self.defect_combobox:
-            self.defect_combobox["values"] = defects
+            self.defect_combobox["values"] = self._filter_defects("")
 
     def clear_form(self):
         """フォームをクリア"""
@@ -736,6 +806,7 @@ class SidebarView:
             "count_number": self.get_item_number(),
             "reference": self.reference_var.get(),
             "defect": self.defect_var.get(),
+            "repaired": self.get_repaired(),
         }
 
         # コメント情報を追加
@@ -752,14 +823,17 @@ class SidebarView:
         """フォームデータを設定（MVCでは座標詳細のみ）"""
         self.set_coordinate_detail(data)
 
-    def focus_reference_entry(self):
-        """リファレンス入力フィールドにフォーカス"""
+    def focus_reference_entry(self, select_all: bool = False):
+        """リファレンス入力フィールドにフォーカス（select_all: 入力済みの値を選択状態にする）"""
         if (
             hasattr(self, "reference_entry")
             and self.reference_entry
             and not self.readonly_mode
         ):
             self.reference_entry.focus_set()
+            if select_all:
+                self.reference_entry.selection_range(0, tk.END)
+                self.reference_entry.icursor(tk.END)
 
     def update_worker_label(self, worker_text: str):
         """作業者ラベルを更新"""
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+BoardCacheModel（閲覧モードの基板LRU・先読み）をテストするスクリプト
+"""
+
+import os
+import sys
+import threading
+import time
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.db.schema import Detail
+from src.models.board_cache_model import BoardCacheModel
+
+
+def test_lru_and_prefetch():
+    """読み込み済みの基板を再利用し、先読みした基板は読み込みなしで取得できること"""
+    loads = []
+
+    def loader(lot_number, board_number):
+        loads.append(board_number)
+        return [Detail(x=board_number, y=board_number)]
+
+    cache = BoardCacheModel(loader, capacity=3)
+    assert cache.get("LOT", 1)[0].x == 1
+    cache.get("LOT", 1)
+    assert loads == [1]
+
+    cache.prefetch("LOT", [2, 3])
+    for _ in range(100):
+        if cache.contains("LOT", 2) and cache.contains("LOT", 3):
+            break
+        time.sleep(0.01)
+    cache.get("LOT", 3)
+    assert sorted(loads) == [1, 2, 3]
+
+    # 上限を超えると最も使われていない基板から破棄
+    cache.get("LOT", 4)
+    assert not cache.contains("LOT", 1)
+    assert cache.contains("LOT", 3)
+
+    cache.invalidate("LOT")
+    assert not cache.contains("LOT", 3)
+
+
+def test_invalidate_drops_in_flight_prefetch():
+    """先読み中に破棄したロットの古いデータがキャッシュに戻らないこと"""
+    started = threading.Event()
+    release = threading.Event()
+    version = {"value": "old"}
+
+    def loader(lot_number, board_number):
+        value = version["value"]
+        started.set()
+        release.wait(5)
+        return [Detail(x=board_number, y=0, defect=value)]
+
+    cache = BoardCacheModel(loader)
+    cache.prefetch("LOT", [1])
+    assert started.wait(5)
+
+    # 読み込み中にファイルが更新されて破棄された
+    version["value"] = "new"
+    cache.invalidate("LOT")
+    release.set()
+    for _ in range(100):
+        with cache._lock:
+            if not cache._pending:
+                break
+        time.sleep(0.01)
+    assert not cache.contains("LOT", 1)
+    assert cache.get("LOT", 1)[0].defect == "new"
+
+
+if __name__ == "__main__":
+    test_lru_and_prefetch()
+    test_invalidate_drops_in_flight_prefetch()
+    print("✅ BoardCacheModel テスト完了")
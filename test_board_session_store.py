@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+BoardSessionStore（基盤セッションの個別ファイル保存）をテストするスクリプト
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.board_model import BoardModel
+from src.models.board_session_store import BoardSessionStore
+
+
+def test_incremental_save_and_load():
+    """変更された基盤のみ書き込み、保存したセッションを復元できること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        board_model = BoardModel(session_directory=temp_dir)
+        for board_number in (1, 2, 3):
+            board_model.save_board_data(board_number, [(board_number, 10)], [{}], "LOT", "001", "", "M")
+        assert board_model.save_board_info_to_file("2026-10-19", "M", "LOT")
+
+        boards_directory = next(Path(temp_dir).glob("*/boards"))
+        board_1_mtime = (boards_directory / "0001.json").stat().st_mtime_ns
+
+        # 基盤2のみ変更・基盤3を削除して保存
+        board_model.save_board_data(2, [(2, 20)], [{}], "LOT", "001", "", "M")
+        board_model.delete_board_data(3)
+        board_model.save_board_info_to_file("2026-10-19", "M", "LOT")
+        assert (boards_directory / "0001.json").stat().st_mtime_ns == board_1_mtime
+        assert not (boards_directory / "0003.json").exists()
+
+        loaded = BoardModel(session_directory=temp_dir)
+        assert loaded.load_board_info_from_file("2026-10-19", "M", "LOT")
+        assert loaded.get_board_list() == [1, 2]
+        assert loaded.get_board_data(2)["coordinates"] == [[2, 20]]
+        assert not loaded.load_board_info_from_file("2026-10-19", "M", "OTHER")
+
+
+def test_lazy_board_loading():
+    """読み込み時はヘッダーと現在の基盤のみ読み込み、他の基盤は参照時に読み込むこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        board_model = BoardModel(session_directory=temp_dir)
+        for board_number in range(1, 21):
+            board_model.save_board_data(board_number, [(board_number, 0)], [{}], "LOT", "001", "", "M")
+        board_model.set_current_board(20)
+        board_model.save_board_info_to_file("2026-10-19", "M", "LOT")
+        assert board_model.get_resident_board_count() <= BoardModel.RESIDENT_BOARDS
+
+        loaded = BoardModel(session_directory=temp_dir)
+        loaded.load_board_info_from_file("2026-10-19", "M", "LOT")
+        assert loaded.get_resident_board_count() == 1
+        assert loaded.get_board_count() == 20
+
+        boards = loaded.boards_data
+        assert len(boards) == 20
+        assert boards[5]["coordinates"] == [[5, 0]]
+        assert sum(1 for _ in boards.items()) == 20
+        assert loaded.get_resident_board_count() <= BoardModel.RESIDENT_BOARDS
+        assert loaded.get_board_data(20)["coordinates"] == [[20, 0]]
+
+
+def test_legacy_migration_and_compaction():
+    """旧形式の board_info.json を取り込み、保持期間を過ぎたセッションを削除すること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        legacy_file = os.path.join(temp_dir, "board_info.json")
+        legacy = {
+            "2026-01-01_M_OLD": {
+                "date": "2026-01-01",
+                "model_name": "M",
+                "lot_number": "OLD",
+                "current_board": 2,
+                "boards_data": {"1": {"coordinates": [[1, 1]]}},
+                "board_history": [1],
+            }
+        }
+        with open(legacy_file, "w", encoding="utf-8") as f:
+            json.dump(legacy, f)
+
+        store = BoardSessionStore(os.path.join(temp_dir, "sessions"), legacy_file=legacy_file)
+        assert store.load_header("2026-01-01_M_OLD")["current_board"] == 2
+        assert store.load_board("2026-01-01_M_OLD", 1)["coordinates"] == [[1, 1]]
+
+        assert store.compact(today=date(2026, 3, 1)) == 0
+        assert store.compact(today=date(2026, 10, 19)) == 1
+        header = {"date": "2026-10-19", "model_name": "M", "lot_number": "NEW", "board_numbers": []}
+        store.save_session("2026-10-19_M_NEW", header, {})
+        assert list(store.list_sessions()) == ["2026-10-19_M_NEW"]
+
+
+def test_save_session_keeps_the_saved_session():
+    """保持期間・上限を超える日付のセッションでも、保存直後に削除されないこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = BoardSessionStore(os.path.join(temp_dir, "sessions"), max_sessions=2)
+        for key, day in (("A", "2099-01-02"), ("B", "2099-01-03")):
+            store.save_session(key, {"date": day, "board_numbers": []}, {})
+
+        # 保持期間を過ぎた日付（過去のロットの作業を再開した場合など）
+        header = {"date": "2000-01-01", "model_name": "M", "lot_number": "OLD", "board_numbers": [1]}
+        store.save_session("2000-01-01_M_OLD", header, {1: {"coordinates": [[1, 2]]}})
+        assert store.load_board("2000-01-01_M_OLD", 1)["coordinates"] == [[1, 2]]
+        # 上限2件のうち1件は保存したセッション、残りは新しい順
+        assert sorted(store.list_sessions()) == ["2000-01-01_M_OLD", "B"]
+
+
+if __name__ == "__main__":
+    test_incremental_save_and_load()
+    test_lazy_board_loading()
+    test_legacy_migration_and_compaction()
+    test_save_session_keeps_the_saved_session()
+    print("✅ BoardSessionStore テスト完了")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+BoardThumbnailModel（基板タイムラインのサムネイル生成・キャッシュ）をテストするスクリプト
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+
+from src.db.schema import Detail
+from src.models.board_thumbnail_model import BoardThumbnailModel
+
+
+def _wait_completed(model):
+    """生成が完了するまで待ってサムネイルを取得"""
+    completed = []
+    for _ in range(200):
+        completed.extend(model.poll_completed())
+        if not model.has_pending():
+            break
+        time.sleep(0.01)
+    return dict(completed)
+
+
+def test_thumbnail_cache_by_checksum():
+    """同じ内容の基板はキャッシュから読み込み、内容が変わると再生成すること"""
+    loads = []
+
+    def loader(lot_number, board_number):
+        loads.append(board_number)
+        return [Detail(x=50, y=50)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lot_directory = Path(temp_dir) / "LOT"
+        lot_directory.mkdir()
+        (lot_directory / "0001.data").write_text("[]", encoding="utf-8")
+        (lot_directory / "0002.data").write_text("[]", encoding="utf-8")
+
+        model = BoardThumbnailModel(os.path.join(temp_dir, "cache"), loader, max_workers=2)
+        model.set_base_image("", Image.new("RGB", (96, 72), (255, 255, 255)), (96, 72))
+        model.set_lot("LOT", lot_directory, {})
+        model.request(1)
+        model.request(1)
+        thumbnails = _wait_completed(model)
+        assert list(thumbnails) == [1]
+        assert thumbnails[1].getpixel((50, 50)) == (255, 0, 0)
+        assert loads == [1]
+
+        # 同じ内容の基板2はキャッシュ済みのサムネイルを使用
+        model.request(2)
+        assert list(_wait_completed(model)) == [2]
+        assert loads == [1]
+
+        # ロットを開き直すと内容が変わった基板のみ再生成
+        (lot_directory / "0002.data").write_text("[{}]", encoding="utf-8")
+        model.set_lot("LOT", lot_directory, {})
+        model.request(1)
+        model.request(2)
+        assert sorted(_wait_completed(model)) == [1, 2]
+        assert loads == [1, 2]
+        model.shutdown()
+
+
+if __name__ == "__main__":
+    test_thumbnail_cache_by_checksum()
+    print("✅ BoardThumbnailModel テスト完了")
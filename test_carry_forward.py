@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+前の基板の座標の引き継ぎ（未確定の座標の確定）と座標の一括追加をテストするスクリプト
+"""
+
+import os
+import sys
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.controllers.coordinate_controller import CoordinateController
+from src.db.schema import Detail
+from src.models.coordinate_model import CoordinateModel
+from src.models.image_model import ImageModel
+
+
+def test_add_coordinates_is_single_undo_step():
+    """一括追加がアンドゥ1回分・リビジョン1回分の変更になること"""
+    model = CoordinateModel()
+    model.add_coordinate(1, 1)
+    model.mark_saved()
+
+    indices = model.add_coordinates([(10, 20), (30, 40), (50, 60)], [{"reference": "R1"}, {"defect": "ズレ"}])
+    assert indices == [1, 2, 3]
+    assert model.coordinates == [(1, 1), (10, 20), (30, 40), (50, 60)]
+    assert model.get_coordinate_detail(1)["reference"] == "R1"
+    assert model.get_coordinate_detail(2)["defect"] == "ズレ"
+    assert model.has_unsaved_changes()
+
+    model.undo()
+    assert model.coordinates == [(1, 1)]
+    assert not model.has_unsaved_changes()
+    assert model.add_coordinates([]) == []
+
+
+def test_ghosts_confirm_one_and_all():
+    """引き継いだ座標は部品番号・不良名だけを持ち、1つずつ・まとめて確定できること"""
+    controller = CoordinateController(CoordinateModel(), ImageModel())
+    previous_board = [
+        Detail(x=100, y=200, reference="R1", defect="ズレ", repaired="はい", comment="再検査"),
+        Detail(x=300, y=400, reference="C2", defect="傷"),
+        Detail(x=500, y=600, reference="U3", defect="汚れ"),
+    ]
+    controller.set_ghosts(previous_board)
+    assert controller.has_ghosts()
+    assert controller.ghost_details[0].repaired == "いいえ" and controller.ghost_details[0].comment == ""
+
+    assert controller.confirm_ghost(1) == 0
+    assert controller.coordinate_model.coordinates == [(300, 400)]
+    assert [ghost.reference for ghost in controller.ghost_details] == ["R1", "U3"]
+    assert controller.confirm_ghost(5) is None
+
+    assert controller.confirm_all_ghosts() == [1, 2]
+    assert not controller.has_ghosts()
+    assert [detail.reference for detail in controller.get_all_coordinate_items()] == ["C2", "R1", "U3"]
+
+    # 一括確定はアンドゥ1回で取り消される
+    controller.undo()
+    assert controller.coordinate_model.coordinates == [(300, 400)]
+
+    # 次の基板への切り替え（座標のクリア）で未確定の座標も破棄される
+    controller.set_ghosts(previous_board)
+    controller.clear_coordinates()
+    assert not controller.has_ghosts()
+
+
+class _GhostCanvas:
+    """未確定の座標の描画だけを記録するキャンバス"""
+
+    def __init__(self):
+        self.ghosts = None
+
+    def show_ghost_markers(self, coordinates):
+        self.ghosts = coordinates
+
+    def clear_ghost_markers(self):
+        self.ghosts = []
+
+
+def test_ghosts_follow_zoom_and_pan():
+    """ズーム・パン後の再描画で未確定の座標も新しい表示位置に描き直されること"""
+    image_model = ImageModel()
+    controller = CoordinateController(CoordinateModel(), image_model)
+    canvas = _GhostCanvas()
+    controller.set_canvas_view(canvas)
+
+    controller.set_ghosts([Detail(x=100, y=200, reference="R1", defect="ズレ")])
+    before = canvas.ghosts
+    assert len(before) == 1
+
+    # 確定済みの座標がなくても再描画される
+    image_model.set_zoom_pan(2.0, 10.0, 20.0)
+    controller.redraw_ghost_markers()
+    assert canvas.ghosts != before
+    expected = image_model.convert_original_to_display_array([(100, 200)]).tolist()
+    assert canvas.ghosts == expected
+
+    controller.clear_ghosts()
+    assert canvas.ghosts == []
+
+
+if __name__ == "__main__":
+    test_add_coordinates_is_single_undo_step()
+    test_ghosts_confirm_one_and_all()
+    test_ghosts_follow_zoom_and_pan()
+    print("✅ 座標の引き継ぎテスト完了")
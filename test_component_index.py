@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+ComponentIndexModel（部品番号の補完・クリック位置の部品候補・キャリブレーション）と
+部品表・部品座標ファイルの読み込みをテストするスクリプト
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from src.models.component_index_model import ComponentIndexModel, ReferenceTrie
+from src.utils.affine_transform import apply_affine, fit_affine
+from src.utils.component_file import expand_designators, read_component_file
+
+CENTROID_CSV = """# Pick and Place export
+# Units: mm
+Designator,Footprint,Mid X,Mid Y,Layer,Rotation
+R1,0603,10.0mm,20.0mm,Top,90
+R2,0603,40.0mm,20.0mm,Top,0
+R10,0603,10.0mm,60.0mm,Bottom,180
+C1,0402,100.0mm,100.0mm,Top,0
+"""
+
+
+def test_read_centroid_and_bom_files():
+    """部品座標ファイル（コメント行・単位付き）と部品表（範囲指定・CP932）を読み込めること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        centroid_path = Path(temp_dir) / "centroid.csv"
+        centroid_path.write_text(CENTROID_CSV, encoding="utf-8")
+        centroid = read_component_file(str(centroid_path))
+        assert centroid.designators == ["R1", "R2", "R10", "C1"]
+        assert centroid.parts[0] == ("R1", 10.0, 20.0, 90.0, "Top")
+
+        bom_path = Path(temp_dir) / "bom.tsv"
+        bom_path.write_bytes("部品番号\t品名\nr1, r2 R5-R7\t抵抗\nU1\tIC\n".encode("cp932"))
+        bom = read_component_file(str(bom_path))
+        assert bom.designators == ["R1", "R2", "R5", "R6", "R7", "U1"]
+        assert bom.parts == []
+
+    assert expand_designators("C1-C3,C5") == ["C1", "C2", "C3", "C5"]
+    assert expand_designators("TP1-X") == ["TP1-X"]
+
+
+def test_trie_completion_order():
+    """前方一致の候補が記録回数の多い順、同数は番号順（R2 が R10 より先）に並ぶこと"""
+    trie = ReferenceTrie()
+    for designator in ["R10", "R2", "R1", "C1"]:
+        trie.add(designator)
+    assert trie.complete("R") == ["R1", "R2", "R10"]
+    trie.add("R10", 3)
+    assert trie.complete("R", limit=2) == ["R10", "R1"]
+    assert trie.complete("R1") == ["R10", "R1"]
+    assert trie.complete("Q") == []
+
+
+def test_component_index_import_and_suggest():
+    """取り込んだ部品座標でクリック位置の部品番号を候補にし、保存内容と過去の記録を次回読み込めること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        centroid_path = Path(temp_dir) / "centroid.csv"
+        centroid_path.write_text(CENTROID_CSV, encoding="utf-8")
+
+        component_index = ComponentIndexModel(temp_dir, "12345")
+        component_index.load()
+        assert not component_index.has_positions
+        assert component_index.import_file(str(centroid_path)) == {"designators": 4, "parts": 4}
+        assert component_index.suggest_at(12, 18) == "R1"
+        assert component_index.suggest_at(38, 21, max_distance=5) == "R2"
+        assert component_index.suggest_at(70, 70) is None
+
+        reloaded = ComponentIndexModel(temp_dir, "12345")
+        reloaded.load(history={"r2": 5, "IC1": 1})
+        assert reloaded.source == "centroid.csv"
+        assert reloaded.complete("r") == ["R2", "R1", "R10"]
+        assert reloaded.complete("i") == ["IC1"]
+        assert reloaded.suggest_at(100, 100) == "C1"
+        assert "C1" in reloaded and len(reloaded) == 5
+
+
+def test_fit_affine():
+    """2点では相似変換、3点では反転を含むアフィン変換が求まること"""
+    # 1mm = 10px、90度回転、平行移動
+    source = [(0, 0), (10, 0), (0, 20)]
+    target = [(500, 100), (500, 200), (300, 100)]
+    matrix = fit_affine(source[:2], target[:2])
+    assert np.allclose(apply_affine(matrix, source), target)
+
+    # 裏面（左右反転）
+    mirrored = [(100, 0), (0, 0), (100, 50)]
+    matrix = fit_affine(source, mirrored)
+    assert np.allclose(apply_affine(matrix, [(5, 5)]), [(50, 12.5)])
+
+    # 2点でY軸を反転（CADのY軸上向き → 画像のY軸下向き）
+    matrix = fit_affine([(0, 0), (100, 100)], [(10, 200), (110, 100)], mirror=True)
+    assert np.allclose(apply_affine(matrix, [(100, 0), (0, 100)]), [(110, 200), (10, 100)])
+
+    for points in ([(0, 0), (0, 0)], [(0, 0), (1, 1), (2, 2)]):
+        try:
+            fit_affine(points, target[: len(points)])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("変換が決まらない基準点でエラーにならない")
+
+
+def test_calibration_snaps_to_part_centers():
+    """基準点から部品座標（mm）を元画像に合わせ、クリック位置を部品の中心に合わせられること"""
+    centroid = (
+        "RefDes,X,Y,Rotation,Side\n"
+        "FID1,0,0,0,T\nFID2,100,0,0,T\nFID3,0,80,0,T\n"
+        "R1,10,20,0,T\nR2,10.5,20,0,T\nU1,50,40,0,T\n"
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        centroid_path = Path(temp_dir) / "xy.csv"
+        centroid_path.write_text(centroid, encoding="utf-8")
+        component_index = ComponentIndexModel(temp_dir, "67890")
+        component_index.load()
+        component_index.import_file(str(centroid_path))
+        assert [part.reference for part in component_index.get_calibration_parts()] == ["FID2", "FID3", "FID1"]
+
+        # 元画像は 1mm = 8px、原点 (40, 30)、Y軸は下向き
+        def to_image(x, y):
+            return 40 + x * 8, 30 + y * 8
+
+        fiducials = [
+            (reference, *to_image(x, y))
+            for reference, x, y in (("FID1", 0, 0), ("FID2", 100, 0), ("FID3", 0, 80))
+        ]
+        assert component_index.calibrate(fiducials) < 1e-6
+        assert component_index.is_calibrated
+        assert component_index.snap(*to_image(50.5, 41)) == ("U1", 440, 350)
+        assert component_index.snap(121, 191)[0] == "R1"
+        assert component_index.snap(125, 190)[0] == "R2"
+
+        # キャリブレーションは保存され、同じ基準点の部品座標の再取り込みでは引き継がれる
+        component_index.import_file(str(centroid_path))
+        reloaded = ComponentIndexModel(temp_dir, "67890")
+        reloaded.load()
+        assert reloaded.is_calibrated
+        assert reloaded.snap(440, 350) == ("U1", 440, 350)
+
+
+def test_two_fiducial_calibration_with_y_up_centroid():
+    """基準マークが2点だけのY軸上向きの部品座標でも、基準点以外の部品が画像の正しい位置に合うこと"""
+    centroid = (
+        "Designator,Mid X,Mid Y,Layer\n"
+        "FID1,0,0,Top\nFID2,100,100,Top\nR1,100,0,Top\nU1,20,80,Top\n"
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        centroid_path = Path(temp_dir) / "xy.csv"
+        centroid_path.write_text(centroid, encoding="utf-8")
+        component_index = ComponentIndexModel(temp_dir, "24680")
+        component_index.load()
+        component_index.import_file(str(centroid_path))
+        assert {part.reference for part in component_index.get_calibration_parts()} == {"FID1", "FID2"}
+
+        # 元画像は 1mm = 1px、CADの原点が画像の (10, 200)、Y軸は反対向き
+        def to_image(x, y):
+            return 10 + x, 200 - y
+
+        component_index.calibrate([("FID1", *to_image(0, 0)), ("FID2", *to_image(100, 100))])
+        assert component_index.snap(*to_image(100, 0)) == ("R1", 110, 200)
+        assert component_index.snap(*to_image(20, 80)) == ("U1", 30, 120)
+
+
+if __name__ == "__main__":
+    test_read_centroid_and_bom_files()
+    test_trie_completion_order()
+    test_component_index_import_and_suggest()
+    test_fit_affine()
+    test_calibration_snaps_to_part_centers()
+    test_two_fiducial_calibration_with_y_up_centroid()
+    print("✅ ComponentIndexModel テスト完了")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+座標ファイル（CSV/TSV/JSON）の取り込みとCSVへの書き出しをテストするスクリプト
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.controllers.coordinate_controller import CoordinateController
+from src.controllers.file_controller import FileController
+from src.db.schema import Detail
+from src.models.coordinate_model import CoordinateModel
+from src.models.image_model import ImageModel
+from src.utils.coordinate_file import read_coordinate_file, write_coordinate_csv
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+
+def test_read_headerless_coords_txt():
+    """見出し行のない x,y の行（リポジトリの coords.txt）を読み込めること"""
+    result = read_coordinate_file(str(PROJECT_ROOT / "coords.txt"))
+    assert result.errors == []
+    assert result.coordinates[0] == (130, 174)
+    assert len(result.coordinates) == len(result.details) == 5
+
+
+def test_read_csv_with_mapping_and_batch_validation():
+    """列名の推定・指定ができ、不正な行はエラーとして集めて正しい行だけを返すこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "points.tsv"
+        path.write_bytes(
+            "X座標\tY座標\t部品番号\t不良名\t修理済み\n"
+            "10\t20\tR1\tズレ\tはい\n"
+            "１５.６\t30\t\t\t\n"
+            "abc\t40\tR2\t\t\n"
+            "-1\t50\t\t\t\n"
+            "900\t60\t\t\t\n"
+            "70\t80\tU1\t傷\t要確認\n".encode("cp932")
+        )
+        result = read_coordinate_file(str(path), bounds=(800, 600))
+        assert result.coordinates == [(10, 20), (16, 30)]
+        assert result.details == [{"reference": "R1", "defect": "ズレ", "repaired": "はい"}, {}]
+        assert [error.split(":")[0] for error in result.errors] == ["4行目", "5行目", "6行目", "7行目"]
+
+        mapped = Path(temp_dir) / "mapped.csv"
+        mapped.write_text("px,py,name\n1,2,C1\n", encoding="utf-8")
+        result = read_coordinate_file(str(mapped), column_map={"x": "px", "y": "py", "reference": "name"})
+        assert result.coordinates == [(1, 2)] and result.details == [{"reference": "C1"}]
+        try:
+            read_coordinate_file(str(mapped), column_map={"x": "left", "y": "top"})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("指定した座標の列がなくてもエラーにならない")
+
+
+def test_read_json_objects_and_pairs():
+    """JSONのオブジェクト（dataファイル形式）と [x, y] の配列を読み込めること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "points.json"
+        path.write_text(
+            json.dumps([{"x": 5, "y": 6, "Reference": "R9", "comment": "再検査"}, [7, 8], {"x": None, "y": 1}]),
+            encoding="utf-8",
+        )
+        result = read_coordinate_file(str(path))
+        assert result.coordinates == [(5, 6), (7, 8)]
+        assert result.details[0] == {"reference": "R9", "comment": "再検査"}
+        assert result.errors[0].startswith("3件目")
+
+
+def test_bulk_import_is_single_undo_step():
+    """取り込んだ座標がまとめて追加され、元に戻す1回で全て取り消されること"""
+    controller = CoordinateController(CoordinateModel(), ImageModel())
+    controller.coordinate_model.add_coordinate(1, 1)
+    result = read_coordinate_file(str(PROJECT_ROOT / "coords.txt"))
+    assert controller.add_original_coordinates(result.coordinates, result.details) == [1, 2, 3, 4, 5]
+    controller.undo()
+    assert controller.coordinate_model.coordinates == [(1, 1)]
+
+
+def test_export_lot_round_trip():
+    """ロット内の基板を基板番号順に書き出し、書き出したCSVをそのまま取り込めること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_controller = FileController(SimpleNamespace(data_directory=temp_dir))
+        file_controller.create_detail_text("LOT-1", 2, [Detail(x=30, y=40, defect="傷")])
+        file_controller.create_detail_text("LOT-1", 1, [Detail(x=10, y=20, reference="R1"), Detail(x=11, y=21)])
+        file_controller.create_detail_text("LOT-1", 3, [])
+
+        def iter_rows():
+            for board_number, chunk in file_controller.iter_lot_detail_chunks("LOT-1", chunk_size=1):
+                for detail in chunk:
+                    yield "LOT-1", board_number, 0, detail
+
+        export_path = Path(temp_dir) / "LOT-1.csv"
+        assert write_coordinate_csv(str(export_path), iter_rows()) == 3
+        with open(export_path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [(row["board_number"], row["x"], row["reference"], row["defect"]) for row in rows] == [
+            ("1", "10", "R1", ""),
+            ("1", "11", "", ""),
+            ("2", "30", "", "傷"),
+        ]
+        assert not Path(f"{export_path}.tmp").exists()
+
+        result = read_coordinate_file(str(export_path))
+        assert result.errors == []
+        assert result.coordinates == [(10, 20), (11, 21), (30, 40)]
+        assert result.details[0] == {"reference": "R1", "repaired": "いいえ"}
+
+
+if __name__ == "__main__":
+    test_read_headerless_coords_txt()
+    test_read_csv_with_mapping_and_batch_validation()
+    test_read_json_objects_and_pairs()
+    test_bulk_import_is_single_undo_step()
+    test_export_lot_round_trip()
+    print("✅ 座標ファイルの取り込み・書き出しテスト完了")
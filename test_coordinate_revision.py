@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+CoordinateModel のリビジョンによる未保存変更の検出をテストするスクリプト
+"""
+
+import os
+import sys
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.coordinate_model import CoordinateModel
+
+
+def test_revision_tracks_unsaved_changes():
+    """変更で未保存になり、保存・アンドゥで保存時の状態に戻ると未保存でなくなること"""
+    model = CoordinateModel()
+    assert not model.has_unsaved_changes()
+
+    # 空の状態のクリアは変更なし
+    model.clear_coordinates()
+    assert not model.has_unsaved_changes()
+
+    model.add_coordinate(10, 20)
+    assert model.has_unsaved_changes()
+    model.mark_saved()
+    assert not model.has_unsaved_changes()
+
+    model.update_coordinate(0, 15, 25)
+    assert model.has_unsaved_changes()
+
+    # アンドゥで保存時の状態に戻る
+    model.undo()
+    assert not model.has_unsaved_changes()
+    model.redo()
+    assert model.has_unsaved_changes()
+
+    # アンドゥ後の別の変更は保存時と異なるリビジョン
+    model.undo()
+    model.set_coordinate_detail(0, {"defect": "ズレ"})
+    assert model.has_unsaved_changes()
+
+
+if __name__ == "__main__":
+    test_revision_tracks_unsaved_changes()
+    print("✅ CoordinateModel リビジョンテスト完了")
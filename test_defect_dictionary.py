@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+DefectDictionaryModel（不良項目辞書）の読み込み・絞り込み・使用回数の学習をテストするスクリプト
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.defect_dictionary_model import DefectDictionaryModel, _kana_to_romaji
+
+DEFECTS = "ズレ\tずれ\n裏\tうら\n傷\tきず\n汚れ\tよごれ\n変色\tへんしょく\n寸法不良\tすんぽうふりょう\n形状不良\tけいじょうふりょう\nショート\n"
+
+
+def _create_model(temp_dir: str, content: str = DEFECTS) -> DefectDictionaryModel:
+    defects_file = Path(temp_dir) / "defects.txt"
+    defects_file.write_text(content, encoding="utf-8")
+    model = DefectDictionaryModel(str(defects_file), usage_file=str(Path(temp_dir) / "usage.json"))
+    model.load()
+    return model
+
+
+def test_kana_to_romaji():
+    """読みが訓令式のローマ字に変換されること"""
+    assert _kana_to_romaji("へんしょく") == "hensyoku"
+    assert _kana_to_romaji("しょーと") == "syoto"
+    assert _kana_to_romaji("きっぷ") == "kippu"
+
+
+def test_load_uses_mtime_cache():
+    """更新がなければ読み直さず、更新されたら読み直すこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model = _create_model(temp_dir)
+        assert model.get_names()[:3] == ["ズレ", "裏", "傷"]
+        assert not model.load()
+
+        defects_file = Path(temp_dir) / "defects.txt"
+        defects_file.write_text("欠け\tかけ\n", encoding="utf-8")
+        os.utime(defects_file, ns=(1, 1))
+        assert model.load()
+        assert model.get_names() == ["欠け"]
+
+
+def test_filter_prefix_substring_and_romaji():
+    """名前・かな・ローマ字（ヘボン式を含む）で前方一致を部分一致より先に返すこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model = _create_model(temp_dir)
+        assert model.filter("不良") == ["寸法不良", "形状不良"]
+        assert model.filter("ｷｽﾞ") == ["傷"]
+        assert model.filter("zu") == ["ズレ", "傷"]
+        assert model.filter("sho-to") == ["ショート"]
+        assert model.filter("hensho") == ["変色"]
+        # 1文字ずつ伸ばした場合も全件から探した場合と同じ結果になること
+        assert model.filter("s") == ["寸法不良", "ショート", "変色"]
+        assert model.filter("sh") == ["ショート", "変色"]
+        assert model.filter("j") == ["形状不良"]
+        assert model.filter("jo") == ["形状不良"]
+        assert model.filter("jou") == ["形状不良"]
+        assert model.filter("ki") == ["傷"]
+        assert model.filter("kiz") == ["傷"]
+        assert model.best_match("ura") == "裏"
+        assert model.best_match("該当なし") is None
+
+
+def test_usage_ranking_learns_from_boards():
+    """保存した基板の不良名の使用回数で並び順が変わり、同じ基板の再保存は二重に数えないこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model = _create_model(temp_dir)
+        assert model.record_board_usage("LOT-1/0001", ["形状不良", "形状不良"])
+        assert model.record_board_usage("LOT-1/0001", ["形状不良"])
+        assert not model.record_board_usage("LOT-1/0001", ["形状不良"])
+        assert model.get_usage_count("形状不良") == 1
+        assert model.filter("不良") == ["形状不良", "寸法不良"]
+        assert model.filter("")[0] == "形状不良"
+
+        # 使用回数は保存され、次回起動時に引き継がれる
+        reloaded = _create_model(temp_dir)
+        assert reloaded.get_usage_count("形状不良") == 1
+
+
+def test_filter_speed():
+    """項目数が多くても1回の絞り込みが1ミリ秒未満で終わること"""
+    lines = "".join(f"不良{index:04d}\tふりょう{index}\n" for index in range(2000))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model = _create_model(temp_dir, lines + DEFECTS)
+        queries = ["h", "he", "hen", "hens", "hensy", "hensyo"]
+        # 1文字ずつ入力した場合の1回あたりの時間（最も速かった回、GC等の揺らぎを除く）
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for query in queries:
+                model.filter(query, limit=50)
+            timings.append((time.perf_counter() - start) * 1000 / len(queries))
+        elapsed_ms = min(timings)
+        assert model.filter("hensyo") == ["変色"]
+        print(f"絞り込み時間: {elapsed_ms:.3f}ms/回")
+        assert elapsed_ms < 1.0
+
+
+if __name__ == "__main__":
+    test_kana_to_romaji()
+    test_load_uses_mtime_cache()
+    test_filter_prefix_substring_and_romaji()
+    test_usage_ranking_learns_from_boards()
+    test_filter_speed()
+    print("✅ DefectDictionaryModel テスト完了")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+DefectHeatmapModel（モデルごとの不良ヒートマップ）をテストするスクリプト
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.controllers.file_controller import FileController
+from src.db.schema import Detail
+from src.models.defect_heatmap_model import DefectHeatmapModel
+
+
+def test_histogram_cache_and_incremental_add():
+    """署名が同じ間はキャッシュを使い、保存した基板の座標を差分加算できること"""
+    with tempfile.TemporaryDirectory() as tmp:
+        heatmap = DefectHeatmapModel(tmp, bins=10)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            yield [(5, 5), (95, 45)]
+
+        histogram = heatmap.get_histogram("MODEL_A", (100, 50), {"LOT1": "a"}, loader)
+        assert histogram.shape == (5, 10)
+        assert histogram.sum() == 2
+
+        # 別インスタンスでもキャッシュファイルから読み込み、再集計しない
+        heatmap = DefectHeatmapModel(tmp, bins=10)
+        heatmap.get_histogram("MODEL_A", (100, 50), {"LOT1": "a"}, loader)
+        assert len(calls) == 1
+
+        assert heatmap.add_points("MODEL_A", [(50, 25)], "LOT2", "", "b")
+        assert heatmap.get_cached_histogram("MODEL_A").sum() == 3
+
+        # 保存前の署名が一致しない場合はキャッシュを破棄
+        assert not heatmap.add_points("MODEL_A", [(50, 25)], "LOT1", "x", "c")
+        assert heatmap.get_cached_histogram("MODEL_A") is None
+
+        overlay = heatmap.render_overlay(histogram, (200, 100))
+        assert overlay.mode == "RGBA" and overlay.size == (200, 100)
+
+
+def test_signature_does_not_rewrite_manifest():
+    """署名の算出ではマニフェストを書き換えず、並行した更新でもマニフェストが壊れないこと"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_controller = FileController(SimpleNamespace(data_directory=tmp))
+        file_controller.create_detail_text("LOT1", 1, [Detail(x=1, y=2)])
+        manifest_path = Path(tmp) / "LOT1" / "manifest.json"
+
+        signature = file_controller.get_lot_manifest_signature("LOT1")
+        assert signature and not manifest_path.exists()
+
+        manifest = file_controller.update_lot_manifest("LOT1")
+        assert file_controller.get_lot_manifest_signature("LOT1", manifest) == signature
+        modified = manifest_path.stat().st_mtime_ns
+
+        def save_boards(start):
+            for index in range(start, start + 10):
+                file_controller.create_detail_text("LOT1", index, [Detail(x=index, y=index)])
+                file_controller.update_lot_manifest("LOT1")
+                file_controller.get_lot_manifest_signature("LOT1")
+
+        threads = [threading.Thread(target=save_boards, args=(start,)) for start in (2, 12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        manifest = file_controller.read_lot_manifest("LOT1")
+        assert len(manifest["files"]) == 21
+        assert manifest_path.stat().st_mtime_ns >= modified
+        assert file_controller.get_lot_manifest_signature("LOT1") == file_controller.get_lot_manifest_signature(
+            "LOT1", manifest
+        )
+
+
+if __name__ == "__main__":
+    test_histogram_cache_and_incremental_add()
+    test_signature_does_not_rewrite_manifest()
+    print("✅ DefectHeatmapModel テスト完了")
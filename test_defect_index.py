@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+DefectIndexModel（ロット横断の不良検索）をテストするスクリプト
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.defect_index_model import DefectIndexModel
+
+
+def _write_lot(data_dir: Path, lot_number: str, model: str, worker: str, boards: dict):
+    """テスト用のロットディレクトリを作成"""
+    lot_dir = data_dir / lot_number
+    lot_dir.mkdir(parents=True)
+    with open(lot_dir / "lotInfo.txt", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "model": model,
+                "lot_number": lot_number,
+                "worker_number": worker,
+                "insert_timestamp": "2025-08-11 10:00:00",
+            },
+            f,
+        )
+    for index, details in boards.items():
+        with open(lot_dir / f"{index:04d}.data", "w", encoding="utf-8") as f:
+            if details:
+                json.dump(details, f, ensure_ascii=False)
+
+
+def test_search_across_lots():
+    """複数ロットを横断してリファレンス・不良名で検索できること"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        _write_lot(
+            data_dir,
+            "1234567-10",
+            "MODEL_A",
+            "001",
+            {
+                1: [
+                    {"x": 10, "y": 20, "count_number": 1, "reference": "R123", "defect": "ブリッジ"},
+                    {"x": 30, "y": 40, "count_number": 2, "reference": "C1", "defect": "ズレ"},
+                ],
+                2: [],
+            },
+        )
+        _write_lot(
+            data_dir,
+            "7654321-20",
+            "MODEL_B",
+            "002",
+            {1: [{"x": 5, "y": 6, "count_number": 1, "reference": "R123", "defect": "ブリッジ", "repaired": "はい"}]},
+        )
+
+        index = DefectIndexModel(str(data_dir), str(Path(tmp) / "index"))
+        result = index.refresh()
+        assert result["updated"] == 3
+
+        rows = index.search(reference="R123", defect="ブリッジ")
+        assert {row["lot_number"] for row in rows} == {"1234567-10", "7654321-20"}
+        assert index.count(reference="R123", model="MODEL_B") == 1
+        assert index.count(repaired="はい") == 1
+        assert index.count(reference="R*") == 2
+        assert index.count(date_to="2000-01-01") == 0
+
+        # 2回目は変更のないファイルを再解析しない
+        assert index.refresh()["unchanged"] == 3
+
+
+def test_index_is_kept_per_station():
+    """インデックスは共有のデータディレクトリではなく、保存先にデータディレクトリごとに作成されること"""
+    with tempfile.TemporaryDirectory() as tmp:
+        index_dir = Path(tmp) / "index"
+        for name in ("data_a", "data_b"):
+            _write_lot(Path(tmp) / name, "1111111-10", "MODEL_A", "001", {1: [{"x": 1, "y": 1}]})
+
+        index_a = DefectIndexModel(str(Path(tmp) / "data_a"), str(index_dir))
+        index_b = DefectIndexModel(str(Path(tmp) / "data_b"), str(index_dir))
+        assert index_a.index_path.parent == index_dir
+        assert index_a.index_path != index_b.index_path
+        assert index_a.index_path == DefectIndexModel(str(Path(tmp) / "data_a" / "."), str(index_dir)).index_path
+        index_a.refresh()
+        assert not list((Path(tmp) / "data_a").glob("*.sqlite3"))
+
+
+def test_wildcard_search_escapes_like_characters():
+    """"*" 以外の "%" "_" はワイルドカードではなく文字として検索されること"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        details = [
+            {"x": 1, "y": 1, "count_number": 1, "reference": "R_1", "defect": "ズレ"},
+            {"x": 2, "y": 2, "count_number": 2, "reference": "RX1", "defect": "ズレ"},
+            {"x": 3, "y": 3, "count_number": 3, "reference": "R%1", "defect": "100%"},
+            {"x": 4, "y": 4, "count_number": 4, "reference": "R\\1", "defect": "1000"},
+        ]
+        _write_lot(data_dir, "1111111-10", "MODEL_A", "001", {1: details})
+
+        index = DefectIndexModel(str(data_dir), str(Path(tmp) / "index"))
+        index.refresh()
+        assert [row["reference"] for row in index.search(reference="R_*")] == ["R_1"]
+        assert [row["reference"] for row in index.search(reference="R%*")] == ["R%1"]
+        assert [row["reference"] for row in index.search(reference="R\\*")] == ["R\\1"]
+        assert [row["defect"] for row in index.search(defect="*%")] == ["100%"]
+        assert index.count(reference="R*1") == 4
+
+
+def test_iter_search_pages():
+    """検索結果をチャンク単位で逐次取得できること"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        details = [
+            {"x": i, "y": i, "count_number": i + 1, "reference": f"R{i}", "defect": "ズレ"}
+            for i in range(25)
+        ]
+        _write_lot(data_dir, "1111111-10", "MODEL_A", "001", {1: details})
+
+        index = DefectIndexModel(str(data_dir), str(Path(tmp) / "index"))
+        index.refresh()
+        chunks = list(index.iter_search(chunk_size=10, defect="ズレ"))
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+        assert len(index.search(offset=20, limit=10)) == 5
+
+
+if __name__ == "__main__":
+    test_search_across_lots()
+    test_index_is_kept_per_station()
+    test_wildcard_search_escapes_like_characters()
+    test_iter_search_pages()
+    print("✅ DefectIndexModel テスト完了")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+DefectReportModel（期間の不良集計表の作成・書き出し）をテストするスクリプト
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from src.models.defect_report_model import DefectReportModel, aggregate_lot_directory
+from src.views.dialogs.report_export_dialog import ReportExportDialog
+
+
+def _create_lot(data_directory: Path, lot_number: str, model: str, worker_number: str, boards):
+    """ロット情報と基板ごとの座標（(日付, リファレンス, 不良名) のリスト）を作成"""
+    lot_directory = data_directory / lot_number
+    lot_directory.mkdir()
+    lot = {"model": model, "lot_number": lot_number, "worker_number": worker_number, "insert_timestamp": "2026-09-01 08:00:00"}
+    (lot_directory / "lotInfo.txt").write_text(json.dumps(lot), encoding="utf-8")
+    for board_number, details in enumerate(boards, start=1):
+        items = [
+            {"x": 10, "y": 20, "reference": reference, "defect": defect, "insert_timestamp": f"{date} 10:00:00"}
+            for date, reference, defect in details
+        ]
+        (lot_directory / f"{board_number:04d}.data").write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+    # 座標未登録の基板
+    (lot_directory / f"{len(boards) + 1:04d}.data").write_text("", encoding="utf-8")
+
+
+def _create_data_directory(temp_dir: str) -> Path:
+    data_directory = Path(temp_dir)
+    _create_lot(
+        data_directory,
+        "LOT-A",
+        "12345",
+        "001",
+        [
+            [("2026-10-01", "R1", "ズレ"), ("2026-10-01", "R1", "ズレ"), ("2026-10-01", "C2", "傷")],
+            [("2026-10-02", "R1", "傷"), ("2026-09-15", "U1", "ズレ")],
+        ],
+    )
+    _create_lot(data_directory, "LOT-B", "67890", "002", [[("2026-10-02", "R1", "ズレ"), ("2026-10-03", "", "")]])
+    return data_directory
+
+
+def test_aggregate_lot_directory_filters_period_and_model():
+    """期間外の座標と対象外のモデルのロットを集計しないこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_directory = _create_data_directory(temp_dir)
+        result = aggregate_lot_directory(str(data_directory / "LOT-A"), date_from="2026-10-01", chunk_size=2)
+        assert result["rows"] == 4
+        assert result["counts"]["defect_reference"][("R1", "ズレ")] == 2
+        assert aggregate_lot_directory(str(data_directory / "LOT-A"), model="678*")["rows"] == 0
+
+
+def test_build_report_tables():
+    """不良×リファレンス・モデル別・作業者別・日別の集計表が作られ、集計元によらず同じになること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_directory = _create_data_directory(temp_dir)
+        report_model = DefectReportModel(str(data_directory), max_workers=1)
+        report = report_model.build(date_from="2026-10-01", date_to="2026-10-31", chunk_size=2)
+        assert report["rows"] == 6 and report["lots"] == 2
+
+        tables = report["tables"]
+        by_reference = tables["defect_reference"]
+        assert list(by_reference.columns) == ["ズレ", "傷", "（未入力）", "合計"]
+        assert by_reference.loc["R1"].tolist() == [3, 1, 0, 4]
+        assert by_reference.index[0] == "R1"
+        assert tables["model"].loc["12345", "合計"] == 4
+        assert tables["worker"].loc["002", "ズレ"] == 1
+        assert tables["daily"].index.tolist() == ["2026-10-01", "2026-10-02", "2026-10-03"]
+        assert tables["daily"]["合計"].tolist() == [3, 2, 1]
+
+        index_model = DefectReportModel(
+            str(data_directory), max_workers=1, index_directory=str(Path(temp_dir) / "index")
+        )
+        indexed = index_model.build(date_from="2026-10-01", date_to="2026-10-31", use_index=True, chunk_size=2)
+        for name, table in tables.items():
+            pd.testing.assert_frame_equal(indexed["tables"][name], table)
+
+        # 並列集計（プロセスプール）でも同じ結果になること
+        parallel = DefectReportModel(str(data_directory), max_workers=2).build(
+            date_from="2026-10-01", date_to="2026-10-31"
+        )
+        for name, table in tables.items():
+            pd.testing.assert_frame_equal(parallel["tables"][name], table)
+
+        empty = report_model.build(date_from="2027-01-01")
+        assert empty["rows"] == 0 and empty["tables"]["daily"].empty
+
+
+def test_write_report_formats():
+    """CSVは集計表ごとのファイル、XLSXは集計表ごとのシートで書き出されること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_directory = _create_data_directory(temp_dir)
+        report = DefectReportModel(str(data_directory), max_workers=1).build()
+        output_directory = Path(temp_dir) / "out"
+        output_directory.mkdir()
+
+        paths = DefectReportModel.write(report, str(output_directory / "report.csv"))
+        assert [Path(path).name for path in paths] == [
+            "report_defect_reference.csv",
+            "report_model.csv",
+            "report_worker.csv",
+            "report_daily.csv",
+        ]
+        daily = pd.read_csv(paths[3], encoding="utf-8-sig", index_col=0)
+        assert daily.index.name == "日付" and daily["合計"].sum() == 7
+
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            openpyxl = None
+        if openpyxl is not None:
+            xlsx_path = DefectReportModel.write(report, str(output_directory / "report.xlsx"))[0]
+            sheets = pd.read_excel(xlsx_path, sheet_name=None, index_col=0)
+            assert list(sheets) == ["不良×リファレンス", "モデル別", "作業者別", "日別"]
+
+        try:
+            DefectReportModel.write(report, str(output_directory / "report.txt"))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("対応していない形式でエラーにならない")
+
+
+def test_report_formats_default_to_csv():
+    """既定の形式はCSVで、必要なライブラリがない形式は選択肢に出ないこと"""
+    assert ReportExportDialog.available_formats()[0][1] == ".csv"
+
+    optional_formats = ReportExportDialog.OPTIONAL_FORMATS
+    ReportExportDialog.OPTIONAL_FORMATS = {".xlsx": "not_installed_excel_writer"}
+    try:
+        suffixes = [suffix for _, suffix in ReportExportDialog.available_formats()]
+    finally:
+        ReportExportDialog.OPTIONAL_FORMATS = optional_formats
+    assert suffixes == [".csv", ".parquet"]
+
+
+if __name__ == "__main__":
+    test_aggregate_lot_directory_filters_period_and_model()
+    test_build_report_tables()
+    test_write_report_formats()
+    test_report_formats_default_to_csv()
+    print("✅ DefectReportModel テスト完了")
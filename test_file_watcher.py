@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+FileWatcher（ファイル監視）とモデルカタログへの差分反映をテストするスクリプト
+"""
+
+import os
+import queue
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from PIL import Image
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.controllers.file_controller import FileController
+from src.controllers.main_controller import MainController
+from src.models.model_catalog_model import ModelCatalogModel
+from src.utils.file_watcher import EVENT_MODIFIED, FileWatcher, WatchEvent, _merge_event, _PollingWatch
+
+
+def test_merge_events():
+    """同じパスのイベントがまとめられること"""
+    assert _merge_event(None, "created") == "created"
+    assert _merge_event("created", "modified") == "created"
+    assert _merge_event("created", "deleted") is None
+    assert _merge_event("deleted", "created") == "modified"
+    assert _merge_event("modified", "deleted") == "deleted"
+
+
+def test_polling_watch_detects_changes():
+    """ポーリング監視で追加・更新・削除とサブディレクトリ内の変更を検出すること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lot_directory = Path(temp_dir) / "LOT-1"
+        lot_directory.mkdir()
+        (lot_directory / "0001.data").write_text("[]", encoding="utf-8")
+
+        events = []
+        polling_watch = _PollingWatch(temp_dir, recursive=True)
+        polling_watch.poll(lambda kind, path: events.append((kind, Path(path).name)))
+        assert events == []
+
+        (lot_directory / "0002.data").write_text("", encoding="utf-8")
+        (lot_directory / "0001.data").write_text("[{}]", encoding="utf-8")
+        os.utime(lot_directory / "0001.data", ns=(1, 1))
+        (Path(temp_dir) / "LOT-2").mkdir()
+        (Path(temp_dir) / "LOT-2" / "0001.data").write_text("", encoding="utf-8")
+        polling_watch.poll(lambda kind, path: events.append((kind, Path(path).parent.name, Path(path).name)))
+        assert sorted(events) == [
+            ("created", "LOT-1", "0002.data"),
+            ("created", "LOT-2", "0001.data"),
+            ("modified", "LOT-1", "0001.data"),
+        ]
+
+        events.clear()
+        (lot_directory / "0002.data").unlink()
+        polling_watch.poll(lambda kind, path: events.append((kind, Path(path).name)))
+        assert events == [("deleted", "0002.data")]
+
+
+def test_debounced_batches():
+    """連続したイベントが間引き時間後に1回でまとめて通知されること"""
+    batches = []
+    delivered = threading.Event()
+
+    def on_changes(events):
+        batches.append(events)
+        delivered.set()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        watcher = FileWatcher(on_changes, debounce_seconds=0.1, poll_interval=0.05)
+        assert watcher.watch(temp_dir, polling=True)
+        for index in range(5):
+            (Path(temp_dir) / f"{index}.png").write_bytes(b"x")
+        assert delivered.wait(5)
+        watcher.stop()
+
+    events = [event for batch in batches for event in batch]
+    assert sorted(Path(event.path).name for event in events) == [f"{i}.png" for i in range(5)]
+    assert len(batches) <= 2
+
+
+def test_manifest_is_updated_on_watcher_thread():
+    """dataファイルの変更は監視スレッドでマニフェストに反映し、結果だけをメインスレッドに渡すこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lot_directory = Path(temp_dir) / "1234567-10"
+        lot_directory.mkdir()
+        (lot_directory / "0001.data").write_text("[]", encoding="utf-8")
+        controller = SimpleNamespace(
+            settings_model=SimpleNamespace(data_directory=temp_dir),
+            file_controller=FileController(SimpleNamespace(data_directory=temp_dir)),
+            _file_change_queue=queue.Queue(),
+        )
+        events = [
+            WatchEvent(EVENT_MODIFIED, str(lot_directory / "0001.data")),
+            WatchEvent(EVENT_MODIFIED, str(Path(temp_dir) / "model.png")),
+        ]
+
+        worker = threading.Thread(target=MainController._on_file_changes, args=(controller, events))
+        worker.start()
+        worker.join(5)
+
+        manifest = controller.file_controller.read_lot_manifest("1234567-10")
+        assert manifest["files"]["0001.data"]["sha1"]
+        queued_events, changed_lots = controller._file_change_queue.get_nowait()
+        assert queued_events == events
+        assert changed_lots == {"1234567-10": {"0001.data"}}
+
+
+def test_catalog_apply_changes():
+    """監視イベントがモデルカタログに差分で反映されること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_directory = Path(temp_dir) / "images"
+        image_directory.mkdir()
+        Image.new("RGB", (4, 3)).save(image_directory / "11111.png")
+        catalog = ModelCatalogModel(cache_file=str(Path(temp_dir) / "catalog.json"))
+        catalog.load(str(image_directory))
+
+        Image.new("RGB", (6, 5)).save(image_directory / "22222.png")
+        (image_directory / "11111.png").unlink()
+        assert catalog.apply_changes(
+            [
+                ("created", str(image_directory / "22222.png")),
+                ("deleted", str(image_directory / "11111.png")),
+                ("created", str(Path(temp_dir) / "other.png")),
+            ]
+        )
+        assert catalog.get_names() == ["22222"]
+        assert catalog.get_image_size("22222") == (6, 5)
+
+        # 反映後はディレクトリの再走査なしでキャッシュが使われる
+        reloaded = ModelCatalogModel(cache_file=str(Path(temp_dir) / "catalog.json"))
+        assert not reloaded.load(str(image_directory))
+        assert reloaded.get_names() == ["22222"]
+
+
+if __name__ == "__main__":
+    test_merge_events()
+    test_polling_watch_detects_changes()
+    test_debounced_batches()
+    test_manifest_is_updated_on_watcher_thread()
+    test_catalog_apply_changes()
+    print("✅ FileWatcher テスト完了")
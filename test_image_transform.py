@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+ImageModel / ViewportTransform の座標変換をテストするスクリプト
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+
+from src.controllers.file_controller import FileController
+from src.db.schema import Detail, Lot
+from src.models.defect_index_model import DefectIndexModel
+from src.models.image_model import ImageModel
+from src.models.viewport_transform import ViewportTransform
+from src.utils.lot_coordinates import NO_OFFSET
+
+
+def test_array_transform_matches_scalar():
+    """一括変換が1点ずつの変換と同じ結果になること"""
+    image_model = ImageModel()
+    image_model.transform.update(base_scale=0.37)
+    image_model.set_display_offset(120, 45)
+    image_model.set_zoom_pan(1.5, 10.0, -4.0)
+
+    points = [(0, 0), (1234, 567), (3999, 2999), (17, 911)]
+    display = image_model.convert_original_to_display_array(points)
+    assert display.shape == (4, 2)
+    assert display.tolist() == [
+        list(image_model.convert_original_to_display_coords(x, y)) for x, y in points
+    ]
+
+    original = image_model.convert_display_to_original_array(display)
+    assert original.tolist() == [list(point) for point in points]
+
+    assert image_model.convert_original_to_display_array(np.empty((0, 2))).shape == (0, 2)
+
+
+def test_display_offset_is_applied():
+    """画像の表示オフセットを考慮して変換されること"""
+    image_model = ImageModel()
+    image_model.transform.update(base_scale=0.5)
+    image_model.set_display_offset(100, 20)
+
+    assert image_model.convert_original_to_display_coords(200, 40) == (200, 40)
+    assert image_model.convert_display_to_original_coords(200, 40) == (200, 40)
+
+
+def test_round_trip_at_any_window_size():
+    """どのウィンドウサイズでも元画像のピクセルに戻ること"""
+    transform = ViewportTransform()
+    points = np.array([(x, y) for x in range(0, 4000, 37) for y in range(0, 3000, 53)])
+    for base_scale, offset in [(0.1234, (3, 77)), (0.2, (150, 0)), (0.33, (0, 41)), (1.7, (-5, 9))]:
+        assert transform.update(base_scale=base_scale, offset=offset)
+        display = transform.to_display_array(points)
+        assert np.array_equal(transform.to_original_array(display), points)
+
+    # 値が変わらない更新ではキャッシュを維持
+    revision = transform.revision
+    assert not transform.update(base_scale=1.7, offset=(-5, 9))
+    assert transform.revision == revision
+
+
+def test_zoom_keeps_cursor_pixel_and_crops_viewport():
+    """カーソル下の画素を固定してズームし、見えている範囲だけを切り出すこと"""
+    image_model = ImageModel()
+    # Tkを使わずに読み込み済みの状態を再現
+    image_model._source_image = Image.new("RGB", (4000, 3000))
+    image_model._pyramid = [image_model._source_image]
+    image_model._original_size = (4000, 3000)
+    image_model._display_size = (800, 600)
+    image_model.transform.update(base_scale=0.2, offset=(100, 0))
+
+    before = image_model.transform.to_original_exact(500, 300)
+    assert image_model.zoom_at(500, 300, 8.0)
+    after = image_model.transform.to_original_exact(500, 300)
+    assert abs(before[0] - after[0]) < 1e-9 and abs(before[1] - after[1]) < 1e-9
+
+    layout = image_model.get_viewport_layout(1000, 600)
+    left, top, right, bottom = layout["region"]
+    # キャンバス (1000x600) ÷ 実効倍率 1.6 の範囲
+    assert (right - left, bottom - top) == (625.0, 375.0)
+    assert layout["size"] == (1000, 600)
+
+    # 倍率1.6では元画像、倍率0.2では1/4の縮小画像を使う
+    assert image_model._get_pyramid_level(1.6)[1] == 1.0
+    assert image_model._get_pyramid_level(0.2)[1] == 0.25
+
+    assert image_model.zoom_at(0, 0, 1.0)
+    assert not image_model.is_zoomed()
+
+
+def test_legacy_lot_offset_is_recorded_without_rewriting_data():
+    """旧形式（画像の表示位置を含む）のロットは補正量をlotInfo.txtに記録し、dataファイルは書き換えないこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_controller = FileController(SimpleNamespace(data_directory=temp_dir))
+        lot_directory = Path(temp_dir) / "1234567-10"
+        lot_directory.mkdir()
+        legacy_lot = Lot(
+            model="M1", image_path="", parent_lot_number="1234567",
+            lot_number="1234567-10", worker_number="1", detail_count=1,
+        ).model_dump()
+        legacy_lot.pop("coordinate_version")
+        (lot_directory / "lotInfo.txt").write_text(json.dumps(legacy_lot), encoding="utf-8")
+
+        # 旧バージョンは「クリック位置 / 表示倍率」を保存していた
+        scale, offset = 0.25, (100, 0)
+        shift = (int(offset[0] / scale), int(offset[1] / scale))
+        pixels = [(400, 200), (3999, 0)]
+        legacy = [(x + shift[0], y + shift[1]) for x, y in pixels]
+        (lot_directory / "0001.data").write_text(
+            json.dumps([Detail(x=x, y=y, defect="ズレ").model_dump() for x, y in legacy]),
+            encoding="utf-8",
+        )
+        index_model = DefectIndexModel(temp_dir, str(Path(temp_dir) / ".index"))
+        index_model.refresh()
+
+        # 補正量が未記録の間は座標を変換せず、ヒートマップの集計からも除外する
+        assert file_controller.get_coordinate_offset("1234567-10") is None
+        assert list(index_model.iter_points("M1")) == []
+        assert index_model.count(model="M1") == 2
+        signature = file_controller.get_lot_manifest_signature("1234567-10")
+
+        data_before = (lot_directory / "0001.data").read_bytes()
+        lot_info_before = (lot_directory / "lotInfo.txt").read_bytes()
+        backup_path = file_controller.record_coordinate_offset("1234567-10", shift)
+        assert backup_path.read_bytes() == lot_info_before
+        assert (lot_directory / "0001.data").read_bytes() == data_before
+        assert file_controller.get_coordinate_offset("1234567-10") == shift
+        assert not list(lot_directory.glob("*.tmp"))
+
+        # 読み込みは元画像のピクセル座標、保存は旧形式の座標に戻す
+        details = file_controller.read_detail_text("1234567-10", 1)
+        assert [(d.x, d.y) for d in details] == pixels
+        assert details[0].defect == "ズレ"
+        file_controller.create_detail_text("1234567-10", 1, details)
+        stored = json.loads((lot_directory / "0001.data").read_text(encoding="utf-8"))
+        assert [(d["x"], d["y"]) for d in stored] == legacy
+        assert [(d.x, d.y) for d in file_controller.read_detail_text("1234567-10", 1)] == pixels
+
+        # 補正量の記録でヒートマップの署名と検索インデックスが更新される
+        assert file_controller.get_lot_manifest_signature("1234567-10") != signature
+        index_model.refresh()
+        points = [point for chunk in index_model.iter_points("M1") for point in chunk]
+        assert sorted(points) == sorted(pixels)
+
+        # 新しく作成したロットは補正不要
+        new_lot = Lot(
+            model="M1", image_path="", parent_lot_number="7654321",
+            lot_number="7654321-10", worker_number="1", detail_count=0,
+            coordinate_version=FileController.COORDINATE_VERSION,
+        )
+        file_controller.create_lot_text(new_lot)
+        file_controller.create_detail_text("7654321-10", 1, [Detail(x=1, y=2)])
+        assert file_controller.get_coordinate_offset("7654321-10") == NO_OFFSET
+        assert [(d.x, d.y) for d in file_controller.read_detail_text("7654321-10", 1)] == [(1, 2)]
+
+
+if __name__ == "__main__":
+    test_array_transform_matches_scalar()
+    test_display_offset_is_applied()
+    test_round_trip_at_any_window_size()
+    test_zoom_keeps_cursor_pixel_and_crops_viewport()
+    test_legacy_lot_offset_is_recorded_without_rewriting_data()
+    print("✅ 座標変換テスト完了")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+JSONストリーム読み込み（dataファイルの逐次デコード）をテストするスクリプト
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.json_stream import iter_detail_chunks, iter_json_array
+
+
+def test_iter_json_array_small_reads():
+    """読み込み単位より大きな要素や途中で切れる数値も正しくデコードできること"""
+    items = [{"x": 1234567, "y": i, "comment": "あ" * 20} for i in range(10)] + [12345, "text"]
+    text = json.dumps(items, ensure_ascii=False, indent=4)
+    for read_size in (1, 3, 7, 64):
+        assert list(iter_json_array(io.StringIO(text), read_size)) == items
+
+    assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+    for invalid in ("", "{}", "[1, 2", "[1 2]"):
+        try:
+            list(iter_json_array(io.StringIO(invalid), 2))
+        except ValueError:
+            continue
+        raise AssertionError(f"不正なJSONを受け付けました: {invalid!r}")
+
+
+def test_iter_detail_chunks():
+    """dataファイルを指定件数ごとのDetailのリストとして読み込めること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "0001.data")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([{"x": i, "y": i * 2, "defect": "ズレ"} for i in range(7)], f, ensure_ascii=False)
+
+        chunks = list(iter_detail_chunks(path, chunk_size=3, read_size=16))
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        assert chunks[2][0].x == 6 and chunks[2][0].y == 12
+        assert chunks[0][0].defect == "ズレ"
+
+
+if __name__ == "__main__":
+    test_iter_json_array_small_reads()
+    test_iter_detail_chunks()
+    print("✅ JSONストリーム読み込みテスト完了")
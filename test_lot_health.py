@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+LotHealthModel（ロット整合性チェック）をテストするスクリプト
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.lot_health_model import LotHealthModel, scan_lot_directory
+
+
+def _create_lot(lot_directory: Path):
+    """正常なロット情報・作業者情報を作成"""
+    lot_directory.mkdir()
+    lot = {
+        "model": "M",
+        "image_path": "",
+        "parent_lot_number": "",
+        "lot_number": lot_directory.name,
+        "worker_number": "001",
+        "detail_count": 0,
+    }
+    (lot_directory / "lotInfo.txt").write_text(json.dumps(lot), encoding="utf-8")
+    (lot_directory / "workerInfo.txt").write_text(json.dumps({"name": "A", "number": "001"}), encoding="utf-8")
+
+
+def test_full_scan_detects_issues():
+    """破損・項目不正・アイテム番号重複・ロックファイルを検出すること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lot_directory = Path(temp_dir) / "LOT-1"
+        _create_lot(lot_directory)
+        (lot_directory / "0001.data").write_text(
+            json.dumps([{"x": 1, "y": 1, "count_number": 1}, {"x": 2, "y": 2, "count_number": 1}]),
+            encoding="utf-8",
+        )
+        (lot_directory / "0002.data").write_text('[{"x": 1, "y": 1}, {"x": 2', encoding="utf-8")
+        (lot_directory / "0003.data").write_text("", encoding="utf-8")
+        (lot_directory / "0004.data").write_text(json.dumps([{"x": "abc", "y": 1}]), encoding="utf-8")
+        (lot_directory / "lock").touch()
+        (Path(temp_dir) / "LOT-2").mkdir()
+
+        result = scan_lot_directory(str(lot_directory), lock_stale_seconds=0)
+        kinds = {(issue["file"], issue["kind"]) for issue in result["issues"]}
+        assert kinds == {
+            ("0001.data", "duplicate_count_number"),
+            ("0002.data", "truncated"),
+            ("0004.data", "schema"),
+            ("lock", "orphaned_lock"),
+        }
+
+        report = LotHealthModel(temp_dir, max_workers=2).scan()
+        assert report["lots"] == 2
+        assert report["files"] == 8
+        lot_2_kinds = {issue["kind"] for issue in report["issues"] if issue["lot_number"] == "LOT-2"}
+        assert lot_2_kinds == {"missing"}
+        # 作成直後のロックファイルは残存とみなさない
+        assert not any(issue["kind"] == "orphaned_lock" for issue in report["issues"])
+        assert "問題" in LotHealthModel.format_report(report)
+
+
+def test_empty_data_files_are_not_issues():
+    """作成直後の基板・不良なしで保存した基板（空のdataファイル）は問題として検出しないこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lot_directory = Path(temp_dir) / "LOT-1"
+        _create_lot(lot_directory)
+        (lot_directory / "0001.data").write_text("", encoding="utf-8")
+        (lot_directory / "0002.data").write_text(json.dumps([{"x": 1, "y": 1}]), encoding="utf-8")
+        (lot_directory / "0003.data").write_text("", encoding="utf-8")
+        old = os.stat(lot_directory / "0001.data").st_mtime - 86400
+        os.utime(lot_directory / "0001.data", (old, old))
+
+        result = scan_lot_directory(str(lot_directory))
+        assert result["issues"] == []
+        assert result["files"] == 5
+
+        # lotInfo.txt・workerInfo.txt の空ファイルは引き続き検出する
+        (lot_directory / "workerInfo.txt").write_text("", encoding="utf-8")
+        result = scan_lot_directory(str(lot_directory))
+        assert [(i["file"], i["kind"]) for i in result["issues"]] == [("workerInfo.txt", "empty")]
+
+
+def test_quick_scan_uses_manifest():
+    """簡易モードではマニフェストのサイズ・チェックサムとの照合のみ行うこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lot_directory = Path(temp_dir) / "LOT-1"
+        _create_lot(lot_directory)
+        data_path = lot_directory / "0001.data"
+        data_path.write_text("[", encoding="utf-8")
+        stat = data_path.stat()
+        manifest = {
+            "files": {
+                "0001.data": {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha1": hashlib.sha1(b"[").hexdigest(),
+                },
+                "0002.data": {"size": 0, "mtime_ns": 0, "sha1": ""},
+            }
+        }
+        (lot_directory / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+        # 内容が壊れていてもマニフェストと一致していれば解析しない
+        result = scan_lot_directory(str(lot_directory), quick=True)
+        assert [(i["file"], i["kind"]) for i in result["issues"]] == [("0002.data", "missing")]
+
+        data_path.write_text("[]", encoding="utf-8")
+        result = scan_lot_directory(str(lot_directory), quick=True)
+        assert ("0001.data", "manifest_mismatch") in [(i["file"], i["kind"]) for i in result["issues"]]
+
+
+if __name__ == "__main__":
+    test_full_scan_detects_issues()
+    test_empty_data_files_are_not_issues()
+    test_quick_scan_uses_manifest()
+    print("✅ LotHealthModel テスト完了")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+LotLockModel（ロットディレクトリの排他ロック）をテストするスクリプト
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.lot_lock_model import LotLockModel
+
+
+def test_exclusive_lock_and_release():
+    """他のインスタンスが保持中のロックは取得できず、解放後は取得できること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = LotLockModel()
+        second = LotLockModel()
+        assert first.acquire(Path(temp_dir), owner="001")
+        assert first.acquire(Path(temp_dir))
+
+        info = first.get_lock_info(Path(temp_dir))
+        assert info["owner"] == "001" and info["pid"] == os.getpid() and not info["stale"]
+        assert second.is_locked_by_other(Path(temp_dir))
+        assert not first.is_locked_by_other(Path(temp_dir))
+        assert not second.acquire(Path(temp_dir))
+
+        first.release(Path(temp_dir))
+        assert not (Path(temp_dir) / "lock").exists()
+        assert second.acquire(Path(temp_dir))
+        second.release_all()
+
+
+def test_stale_lock_takeover():
+    """ハートビートが途絶えたロックや所有プロセスが存在しないロックを引き継ぐこと"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lock_path = Path(temp_dir) / "lock"
+
+        # 旧形式の空のロックファイル（更新が途絶えている）
+        lock_path.touch()
+        old = time.time() - LotLockModel.STALE_SECONDS - 10
+        os.utime(lock_path, (old, old))
+        model = LotLockModel()
+        assert model.acquire(Path(temp_dir), owner="002")
+        assert json.loads(lock_path.read_text(encoding="utf-8"))["owner"] == "002"
+
+        # 引き継がれた側はハートビートでロックを手放す
+        os.utime(lock_path, (old, old))
+        other = LotLockModel()
+        assert other.acquire(Path(temp_dir))
+        model.heartbeat()
+        assert not model.is_held(Path(temp_dir))
+        model.release(Path(temp_dir))
+        assert lock_path.exists()
+        other.release_all()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # 同じホストで終了済みプロセスのロック
+        import socket
+
+        lock_path = Path(temp_dir) / "lock"
+        lock_path.write_text(
+            json.dumps({"owner": "003", "pid": 2 ** 22 + 12345, "host": socket.gethostname(), "token": "x"}),
+            encoding="utf-8",
+        )
+        model = LotLockModel()
+        assert model.get_lock_info(Path(temp_dir))["stale"]
+        assert model.acquire(Path(temp_dir))
+        model.release_all()
+
+
+def test_release_closes_before_unlink_and_reacquires():
+    """ファイル記述子を閉じてから削除し、削除に失敗しても同じロットを再取得できること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lock_path = Path(temp_dir) / "lock"
+        model = LotLockModel()
+        assert model.acquire(Path(temp_dir), owner="004")
+        model.release(Path(temp_dir))
+        assert not lock_path.exists()
+        assert model.acquire(Path(temp_dir), owner="004")
+
+        # Windowsのように開いているファイルは削除できない環境を再現
+        open_fds = set(model._held.values())
+        close_lock_fd = LotLockModel._close_lock_fd
+        unlink = Path.unlink
+
+        def close_and_record(fd):
+            open_fds.discard(fd)
+            close_lock_fd(fd)
+
+        def unlink_if_closed(path, *args, **kwargs):
+            if path == lock_path:
+                if open_fds:
+                    raise PermissionError("使用中のファイルは削除できません")
+                raise PermissionError("ウイルス対策ソフトが使用中")
+            return unlink(path, *args, **kwargs)
+
+        model._close_lock_fd = close_and_record
+        Path.unlink = unlink_if_closed
+        try:
+            model.release(Path(temp_dir))
+        finally:
+            Path.unlink = unlink
+            del model._close_lock_fd
+        assert not open_fds
+        assert not model.is_held(Path(temp_dir))
+
+        # 削除できずに残った自分のロックファイルは引き継いで再取得できる
+        assert lock_path.exists()
+        assert model.acquire(Path(temp_dir), owner="004")
+        assert model.is_held(Path(temp_dir))
+        model.release_all()
+        assert not lock_path.exists()
+
+
+if __name__ == "__main__":
+    test_exclusive_lock_and_release()
+    test_release_closes_before_unlink_and_reacquires()
+    test_stale_lock_takeover()
+    print("✅ LotLockModel テスト完了")
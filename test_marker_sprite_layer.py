@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+MarkerSpriteLayer（閲覧モードのマーカー合成）をテストするスクリプト
+"""
+
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.views.marker_sprite_layer import MarkerSpriteLayer
+
+
+def test_render_composites_markers_into_one_image():
+    """マーカーとハイライトが1枚の画像に合成されること"""
+    layer = MarkerSpriteLayer()
+    base = Image.new("RGB", (200, 100), "white")
+    points = np.array([(50, 50), (150, 50), (500, 500)])
+
+    composite = layer.render(base, points, [1, 2, 3], highlight_index=1, show_labels=False)
+    assert composite.mode == "RGBA" and composite.size == (200, 100)
+
+    # マーカーの中心は赤、ハイライトの外周は黄色、何もない位置は元画像のまま
+    assert composite.getpixel((50, 50))[:3] == (255, 0, 0)
+    assert composite.getpixel((150, 50 - 10))[:2] == (255, 255)
+    assert composite.getpixel((100, 90))[:3] == (255, 255, 255)
+
+
+if __name__ == "__main__":
+    test_render_composites_markers_into_one_image()
+    print("✅ MarkerSpriteLayer テスト完了")
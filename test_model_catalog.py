@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+ModelCatalogModel（画像ディレクトリのモデル索引）をテストするスクリプト
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models.model_catalog_model import ModelCatalogModel
+
+
+def _create_images(directory: Path):
+    """テスト用のモデル画像を作成"""
+    Image.new("RGB", (40, 30)).save(directory / "12345_A.png")
+    Image.new("RGB", (20, 10)).save(directory / "12345_B.jpg")
+    Image.new("RGB", (8, 8)).save(directory / "22222.bmp")
+    (directory / "memo.txt").write_text("x", encoding="utf-8")
+    (directory / "sub.png").mkdir()
+
+
+def test_scan_and_lookup():
+    """画像のみを名前順に索引し、前方一致とサイズを取得できること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_directory = Path(temp_dir) / "images"
+        image_directory.mkdir()
+        _create_images(image_directory)
+
+        catalog = ModelCatalogModel(cache_file=str(Path(temp_dir) / "catalog.json"))
+        assert catalog.load(str(image_directory))
+        assert catalog.get_names() == ["12345_A", "12345_B", "22222"]
+        assert catalog.get_path("22222") == str(image_directory / "22222.bmp")
+        assert catalog.get_image_size("12345_A") == (40, 30)
+        assert catalog.find_by_prefix("12345") == ["12345_A", "12345_B"]
+        assert catalog.find_first_by_prefix("2") == "22222"
+        assert catalog.find_first_by_prefix("9") is None
+        assert catalog.to_model_list()[0] == {"12345_A": str(image_directory / "12345_A.png")}
+
+        # 更新がなければ再走査しない
+        assert not catalog.load(str(image_directory))
+
+
+def test_cache_is_keyed_by_directory_mtime():
+    """ディレクトリの更新時刻が同じなら別インスタンスでもキャッシュを使い、変われば再走査すること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_directory = Path(temp_dir) / "images"
+        image_directory.mkdir()
+        _create_images(image_directory)
+        cache_file = str(Path(temp_dir) / "catalog.json")
+        ModelCatalogModel(cache_file=cache_file).load(str(image_directory))
+
+        catalog = ModelCatalogModel(cache_file=cache_file)
+        with mock.patch.object(ModelCatalogModel, "read_image_size") as read_image_size:
+            assert not catalog.load(str(image_directory))
+            read_image_size.assert_not_called()
+        assert catalog.get_image_size("12345_B") == (20, 10)
+
+        # 追加された画像のみヘッダーを読み込む
+        Image.new("RGB", (5, 6)).save(image_directory / "33333.png")
+        os.utime(image_directory, ns=(0, 1))
+        catalog = ModelCatalogModel(cache_file=cache_file)
+        with mock.patch.object(ModelCatalogModel, "read_image_size", return_value=(5, 6)) as read_image_size:
+            assert catalog.load(str(image_directory))
+            assert read_image_size.call_count == 1
+        assert "33333" in catalog and len(catalog) == 4
+
+
+if __name__ == "__main__":
+    test_scan_and_lookup()
+    test_cache_is_keyed_by_directory_mtime()
+    print("✅ ModelCatalogModel テスト完了")
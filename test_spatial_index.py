@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+GridSpatialIndex（マーカーの当たり判定・LOD描画用）をテストするスクリプト
+"""
+
+import os
+import random
+import sys
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.spatial_index import GridSpatialIndex
+
+
+def _brute_force_nearest(points, x, y, max_distance):
+    """線形探索による最寄り点（旧実装と同じ規則）"""
+    nearest_index, min_distance = None, float("inf")
+    for i, (px, py) in enumerate(points):
+        distance = ((x - px) ** 2 + (y - py) ** 2) ** 0.5
+        if distance <= max_distance and distance < min_distance:
+            nearest_index, min_distance = i, distance
+    return nearest_index
+
+
+def test_nearest_matches_linear_search():
+    """最寄り点検索が線形探索と同じ結果になること"""
+    random.seed(0)
+    points = [(random.uniform(-50, 850), random.uniform(-50, 650)) for _ in range(2000)]
+    index = GridSpatialIndex()
+    index.build(points)
+
+    for _ in range(300):
+        x, y = random.uniform(0, 800), random.uniform(0, 600)
+        assert index.nearest(x, y, 20) == _brute_force_nearest(points, x, y, 20)
+
+    # 追加した点も検索対象になること
+    added = index.add(1000.0, 1000.0)
+    assert index.nearest(1003, 1004, 20) == added
+
+
+def test_add_matches_build():
+    """1点ずつ追加したインデックスが一括構築と同じ検索結果になること"""
+    random.seed(1)
+    points = [(random.uniform(0, 800), random.uniform(0, 600)) for _ in range(1000)]
+    built = GridSpatialIndex()
+    built.build(points[:10])
+    added = GridSpatialIndex()
+    added.build(points[:10])
+    built.build(points)
+    for x, y in points[10:]:
+        added.add(x, y)
+
+    assert len(added) == len(built) == 1000
+    assert added.query_rect(100, 100, 400, 300).tolist() == built.query_rect(100, 100, 400, 300).tolist()
+    for _ in range(100):
+        x, y = random.uniform(0, 800), random.uniform(0, 600)
+        assert added.nearest(x, y, 15) == built.nearest(x, y, 15)
+
+    added.clear()
+    assert len(added) == 0 and added.nearest(0, 0, 1000) is None
+    assert added.add(5, 5) == 0
+
+
+def test_query_rect_and_cluster():
+    """範囲内の点の取得と格子ごとの集約ができること"""
+    index = GridSpatialIndex(cell_size=10)
+    index.build([(1, 1), (2, 2), (50, 50), (500, 500)])
+
+    visible = index.query_rect(0, 0, 100, 100)
+    assert visible.tolist() == [0, 1, 2]
+
+    clusters = sorted(index.cluster(visible, 24), key=lambda c: len(c[2]), reverse=True)
+    assert clusters[0][2] == [0, 1] and clusters[0][:2] == (1.5, 1.5)
+    assert clusters[1][2] == [2]
+
+
+if __name__ == "__main__":
+    test_nearest_matches_linear_search()
+    test_add_matches_build()
+    test_query_rect_and_cluster()
+    print("✅ GridSpatialIndex テスト完了")
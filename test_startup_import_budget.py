@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+起動時（作業者入力の表示まで）のインポート時間をテストするスクリプト
+python -X importtime の結果から、重いライブラリを読み込んでいないことと合計時間が予算内であることを確認
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict
+
+# プロジェクトのルートディレクトリ
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 作業者入力の表示までに必要なモジュール
+FIRST_INTERACTION_IMPORTS = "import main, src.models.worker_model, src.views.dialogs.worker_input_dialog"
+
+# 最初の画面表示の後に読み込むライブラリ
+DEFERRED_PACKAGES = ("sqlmodel", "sqlalchemy", "pydantic", "PIL", "numpy", "pandas", "watchdog")
+
+# インポート時間の予算（ミリ秒、環境変数 STARTUP_IMPORT_BUDGET_MS で変更可能）
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "300"))
+
+
+def measure_import_times(statement: str) -> Dict[str, int]:
+    """python -X importtime でモジュールごとのインポート時間（自身の時間、マイクロ秒）を取得"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_time)
+    return times
+
+
+def test_heavy_packages_are_deferred():
+    """作業者入力の表示までに重いライブラリを読み込まないこと"""
+    times = measure_import_times(FIRST_INTERACTION_IMPORTS)
+    loaded = sorted(name for name in times if name.split(".")[0] in DEFERRED_PACKAGES)
+    assert not loaded, f"起動時に読み込まれています: {loaded[:10]}"
+
+
+def test_import_time_budget():
+    """作業者入力の表示までのインポート時間が予算内であること"""
+    times = measure_import_times(FIRST_INTERACTION_IMPORTS)
+    total_ms = sum(times.values()) / 1000
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:5]
+    print(f"インポート時間: {total_ms:.1f}ms (予算: {IMPORT_BUDGET_MS:.0f}ms)")
+    assert total_ms <= IMPORT_BUDGET_MS, f"予算超過: {total_ms:.1f}ms, 上位: {slowest}"
+
+
+if __name__ == "__main__":
+    test_heavy_packages_are_deferred()
+    test_import_time_budget()
+    print("✅ 起動時インポート予算テスト完了")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+StartupProfiler（起動プロファイル）とonedirビルドの除外リスト作成をテストするスクリプト
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scripts.build_onedir import EXCLUDE_CANDIDATES, collect_source_modules, derive_excludes
+from src.utils.startup_profiler import StartupProfiler
+
+
+def test_records_imports_and_steps():
+    """インポート時間（入れ子を含む）と初期化ステップを記録してレポートを出力すること"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        package = Path(temp_dir) / "profiled_package"
+        package.mkdir()
+        (package / "__init__.py").write_text("from . import child\n", encoding="utf-8")
+        (package / "child.py").write_text("import time\ntime.sleep(0.01)\n", encoding="utf-8")
+        sys.path.insert(0, temp_dir)
+
+        profiler = StartupProfiler()
+        try:
+            profiler.enable()
+            with profiler.step("パッケージの読み込み"):
+                import profiled_package  # noqa: F401
+            profiler.mark("完了")
+        finally:
+            profiler.disable()
+            sys.path.remove(temp_dir)
+
+        report = profiler.get_report()
+        imports = {entry["module"]: entry for entry in report["imports"]}
+        assert imports["profiled_package.child"]["self_us"] >= 10_000
+        # 親の自身の時間には子のインポート時間を含めない
+        parent = imports["profiled_package"]
+        assert parent["cumulative_us"] >= imports["profiled_package.child"]["cumulative_us"]
+        assert parent["self_us"] < imports["profiled_package.child"]["self_us"]
+        assert [step["name"] for step in report["steps"]] == ["パッケージの読み込み", "完了"]
+        assert report["packages"]["profiled_package"] >= 10_000
+
+        report_path = profiler.write_report(str(Path(temp_dir) / "profile.json"))
+        with open(report_path, "r", encoding="utf-8") as f:
+            assert json.load(f)["steps"][0]["name"] == "パッケージの読み込み"
+
+
+def test_derive_excludes_keeps_profiled_modules():
+    """起動プロファイルでインポートされた除外候補は除外しないこと"""
+    excludes = derive_excludes(["sqlalchemy.dialects.postgresql.base", "numpy"])
+    assert "sqlalchemy.dialects.postgresql" not in excludes
+    assert "sqlalchemy.dialects.mysql" in excludes
+    assert set(derive_excludes([])) == set(EXCLUDE_CANDIDATES)
+
+    modules = collect_source_modules()
+    assert "src.models" in modules and "src.models.image_model" in modules
+
+
+if __name__ == "__main__":
+    test_records_imports_and_steps()
+    test_derive_excludes_keeps_profiled_modules()
+    print("✅ StartupProfiler テスト完了")
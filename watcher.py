@@ -0,0 +1,46 @@
+"""
+ファイル監視の動作確認用スクリプト
+指定したディレクトリの変更イベントを間引いてまとめて表示する
+
+使い方:
+    python watcher.py <ディレクトリ> [--recursive] [--polling]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# プロジェクトルートを追加
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.file_watcher import FileWatcher, WatchEvent
+
+
+def _print_events(events: list[WatchEvent]):
+    """まとめて届いたイベントを表示"""
+    print(f"[ファイル監視] {len(events)}件の変更")
+    for event in events:
+        print(f"  {event.kind}: {event.path}")
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="ディレクトリの変更を監視して表示します")
+    parser.add_argument("directory", help="監視するディレクトリ")
+    parser.add_argument("--recursive", action="store_true", help="サブディレクトリも監視する")
+    parser.add_argument("--polling", action="store_true", help="OSの変更通知を使わずポーリングで監視する")
+    args = parser.parse_args()
+
+    watcher = FileWatcher(_print_events)
+    if not watcher.watch(args.directory, recursive=args.recursive, polling=True if args.polling else None):
+        sys.exit(1)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()